@@ -27,6 +27,18 @@ def create_app() -> Flask:
     global app
     if app:
         return app
+    from flaskr.common.startup_profile import StartupProfiler
+
+    profiler = StartupProfiler.from_env()
+    profiler.install()
+    try:
+        return _create_app(profiler)
+    finally:
+        profiler.uninstall()
+
+
+def _create_app(profiler) -> Flask:
+    global app
     import pymysql
 
     pymysql.install_as_MySQLdb()
@@ -42,64 +54,75 @@ def create_app() -> Flask:
         },
         supports_credentials=True,
     )
-    from flaskr.common import Config, init_log
+    with profiler.phase("config"):
+        from flaskr.common import Config, init_log
 
-    app.config = Config(app.config, app)
+        app.config = Config(app.config, app)
 
-    # init log
-    init_log(app)
-    app = enable_plugin_manager(app)
+        # init log
+        init_log(app)
+        app = enable_plugin_manager(app)
     app.logger.info("ai-shifu-api mode: %s", app.config.get("MODE", "api"))
     # init database
-    from flaskr import dao
+    with profiler.phase("database"):
+        from flaskr import dao
 
-    dao.init_db(app)
+        dao.init_db(app)
 
     # init i18n
-    from flaskr.i18n import load_translations
+    with profiler.phase("i18n"):
+        from flaskr.i18n import load_translations
 
-    load_translations(app)
+        load_translations(app)
 
     # init redis
-    dao.init_redis(app)
+    with profiler.phase("redis"):
+        dao.init_redis(app)
 
-    from flaskr.service.user.auth import register_builtin_providers
+    with profiler.phase("auth providers"):
+        from flaskr.service.user.auth import register_builtin_providers
 
-    register_builtin_providers()
+        register_builtin_providers()
 
-    # Init LLM
-    with app.app_context():
-        from flaskr.api import llm  # noqa
+    # LLM providers are initialized on first use, see flaskr.api.llm.
     # init langfuse
-    from flaskr import api
+    with profiler.phase("langfuse"):
+        from flaskr import api
 
-    api.init_langfuse(app)
+        api.init_langfuse(app)
     # load plugins
-    from flaskr.framework.plugin.load_plugin import load_plugins_from_dir
-    from flaskr.framework.plugin.plugin_manager import plugin_manager
-
-    load_plugins_from_dir(app, os.path.join("flaskr", "service"))
-    try:
-        load_plugins_from_dir(app, os.path.join("flaskr", "plugins"), plugin_manager)
-    except Exception as e:
-        app.logger.warning(f"load plugins error: {e}")
+    with profiler.phase("plugins"):
+        from flaskr.framework.plugin.load_plugin import load_plugins_from_dir
+        from flaskr.framework.plugin.plugin_manager import plugin_manager
+
+        load_plugins_from_dir(app, os.path.join("flaskr", "service"))
+        try:
+            load_plugins_from_dir(
+                app, os.path.join("flaskr", "plugins"), plugin_manager
+            )
+        except Exception as e:
+            app.logger.warning(f"load plugins error: {e}")
 
     Migrate(app, dao.db)
     # register route
-    from flaskr.route import register_route
+    with profiler.phase("routes"):
+        from flaskr.route import register_route
 
-    app = register_route(app)
+        app = register_route(app)
     # init swagger
     if app.config.get("SWAGGER_ENABLED", False):
-        from flaskr.common import swagger_config
+        with profiler.phase("swagger"):
+            from flaskr.common import swagger_config
 
-        app.logger.info("swagger init ...")
-        Swagger(app, config=swagger_config, merge=True)
+            app.logger.info("swagger init ...")
+            Swagger(app, config=swagger_config, merge=True)
 
     # enable hot reload
     if app.config.get("ENV") == "development":
         plugin_manager.enable_hot_reload()
 
+    if profiler.enabled:
+        app.logger.info(profiler.report())
     return app
 
 
@@ -6,9 +6,9 @@ import base64
 import hmac
 import json
 from hashlib import sha256 as sha256
-from urllib.request import Request, urlopen
-from urllib.error import URLError
+import requests
 from flask import Flask
+from flaskr.common.http_client import http_client
 from .dto import (
     CheckResultDTO,
     CHECK_RESULT_PASS,
@@ -85,7 +85,7 @@ def ilivedata_check(
     )
     try:
         ret = send(query_body, signature, now_date, pid)
-    except URLError as err:
+    except requests.RequestException as err:
         app.logger.error("ilivedata request failed: %s", err)
         return CheckResultDTO(
             check_result=CHECK_RESULT_UNKNOWN,
@@ -132,7 +132,11 @@ def send(querystring, signature, time_stamp, pid):
         "Connection": "keep-alive",
     }
 
-    req = Request(
-        endpoint_url, querystring.encode("utf-8"), headers=headers, method="POST"
+    response = http_client.post(
+        endpoint_url,
+        data=querystring.encode("utf-8"),
+        headers=headers,
+        endpoint="ilivedata.text_check",
     )
-    return json.loads(urlopen(req).read().decode(), strict=False)
+    response.raise_for_status()
+    return json.loads(response.content.decode(), strict=False)
@@ -8,7 +8,7 @@ import random
 from flask import Flask
 from urllib.parse import urlencode
 from gmssl import sm3, func
-import requests
+from flaskr.common.http_client import http_client
 from flaskr.service.config import get_config
 from .dto import (
     CheckResultDTO,
@@ -101,7 +101,9 @@ def yidun_check(
 
     try:
         params = urlencode(params).encode("utf8")
-        response = requests.post(URL, data=params, headers=headers)
+        response = http_client.post(
+            URL, data=params, headers=headers, endpoint="yidun.text_check"
+        )
         response_json = response.json()
         if response_json.get("code", 200) == 200:
             return CheckResultDTO(
@@ -2,21 +2,26 @@ import asyncio
 import os
 import time
 from dataclasses import dataclass, field, replace
+from functools import partial
 from typing import Any, Callable, Dict, Generator, List, Optional, Tuple, Union
 from datetime import datetime
 import logging
+import threading
 import requests
-import litellm
 from flask import Flask, current_app, request
 from langfuse.client import StatefulSpanClient
 from langfuse.model import ModelUsage
 
 from .dify import DifyChunkChatCompletionResponse, dify_chat_message
+from .model_catalog import ModelCatalog, provider_fingerprint
 from flaskr.service.config import get_config
 from flaskr.service.common.models import raise_error_with_args
 from flaskr.service.metering import UsageContext, record_llm_usage
 from flaskr.service.metering.consts import normalize_usage_scene
-from litellm import get_max_tokens
+from flaskr.util.lazy_import import LazyModule
+
+# litellm takes seconds to import; it is loaded on the first completion.
+litellm = LazyModule("litellm")
 
 logger = logging.getLogger(__name__)
 
@@ -218,7 +223,9 @@ def _register_provider_models(
     return display_models
 
 
-def _init_litellm_provider(config: ProviderConfig) -> ProviderState:
+def _init_litellm_provider(
+    config: ProviderConfig, catalog: Optional[ModelCatalog] = None
+) -> ProviderState:
     api_key = get_config(config.api_key_env)
     if not api_key:
         _log_warning(f"{config.api_key_env} not configured")
@@ -246,18 +253,32 @@ def _init_litellm_provider(config: ProviderConfig) -> ProviderState:
         params["api_base"] = base_url
     if config.custom_llm_provider:
         params["custom_llm_provider"] = config.custom_llm_provider
+    fetched_models: List[Union[str, Tuple[str, str]]] = []
+    fetch = partial(_fetch_models, config, params, base_url)
+    if not (config.model_loader or config.fetch_models):
+        pass
+    elif catalog is None:
+        try:
+            fetched_models = fetch()
+        except Exception as exc:
+            _log_warning(f"load {config.key} models error: {exc}")
+    else:
+        fingerprint = provider_fingerprint(config.key, api_key, base_url)
+        catalog.register(config.key, fingerprint, fetch)
+        fetched_models = catalog.models(config.key) or []
+    return _build_provider_state(config, params, fetched_models)
+
+
+def _build_provider_state(
+    config: ProviderConfig,
+    params: Dict[str, str],
+    fetched_models: List[Union[str, Tuple[str, str]]],
+) -> ProviderState:
     if config.model_loader:
-        raw_models = config.model_loader(config, params, base_url)
+        raw_models = list(fetched_models)
     else:
-        raw_models: List[Union[str, Tuple[str, str]]] = list(config.static_models)
-        if config.fetch_models:
-            try:
-                fetched_models = _fetch_provider_models(api_key, base_url)
-                if config.filter_fn:
-                    fetched_models = [m for m in fetched_models if config.filter_fn(m)]
-                raw_models.extend(fetched_models)
-            except Exception as exc:
-                _log_warning(f"load {config.key} models error: {exc}")
+        raw_models = list(config.static_models)
+        raw_models.extend(fetched_models)
         raw_models.extend(config.extra_models)
     display_models = _register_provider_models(config, raw_models)
     if display_models:
@@ -272,6 +293,18 @@ def _init_litellm_provider(config: ProviderConfig) -> ProviderState:
     )
 
 
+def _fetch_models(
+    config: ProviderConfig, params: Dict[str, str], base_url: Optional[str]
+) -> List[Union[str, Tuple[str, str]]]:
+    """Fetch a provider's model list; run by the model catalog."""
+    if config.model_loader:
+        return config.model_loader(config, params, base_url)
+    fetched_models = _fetch_provider_models(params["api_key"], base_url)
+    if config.filter_fn:
+        fetched_models = [m for m in fetched_models if config.filter_fn(m)]
+    return fetched_models
+
+
 def _build_models_url(base_url: str | None) -> str:
     base = base_url or "https://api.openai.com/v1"
     return f"{base.rstrip('/')}/models"
@@ -285,7 +318,7 @@ def _fetch_provider_models(api_key: str, base_url: str | None) -> list[str]:
         "Authorization": f"Bearer {api_key}",
         "Content-Type": "application/json",
     }
-    response = requests.get(url, headers=headers, timeout=20)
+    response = requests.get(url, headers=headers, timeout=_model_fetch_timeout)
     response.raise_for_status()
     data = response.json()
     return [item.get("id", "") for item in data.get("data", []) if item.get("id")]
@@ -296,7 +329,7 @@ def _stream_litellm_completion(
 ):
     try:
         try:
-            max_tokens = get_max_tokens(model)
+            max_tokens = litellm.get_max_tokens(model)
             kwargs["max_tokens"] = max_tokens
         except Exception as exc:
             _log_warning(f"get max tokens for {model} failed: {exc}")
@@ -320,6 +353,7 @@ def _stream_litellm_completion(
 
 
 def _resolve_provider_for_model(model: str) -> Tuple[Optional[str], str]:
+    _ensure_providers()
     alias = MODEL_ALIAS_MAP.get(model)
     if alias:
         return alias
@@ -353,7 +387,7 @@ def _load_gemini_models(
     google_base = base_url or "https://generativelanguage.googleapis.com"
     url = f"{google_base.rstrip('/')}/v1beta/models?key={api_key}"
     try:
-        response = requests.get(url, timeout=20)
+        response = requests.get(url, timeout=_model_fetch_timeout)
         response.raise_for_status()
         data = response.json()
         for item in data.get("models", []):
@@ -528,22 +562,87 @@ LITELLM_PROVIDER_CONFIGS: List[ProviderConfig] = [
     ),
 ]
 
-PROVIDER_CONFIG_HINTS: Dict[str, str] = {}
-for config in LITELLM_PROVIDER_CONFIGS:
-    PROVIDER_STATES[config.key] = _init_litellm_provider(config)
-    PROVIDER_CONFIG_HINTS[config.key] = config.config_hint or config.api_key_env
+PROVIDER_CONFIG_HINTS: Dict[str, str] = {
+    config.key: config.config_hint or config.api_key_env
+    for config in LITELLM_PROVIDER_CONFIGS
+}
 
+any_litellm_enabled = False
+DIFY_MODELS = []
 
-any_litellm_enabled = any(state.enabled for state in PROVIDER_STATES.values())
-if not any_litellm_enabled:
-    _log_warning("No LLM Configured")
+_providers_lock = threading.Lock()
+_model_fetch_timeout = 20.0
+model_catalog: Optional[ModelCatalog] = None
+
+
+def _apply_catalog_models(
+    provider_key: str, fetched_models: List[Union[str, Tuple[str, str]]]
+) -> None:
+    """Rebuild a provider's state when the catalog fetched new models."""
+    state = PROVIDER_STATES.get(provider_key)
+    if state is None or not state.enabled:
+        return
+    config = next(c for c in LITELLM_PROVIDER_CONFIGS if c.key == provider_key)
+    PROVIDER_STATES[provider_key] = _build_provider_state(
+        config, state.params, fetched_models
+    )
+
+
+def _create_model_catalog() -> ModelCatalog:
+    global _model_fetch_timeout
+    _model_fetch_timeout = float(get_config("LLM_MODEL_CATALOG_FETCH_TIMEOUT"))
+    return ModelCatalog(
+        path=get_config("LLM_MODEL_CATALOG_PATH") or None,
+        refresh_interval=float(get_config("LLM_MODEL_CATALOG_REFRESH_SECONDS")),
+        max_workers=len(LITELLM_PROVIDER_CONFIGS),
+        on_update=_apply_catalog_models,
+    )
 
-DIFY_MODELS = []
 
-if get_config("DIFY_API_KEY") and get_config("DIFY_URL"):
-    DIFY_MODELS = ["dify"]
-else:
-    _log_warning("DIFY_API_KEY and DIFY_URL not configured")
+def _ensure_providers() -> None:
+    """
+    Initialize the LiteLLM providers and the Dify model on first use.
+
+    Provider model lists come from the model catalog snapshot. Providers
+    without a usable entry are fetched concurrently before the first call is
+    served; stale entries are refreshed in the background afterwards.
+    """
+    global any_litellm_enabled, DIFY_MODELS, model_catalog
+    if PROVIDER_STATES:
+        if model_catalog is not None:
+            model_catalog.maybe_refresh()
+        return
+    with _providers_lock:
+        if PROVIDER_STATES:
+            return
+        catalog = model_catalog or _create_model_catalog()
+        catalog.load()
+        states = {
+            config.key: _init_litellm_provider(config, catalog)
+            for config in LITELLM_PROVIDER_CONFIGS
+        }
+        missing = catalog.missing()
+        if missing:
+            catalog.refresh(missing)
+            for config in LITELLM_PROVIDER_CONFIGS:
+                if config.key in missing:
+                    states[config.key] = _build_provider_state(
+                        config,
+                        states[config.key].params,
+                        catalog.models(config.key) or [],
+                    )
+        any_litellm_enabled = any(state.enabled for state in states.values())
+        if not any_litellm_enabled:
+            _log_warning("No LLM Configured")
+
+        if get_config("DIFY_API_KEY") and get_config("DIFY_URL"):
+            DIFY_MODELS = ["dify"]
+        else:
+            DIFY_MODELS = []
+            _log_warning("DIFY_API_KEY and DIFY_URL not configured")
+        # Published last: a non-empty PROVIDER_STATES marks setup as done.
+        PROVIDER_STATES.update(states)
+        model_catalog = catalog
 
 
 class LLMStreamaUsage:
@@ -565,6 +664,7 @@ class LLMStreamResponse:
 
 
 def get_litellm_params_and_model(model: str):
+    _ensure_providers()
     requested_model = model
     provider_key, invoke_model = _resolve_provider_for_model(model)
     if provider_key:
@@ -976,6 +1076,7 @@ def _build_model_options(
 
 
 def get_current_models(app: Flask) -> list[dict[str, str]]:
+    _ensure_providers()
     litellm_models: list[str] = []
     for state in PROVIDER_STATES.values():
         litellm_models.extend(state.models)
@@ -1,7 +1,7 @@
 from flask import Flask
 from typing import Generator
-import requests
 import json
+from flaskr.common.http_client import http_client
 from flaskr.service.config.funcs import get_config
 
 
@@ -38,7 +38,9 @@ def dify_chat_message(
         "inputs": {},
         "files": [],
     }
-    response = requests.post(url, headers=headers, json=data, stream=True)
+    response = http_client.post(
+        url, headers=headers, json=data, stream=True, endpoint="dify.chat"
+    )
     for res in response.iter_lines():
         res = res.decode("utf-8")
         app.logger.info("dify response data: {}".format(res))
@@ -0,0 +1,271 @@
+"""
+Catalog of the model lists fetched from LLM providers.
+
+Fetching ``/models`` from every configured provider is slow and can hang on
+an unreachable endpoint, so the results are kept in a JSON snapshot shared
+by the workers on a host:
+
+- a worker reads the snapshot on first use and serves it immediately;
+- entries older than the refresh interval keep being served while a
+  background thread refetches them (stale-while-revalidate);
+- providers are fetched concurrently, so a refresh takes as long as the
+  slowest provider rather than the sum of all of them;
+- a failed or empty fetch keeps the previous entry and is retried after
+  ``FAILED_FETCH_RETRY_SECONDS``.
+
+Entries are keyed by provider and a fingerprint of its API key and base URL,
+so changing credentials never serves the models of the previous account.
+The fingerprint is a hash; credentials are not written to the snapshot.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+DEFAULT_SNAPSHOT_NAME = "ai-shifu-llm-models.json"
+FAILED_FETCH_RETRY_SECONDS = 60.0
+
+ModelEntry = Union[str, Tuple[str, str]]
+FetchModels = Callable[[], List[ModelEntry]]
+OnUpdate = Callable[[str, List[ModelEntry]], None]
+
+
+def provider_fingerprint(key: str, api_key: str, base_url: Optional[str]) -> str:
+    digest = hashlib.sha256(f"{key}\0{api_key}\0{base_url or ''}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def default_snapshot_path() -> str:
+    return os.path.join(tempfile.gettempdir(), DEFAULT_SNAPSHOT_NAME)
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    fingerprint: str
+    models: Tuple[ModelEntry, ...]
+    fetched_at: float
+
+
+def _decode_models(raw) -> Tuple[ModelEntry, ...]:
+    return tuple(tuple(item) if isinstance(item, list) else item for item in raw)
+
+
+class ModelCatalog:
+    """Snapshot-backed provider model lists with background refresh."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        refresh_interval: float = 3600.0,
+        max_workers: int = 8,
+        on_update: Optional[OnUpdate] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = path or default_snapshot_path()
+        self.refresh_interval = refresh_interval
+        self.max_workers = max_workers
+        self.on_update = on_update
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: Dict[str, CatalogEntry] = {}
+        self._fetchers: Dict[str, Tuple[str, FetchModels]] = {}
+        self._failed_at: Dict[str, float] = {}
+        self._snapshot_mtime: Optional[float] = None
+        self._next_check = 0.0
+        self._refresh_thread: Optional[threading.Thread] = None
+
+    # -- snapshot -----------------------------------------------------------
+
+    def load(self) -> bool:
+        """Merge newer entries from the snapshot file; True if any changed."""
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            return False
+        if mtime == self._snapshot_mtime:
+            return False
+        try:
+            with open(self.path, encoding="utf-8") as fp:
+                data = json.load(fp)
+        except (OSError, ValueError) as exc:
+            logger.warning(f"read model catalog {self.path} error: {exc}")
+            return False
+        self._snapshot_mtime = mtime
+        if data.get("version") != SNAPSHOT_VERSION:
+            return False
+        changed = []
+        with self._lock:
+            for key, raw in (data.get("providers") or {}).items():
+                entry = CatalogEntry(
+                    fingerprint=raw.get("fingerprint", ""),
+                    models=_decode_models(raw.get("models") or []),
+                    fetched_at=float(raw.get("fetched_at") or 0),
+                )
+                current = self._entries.get(key)
+                if current is None or entry.fetched_at > current.fetched_at:
+                    self._entries[key] = entry
+                    changed.append(key)
+            self._next_check = 0.0
+        self._notify(changed)
+        return bool(changed)
+
+    def _save(self) -> None:
+        with self._lock:
+            providers = {
+                key: {
+                    "fingerprint": entry.fingerprint,
+                    "models": list(entry.models),
+                    "fetched_at": entry.fetched_at,
+                }
+                for key, entry in self._entries.items()
+            }
+        payload = json.dumps({"version": SNAPSHOT_VERSION, "providers": providers})
+        directory = os.path.dirname(self.path) or "."
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".models-")
+            with os.fdopen(fd, "w", encoding="utf-8") as fp:
+                fp.write(payload)
+            os.replace(tmp_path, self.path)
+            self._snapshot_mtime = os.stat(self.path).st_mtime
+        except OSError as exc:
+            logger.warning(f"write model catalog {self.path} error: {exc}")
+
+    # -- lookups ------------------------------------------------------------
+
+    def register(self, key: str, fingerprint: str, fetch: FetchModels) -> None:
+        """Declare how to fetch ``key``'s models for the current credentials."""
+        with self._lock:
+            self._fetchers[key] = (fingerprint, fetch)
+            self._next_check = 0.0
+
+    def models(self, key: str) -> Optional[List[ModelEntry]]:
+        """Return the cached models for ``key``, or None if there are none."""
+        with self._lock:
+            fetcher = self._fetchers.get(key)
+            entry = self._entries.get(key)
+        if fetcher is None or entry is None or entry.fingerprint != fetcher[0]:
+            return None
+        return list(entry.models)
+
+    def missing(self) -> List[str]:
+        """Registered providers that have no usable entry."""
+        return [key for key in list(self._fetchers) if self.models(key) is None]
+
+    def _due(self, now: float) -> Tuple[List[str], float]:
+        due = []
+        next_check = now + self.refresh_interval
+        with self._lock:
+            for key, (fingerprint, _fetch) in self._fetchers.items():
+                entry = self._entries.get(key)
+                if entry is not None and entry.fingerprint == fingerprint:
+                    due_at = entry.fetched_at + self.refresh_interval
+                else:
+                    due_at = 0.0
+                failed_at = self._failed_at.get(key)
+                if failed_at is not None:
+                    due_at = max(due_at, failed_at + FAILED_FETCH_RETRY_SECONDS)
+                if due_at <= now:
+                    due.append(key)
+                else:
+                    next_check = min(next_check, due_at)
+        return due, next_check
+
+    # -- refresh ------------------------------------------------------------
+
+    def maybe_refresh(self) -> Optional[threading.Thread]:
+        """Start a background refresh if an entry is due; cheap otherwise."""
+        now = self._clock()
+        if now < self._next_check:
+            return None
+        with self._lock:
+            thread = self._refresh_thread
+            if thread is not None and thread.is_alive():
+                return None
+            # Checked again by the refresh thread; this only rate-limits.
+            self._next_check = now + FAILED_FETCH_RETRY_SECONDS
+            thread = threading.Thread(
+                target=self._refresh_due, name="llm-model-catalog", daemon=True
+            )
+            self._refresh_thread = thread
+        thread.start()
+        return thread
+
+    def _refresh_due(self) -> None:
+        # Another worker may have refreshed the snapshot already.
+        self.load()
+        due, _next_check = self._due(self._clock())
+        if due:
+            self.refresh(due)
+        else:
+            with self._lock:
+                self._next_check = _next_check
+
+    def refresh(self, keys: Optional[List[str]] = None) -> Dict[str, bool]:
+        """Fetch ``keys`` (default: all registered) concurrently and save."""
+        with self._lock:
+            jobs = {
+                key: fetcher
+                for key, fetcher in self._fetchers.items()
+                if keys is None or key in keys
+            }
+        if not jobs:
+            return {}
+        results: Dict[str, bool] = {}
+        workers = max(1, min(self.max_workers, len(jobs)))
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="llm-models"
+        ) as pool:
+            futures = {key: pool.submit(fetch) for key, (_fp, fetch) in jobs.items()}
+            fetched: Dict[str, List[ModelEntry]] = {}
+            for key, future in futures.items():
+                try:
+                    models = list(future.result())
+                except Exception as exc:
+                    logger.warning(f"load {key} models error: {exc}")
+                    models = []
+                if models:
+                    fetched[key] = models
+                results[key] = bool(models)
+
+        now = self._clock()
+        with self._lock:
+            for key, (fingerprint, _fetch) in jobs.items():
+                if key in fetched:
+                    self._entries[key] = CatalogEntry(
+                        fingerprint, _decode_models(fetched[key]), now
+                    )
+                    self._failed_at.pop(key, None)
+                else:
+                    self._failed_at[key] = now
+        if fetched:
+            self._save()
+        self._notify(list(fetched))
+        _due, next_check = self._due(self._clock())
+        with self._lock:
+            self._next_check = next_check
+        return results
+
+    def _notify(self, keys: List[str]) -> None:
+        if self.on_update is None:
+            return
+        for key in keys:
+            models = self.models(key)
+            if models is None:
+                continue
+            try:
+                self.on_update(key, models)
+            except Exception as exc:
+                logger.warning(f"apply {key} models error: {exc}")
@@ -1,10 +1,16 @@
-from alibabacloud_dysmsapi20170525.client import Client as Dysmsapi20170525Client
-from alibabacloud_tea_openapi import models as open_api_models
-from alibabacloud_dysmsapi20170525 import models as dysmsapi_20170525_models
-from alibabacloud_tea_util import models as util_models
-from alibabacloud_tea_util.client import Client as UtilClient
+from __future__ import annotations
+
 from flask import Flask
 
+from flaskr.util.lazy_import import LazyModule
+
+# The Aliyun SDK takes most of a second to import; it is loaded on the first SMS.
+dysmsapi_client = LazyModule("alibabacloud_dysmsapi20170525.client")
+dysmsapi_20170525_models = LazyModule("alibabacloud_dysmsapi20170525.models")
+open_api_models = LazyModule("alibabacloud_tea_openapi.models")
+util_models = LazyModule("alibabacloud_tea_util.models")
+util_client = LazyModule("alibabacloud_tea_util.client")
+
 
 def send_sms_code_ali(
     app: Flask, mobile: str, check_code: str
@@ -22,7 +28,7 @@ def send_sms_code_ali(
         access_key_secret=app.config["ALIBABA_CLOUD_SMS_ACCESS_KEY_SECRET"],
     )
     config.endpoint = "dysmsapi.aliyuncs.com"
-    client = Dysmsapi20170525Client(config)
+    client = dysmsapi_client.Client(config)
     send_sms_request = dysmsapi_20170525_models.SendSmsRequest()
     send_sms_request.sign_name = app.config["ALIBABA_CLOUD_SMS_SIGN_NAME"]
     send_sms_request.template_code = app.config["ALIBABA_CLOUD_SMS_TEMPLATE_CODE"]
@@ -35,5 +41,5 @@ def send_sms_code_ali(
     except Exception as error:
         app.logger.error(error.message)
         app.logger.error(error.data.get("Recommend"))
-        UtilClient.assert_as_string(error.message)
+        util_client.Client.assert_as_string(error.message)
     return None
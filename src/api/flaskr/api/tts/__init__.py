@@ -13,6 +13,7 @@ The provider can be selected per-Shifu configuration.
 import base64
 import logging
 import os
+from importlib import import_module
 from typing import Optional, Tuple
 
 from flaskr.common.config import get_config
@@ -26,23 +27,20 @@ from flaskr.api.tts.base import (
     AudioSettings as AudioSettings,
     BaseTTSProvider as BaseTTSProvider,
 )
-from flaskr.api.tts.minimax_provider import MinimaxTTSProvider
-from flaskr.api.tts.volcengine_provider import VolcengineTTSProvider
-from flaskr.api.tts.volcengine_http_provider import VolcengineHttpTTSProvider
-from flaskr.api.tts.baidu_provider import BaiduTTSProvider
-from flaskr.api.tts.aliyun_provider import AliyunTTSProvider
-from flaskr.api.tts.aliyun_nls_token import is_aliyun_nls_token_configured
 
 
 logger = AppLoggerProxy(logging.getLogger(__name__))
 
-# Provider registry (ordered by default selection priority)
+# Provider registry (ordered by default selection priority). Provider modules
+# pull in WebSocket/HTTP client code, so they are imported on first use.
 _PROVIDER_REGISTRY = {
-    "minimax": MinimaxTTSProvider,
-    "volcengine": VolcengineTTSProvider,
-    "volcengine_http": VolcengineHttpTTSProvider,
-    "baidu": BaiduTTSProvider,
-    "aliyun": AliyunTTSProvider,
+    "minimax": "flaskr.api.tts.minimax_provider:MinimaxTTSProvider",
+    "volcengine": "flaskr.api.tts.volcengine_provider:VolcengineTTSProvider",
+    "volcengine_http": (
+        "flaskr.api.tts.volcengine_http_provider:VolcengineHttpTTSProvider"
+    ),
+    "baidu": "flaskr.api.tts.baidu_provider:BaiduTTSProvider",
+    "aliyun": "flaskr.api.tts.aliyun_provider:AliyunTTSProvider",
 }
 _PROVIDER_PRIORITY = (
     "minimax",
@@ -56,6 +54,23 @@ _PROVIDER_PRIORITY = (
 _provider_instances: dict = {}
 
 
+def _get_provider_class(provider_name: str):
+    target = _PROVIDER_REGISTRY.get(provider_name)
+    if not target:
+        return None
+    module_name, class_name = target.split(":")
+    return getattr(import_module(module_name), class_name)
+
+
+def __getattr__(name: str):
+    """Lazy-export provider classes, e.g. ``MinimaxTTSProvider``."""
+    for target in _PROVIDER_REGISTRY.values():
+        module_name, class_name = target.split(":")
+        if class_name == name:
+            return getattr(import_module(module_name), class_name)
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
+
 def _normalize_provider_name(provider_name: str) -> str:
     normalized = (provider_name or "").strip().lower()
     if normalized == "default":
@@ -80,8 +95,11 @@ def _auto_detect_provider_name() -> str:
         return "volcengine_http"
     if get_config("BAIDU_TTS_API_KEY") and get_config("BAIDU_TTS_SECRET_KEY"):
         return "baidu"
-    if get_config("ALIYUN_TTS_APPKEY") and is_aliyun_nls_token_configured():
-        return "aliyun"
+    if get_config("ALIYUN_TTS_APPKEY"):
+        from flaskr.api.tts.aliyun_nls_token import is_aliyun_nls_token_configured
+
+        if is_aliyun_nls_token_configured():
+            return "aliyun"
     return "minimax"  # Default fallback
 
 
@@ -92,7 +110,7 @@ def _resolve_provider_name(provider_name: str = "") -> str:
 
 def _iter_provider_classes():
     for name in _PROVIDER_PRIORITY:
-        provider_cls = _PROVIDER_REGISTRY.get(name)
+        provider_cls = _get_provider_class(name)
         if provider_cls:
             yield name, provider_cls
 
@@ -117,7 +135,7 @@ def get_tts_provider(provider_name: str = "") -> BaseTTSProvider:
 
     # Get or create provider instance
     if provider_name not in _provider_instances:
-        provider_cls = _PROVIDER_REGISTRY.get(provider_name)
+        provider_cls = _get_provider_class(provider_name)
         if not provider_cls:
             raise ValueError(f"Unknown TTS provider: {provider_name}")
         _provider_instances[provider_name] = provider_cls()
@@ -2,9 +2,9 @@
 Aliyun NLS token helper.
 
 Aliyun RESTful TTS requires a short-lived NLS access token. This module fetches
-the token via Aliyun POP OpenAPI (CreateToken) and caches it in Redis when
-available, falling back to a process-local in-memory cache when Redis is not
-configured.
+the token via Aliyun POP OpenAPI (CreateToken) and keeps it in the shared
+token cache (``token_cache``), which refreshes it in the background before it
+expires.
 
 Docs:
 - CreateToken (POP OpenAPI): https://help.aliyun.com/zh/isi/getting-started/obtain-an-access-token
@@ -15,22 +15,16 @@ from __future__ import annotations
 import base64
 import hashlib
 import hmac
-import json
-import logging
 import time
 import uuid
-from dataclasses import dataclass
-from typing import Any, Optional, Tuple
+from typing import Any, Tuple
 from urllib.parse import quote
 
 import requests
 
-from flaskr.common.cache_provider import cache
+from flaskr.api.tts.token_cache import CachedToken, SharedTokenCache
 from flaskr.common.config import get_config
-from flaskr.common.log import AppLoggerProxy
-
-
-logger = AppLoggerProxy(logging.getLogger(__name__))
+from flaskr.common.http_client import http_client
 
 
 NLS_META_ENDPOINT = "https://nls-meta.cn-shanghai.aliyuncs.com/"
@@ -42,18 +36,9 @@ NLS_CREATE_TOKEN_REGION_ID = "cn-shanghai"
 _DEFAULT_REFRESH_LEEWAY_SECONDS = 60
 
 
-@dataclass(frozen=True)
-class AliyunNlsToken:
-    token: str
-    expire_time: int  # unix epoch seconds
+AliyunNlsToken = CachedToken
 
-    @property
-    def expires_in_seconds(self) -> int:
-        return max(0, int(self.expire_time - time.time()))
-
-    def is_expired(self, now: Optional[float] = None) -> bool:
-        now_ts = time.time() if now is None else float(now)
-        return self.expire_time <= int(now_ts)
+nls_token_cache = SharedTokenCache("aliyun_nls")
 
 
 def _percent_encode(value: Any) -> str:
@@ -106,42 +91,6 @@ def _get_cache_key() -> str:
     return f"{prefix}tts:aliyun:nls_token"
 
 
-def _get_lock_key() -> str:
-    prefix = get_config("REDIS_KEY_PREFIX", "") or ""
-    return f"{prefix}tts:aliyun:nls_token:lock"
-
-
-def _decode_cache_value(raw: Any) -> Optional[AliyunNlsToken]:
-    if raw is None:
-        return None
-    if isinstance(raw, bytes):
-        raw = raw.decode("utf-8", errors="replace")
-    if not isinstance(raw, str):
-        raw = str(raw)
-    raw = raw.strip()
-    if not raw:
-        return None
-    try:
-        data = json.loads(raw)
-    except Exception:
-        return None
-    token = (data.get("token") or "").strip()
-    expire_time = data.get("expire_time")
-    try:
-        expire_int = int(expire_time)
-    except Exception:
-        expire_int = 0
-    if not token or expire_int <= 0:
-        return None
-    return AliyunNlsToken(token=token, expire_time=expire_int)
-
-
-def _store_cache_value(value: AliyunNlsToken) -> None:
-    ttl_seconds = max(1, int(value.expire_time - time.time()))
-    payload = json.dumps({"token": value.token, "expire_time": value.expire_time})
-    cache.set(_get_cache_key(), payload, ex=ttl_seconds)
-
-
 def _get_access_keys() -> Tuple[str, str]:
     """
     Resolve AccessKeyId/AccessKeySecret for NLS CreateToken.
@@ -182,7 +131,12 @@ def _request_new_token(access_key_id: str, access_key_secret: str) -> AliyunNlsT
     url = f"{NLS_META_ENDPOINT}?Signature={signature}&{canonical_query}"
 
     try:
-        resp = requests.get(url, headers={"Accept": "application/json"}, timeout=10)
+        resp = http_client.get(
+            url,
+            headers={"Accept": "application/json"},
+            timeout=10,
+            endpoint="aliyun.nls_token",
+        )
     except requests.RequestException as exc:
         raise ValueError(f"Aliyun NLS token request failed: {exc}") from exc
 
@@ -220,6 +174,16 @@ def _request_new_token(access_key_id: str, access_key_secret: str) -> AliyunNlsT
     return AliyunNlsToken(token=token, expire_time=expire_int)
 
 
+def _fetch_token() -> AliyunNlsToken:
+    access_key_id, access_key_secret = _get_access_keys()
+    if not access_key_id or not access_key_secret:
+        raise ValueError(
+            "Aliyun NLS token is not configured. Set ALIYUN_TTS_TOKEN, or set "
+            "ALIYUN_AK_ID and ALIYUN_AK_SECRET to auto-fetch a temporary token."
+        )
+    return _request_new_token(access_key_id, access_key_secret)
+
+
 def get_aliyun_nls_token(
     *,
     force_refresh: bool = False,
@@ -230,7 +194,8 @@ def get_aliyun_nls_token(
 
     Resolution order:
     1) Use `ALIYUN_TTS_TOKEN` when explicitly configured (manual override).
-    2) Use cached token from Redis/in-memory cache.
+    2) Use the shared cached token; it is refreshed in the background
+       shortly before it expires.
     3) Fetch a new token using `ALIYUN_AK_ID` + `ALIYUN_AK_SECRET` (or OSS key fallback),
        cache it, and return it.
     """
@@ -239,59 +204,12 @@ def get_aliyun_nls_token(
     if override:
         return override
 
-    now = time.time()
-    cached = None if force_refresh else _decode_cache_value(cache.get(_get_cache_key()))
-    if (
-        cached
-        and not cached.is_expired(now=now)
-        and cached.expires_in_seconds > refresh_leeway_seconds
-    ):
-        return cached.token
-
-    access_key_id, access_key_secret = _get_access_keys()
-    if not access_key_id or not access_key_secret:
-        raise ValueError(
-            "Aliyun NLS token is not configured. Set ALIYUN_TTS_TOKEN, or set "
-            "ALIYUN_AK_ID and ALIYUN_AK_SECRET to auto-fetch a temporary token."
-        )
-
-    lock = cache.lock(_get_lock_key(), timeout=15, blocking_timeout=2)
-    acquired = False
-    try:
-        acquired = bool(lock.acquire(blocking=True, blocking_timeout=2))
-        if acquired and not force_refresh:
-            # Double-check cache after acquiring lock.
-            cached2 = _decode_cache_value(cache.get(_get_cache_key()))
-            if (
-                cached2
-                and not cached2.is_expired(now=now)
-                and cached2.expires_in_seconds > refresh_leeway_seconds
-            ):
-                return cached2.token
-
-        try:
-            fresh = _request_new_token(access_key_id, access_key_secret)
-            _store_cache_value(fresh)
-            logger.info(
-                "Fetched Aliyun NLS token (expires_in=%ss)",
-                max(0, int(fresh.expire_time - time.time())),
-            )
-            return fresh.token
-        except Exception as exc:
-            # If we still have a cached token that hasn't expired, use it as a fallback.
-            if cached and not cached.is_expired(now=now):
-                logger.warning(
-                    "Aliyun NLS token refresh failed, falling back to cached token: %s",
-                    str(exc)[:200],
-                )
-                return cached.token
-            raise
-    finally:
-        if acquired:
-            try:
-                lock.release()
-            except Exception:
-                pass
+    return nls_token_cache.get(
+        _get_cache_key(),
+        _fetch_token,
+        refresh_leeway=refresh_leeway_seconds,
+        force_refresh=force_refresh,
+    )
 
 
 def is_aliyun_nls_token_configured() -> bool:
@@ -14,6 +14,7 @@ import requests
 from typing import Optional, List
 
 from flaskr.common.config import get_config
+from flaskr.common.http_client import http_client
 from flaskr.common.log import AppLoggerProxy
 from flaskr.api.tts.base import (
     BaseTTSProvider,
@@ -1332,11 +1333,14 @@ class AliyunTTSProvider(BaseTTSProvider):
         )
 
         try:
-            response = requests.post(
+            response = http_client.post(
                 endpoint,
                 json=payload,
                 headers=headers,
                 timeout=60,
+                endpoint="aliyun.tts",
+                idempotent=True,
+                retry_after_send=False,
             )
 
             # Check content type to determine if error or audio
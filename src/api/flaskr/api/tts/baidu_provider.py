@@ -14,7 +14,9 @@ import time
 import hashlib
 from typing import Optional, List
 
+from flaskr.api.tts.token_cache import CachedToken, SharedTokenCache
 from flaskr.common.config import get_config
+from flaskr.common.http_client import http_client
 from flaskr.common.log import AppLoggerProxy
 from flaskr.api.tts.base import (
     BaseTTSProvider,
@@ -658,27 +660,17 @@ BAIDU_VOICES = [
     },
 ]
 
-# Token cache
-_token_cache = {
-    "access_token": None,
-    "expires_at": 0,
-}
+access_token_cache = SharedTokenCache("baidu")
 
 
-def _get_access_token(api_key: str, secret_key: str) -> str:
-    """
-    Get Baidu access token using API Key and Secret Key.
+def _token_cache_key(api_key: str, secret_key: str) -> str:
+    prefix = get_config("REDIS_KEY_PREFIX", "") or ""
+    # Keyed by the credentials so a rotated key never reads the old token.
+    digest = hashlib.sha256(f"{api_key}:{secret_key}".encode("utf-8")).hexdigest()
+    return f"{prefix}tts:baidu:access_token:{digest[:16]}"
 
-    Token is cached and refreshed when expired.
-    """
-    global _token_cache
 
-    # Check cache
-    current_time = time.time()
-    if _token_cache["access_token"] and _token_cache["expires_at"] > current_time + 300:
-        return _token_cache["access_token"]
-
-    # Request new token
+def _request_access_token(api_key: str, secret_key: str) -> CachedToken:
     params = {
         "grant_type": "client_credentials",
         "client_id": api_key,
@@ -686,27 +678,41 @@ def _get_access_token(api_key: str, secret_key: str) -> str:
     }
 
     try:
-        response = requests.post(BAIDU_TOKEN_URL, params=params, timeout=30)
+        response = http_client.post(
+            BAIDU_TOKEN_URL,
+            params=params,
+            timeout=30,
+            endpoint="baidu.token",
+            idempotent=True,
+        )
         response.raise_for_status()
         result = response.json()
+    except requests.RequestException as e:
+        logger.error(f"Failed to get Baidu access token: {e}")
+        raise ValueError(f"Failed to get Baidu access token: {e}")
 
-        if "access_token" not in result:
-            error_msg = result.get("error_description", "Unknown error")
-            raise ValueError(f"Failed to get Baidu access token: {error_msg}")
+    if "access_token" not in result:
+        error_msg = result.get("error_description", "Unknown error")
+        raise ValueError(f"Failed to get Baidu access token: {error_msg}")
 
-        access_token = result["access_token"]
-        expires_in = result.get("expires_in", 2592000)  # Default 30 days
+    expires_in = int(result.get("expires_in", 2592000))  # Default 30 days
+    return CachedToken(
+        token=result["access_token"], expire_time=int(time.time()) + expires_in
+    )
 
-        # Cache the token
-        _token_cache["access_token"] = access_token
-        _token_cache["expires_at"] = current_time + expires_in
 
-        logger.info(f"Baidu access token obtained, expires in {expires_in} seconds")
-        return access_token
+def _get_access_token(api_key: str, secret_key: str) -> str:
+    """
+    Get Baidu access token using API Key and Secret Key.
 
-    except requests.RequestException as e:
-        logger.error(f"Failed to get Baidu access token: {e}")
-        raise ValueError(f"Failed to get Baidu access token: {e}")
+    The token is shared by all workers through the token cache and refreshed
+    before it expires.
+    """
+    return access_token_cache.get(
+        _token_cache_key(api_key, secret_key),
+        lambda: _request_access_token(api_key, secret_key),
+        refresh_leeway=300,
+    )
 
 
 # Frontend-formatted voice list
@@ -878,10 +884,13 @@ class BaiduTTSProvider(BaseTTSProvider):
         )
 
         try:
-            response = requests.post(
+            response = http_client.post(
                 BAIDU_TTS_API_URL,
                 params=params,
                 timeout=60,
+                endpoint="baidu.tts",
+                idempotent=True,
+                retry_after_send=False,
             )
 
             # Check content type to determine if error or audio
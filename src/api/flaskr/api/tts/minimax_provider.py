@@ -5,10 +5,10 @@ This module provides TTS synthesis using Minimax's Text-to-Speech API (t2a_v2).
 """
 
 import logging
-import requests
 from typing import Optional, Dict, Any, List
 
 from flaskr.common.config import get_config
+from flaskr.common.http_client import http_client
 from flaskr.common.log import AppLoggerProxy
 from flaskr.api.tts.base import (
     BaseTTSProvider,
@@ -274,7 +274,15 @@ class MinimaxTTSProvider(BaseTTSProvider):
             f"Calling Minimax TTS API with model={tts_model}, text_length={len(text)}"
         )
 
-        response = requests.post(url, json=payload, headers=headers, timeout=60)
+        response = http_client.post(
+            url,
+            json=payload,
+            headers=headers,
+            timeout=60,
+            endpoint="minimax.t2a",
+            idempotent=True,
+            retry_after_send=False,
+        )
         response.raise_for_status()
 
         result = response.json()
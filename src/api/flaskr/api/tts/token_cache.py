@@ -0,0 +1,270 @@
+"""
+Shared cache for short-lived TTS provider tokens.
+
+Baidu OAuth access tokens and Aliyun NLS tokens are kept in the cache
+provider (Redis when configured), so every worker process uses the same
+token instead of fetching its own.
+
+A token is refreshed before it expires:
+- inside the last TTS_TOKEN_REFRESH_AHEAD_SECONDS of its lifetime, callers
+  still get the cached token and one background thread fetches a new one
+- inside the provider's refresh leeway (or once it is missing or expired),
+  the caller fetches synchronously; a failed refresh falls back to the cached
+  token while it has not expired
+
+Refreshes are single-flight: a process starts at most one background refresh
+per token, and the ``<cache key>:lock`` cache lock lets only one process fetch
+at a time. Background refreshes skip when another process holds the lock;
+synchronous ones wait for it briefly and then re-read the cache. If the lock
+is still held after that wait, they keep using the cached token until it
+expires and fetch only when none is left.
+
+:meth:`SharedTokenCache.stats` reports cache hits, fetches, failures and
+refresh latency.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from flaskr.common.cache_provider import cache
+from flaskr.common.config import get_config
+from flaskr.common.log import AppLoggerProxy
+
+
+logger = AppLoggerProxy(logging.getLogger(__name__))
+
+LOCK_TIMEOUT_SECONDS = 15
+LOCK_WAIT_SECONDS = 2
+
+
+@dataclass(frozen=True)
+class CachedToken:
+    token: str
+    expire_time: int  # unix epoch seconds
+
+    @property
+    def expires_in_seconds(self) -> int:
+        return max(0, int(self.expire_time - time.time()))
+
+    def is_expired(self, now: Optional[float] = None) -> bool:
+        now_ts = time.time() if now is None else float(now)
+        return self.expire_time <= int(now_ts)
+
+
+def decode_token(raw: Any) -> Optional[CachedToken]:
+    if raw is None:
+        return None
+    if isinstance(raw, bytes):
+        raw = raw.decode("utf-8", errors="replace")
+    if not isinstance(raw, str):
+        raw = str(raw)
+    raw = raw.strip()
+    if not raw:
+        return None
+    try:
+        data = json.loads(raw)
+    except Exception:
+        return None
+    token = (data.get("token") or "").strip()
+    expire_time = data.get("expire_time")
+    try:
+        expire_int = int(expire_time)
+    except Exception:
+        expire_int = 0
+    if not token or expire_int <= 0:
+        return None
+    return CachedToken(token=token, expire_time=expire_int)
+
+
+def store_token(cache_key: str, value: CachedToken) -> None:
+    ttl_seconds = max(1, int(value.expire_time - time.time()))
+    payload = json.dumps({"token": value.token, "expire_time": value.expire_time})
+    cache.set(cache_key, payload, ex=ttl_seconds)
+
+
+class SharedTokenCache:
+    """Tokens of one provider, keyed by cache key (one per credential)."""
+
+    def __init__(self, name: str, refresh_ahead: Optional[float] = None):
+        self.name = name
+        self._refresh_ahead = refresh_ahead
+        self._lock = threading.Lock()
+        self._refreshing: set[str] = set()
+        self._hits = 0
+        self._fetches = 0
+        self._background_refreshes = 0
+        self._failures = 0
+        self._fallbacks = 0
+        self._skipped = 0
+        self._fetch_total = 0.0
+        self._fetch_max = 0.0
+        self._last_error = ""
+
+    def _refresh_ahead_seconds(self) -> float:
+        if self._refresh_ahead is None:
+            return float(get_config("TTS_TOKEN_REFRESH_AHEAD_SECONDS") or 0)
+        return self._refresh_ahead
+
+    def _fetch_and_store(
+        self, cache_key: str, fetch: Callable[[], CachedToken]
+    ) -> CachedToken:
+        started = time.perf_counter()
+        try:
+            fresh = fetch()
+        except Exception as exc:
+            with self._lock:
+                self._failures += 1
+                self._last_error = str(exc)[:200]
+            raise
+        elapsed = time.perf_counter() - started
+        store_token(cache_key, fresh)
+        with self._lock:
+            self._fetches += 1
+            self._fetch_total += elapsed
+            self._fetch_max = max(self._fetch_max, elapsed)
+        logger.info(
+            "Fetched %s token in %sms (expires_in=%ss)",
+            self.name,
+            int(elapsed * 1000),
+            fresh.expires_in_seconds,
+        )
+        return fresh
+
+    def _refresh_in_background(
+        self, cache_key: str, fetch: Callable[[], CachedToken], seen: CachedToken
+    ) -> None:
+        lock = cache.lock(cache_key + ":lock", timeout=LOCK_TIMEOUT_SECONDS)
+        acquired = False
+        try:
+            acquired = bool(lock.acquire(blocking=False))
+            if not acquired:
+                with self._lock:
+                    self._skipped += 1
+                return
+            current = decode_token(cache.get(cache_key))
+            if current and current.expire_time > seen.expire_time:
+                # Another process refreshed it since we looked.
+                return
+            self._fetch_and_store(cache_key, fetch)
+            with self._lock:
+                self._background_refreshes += 1
+        except Exception as exc:
+            logger.warning(
+                "Background %s token refresh failed: %s", self.name, str(exc)[:200]
+            )
+        finally:
+            if acquired:
+                try:
+                    lock.release()
+                except Exception:
+                    pass
+            with self._lock:
+                self._refreshing.discard(cache_key)
+
+    def _start_background_refresh(
+        self, cache_key: str, fetch: Callable[[], CachedToken], seen: CachedToken
+    ) -> None:
+        with self._lock:
+            if cache_key in self._refreshing:
+                return
+            self._refreshing.add(cache_key)
+        threading.Thread(
+            target=self._refresh_in_background,
+            args=(cache_key, fetch, seen),
+            name=f"{self.name}-token-refresh",
+            daemon=True,
+        ).start()
+
+    def get(
+        self,
+        cache_key: str,
+        fetch: Callable[[], CachedToken],
+        *,
+        refresh_leeway: float = 60,
+        force_refresh: bool = False,
+    ) -> str:
+        """Return a valid token for ``cache_key``, calling ``fetch`` as needed.
+
+        ``fetch`` returns a :class:`CachedToken` or raises; it runs at most
+        once per call, on this thread or on the background refresh thread.
+        """
+        now = time.time()
+        cached = None if force_refresh else decode_token(cache.get(cache_key))
+        if cached and cached.expire_time - now > refresh_leeway:
+            with self._lock:
+                self._hits += 1
+            if (
+                cached.expire_time - now
+                <= refresh_leeway + self._refresh_ahead_seconds()
+            ):
+                self._start_background_refresh(cache_key, fetch, cached)
+            return cached.token
+
+        lock = cache.lock(
+            cache_key + ":lock",
+            timeout=LOCK_TIMEOUT_SECONDS,
+            blocking_timeout=LOCK_WAIT_SECONDS,
+        )
+        acquired = False
+        try:
+            acquired = bool(
+                lock.acquire(blocking=True, blocking_timeout=LOCK_WAIT_SECONDS)
+            )
+            if not force_refresh:
+                # Another process may have refreshed while we waited.
+                now = time.time()
+                current = decode_token(cache.get(cache_key))
+                if current and (
+                    current.expire_time - now > refresh_leeway
+                    or (not acquired and not current.is_expired(now=now))
+                ):
+                    # Without the lock its holder is still fetching, so a
+                    # token that has not expired yet is good enough.
+                    with self._lock:
+                        self._hits += 1
+                    return current.token
+            try:
+                return self._fetch_and_store(cache_key, fetch).token
+            except Exception as exc:
+                if cached and not cached.is_expired(now=now):
+                    logger.warning(
+                        "%s token refresh failed, falling back to cached token: %s",
+                        self.name,
+                        str(exc)[:200],
+                    )
+                    with self._lock:
+                        self._fallbacks += 1
+                    return cached.token
+                raise
+        finally:
+            if acquired:
+                try:
+                    lock.release()
+                except Exception:
+                    pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit, fetch and failure counts and fetch latency."""
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "fetches": self._fetches,
+                "background_refreshes": self._background_refreshes,
+                "failures": self._failures,
+                "fallbacks": self._fallbacks,
+                "skipped": self._skipped,
+                "refreshing": len(self._refreshing),
+                "fetch_avg_ms": (
+                    int(self._fetch_total / self._fetches * 1000)
+                    if self._fetches
+                    else 0
+                ),
+                "fetch_max_ms": int(self._fetch_max * 1000),
+                "last_error": self._last_error,
+            }
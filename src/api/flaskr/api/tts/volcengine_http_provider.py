@@ -17,6 +17,7 @@ import requests
 from requests import Response
 
 from flaskr.common.config import get_config
+from flaskr.common.http_client import http_client
 from flaskr.api.tts.base import (
     BaseTTSProvider,
     TTSResult,
@@ -236,11 +237,14 @@ class VolcengineHttpTTSProvider(BaseTTSProvider):
         headers = {"Authorization": f"Bearer;{token}"}
 
         try:
-            response = requests.post(
+            response = http_client.post(
                 VOLCENGINE_HTTP_TTS_URL,
                 json=payload,
                 headers=headers,
                 timeout=60,
+                endpoint="volcengine.tts",
+                idempotent=True,
+                retry_after_send=False,
             )
         except requests.RequestException as exc:
             logger.error(
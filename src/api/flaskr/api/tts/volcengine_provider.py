@@ -2,16 +2,15 @@
 Volcengine TTS Provider.
 
 This module provides TTS synthesis using Volcengine's bidirectional
-WebSocket TTS API (ByteDance/Doubao).
+WebSocket TTS API (ByteDance/Doubao). Connections are pooled and reused
+across syntheses by ``volcengine_ws_pool``.
 
 API Reference:
 - WebSocket URL: wss://openspeech.bytedance.com/api/v3/tts/bidirection
 - Uses custom binary protocol for frame encoding/decoding
 """
 
-import uuid
 import logging
-import threading
 from typing import Optional, List
 
 from flaskr.common.config import get_config
@@ -24,11 +23,7 @@ from flaskr.api.tts.base import (
     ProviderConfig,
     ParamRange,
 )
-from flaskr.api.tts.volcengine_protocol import (
-    VolcengineProtocol,
-    Event,
-    MessageType,
-)
+from flaskr.api.tts.volcengine_ws_pool import volcengine_ws_pool
 
 try:
     import websocket
@@ -190,10 +185,6 @@ VOLCENGINE_EMOTIONS = [
 class VolcengineTTSProvider(BaseTTSProvider):
     """TTS provider using Volcengine bidirectional WebSocket API."""
 
-    def __init__(self):
-        self._protocol = VolcengineProtocol()
-        self._lock = threading.Lock()
-
     @property
     def provider_name(self) -> str:
         return "volcengine"
@@ -339,181 +330,26 @@ class VolcengineTTSProvider(BaseTTSProvider):
                 "Set VOLCENGINE_TTS_APP_KEY and VOLCENGINE_TTS_ACCESS_KEY."
             )
 
-        # Generate unique IDs
-        connect_id = str(uuid.uuid4())
-        session_id = str(uuid.uuid4()).replace("-", "")
-
-        # Collect audio data
-        audio_chunks: List[bytes] = []
-        error_message: Optional[str] = None
-        connection_established = threading.Event()
-        session_finished = threading.Event()
-        total_duration_ms = 0
-
-        # Create WebSocket connection
-        ws_headers = {
-            "X-Api-App-Key": app_key,
-            "X-Api-Access-Key": access_key,
-            "X-Api-Resource-Id": resource_id,
-            "X-Api-Connect-Id": connect_id,
-        }
-
-        protocol = VolcengineProtocol()
-
-        def on_message(ws, message):
-            nonlocal error_message, total_duration_ms
-
-            try:
-                if isinstance(message, bytes):
-                    frame = protocol.decode_frame(message)
-
-                    if frame.event == Event.CONNECTION_STARTED:
-                        logger.debug(f"Connection started: {frame.connection_id}")
-                        connection_established.set()
-
-                    elif frame.event == Event.CONNECTION_FAILED:
-                        error_message = f"Connection failed: {frame.payload}"
-                        logger.error(error_message)
-                        connection_established.set()
-                        session_finished.set()
-
-                    elif frame.event == Event.SESSION_STARTED:
-                        logger.debug(f"Session started: {frame.session_id}")
-
-                    elif frame.event == Event.SESSION_FINISHED:
-                        logger.debug(f"Session finished: {frame.session_id}")
-                        # Extract usage info if available
-                        if isinstance(frame.payload, dict):
-                            usage = frame.payload.get("usage", {})
-                            if usage:
-                                logger.info(f"TTS usage: {usage}")
-                        session_finished.set()
-
-                    elif frame.event == Event.SESSION_FAILED:
-                        error_message = f"Session failed: {frame.payload}"
-                        logger.error(error_message)
-                        session_finished.set()
-
-                    elif frame.event == Event.TTS_RESPONSE:
-                        # Audio data received
-                        if frame.payload and isinstance(frame.payload, bytes):
-                            audio_chunks.append(frame.payload)
-                            logger.debug(
-                                f"Received audio chunk: {len(frame.payload)} bytes"
-                            )
-
-                    elif frame.event == Event.TTS_SENTENCE_START:
-                        logger.debug(f"Sentence start: {frame.payload}")
-
-                    elif frame.event == Event.TTS_SENTENCE_END:
-                        logger.debug(f"Sentence end: {frame.payload}")
-                        # Extract duration if available
-                        if isinstance(frame.payload, dict):
-                            duration = frame.payload.get("res_params", {}).get(
-                                "duration_ms", 0
-                            )
-                            total_duration_ms += duration
-
-                    elif frame.message_type == MessageType.ERROR_INFORMATION:
-                        error_message = f"Error {frame.error_code}: {frame.payload}"
-                        logger.error(error_message)
-                        session_finished.set()
-
-            except Exception as e:
-                logger.error(f"Error processing message: {e}")
-                error_message = str(e)
-                session_finished.set()
-
-        def on_error(ws, error):
-            nonlocal error_message
-            error_message = str(error)
-            logger.error(f"WebSocket error: {error}")
-            connection_established.set()
-            session_finished.set()
-
-        def on_close(ws, close_status_code, close_msg):
-            logger.debug(f"WebSocket closed: {close_status_code} - {close_msg}")
-            connection_established.set()
-            session_finished.set()
-
-        def on_open(ws):
-            logger.debug("WebSocket opened, sending StartConnection")
-            # Send StartConnection
-            ws.send(
-                protocol.encode_start_connection(), opcode=websocket.ABNF.OPCODE_BINARY
-            )
-
-        # Create and run WebSocket
-        ws = websocket.WebSocketApp(
-            VOLCENGINE_TTS_WS_URL,
-            header=ws_headers,
-            on_message=on_message,
-            on_error=on_error,
-            on_close=on_close,
-            on_open=on_open,
+        # Sessions run on a warm pooled connection; see volcengine_ws_pool.
+        result = volcengine_ws_pool.synthesize(
+            url=VOLCENGINE_TTS_WS_URL,
+            app_key=app_key,
+            access_key=access_key,
+            resource_id=resource_id,
+            text=text,
+            session_params={
+                "speaker": voice_settings.voice_id,
+                "audio_format": audio_settings.format,
+                "sample_rate": audio_settings.sample_rate,
+                "speed": voice_settings.speed,
+                "pitch": voice_settings.pitch,
+                "volume": voice_settings.volume,
+                "emotion": voice_settings.emotion,
+                "model": model_version,
+            },
         )
-
-        # Run WebSocket in a separate thread
-        ws_thread = threading.Thread(
-            target=ws.run_forever, kwargs={"skip_utf8_validation": True}
-        )
-        ws_thread.daemon = True
-        ws_thread.start()
-
-        try:
-            # Wait for connection to be established
-            if not connection_established.wait(timeout=10):
-                raise ValueError("Timeout waiting for connection")
-
-            if error_message:
-                raise ValueError(error_message)
-
-            # Send StartSession
-            logger.debug(f"Sending StartSession with speaker={voice_settings.voice_id}")
-            start_session_frame = protocol.encode_start_session(
-                session_id=session_id,
-                speaker=voice_settings.voice_id,
-                audio_format=audio_settings.format,
-                sample_rate=audio_settings.sample_rate,
-                speed=voice_settings.speed,
-                pitch=voice_settings.pitch,
-                volume=voice_settings.volume,
-                emotion=voice_settings.emotion,
-                model=model_version,
-            )
-            ws.send(start_session_frame, opcode=websocket.ABNF.OPCODE_BINARY)
-
-            # Small delay to ensure session is started
-            import time
-
-            time.sleep(0.1)
-
-            # Send TaskRequest with text
-            logger.debug(f"Sending TaskRequest with text length={len(text)}")
-            task_request_frame = protocol.encode_task_request(session_id, text)
-            ws.send(task_request_frame, opcode=websocket.ABNF.OPCODE_BINARY)
-
-            # Send FinishSession
-            logger.debug("Sending FinishSession")
-            finish_session_frame = protocol.encode_finish_session(session_id)
-            ws.send(finish_session_frame, opcode=websocket.ABNF.OPCODE_BINARY)
-
-            # Wait for session to finish
-            if not session_finished.wait(timeout=60):
-                raise ValueError("Timeout waiting for TTS synthesis")
-
-            if error_message:
-                raise ValueError(error_message)
-
-            # Send FinishConnection
-            ws.send(
-                protocol.encode_finish_connection(), opcode=websocket.ABNF.OPCODE_BINARY
-            )
-
-        finally:
-            # Close WebSocket
-            ws.close()
-            ws_thread.join(timeout=5)
+        audio_chunks = result.audio_chunks
+        total_duration_ms = result.duration_ms
 
         if not audio_chunks:
             raise ValueError("No audio data received")
@@ -0,0 +1,447 @@
+"""
+Connection pool for the Volcengine bidirectional TTS WebSocket API.
+
+Opening a connection costs a TLS handshake plus a StartConnection round trip,
+which dominated time-to-first-audio when every segment opened its own
+socket. The API allows any number of sessions, one after another, on a
+started connection, so the pool keeps started connections warm per
+(url, resource_id, app_key, access_key) and runs each synthesis as a
+StartSession/TaskRequest/FinishSession exchange on a borrowed connection.
+Concurrent syntheses borrow different connections.
+
+Sessions run on the caller's thread with blocking reads; no callback thread
+is started per connection.
+
+A connection is handed out again only while it passes a health check: it is
+still open, younger than VOLCENGINE_TTS_WS_MAX_AGE and the server has not
+sent anything since the last session ended (a close frame or a reset from a
+server-side idle timeout shows up as a readable socket). Connections idle for
+longer than VOLCENGINE_TTS_WS_IDLE_TIMEOUT are closed, and at most
+VOLCENGINE_TTS_WS_POOL_SIZE idle connections are kept per key (0 disables
+pooling). Configuration is read on first use.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import select
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from flaskr.api.tts.volcengine_protocol import (
+    Event,
+    MessageType,
+    ProtocolFrame,
+    VolcengineProtocol,
+)
+from flaskr.common.config import get_config
+from flaskr.common.log import AppLoggerProxy
+
+try:
+    import websocket
+except ImportError:  # pragma: no cover - checked by the provider
+    websocket = None
+
+
+logger = AppLoggerProxy(logging.getLogger(__name__))
+
+CONNECT_TIMEOUT_SECONDS = 10.0
+SESSION_TIMEOUT_SECONDS = 60.0
+
+PoolKey = Tuple[str, str, str, str]
+
+
+@dataclass
+class SessionResult:
+    audio_chunks: List[bytes]
+    duration_ms: int
+
+
+class VolcengineSessionError(ValueError):
+    """A session failed; ``retryable`` if the connection died before it started."""
+
+    def __init__(self, message: str, retryable: bool = False):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class VolcengineConnection:
+    """One started WebSocket connection, used by one session at a time."""
+
+    def __init__(self, key: PoolKey, ws, clock: Callable[[], float]):
+        self.key = key
+        self.ws = ws
+        self.protocol = VolcengineProtocol()
+        self.created_at = clock()
+        self.last_used_at = self.created_at
+        self.sessions = 0
+
+    def _recv_frame(self, deadline: float) -> ProtocolFrame:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise VolcengineSessionError("Timeout waiting for TTS synthesis")
+        self.ws.settimeout(remaining)
+        try:
+            opcode, data = self.ws.recv_data()
+        except websocket.WebSocketTimeoutException as exc:
+            raise VolcengineSessionError("Timeout waiting for TTS synthesis") from exc
+        if opcode == websocket.ABNF.OPCODE_CLOSE:
+            raise VolcengineSessionError("Connection closed by server", True)
+        if not isinstance(data, bytes):
+            data = data.encode("utf-8")
+        return self.protocol.decode_frame(data)
+
+    def _send(self, frame: bytes) -> None:
+        self.ws.send(frame, opcode=websocket.ABNF.OPCODE_BINARY)
+
+    def start(self, timeout: float = CONNECT_TIMEOUT_SECONDS) -> None:
+        """Send StartConnection and wait for ConnectionStarted."""
+        deadline = time.monotonic() + timeout
+        self._send(self.protocol.encode_start_connection())
+        while True:
+            frame = self._recv_frame(deadline)
+            if frame.event == Event.CONNECTION_STARTED:
+                logger.debug(f"Connection started: {frame.connection_id}")
+                return
+            if frame.event == Event.CONNECTION_FAILED:
+                raise VolcengineSessionError(f"Connection failed: {frame.payload}")
+            if frame.message_type == MessageType.ERROR_INFORMATION:
+                raise VolcengineSessionError(
+                    f"Error {frame.error_code}: {frame.payload}"
+                )
+
+    def synthesize(
+        self,
+        text: str,
+        session_params: dict,
+        timeout: float = SESSION_TIMEOUT_SECONDS,
+    ) -> SessionResult:
+        """Run one session on this connection and collect its audio."""
+        deadline = time.monotonic() + timeout
+        session_id = uuid.uuid4().hex
+        audio_chunks: List[bytes] = []
+        duration_ms = 0
+        # Until the server answers the StartSession, a failure means the
+        # (reused) connection was dead and the session can be retried.
+        started = False
+        try:
+            self._send(
+                self.protocol.encode_start_session(
+                    session_id=session_id, **session_params
+                )
+            )
+            while not started:
+                frame = self._recv_frame(deadline)
+                if frame.session_id not in (None, session_id):
+                    continue
+                if frame.event == Event.SESSION_STARTED:
+                    logger.debug(f"Session started: {frame.session_id}")
+                    started = True
+                elif frame.event == Event.SESSION_FAILED:
+                    raise VolcengineSessionError(f"Session failed: {frame.payload}")
+                elif frame.message_type == MessageType.ERROR_INFORMATION:
+                    raise VolcengineSessionError(
+                        f"Error {frame.error_code}: {frame.payload}"
+                    )
+
+            self._send(self.protocol.encode_task_request(session_id, text))
+            self._send(self.protocol.encode_finish_session(session_id))
+            while True:
+                frame = self._recv_frame(deadline)
+                if frame.session_id not in (None, session_id):
+                    continue
+                if frame.event == Event.TTS_RESPONSE:
+                    if frame.payload and isinstance(frame.payload, bytes):
+                        audio_chunks.append(frame.payload)
+                elif frame.event == Event.TTS_SENTENCE_END:
+                    if isinstance(frame.payload, dict):
+                        duration_ms += frame.payload.get("res_params", {}).get(
+                            "duration_ms", 0
+                        )
+                elif frame.event == Event.SESSION_FINISHED:
+                    logger.debug(f"Session finished: {frame.session_id}")
+                    if isinstance(frame.payload, dict):
+                        usage = frame.payload.get("usage", {})
+                        if usage:
+                            logger.info(f"TTS usage: {usage}")
+                    break
+                elif frame.event == Event.SESSION_FAILED:
+                    raise VolcengineSessionError(f"Session failed: {frame.payload}")
+                elif frame.message_type == MessageType.ERROR_INFORMATION:
+                    raise VolcengineSessionError(
+                        f"Error {frame.error_code}: {frame.payload}"
+                    )
+        except VolcengineSessionError as exc:
+            exc.retryable = exc.retryable and not started
+            raise
+        except (OSError, websocket.WebSocketException) as exc:
+            raise VolcengineSessionError(
+                f"WebSocket error: {exc}", retryable=not started
+            ) from exc
+        self.sessions += 1
+        return SessionResult(audio_chunks=audio_chunks, duration_ms=duration_ms)
+
+    def is_healthy(self, now: float, max_age: float) -> bool:
+        if not self.ws.connected:
+            return False
+        if max_age > 0 and now - self.created_at >= max_age:
+            return False
+        sock = self.ws.sock
+        if sock is None:
+            return False
+        try:
+            # Nothing is expected between sessions: buffered TLS data or a
+            # readable socket means a close frame, a reset or stray frames.
+            pending = getattr(sock, "pending", None)
+            if pending is not None and pending() > 0:
+                return False
+            readable, _, _ = select.select([sock], [], [], 0)
+        except (OSError, ValueError):
+            return False
+        return not readable
+
+    def close(self) -> None:
+        try:
+            if self.ws.connected:
+                self._send(self.protocol.encode_finish_connection())
+        except Exception:  # noqa: BLE001 - best effort on a closing socket
+            pass
+        try:
+            self.ws.close(timeout=1)
+        except Exception:  # noqa: BLE001
+            pass
+
+
+def _connect(url: str, headers: Dict[str, str], timeout: float):
+    return websocket.create_connection(
+        url,
+        header=[f"{name}: {value}" for name, value in headers.items()],
+        timeout=timeout,
+        skip_utf8_validation=True,
+    )
+
+
+class VolcengineConnectionPool:
+    """Keeps started Volcengine TTS connections warm for reuse."""
+
+    def __init__(
+        self,
+        *,
+        max_idle_per_key: Optional[int] = None,
+        idle_timeout: Optional[float] = None,
+        max_age: Optional[float] = None,
+        connect: Callable[..., object] = _connect,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._max_idle_per_key = max_idle_per_key
+        self._idle_timeout = idle_timeout
+        self._max_age = max_age
+        self._connect = connect
+        self._clock = clock
+        self._configured = False
+
+        self._lock = threading.Lock()
+        self._idle: Dict[PoolKey, List[VolcengineConnection]] = {}
+        self._in_use = 0
+        self._opened = 0
+        self._reused = 0
+        self._sessions = 0
+        self._failures = 0
+        self._retries = 0
+        self._evicted_idle = 0
+        self._discarded_unhealthy = 0
+        self._connect_count = 0
+        self._connect_total = 0.0
+
+    def _configure(self) -> None:
+        if self._configured:
+            return
+        if self._max_idle_per_key is None:
+            self._max_idle_per_key = int(get_config("VOLCENGINE_TTS_WS_POOL_SIZE") or 0)
+        if self._idle_timeout is None:
+            self._idle_timeout = float(
+                get_config("VOLCENGINE_TTS_WS_IDLE_TIMEOUT") or 0
+            )
+        if self._max_age is None:
+            self._max_age = float(get_config("VOLCENGINE_TTS_WS_MAX_AGE") or 0)
+        self._max_idle_per_key = max(0, self._max_idle_per_key)
+        self._configured = True
+
+    def _take_expired_locked(self, now: float) -> List[VolcengineConnection]:
+        expired: List[VolcengineConnection] = []
+        if self._idle_timeout <= 0:
+            return expired
+        for key in list(self._idle):
+            idle = self._idle[key]
+            keep = [c for c in idle if now - c.last_used_at < self._idle_timeout]
+            expired.extend(c for c in idle if c not in keep)
+            if keep:
+                self._idle[key] = keep
+            else:
+                del self._idle[key]
+        self._evicted_idle += len(expired)
+        return expired
+
+    def _acquire(
+        self, key: PoolKey, headers: Dict[str, str]
+    ) -> Tuple[VolcengineConnection, bool]:
+        self._configure()
+        discard: List[VolcengineConnection] = []
+        conn: Optional[VolcengineConnection] = None
+        with self._lock:
+            now = self._clock()
+            discard.extend(self._take_expired_locked(now))
+            idle = self._idle.get(key)
+            while idle:
+                # Most recently used first: it is the least likely to have
+                # hit a server-side idle timeout.
+                candidate = idle.pop()
+                if candidate.is_healthy(now, self._max_age):
+                    conn = candidate
+                    break
+                self._discarded_unhealthy += 1
+                discard.append(candidate)
+            if idle is not None and not idle:
+                self._idle.pop(key, None)
+            self._in_use += 1
+            if conn is not None:
+                self._reused += 1
+        for stale in discard:
+            stale.close()
+        if conn is not None:
+            return conn, True
+
+        started_at = time.monotonic()
+        try:
+            ws = self._connect(key[0], headers, CONNECT_TIMEOUT_SECONDS)
+            conn = VolcengineConnection(key, ws, self._clock)
+            try:
+                conn.start()
+            except BaseException:
+                conn.close()
+                raise
+        except BaseException as exc:
+            with self._lock:
+                self._in_use -= 1
+                self._failures += 1
+            if isinstance(exc, (OSError, websocket.WebSocketException)):
+                raise VolcengineSessionError(f"WebSocket error: {exc}") from exc
+            raise
+        elapsed = time.monotonic() - started_at
+        with self._lock:
+            self._opened += 1
+            self._connect_count += 1
+            self._connect_total += elapsed
+        return conn, False
+
+    def _release(self, conn: VolcengineConnection, reusable: bool) -> None:
+        discard: List[VolcengineConnection] = []
+        with self._lock:
+            self._in_use -= 1
+            now = self._clock()
+            conn.last_used_at = now
+            discard.extend(self._take_expired_locked(now))
+            idle = self._idle.setdefault(conn.key, [])
+            if reusable and len(idle) < self._max_idle_per_key:
+                idle.append(conn)
+            else:
+                discard.append(conn)
+            if not idle:
+                del self._idle[conn.key]
+        for stale in discard:
+            stale.close()
+
+    def synthesize(
+        self,
+        *,
+        url: str,
+        app_key: str,
+        access_key: str,
+        resource_id: str,
+        text: str,
+        session_params: dict,
+    ) -> SessionResult:
+        """Synthesize ``text`` in one session on a pooled connection.
+
+        A session that fails on a reused connection before the server
+        accepted it is retried on another connection, ending with a new one.
+        """
+        if websocket is None:
+            raise ValueError(
+                "websocket-client package is not installed. Install with: pip install websocket-client"
+            )
+        key: PoolKey = (url, resource_id, app_key, access_key)
+        headers = {
+            "X-Api-App-Key": app_key,
+            "X-Api-Access-Key": access_key,
+            "X-Api-Resource-Id": resource_id,
+            "X-Api-Connect-Id": str(uuid.uuid4()),
+        }
+        while True:
+            conn, reused = self._acquire(key, headers)
+            try:
+                result = conn.synthesize(text, session_params)
+            except VolcengineSessionError as exc:
+                self._release(conn, reusable=False)
+                if reused and exc.retryable:
+                    with self._lock:
+                        self._retries += 1
+                    logger.info(f"Reused Volcengine connection failed, retrying: {exc}")
+                    continue
+                with self._lock:
+                    self._failures += 1
+                raise
+            except BaseException:
+                self._release(conn, reusable=False)
+                with self._lock:
+                    self._failures += 1
+                raise
+            self._release(conn, reusable=True)
+            with self._lock:
+                self._sessions += 1
+            return result
+
+    def evict_idle(self) -> int:
+        """Close connections idle for longer than the idle timeout."""
+        self._configure()
+        with self._lock:
+            expired = self._take_expired_locked(self._clock())
+        for conn in expired:
+            conn.close()
+        return len(expired)
+
+    def stats(self) -> Dict[str, int]:
+        """Return connection counts, reuse and handshake latency."""
+        with self._lock:
+            return {
+                "idle": sum(len(idle) for idle in self._idle.values()),
+                "in_use": self._in_use,
+                "opened": self._opened,
+                "reused": self._reused,
+                "sessions": self._sessions,
+                "failures": self._failures,
+                "retries": self._retries,
+                "evicted_idle": self._evicted_idle,
+                "discarded_unhealthy": self._discarded_unhealthy,
+                "connect_avg_ms": (
+                    int(self._connect_total / self._connect_count * 1000)
+                    if self._connect_count
+                    else 0
+                ),
+            }
+
+    def close_all(self) -> None:
+        with self._lock:
+            conns = [conn for idle in self._idle.values() for conn in idle]
+            self._idle.clear()
+        for conn in conns:
+            conn.close()
+
+
+volcengine_ws_pool = VolcengineConnectionPool()
+
+atexit.register(volcengine_ws_pool.close_all)
@@ -10,6 +10,7 @@ from .import_user import import_user
 from .unified_migration_task import UnifiedMigrationTask, MigrationConfig
 from ..service.shifu.shifu_import_export_funcs import export_shifu, import_shifu
 from .update_shifu_demo import update_demo_shifu
+from .backfill_profile_latest_values import backfill_profile_latest_values
 
 
 def setup_migration_logging():
@@ -395,3 +396,17 @@ def enable_commands(app: Flask):
         """Update demo shifu"""
         app.logger.info("Updating demo shifu...")
         update_demo_shifu(app)
+
+    @console.command(name="backfill_profile_latest_values")
+    @click.option("--batch-size", default=500, help="Users per transaction")
+    @click.option("--user-id", default=None, help="Only rebuild this user")
+    def backfill_profile_latest_values_command(batch_size, user_id):
+        """Rebuild the latest user variable values from their history"""
+        users, rows = backfill_profile_latest_values(
+            app, batch_size=batch_size, user_bid=user_id
+        )
+        click.echo(
+            click.style(
+                f"✅ Rebuilt {rows} latest values for {users} users", fg="green"
+            )
+        )
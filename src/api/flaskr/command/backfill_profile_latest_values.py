@@ -0,0 +1,59 @@
+from typing import Optional
+
+from flask import Flask
+
+from flaskr.dao import db
+from flaskr.service.profile.latest_values import rebuild_latest_values
+from flaskr.service.profile.models import VariableValue
+
+
+def backfill_profile_latest_values(
+    app: Flask, batch_size: int = 500, user_bid: Optional[str] = None
+) -> tuple[int, int]:
+    """
+    Rebuild var_variable_latest_values from var_variable_values.
+
+    Safe to re-run: each user's scopes are rebuilt from history. Commits once
+    per batch of users.
+
+    Returns:
+        Tuple of (users processed, latest rows written)
+    """
+    users = rows = 0
+    last_user_bid = ""
+    with app.app_context():
+        while True:
+            query = db.session.query(VariableValue.user_bid).filter(
+                VariableValue.deleted == 0
+            )
+            if user_bid:
+                query = query.filter(VariableValue.user_bid == user_bid)
+            batch = [
+                bid
+                for (bid,) in query.filter(VariableValue.user_bid > last_user_bid)
+                .distinct()
+                .order_by(VariableValue.user_bid)
+                .limit(batch_size)
+                .all()
+            ]
+            if not batch:
+                break
+            for bid in batch:
+                scopes = [
+                    shifu_bid
+                    for (shifu_bid,) in db.session.query(VariableValue.shifu_bid)
+                    .filter(
+                        VariableValue.user_bid == bid,
+                        VariableValue.deleted == 0,
+                    )
+                    .distinct()
+                    .all()
+                ]
+                rows += rebuild_latest_values(bid, scopes)
+                users += 1
+            db.session.commit()
+            last_user_bid = batch[-1]
+            app.logger.info(
+                "backfill_profile_latest_values: %s users, %s rows", users, rows
+            )
+    return users, rows
@@ -0,0 +1,235 @@
+"""
+Request/response body logging for ``init_log``.
+
+Which bodies are logged is decided once per request by a
+:class:`BodyLogPolicy`: the ``ACCESS_LOG_BODY_POLICIES`` rule matching the
+Flask route, or the ``ACCESS_LOG_BODY_MAX_BYTES`` /
+``ACCESS_LOG_BODY_SAMPLE_RATE`` defaults. A body that is not logged is never
+read or decoded; one that is logged is cut to ``max_bytes`` first and then
+redacted in a single pass over the cut text.
+
+Access records go through :class:`AsyncAccessLogHandler`, which hands them to
+the application's regular handlers on a background thread, so file and
+console I/O stay off the request thread.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from logging.handlers import QueueHandler, QueueListener
+from typing import Iterable, Optional
+
+TRUNCATED_MARKER = "...(truncated, {size} bytes)"
+REDACTED = "***"
+
+
+@dataclass(frozen=True)
+class BodyLogPolicy:
+    """How much of a route's bodies to log.
+
+    ``max_bytes`` of 0 logs bodies in full; ``sample_rate`` of 0 turns body
+    logging off for the route.
+    """
+
+    max_bytes: int = 2048
+    sample_rate: float = 1.0
+
+    def sample(self) -> bool:
+        if self.sample_rate >= 1.0:
+            return True
+        return self.sample_rate > 0.0 and random.random() < self.sample_rate
+
+
+def parse_policy(text: str, default: BodyLogPolicy) -> BodyLogPolicy:
+    """Parse ``off``, ``full``, ``truncate:<bytes>`` or ``sample:<rate>``."""
+    mode, _, arg = text.strip().lower().partition(":")
+    if mode == "off":
+        return BodyLogPolicy(default.max_bytes, 0.0)
+    if mode == "full":
+        return BodyLogPolicy(0, 1.0)
+    if mode == "truncate" and arg:
+        return BodyLogPolicy(int(arg), default.sample_rate)
+    if mode == "sample" and arg:
+        return BodyLogPolicy(default.max_bytes, float(arg))
+    raise ValueError(f"invalid body log policy: {text!r}")
+
+
+class BodyLogPolicies:
+    """Route pattern -> policy rules; the first matching rule wins."""
+
+    def __init__(self, rules: Iterable[str], default: BodyLogPolicy):
+        self.default = default
+        self._rules = []
+        for rule in rules:
+            pattern, sep, policy = rule.rpartition("=")
+            if not sep or not pattern.strip():
+                raise ValueError(f"invalid body log rule: {rule!r}")
+            self._rules.append(
+                (
+                    re.compile(fnmatch.translate(pattern.strip())),
+                    parse_policy(policy, default),
+                )
+            )
+        # Keyed by route template, so the size is bounded by the url map.
+        self._by_route: dict[str, BodyLogPolicy] = {}
+
+    def _match(self, path: str) -> BodyLogPolicy:
+        for pattern, policy in self._rules:
+            if pattern.match(path):
+                return policy
+        return self.default
+
+    def for_request(self, route: Optional[str], path: str) -> BodyLogPolicy:
+        if route is None:
+            return self._match(path)
+        policy = self._by_route.get(route)
+        if policy is None:
+            policy = self._by_route[route] = self._match(route)
+        return policy
+
+
+class BodyRedactor:
+    """Masks the values of sensitive fields in JSON, form and dict bodies."""
+
+    def __init__(self, fields: Iterable[str]):
+        self.fields = frozenset(field.lower() for field in fields if field)
+        self._json = None
+        self._form = None
+        if self.fields:
+            names = "|".join(re.escape(field) for field in sorted(self.fields))
+            # A value cut off by truncation has no closing quote; the second
+            # alternative still masks what is left of it.
+            self._json = re.compile(
+                rf'("(?:{names})"\s*:\s*)("(?:[^"\\]|\\.)*"|[^,}}\]\s]+)',
+                re.IGNORECASE,
+            )
+            self._form = re.compile(rf"(?<![\w-])((?:{names})=)[^&\s]*", re.I)
+
+    def redact_text(self, text: str, form_encoded: bool = False) -> str:
+        if self._json is None:
+            return text
+        if form_encoded:
+            return self._form.sub(rf"\1{REDACTED}", text)
+        return self._json.sub(rf'\1"{REDACTED}"', text)
+
+    def redact_mapping(self, mapping: dict) -> dict:
+        return {
+            key: REDACTED if str(key).lower() in self.fields else value
+            for key, value in mapping.items()
+        }
+
+
+def cap_body(data, max_bytes: int) -> str:
+    """Decode at most ``max_bytes`` of ``data`` (bytes or str)."""
+    size = len(data)
+    if max_bytes and size > max_bytes:
+        data = data[:max_bytes]
+    else:
+        max_bytes = 0
+    if isinstance(data, bytes):
+        data = data.decode("utf-8", "replace")
+    if max_bytes:
+        data += TRUNCATED_MARKER.format(size=size)
+    return data
+
+
+def request_body_text(request, policy: BodyLogPolicy, redactor: BodyRedactor) -> str:
+    if request.files:
+        return "<file upload>"
+    if request.is_json:
+        # Cached by Flask, so the view does not read the stream again.
+        text = cap_body(request.get_data(), policy.max_bytes)
+    elif request.form:
+        form = redactor.redact_mapping(request.form.to_dict())
+        return cap_body(json.dumps(form, ensure_ascii=False), policy.max_bytes)
+    elif request.args:
+        args = redactor.redact_mapping(request.args.to_dict())
+        return cap_body(json.dumps(args, ensure_ascii=False), policy.max_bytes)
+    else:
+        text = cap_body(request.get_data(), policy.max_bytes)
+        return redactor.redact_text(text, form_encoded=True)
+    return redactor.redact_text(text)
+
+
+def response_body_text(response, policy: BodyLogPolicy, redactor: BodyRedactor):
+    return redactor.redact_text(cap_body(response.get_data(), policy.max_bytes))
+
+
+class AsyncAccessLogHandler(QueueHandler):
+    """Forward records to ``handlers`` from a background listener thread.
+
+    Request context (id, url, client ip) is copied onto the record before it
+    is queued, since the formatter runs on the listener thread. Records are
+    dropped, and counted in ``dropped``, when the queue is full.
+    """
+
+    def __init__(self, handlers, context_fields=None, queue_size: int = 10000):
+        super().__init__(queue.Queue(maxsize=queue_size))
+        self.handlers = list(handlers)
+        self.context_fields = context_fields
+        self.dropped = 0
+        self._listener: Optional[QueueListener] = None
+        self._listener_pid = None
+        self._lock = threading.Lock()
+
+    def prepare(self, record):
+        if self.context_fields is not None:
+            for name, value in self.context_fields().items():
+                setattr(record, name, value)
+        return super().prepare(record)
+
+    def enqueue(self, record) -> None:
+        self._ensure_listener()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _ensure_listener(self) -> None:
+        # A listener started before a fork does not exist in the child.
+        if self._listener_pid == os.getpid():
+            return
+        with self._lock:
+            if self._listener_pid == os.getpid():
+                return
+            self._listener = QueueListener(
+                self.queue, *self.handlers, respect_handler_level=True
+            )
+            self._listener.start()
+            self._listener_pid = os.getpid()
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Wait until queued records were handed to the handlers."""
+        if self._listener_pid == os.getpid():
+            deadline = time.monotonic() + timeout
+            while self.queue.unfinished_tasks and time.monotonic() < deadline:
+                time.sleep(0.005)
+        for handler in self.handlers:
+            handler.flush()
+
+    def close(self) -> None:
+        if self._listener is not None and self._listener_pid == os.getpid():
+            self._listener.stop()
+            self._listener = None
+            self._listener_pid = None
+        super().close()
+
+
+def create_access_logger(app_logger: logging.Logger, handler: logging.Handler):
+    """Child of the app logger that only writes through ``handler``."""
+    logger = app_logger.getChild("access")
+    for previous in logger.handlers:
+        previous.close()
+    logger.handlers = [handler]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return logger
@@ -2,7 +2,8 @@ from __future__ import annotations
 
 import threading
 import time
-from dataclasses import dataclass
+import weakref
+from collections import OrderedDict
 from typing import Any, Optional, Protocol, runtime_checkable
 
 
@@ -117,72 +118,251 @@ class _DynamicRedisCacheProvider:
         )
 
 
-@dataclass
 class _InMemoryEntry:
-    value: bytes
-    expires_at: Optional[float]
+    __slots__ = ("value", "expires_at", "size")
+
+    def __init__(self, value: bytes, expires_at: Optional[float], size: int):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+
+
+class _LockState:
+    """Holder and waiters of one in-memory lock key."""
+
+    __slots__ = ("cond", "token", "expires_at", "waiters")
+
+    def __init__(self):
+        # Created by the first waiter; uncontended locks never need one.
+        self.cond: Optional[threading.Condition] = None
+        self.token: Optional[object] = None
+        self.expires_at: Optional[float] = None
+        self.waiters = 0
+
+    def held(self, now: float) -> bool:
+        return self.token is not None and (
+            self.expires_at is None or self.expires_at > now
+        )
+
+
+class _Shard:
+    __slots__ = ("mu", "entries", "bytes", "locks")
+
+    def __init__(self):
+        self.mu = threading.Lock()
+        self.entries: "OrderedDict[str, _InMemoryEntry]" = OrderedDict()
+        self.bytes = 0
+        self.locks: dict[str, _LockState] = {}
 
 
 class _InMemoryLock:
-    def __init__(self, lock: threading.Lock):
-        self._lock = lock
-        self._held = False
+    """
+    Redis-style lock on an in-memory shard.
+
+    Like a Redis lock, a holder's claim lapses after ``timeout`` seconds.
+    Lock state is dropped once it is released (or lapsed) with no waiters,
+    so one-off lock keys do not accumulate.
+    """
+
+    def __init__(
+        self,
+        provider: "InMemoryCacheProvider",
+        key: str,
+        timeout: Optional[float],
+        blocking_timeout: Optional[float],
+    ):
+        self._provider = provider
+        self._shard = provider._shard(key)
+        self._key = key
+        self._timeout = timeout
+        self._blocking_timeout = blocking_timeout
+        self._token: Optional[object] = None
 
     def acquire(self, blocking: bool = True, blocking_timeout: Optional[int] = None):
-        if not blocking:
-            acquired = self._lock.acquire(blocking=False)
-        elif blocking_timeout is None:
-            acquired = self._lock.acquire()
-        else:
-            acquired = self._lock.acquire(timeout=blocking_timeout)
-        self._held = bool(acquired)
-        return acquired
+        if blocking_timeout is None:
+            blocking_timeout = self._blocking_timeout
+        shard = self._shard
+        now_fn = self._provider._now
+        with shard.mu:
+            state = shard.locks.get(self._key)
+            if state is None:
+                state = _LockState()
+                shard.locks[self._key] = state
+            now = now_fn()
+            if state.held(now):
+                if not blocking:
+                    return False
+                if state.cond is None:
+                    state.cond = threading.Condition(shard.mu)
+                deadline = None if blocking_timeout is None else now + blocking_timeout
+                state.waiters += 1
+                try:
+                    while state.held(now):
+                        if deadline is not None and now >= deadline:
+                            return False
+                        wait = None if deadline is None else deadline - now
+                        if state.expires_at is not None:
+                            lapse = state.expires_at - now
+                            wait = lapse if wait is None else min(wait, lapse)
+                        state.cond.wait(wait)
+                        now = now_fn()
+                finally:
+                    state.waiters -= 1
+            self._token = object()
+            state.token = self._token
+            state.expires_at = now + self._timeout if self._timeout else None
+            return True
 
     def release(self) -> None:
-        if self._held:
-            self._lock.release()
-            self._held = False
+        shard = self._shard
+        with shard.mu:
+            token, self._token = self._token, None
+            state = shard.locks.get(self._key)
+            if token is None or state is None or state.token is not token:
+                return
+            state.token = None
+            state.expires_at = None
+            if state.waiters:
+                state.cond.notify()
+            else:
+                del shard.locks[self._key]
+
+
+def _sweep_periodically(provider_ref: "weakref.ref", interval: float) -> None:
+    while True:
+        time.sleep(interval)
+        provider = provider_ref()
+        if provider is None:
+            return
+        try:
+            provider.sweep()
+        except Exception:  # pragma: no cover - keep sweeping
+            pass
+        del provider
 
 
 class InMemoryCacheProvider:
-    def __init__(self):
-        self._store: dict[str, _InMemoryEntry] = {}
-        self._locks: dict[str, threading.Lock] = {}
-        self._mu = threading.RLock()
+    """
+    Process-local cache used when Redis is unavailable.
+
+    Keys are spread over independently locked shards. Each shard evicts least
+    recently used entries beyond its share of CACHE_MEMORY_MAX_ENTRIES and
+    CACHE_MEMORY_MAX_BYTES, and a daemon thread removes expired entries and
+    idle locks every CACHE_MEMORY_SWEEP_INTERVAL_SECONDS.
+    """
+
+    def __init__(
+        self,
+        *,
+        shards: int = 16,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        sweep_interval: Optional[float] = None,
+    ):
+        self._shards = [_Shard() for _ in range(max(1, shards))]
+        self._shard_count = len(self._shards)
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._sweep_interval = sweep_interval
+        self._configured = False
+        self._configure_lock = threading.Lock()
+        self._shard_max_entries = 0
+        self._shard_max_bytes = 0
+        self._sweeper: Optional[threading.Thread] = None
+        self.evictions = 0
+        self.expirations = 0
+
+    def _configure(self) -> None:
+        with self._configure_lock:
+            if self._configured:
+                return
+            if None in (self._max_entries, self._max_bytes, self._sweep_interval):
+                from flaskr.common.config import get_config
+
+                if self._max_entries is None:
+                    self._max_entries = int(
+                        get_config("CACHE_MEMORY_MAX_ENTRIES") or 100000
+                    )
+                if self._max_bytes is None:
+                    self._max_bytes = int(
+                        get_config("CACHE_MEMORY_MAX_BYTES") or 268435456
+                    )
+                if self._sweep_interval is None:
+                    self._sweep_interval = float(
+                        get_config("CACHE_MEMORY_SWEEP_INTERVAL_SECONDS") or 0
+                    )
+            shard_count = len(self._shards)
+            self._shard_max_entries = max(1, -(-self._max_entries // shard_count))
+            self._shard_max_bytes = max(1, -(-self._max_bytes // shard_count))
+            if self._sweep_interval and self._sweep_interval > 0:
+                self._sweeper = threading.Thread(
+                    target=_sweep_periodically,
+                    args=(weakref.ref(self), self._sweep_interval),
+                    name="memory_cache_sweeper",
+                    daemon=True,
+                )
+                self._sweeper.start()
+            self._configured = True
 
     def _now(self) -> float:
         return time.time()
 
+    def _shard(self, key: str) -> _Shard:
+        return self._shards[hash(key) % self._shard_count]
+
     def _encode(self, value: Any) -> bytes:
+        if isinstance(value, str):
+            return value.encode("utf-8")
         if isinstance(value, bytes):
             return value
-        if isinstance(value, (int, float, bool)):
-            return str(value).encode("utf-8")
         if value is None:
             return b""
-        if isinstance(value, str):
-            return value.encode("utf-8")
         return str(value).encode("utf-8")
 
-    def _purge_if_expired(self, key: str) -> None:
-        entry = self._store.get(key)
+    def _remove(self, shard: _Shard, key: str) -> None:
+        entry = shard.entries.pop(key, None)
+        if entry is not None:
+            shard.bytes -= entry.size
+
+    def _live_entry(self, shard: _Shard, key: str) -> Optional[_InMemoryEntry]:
+        entries = shard.entries
+        entry = entries.get(key)
         if entry is None:
-            return
-        if entry.expires_at is None:
-            return
-        if entry.expires_at <= self._now():
-            self._store.pop(key, None)
+            return None
+        expires_at = entry.expires_at
+        if expires_at is not None and expires_at <= self._now():
+            self._remove(shard, key)
+            self.expirations += 1
+            return None
+        entries.move_to_end(key)
+        return entry
+
+    def _store(
+        self, shard: _Shard, key: str, value: bytes, expires_at: Optional[float]
+    ) -> None:
+        entries = shard.entries
+        previous = entries.pop(key, None)
+        size = len(key) + len(value)
+        entries[key] = _InMemoryEntry(value, expires_at, size)
+        shard.bytes += size - (previous.size if previous is not None else 0)
+        while entries and (
+            len(entries) > self._shard_max_entries
+            or shard.bytes > self._shard_max_bytes
+        ):
+            _key, evicted = entries.popitem(last=False)
+            shard.bytes -= evicted.size
+            self.evictions += 1
 
     def get(self, key: str):
-        with self._mu:
-            self._purge_if_expired(key)
-            entry = self._store.get(key)
+        shard = self._shards[hash(key) % self._shard_count]
+        with shard.mu:
+            entry = self._live_entry(shard, key)
             return entry.value if entry is not None else None
 
     def getex(self, key: str, ex: Optional[int] = None, px: Optional[int] = None):
-        with self._mu:
-            self._purge_if_expired(key)
-            entry = self._store.get(key)
+        shard = self._shard(key)
+        with shard.mu:
+            entry = self._live_entry(shard, key)
             if entry is None:
                 return None
             if ex is not None:
@@ -202,12 +382,16 @@ class InMemoryCacheProvider:
         *args,
         **kwargs,
     ):
-        with self._mu:
-            self._purge_if_expired(key)
-            if nx and key in self._store:
-                return False
-            if xx and key not in self._store:
-                return False
+        if not self._configured:
+            self._configure()
+        shard = self._shards[hash(key) % self._shard_count]
+        with shard.mu:
+            if nx or xx:
+                exists = self._live_entry(shard, key) is not None
+                if nx and exists:
+                    return False
+                if xx and not exists:
+                    return False
             expires_at: Optional[float] = None
             if ex is None and args:
                 ex = args[0]
@@ -215,9 +399,7 @@ class InMemoryCacheProvider:
                 expires_at = self._now() + ex
             elif px is not None:
                 expires_at = self._now() + (px / 1000.0)
-            self._store[key] = _InMemoryEntry(
-                value=self._encode(value), expires_at=expires_at
-            )
+            self._store(shard, key, self._encode(value), expires_at)
             return True
 
     def setex(self, key: str, time_in_seconds: int, value: Any):
@@ -225,30 +407,30 @@ class InMemoryCacheProvider:
 
     def delete(self, *keys: str) -> int:
         deleted = 0
-        with self._mu:
-            for key in keys:
-                self._purge_if_expired(key)
-                if key in self._store:
+        for key in keys:
+            shard = self._shard(key)
+            with shard.mu:
+                if self._live_entry(shard, key) is not None:
+                    self._remove(shard, key)
                     deleted += 1
-                    self._store.pop(key, None)
         return deleted
 
     def incr(self, key: str, amount: int = 1):
-        with self._mu:
-            self._purge_if_expired(key)
-            entry = self._store.get(key)
+        if not self._configured:
+            self._configure()
+        shard = self._shard(key)
+        with shard.mu:
+            entry = self._live_entry(shard, key)
             current_value = int(entry.value) if entry is not None else 0
             expires_at = entry.expires_at if entry is not None else None
             new_value = current_value + amount
-            self._store[key] = _InMemoryEntry(
-                value=self._encode(new_value), expires_at=expires_at
-            )
+            self._store(shard, key, self._encode(new_value), expires_at)
             return new_value
 
     def ttl(self, key: str) -> int:
-        with self._mu:
-            self._purge_if_expired(key)
-            entry = self._store.get(key)
+        shard = self._shard(key)
+        with shard.mu:
+            entry = self._live_entry(shard, key)
             if entry is None:
                 return -2
             if entry.expires_at is None:
@@ -262,34 +444,238 @@ class InMemoryCacheProvider:
         timeout: Optional[int] = None,
         blocking_timeout: Optional[int] = None,
     ):
+        if not self._configured:
+            self._configure()
+        return _InMemoryLock(self, key, timeout, blocking_timeout)
+
+    def sweep(self) -> int:
+        """Drop expired entries and idle locks; returns the entries removed."""
+        removed = 0
+        for shard in self._shards:
+            with shard.mu:
+                now = self._now()
+                expired = [
+                    key
+                    for key, entry in shard.entries.items()
+                    if entry.expires_at is not None and entry.expires_at <= now
+                ]
+                for key in expired:
+                    self._remove(shard, key)
+                idle = [
+                    key
+                    for key, state in shard.locks.items()
+                    if not state.waiters and not state.held(now)
+                ]
+                for key in idle:
+                    del shard.locks[key]
+            removed += len(expired)
+        self.expirations += removed
+        return removed
+
+    def stats(self) -> dict[str, int]:
+        entries = size = locks = 0
+        for shard in self._shards:
+            with shard.mu:
+                entries += len(shard.entries)
+                size += shard.bytes
+                locks += len(shard.locks)
+        return {
+            "entries": entries,
+            "bytes": size,
+            "locks": locks,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker guarding the primary cache.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls go straight to the fallback for ``cooldown`` seconds. The first call
+    after the cooldown is let through as a half-open probe (other calls keep
+    using the fallback): success closes the circuit, failure opens it for
+    another cooldown.
+
+    Thresholds are read from REDIS_CIRCUIT_FAILURE_THRESHOLD and
+    REDIS_CIRCUIT_COOLDOWN_SECONDS on first use unless given explicitly.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: Optional[int] = None,
+        cooldown: Optional[float] = None,
+        clock=time.monotonic,
+    ):
+        self._failure_threshold = failure_threshold
+        self._cooldown = cooldown
+        self._clock = clock
+        self._mu = threading.Lock()
+        self._configured = False
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.last_error = ""
+        self.opened = 0
+        self.failures = 0
+        self.successes = 0
+        self.short_circuited = 0
+
+    def _configure(self) -> None:
+        if self._configured:
+            return
+        if self._failure_threshold is None or self._cooldown is None:
+            from flaskr.common.config import get_config
+
+            if self._failure_threshold is None:
+                self._failure_threshold = int(
+                    get_config("REDIS_CIRCUIT_FAILURE_THRESHOLD") or 3
+                )
+            if self._cooldown is None:
+                self._cooldown = float(
+                    get_config("REDIS_CIRCUIT_COOLDOWN_SECONDS") or 5.0
+                )
+        self._failure_threshold = max(1, self._failure_threshold)
+        self._configured = True
+
+    def allow(self) -> bool:
+        """Return True if the primary may be called now."""
+        if self.state == self.CLOSED:
+            return True
+        with self._mu:
+            self._configure()
+            now = self._clock()
+            # A probe that never reported back is retried after a cooldown too.
+            if now - self.opened_at >= self._cooldown:
+                self.state = self.HALF_OPEN
+                self.opened_at = now
+                return True
+            self.short_circuited += 1
+            return False
+
+    def record_success(self) -> None:
+        if self.state == self.CLOSED and not self.consecutive_failures:
+            self.successes += 1
+            return
+        with self._mu:
+            self.successes += 1
+            self.consecutive_failures = 0
+            self.state = self.CLOSED
+            self.opened_at = None
+
+    def record_failure(self, exc: BaseException) -> None:
+        with self._mu:
+            self._configure()
+            self.failures += 1
+            self.consecutive_failures += 1
+            self.last_error = f"{type(exc).__name__}: {exc}"
+            if (
+                self.state == self.HALF_OPEN
+                or self.consecutive_failures >= self._failure_threshold
+            ):
+                if self.state != self.OPEN:
+                    self.opened += 1
+                self.state = self.OPEN
+                self.opened_at = self._clock()
+
+    def reset(self) -> None:
+        with self._mu:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self.last_error = ""
+
+    def stats(self) -> dict[str, Any]:
         with self._mu:
-            lock = self._locks.get(key)
-            if lock is None:
-                lock = threading.Lock()
-                self._locks[key] = lock
-        return _InMemoryLock(lock)
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "opened": self.opened,
+                "failures": self.failures,
+                "successes": self.successes,
+                "short_circuited": self.short_circuited,
+                "last_error": self.last_error,
+            }
+
+
+class _FallbackLock:
+    """
+    Lock that acquires on the primary cache and switches to a fallback lock
+    when the primary fails during ``acquire``.
+    """
+
+    def __init__(self, provider: "FallbackCacheProvider", primary_lock, make_fallback):
+        self._provider = provider
+        self._primary_lock = primary_lock
+        self._make_fallback = make_fallback
+        self._lock = primary_lock
+
+    def acquire(self, blocking: bool = True, blocking_timeout: Optional[int] = None):
+        if self._lock is self._primary_lock:
+            kwargs = {"blocking": blocking}
+            if blocking_timeout is not None:
+                kwargs["blocking_timeout"] = blocking_timeout
+            try:
+                acquired = self._primary_lock.acquire(**kwargs)
+            except Exception as exc:
+                self._provider.breaker.record_failure(exc)
+                self._lock = self._make_fallback()
+            else:
+                self._provider.breaker.record_success()
+                return acquired
+        return self._lock.acquire(blocking=blocking, blocking_timeout=blocking_timeout)
+
+    def release(self) -> None:
+        self._lock.release()
 
 
 class FallbackCacheProvider:
     """
     Cache provider that prefers Redis when configured, and falls back to a
     process-local in-memory cache when Redis is unavailable.
+
+    Redis errors feed a ``CircuitBreaker``; while it is open, calls skip Redis
+    instead of waiting for a connect timeout on every request.
     """
 
-    def __init__(self, primary: CacheProvider, fallback: CacheProvider):
+    def __init__(
+        self,
+        primary: CacheProvider,
+        fallback: CacheProvider,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
         self._primary = primary
         self._fallback = fallback
+        self.breaker = breaker or CircuitBreaker()
+        self.fallback_calls = 0
 
     def _call(self, method: str, *args, **kwargs):
         primary_fn = getattr(self._primary, method)
         fallback_fn = getattr(self._fallback, method)
-        try:
-            return primary_fn(*args, **kwargs)
-        except CacheUnavailableError:
-            return fallback_fn(*args, **kwargs)
-        except Exception:
-            # Redis connectivity errors should not break core flows.
-            return fallback_fn(*args, **kwargs)
+        if self.breaker.allow():
+            try:
+                result = primary_fn(*args, **kwargs)
+            except CacheUnavailableError:
+                pass
+            except Exception as exc:
+                # Redis connectivity errors should not break core flows.
+                self.breaker.record_failure(exc)
+            else:
+                self.breaker.record_success()
+                return result
+        self.fallback_calls += 1
+        return fallback_fn(*args, **kwargs)
+
+    def health(self) -> dict[str, Any]:
+        """Return the circuit state and fallback counters."""
+        stats = self.breaker.stats()
+        stats["fallback_calls"] = self.fallback_calls
+        return stats
 
     def get(self, key: str):
         return self._call("get", key)
@@ -338,12 +724,54 @@ class FallbackCacheProvider:
         timeout: Optional[int] = None,
         blocking_timeout: Optional[int] = None,
     ):
-        return self._call(
-            "lock", key, timeout=timeout, blocking_timeout=blocking_timeout
-        )
+        if not self.breaker.allow():
+            self.fallback_calls += 1
+            return self._fallback.lock(
+                key, timeout=timeout, blocking_timeout=blocking_timeout
+            )
+        try:
+            primary_lock = self._primary.lock(
+                key, timeout=timeout, blocking_timeout=blocking_timeout
+            )
+        except CacheUnavailableError:
+            self.fallback_calls += 1
+            return self._fallback.lock(
+                key, timeout=timeout, blocking_timeout=blocking_timeout
+            )
+        except Exception as exc:
+            self.breaker.record_failure(exc)
+            self.fallback_calls += 1
+            return self._fallback.lock(
+                key, timeout=timeout, blocking_timeout=blocking_timeout
+            )
+
+        def make_fallback():
+            self.fallback_calls += 1
+            return self._fallback.lock(
+                key, timeout=timeout, blocking_timeout=blocking_timeout
+            )
+
+        return _FallbackLock(self, primary_lock, make_fallback)
 
 
 _in_memory_cache = InMemoryCacheProvider()
 cache: CacheProvider = FallbackCacheProvider(
     _DynamicRedisCacheProvider(), _in_memory_cache
 )
+
+
+def cache_health() -> dict[str, Any]:
+    """Return which backend serves the cache and the circuit breaker state.
+
+    Served by an unauthenticated route, so the last error is left out: redis
+    connection errors name the internal host and port.
+    """
+    try:
+        from flaskr.dao import redis_client
+    except Exception:  # pragma: no cover - defensive
+        redis_client = None
+    health: dict[str, Any] = {"redis_configured": redis_client is not None}
+    if isinstance(cache, FallbackCacheProvider):
+        health.update(cache.health())
+        health.pop("last_error", None)
+    return health
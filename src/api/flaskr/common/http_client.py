@@ -0,0 +1,292 @@
+"""
+Shared outbound HTTP client.
+
+Provider calls (TTS, Dify, MDF conversion, content moderation) go through
+``http_client`` instead of bare ``requests.post`` so they reuse keep-alive
+connections: one ``requests.Session`` per scheme and host, holding up to
+HTTP_CLIENT_POOL_SIZE connections. Sessions are created lazily and again
+after a fork, so worker processes never share sockets.
+
+Every call gets a (connect, read) timeout. A number passed as ``timeout``
+sets the read timeout; the connect timeout is HTTP_CLIENT_CONNECT_TIMEOUT.
+
+Idempotent calls (GET/HEAD/OPTIONS/PUT/DELETE, or ``idempotent=True``) are
+retried up to HTTP_CLIENT_MAX_RETRIES times after connection errors,
+timeouts and 429/502/503/504 responses, sleeping a random time up to
+HTTP_CLIENT_RETRY_BACKOFF * 2**attempt (full jitter), or for the response's
+Retry-After seconds when that is longer. Calls that pass
+``retry_after_send=False`` (billed TTS synthesis) are not retried once the
+request was sent, so a read timeout or dropped connection does not run a
+long synthesis again; they still retry 429/502/503/504 responses. Other
+calls are only retried when the connection could not be opened, since the
+request was never sent.
+
+Latency is recorded per endpoint (the ``endpoint`` argument, or the host)
+in a fixed-bucket histogram; :meth:`HttpClient.stats` returns counts,
+errors, retries and approximate percentiles. For ``stream=True`` calls the
+latency is the time to the response headers.
+"""
+
+from __future__ import annotations
+
+import bisect
+import os
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+from flaskr.common.config import get_config
+
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+MAX_BACKOFF_SECONDS = 5.0
+
+
+def _never_sent(exc: requests.RequestException) -> bool:
+    """Whether ``exc`` means the connection could not be opened."""
+    if isinstance(exc, requests.ConnectTimeout):
+        return True
+    if isinstance(exc, requests.ConnectionError) and exc.args:
+        return isinstance(getattr(exc.args[0], "reason", None), NewConnectionError)
+    return False
+
+
+class LatencyHistogram:
+    """Request latencies in fixed millisecond buckets."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.errors = 0
+        self.retries = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, elapsed_ms: float, error: bool = False) -> None:
+        self.counts[bisect.bisect_left(self.buckets, elapsed_ms)] += 1
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        if error:
+            self.errors += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the ``q`` quantile."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                if index < len(self.buckets):
+                    return float(self.buckets[index])
+                break
+        return self.max_ms
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "retries": self.retries,
+            "avg_ms": int(self.total_ms / self.count) if self.count else 0,
+            "p50_ms": int(self.quantile(0.5)),
+            "p95_ms": int(self.quantile(0.95)),
+            "p99_ms": int(self.quantile(0.99)),
+            "max_ms": int(self.max_ms),
+            "buckets": {
+                **{str(le): n for le, n in zip(self.buckets, self.counts)},
+                "+inf": self.counts[-1],
+            },
+        }
+
+
+class HttpClient:
+    """Pooled ``requests`` sessions with timeouts, retries and latency stats."""
+
+    def __init__(
+        self,
+        *,
+        pool_size: Optional[int] = None,
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        backoff: Optional[float] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self._pool_size = pool_size
+        self._connect_timeout = connect_timeout
+        self._read_timeout = read_timeout
+        self._max_retries = max_retries
+        self._backoff = backoff
+        self._sleep = sleep
+        self._configured = False
+
+        self._lock = threading.Lock()
+        self._sessions: Dict[Tuple[str, str], requests.Session] = {}
+        self._sessions_pid: Optional[int] = None
+        self._histograms: Dict[str, LatencyHistogram] = {}
+
+    def _configure(self) -> None:
+        if self._configured:
+            return
+        if self._pool_size is None:
+            self._pool_size = int(get_config("HTTP_CLIENT_POOL_SIZE") or 16)
+        if self._connect_timeout is None:
+            self._connect_timeout = float(
+                get_config("HTTP_CLIENT_CONNECT_TIMEOUT") or 5.0
+            )
+        if self._read_timeout is None:
+            self._read_timeout = float(get_config("HTTP_CLIENT_READ_TIMEOUT") or 60.0)
+        if self._max_retries is None:
+            self._max_retries = int(get_config("HTTP_CLIENT_MAX_RETRIES") or 0)
+        if self._backoff is None:
+            self._backoff = float(get_config("HTTP_CLIENT_RETRY_BACKOFF") or 0.0)
+        self._pool_size = max(1, self._pool_size)
+        self._max_retries = max(0, self._max_retries)
+        self._configured = True
+
+    def _session(self, url: str) -> requests.Session:
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        with self._lock:
+            if self._sessions_pid != os.getpid():
+                # Sockets inherited from the parent process are not ours.
+                self._sessions = {}
+                self._sessions_pid = os.getpid()
+            session = self._sessions.get(key)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=1, pool_maxsize=self._pool_size, max_retries=0
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sessions[key] = session
+            return session
+
+    def _histogram(self, endpoint: str) -> LatencyHistogram:
+        histogram = self._histograms.get(endpoint)
+        if histogram is None:
+            histogram = self._histograms[endpoint] = LatencyHistogram()
+        return histogram
+
+    def _timeout(self, timeout) -> Tuple[float, float]:
+        if timeout is None:
+            return self._connect_timeout, self._read_timeout
+        if isinstance(timeout, tuple):
+            return timeout
+        return self._connect_timeout, float(timeout)
+
+    def _backoff_delay(self, attempt: int, response=None) -> float:
+        delay = random.uniform(
+            0, min(MAX_BACKOFF_SECONDS, self._backoff * (2**attempt))
+        )
+        # Not ``if response``: a Response is falsy for 4xx/5xx statuses.
+        retry_after = (
+            response.headers.get("Retry-After") if response is not None else None
+        )
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, min(float(retry_after), MAX_BACKOFF_SECONDS))
+        return delay
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        endpoint: Optional[str] = None,
+        timeout=None,
+        idempotent: Optional[bool] = None,
+        retry_after_send: bool = True,
+        **kwargs,
+    ) -> requests.Response:
+        """Send a request over the pooled session for ``url``'s host.
+
+        Accepts the keyword arguments of ``requests.Session.request``.
+        ``retry_after_send=False`` limits an idempotent call's retries to
+        connection failures and retryable statuses.
+        Raises the ``requests`` exception of the last attempt.
+        """
+        self._configure()
+        method = method.upper()
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        endpoint = endpoint or urlsplit(url).netloc
+        session = self._session(url)
+        timeout = self._timeout(timeout)
+        retries = self._max_retries if idempotent else 0
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                response = session.request(method, url, timeout=timeout, **kwargs)
+            except requests.RequestException as exc:
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                retryable = _never_sent(exc) or (
+                    isinstance(exc, (requests.ConnectionError, requests.Timeout))
+                    and idempotent
+                    and retry_after_send
+                )
+                with self._lock:
+                    histogram = self._histogram(endpoint)
+                    histogram.observe(elapsed_ms, error=True)
+                    if not retryable or attempt >= self._max_retries:
+                        raise
+                    histogram.retries += 1
+                self._sleep(self._backoff_delay(attempt))
+                attempt += 1
+                continue
+
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            retry = response.status_code in RETRY_STATUSES and attempt < retries
+            with self._lock:
+                histogram = self._histogram(endpoint)
+                histogram.observe(elapsed_ms, error=response.status_code >= 500)
+                if retry:
+                    histogram.retries += 1
+            if not retry:
+                return response
+            delay = self._backoff_delay(attempt, response)
+            response.close()
+            self._sleep(delay)
+            attempt += 1
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def stats(self) -> dict:
+        """Return pooled session count and per-endpoint latency histograms."""
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "endpoints": {
+                    name: histogram.snapshot()
+                    for name, histogram in self._histograms.items()
+                },
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._histograms = {}
+
+    def close(self) -> None:
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions = {}
+        for session in sessions:
+            session.close()
+
+
+http_client = HttpClient()
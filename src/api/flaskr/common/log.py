@@ -1,16 +1,32 @@
 import logging
 import os
-from flask import Flask, request
+import queue
+import time
+from collections import deque
+from dataclasses import dataclass
+from flask import Flask, g, request
 import uuid
-from logging.handlers import TimedRotatingFileHandler
+from logging.handlers import QueueHandler, TimedRotatingFileHandler
 import threading
 import socket
 from datetime import datetime
 import pytz
 import colorlog
+import json
 import requests
 
+from .access_log import (
+    AsyncAccessLogHandler,
+    BodyLogPolicies,
+    BodyLogPolicy,
+    BodyRedactor,
+    create_access_logger,
+    request_body_text,
+    response_body_text,
+)
+
 thread_local = threading.local()
+_module_logger = logging.getLogger(__name__)
 
 
 class AppLoggerProxy:
@@ -45,39 +61,247 @@ class RequestFormatter(logging.Formatter):
         return s
 
     def format(self, record):
-        try:
-            request_id = getattr(thread_local, "request_id", "No_Request_ID")
-            if request_id == "No_Request_ID":
-                thread_local.request_id = uuid.uuid4().hex
-                request_id = thread_local.request_id
-            record.url = getattr(thread_local, "url", "No_URL")
-            record.request_id = request_id
-            record.client_ip = getattr(thread_local, "client_ip", "No_Client_IP")
-        except RuntimeError:
-            record.url = "No_URL"
-            record.request_id = "No_Request_ID"
-            record.client_ip = "No_Client_IP"
+        # Records queued by AsyncAccessLogHandler carry their request context.
+        if not hasattr(record, "request_id"):
+            record.__dict__.update(request_context_fields())
         return super().format(record)
 
 
-class FeishuLogHandler(logging.Handler):
-    def __init__(self, webhook_url):
-        super().__init__(level=logging.ERROR)
+def request_context_fields() -> dict:
+    try:
+        request_id = getattr(thread_local, "request_id", "No_Request_ID")
+        if request_id == "No_Request_ID":
+            thread_local.request_id = uuid.uuid4().hex
+            request_id = thread_local.request_id
+        return {
+            "url": getattr(thread_local, "url", "No_URL"),
+            "request_id": request_id,
+            "client_ip": getattr(thread_local, "client_ip", "No_Client_IP"),
+        }
+    except RuntimeError:
+        return {
+            "url": "No_URL",
+            "request_id": "No_Request_ID",
+            "client_ip": "No_Client_IP",
+        }
+
+
+_STOP = object()
+_FEISHU_TITLE = "师傅出错啦！"
+# Feishu rejects text messages much larger than this.
+_FEISHU_MAX_TEXT = 20000
+
+
+class FeishuLogHandler(QueueHandler):
+    """
+    Post ERROR records to a Feishu bot without blocking the logging thread.
+
+    Records are formatted on the caller's thread, so request ids resolve,
+    and queued. A background sender collects them for ``batch_interval``
+    seconds and posts each batch as one message. Repeats of an alert already
+    posted or pending within ``dedupe_window`` are counted and reported with
+    the next post of that alert. At most ``max_posts_per_minute`` posts are
+    made; the rest wait for the next slot. When the queue is full new alerts
+    are dropped, so an error storm costs the failing request a queue put.
+    """
+
+    def __init__(
+        self,
+        webhook_url: str,
+        batch_interval: float = 2.0,
+        dedupe_window: float = 60.0,
+        max_posts_per_minute: int = 10,
+        queue_size: int = 1000,
+        max_batch: int = 20,
+        timeout: tuple[float, float] = (3.0, 5.0),
+        session: requests.Session = None,
+        clock=time.monotonic,
+    ):
+        super().__init__(queue.Queue(maxsize=queue_size))
+        self.setLevel(logging.ERROR)
         self.webhook_url = webhook_url
+        self.batch_interval = batch_interval
+        self.dedupe_window = dedupe_window
+        self.max_posts_per_minute = max_posts_per_minute
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self._clock = clock
+        self._stats_lock = threading.Lock()
+        self._pending: list[list] = []  # [key, text, repeats]
+        self._posted_at: dict[str, float] = {}
+        self._repeats: dict[str, int] = {}
+        self._post_times: deque = deque()
+        self._sender: threading.Thread = None
+        self._sender_pid = None
+        # counters, in alerts
+        self.sent = 0
+        self.dropped = 0
+        self.deduplicated = 0
+        self.failed = 0
+        self.posts = 0
 
-    def emit(self, record):
-        log_entry = self.format(record)
-        payload = {
-            "msg_type": "text",
-            "content": {"text": f"师傅出错啦！\n{log_entry}\n"},
-        }
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "sent": self.sent,
+                "dropped": self.dropped,
+                "deduplicated": self.deduplicated,
+                "failed": self.failed,
+                "posts": self.posts,
+                "queued": self.queue.qsize(),
+            }
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def prepare(self, record):
+        key = f"{record.levelname}:{record.getMessage()}"
+        return key, self.format(record)
+
+    def enqueue(self, item) -> None:
+        self._ensure_sender()
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            self._count("dropped")
+
+    def _ensure_sender(self) -> None:
+        # A sender started before a fork does not exist in the child.
+        if self._sender_pid == os.getpid() and self._sender.is_alive():
+            return
+        with self._stats_lock:
+            if self._sender_pid == os.getpid() and self._sender.is_alive():
+                return
+            self._sender = threading.Thread(
+                target=self._run, name="feishu-log-sender", daemon=True
+            )
+            self._sender_pid = os.getpid()
+            self._sender.start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                items = [
+                    self.queue.get(
+                        timeout=self.batch_interval if self._pending else None
+                    )
+                ]
+            except queue.Empty:
+                items = []
+            if items and items[0] is not _STOP:
+                time.sleep(self.batch_interval)
+            while True:
+                try:
+                    items.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            for item in items:
+                if item is not _STOP:
+                    self._accept(item)
+            self._send_pending()
+            for _item in items:
+                self.queue.task_done()
+            if _STOP in items:
+                return
+
+    def _accept(self, item) -> None:
+        key, text = item
+        now = self._clock()
+        posted_at = self._posted_at.get(key)
+        recent = posted_at is not None and now - posted_at < self.dedupe_window
+        if recent or any(entry[0] == key for entry in self._pending):
+            self._repeats[key] = self._repeats.get(key, 0) + 1
+            self._count("deduplicated")
+            return
+        if len(self._pending) >= self.queue.maxsize:
+            self._count("dropped")
+            return
+        self._pending.append([key, text, self._repeats.pop(key, 0)])
+
+    def _send_pending(self) -> None:
+        now = self._clock()
+        while self._post_times and now - self._post_times[0] >= 60:
+            self._post_times.popleft()
+        for key, posted_at in list(self._posted_at.items()):
+            if now - posted_at >= self.dedupe_window:
+                del self._posted_at[key]
+        while self._pending and len(self._post_times) < self.max_posts_per_minute:
+            batch = self._pending[: self.max_batch]
+            del self._pending[: self.max_batch]
+            self._post_times.append(now)
+            if self._post(batch):
+                self._count("sent", len(batch))
+                self._count("posts")
+                for key, _text, _repeats in batch:
+                    self._posted_at[key] = now
+            else:
+                self._count("failed", len(batch))
+
+    def _render(self, batch) -> str:
+        entries = []
+        for key, text, repeats in batch:
+            pending_repeats = self._repeats.pop(key, 0) + repeats
+            if pending_repeats:
+                text += f"\n(repeated {pending_repeats} more times)"
+            entries.append(text)
+        title = _FEISHU_TITLE
+        if len(batch) > 1:
+            title += f" ({len(batch)} alerts)"
+        text = f"{title}\n" + "\n\n----\n".join(entries) + "\n"
+        if len(text) > _FEISHU_MAX_TEXT:
+            text = text[: _FEISHU_MAX_TEXT - 16] + "\n...(truncated)"
+        return text
+
+    def _post(self, batch) -> bool:
+        payload = {"msg_type": "text", "content": {"text": self._render(batch)}}
         try:
-            response = requests.post(self.webhook_url, json=payload)
+            response = self.session.post(
+                self.webhook_url, json=payload, timeout=self.timeout
+            )
             response.raise_for_status()
-        except requests.exceptions.RequestException as e:
-            from flask import current_app
+            body = response.json() if response.content else {}
+            code = body.get("code", body.get("StatusCode", 0)) or 0
+            if code:
+                raise requests.exceptions.RequestException(
+                    f"code {code}: {body.get('msg', '')}"
+                )
+            return True
+        except (requests.exceptions.RequestException, ValueError) as e:
+            # Not app.logger: its ERROR records would come back to this handler.
+            _module_logger.warning(f"Failed to send log to Feishu: {e}")
+            return False
+
+    def flush(self, timeout: float = None) -> None:
+        """Wait until queued alerts were posted, or ``timeout`` passed."""
+        if self._sender is None or not self._sender.is_alive():
+            return
+        if timeout is None:
+            timeout = self.batch_interval + sum(self.timeout)
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if not self.queue.unfinished_tasks and not self._pending:
+                return
+            time.sleep(0.01)
+
+    def close(self) -> None:
+        sender = self._sender
+        if sender is not None and sender.is_alive():
+            try:
+                self.queue.put(_STOP, timeout=1)
+            except queue.Full:
+                pass
+            sender.join(self.batch_interval + sum(self.timeout) + 1)
+        super().close()
+
 
-            current_app.logger.error(f"Failed to send log to Feishu: {e}")
+@dataclass
+class _AccessLogState:
+    started: float
+    policy: BodyLogPolicy
+    log_body: bool
+    request_body: str = None
 
 
 class ColoredRequestFormatter(RequestFormatter, colorlog.ColoredFormatter):
@@ -86,6 +310,44 @@ class ColoredRequestFormatter(RequestFormatter, colorlog.ColoredFormatter):
 
 
 def init_log(app: Flask) -> Flask:
+    from .config import get_config
+
+    policies = BodyLogPolicies(
+        get_config("ACCESS_LOG_BODY_POLICIES") or [],
+        BodyLogPolicy(
+            max_bytes=int(get_config("ACCESS_LOG_BODY_MAX_BYTES")),
+            sample_rate=float(get_config("ACCESS_LOG_BODY_SAMPLE_RATE")),
+        ),
+    )
+    redactor = BodyRedactor(get_config("ACCESS_LOG_REDACT_FIELDS") or [])
+    json_format = str(get_config("ACCESS_LOG_FORMAT")).lower() == "json"
+    # Replaced by the async access logger once the handlers are configured.
+    access_log = app.logger
+
+    def access_entry(state, status, response_bytes, response_body, stream=False):
+        # Built while the request context is still active: the close callback
+        # of a streamed response runs after it was popped.
+        entry = {
+            "method": request.method,
+            "path": request.path,
+            "route": request.url_rule.rule if request.url_rule else None,
+            "status": status,
+            "duration_ms": None,
+            "request_bytes": request.content_length or 0,
+            "response_bytes": response_bytes,
+        }
+        if stream:
+            entry["stream"] = True
+        if state.request_body is not None:
+            entry["request_body"] = state.request_body
+        if response_body is not None:
+            entry["response_body"] = response_body
+        return entry
+
+    def log_access_json(state, entry):
+        entry["duration_ms"] = round((time.perf_counter() - state.started) * 1000, 1)
+        access_log.info(json.dumps(entry, ensure_ascii=False))
+
     @app.before_request
     def setup_logging():
         request_id = request.headers.get("X-Request-ID", uuid.uuid4().hex)
@@ -97,45 +359,69 @@ def init_log(app: Flask) -> Flask:
             user_ip = request.remote_addr
         request.client_ip = user_ip
         thread_local.client_ip = user_ip
+        route = request.url_rule.rule if request.url_rule else None
+        policy = policies.for_request(route, request.path)
+        state = _AccessLogState(time.perf_counter(), policy, policy.sample(), None)
+        g.access_log_state = state
         if request.method == "POST":
-            try:
-                request_body = {}
-                if request.files:
-                    request_body["File Upload"] = "File Upload"
-                elif request.is_json:
-                    request_body["JSON"] = request.get_json(silent=True)
-                elif request.form:
-                    request_body["Form"] = request.form.to_dict()
-                elif request.args:
-                    request_body["Args"] = request.args.to_dict()
-                elif request.form:
-                    request_body["Form"] = request.form.to_dict()
-                else:
-                    request_body["Raw"] = request.get_data(as_text=True)
-                app.logger.info(f"Request body: {request_body}")
-            except Exception as e:
-                app.logger.error(f"Failed to get request body: {e}")
-        else:
-            app.logger.info(f"Request method: {request.method}")
+            if state.log_body:
+                try:
+                    state.request_body = request_body_text(request, policy, redactor)
+                except Exception as e:
+                    app.logger.error(f"Failed to get request body: {e}")
+            if not json_format:
+                body = state.request_body if state.log_body else "<omitted>"
+                access_log.info(f"Request body: {body}")
+        elif not json_format:
+            access_log.info(f"Request method: {request.method}")
 
     @app.after_request
     def after_request(response):
+        state = g.get("access_log_state")
+        if state is None:
+            return response
         try:
             if response.headers.get(
                 "Content-Type"
             ) and "text/event-stream" in response.headers.get("Content-Type"):
-                app.logger.info("Response: <SSE streaming response>")
+                if json_format:
+                    entry = access_entry(
+                        state, response.status_code, None, None, stream=True
+                    )
+
+                    @response.call_on_close
+                    def log_sse_json():
+                        log_access_json(state, entry)
+
+                    return response
+                access_log.info("Response: <SSE streaming response>")
 
                 @response.call_on_close
                 def log_sse_end():
-                    app.logger.info("SSE Response: <streaming ended>")
+                    access_log.info("SSE Response: <streaming ended>")
 
                 return response
             if response.direct_passthrough:
-                app.logger.info("Response: <streaming response omitted>")
+                if json_format:
+                    log_access_json(
+                        state,
+                        access_entry(state, response.status_code, None, None, True),
+                    )
+                else:
+                    access_log.info("Response: <streaming response omitted>")
                 return response
-            response_data = response.get_data(as_text=True)
-            app.logger.info(f"Response: {response_data}")
+            response_body = None
+            if state.log_body:
+                response_body = response_body_text(response, state.policy, redactor)
+            if json_format:
+                entry = access_entry(
+                    state, response.status_code, response.content_length, response_body
+                )
+                log_access_json(state, entry)
+            elif response_body is not None:
+                access_log.info(f"Response: {response_body}")
+            else:
+                access_log.info(f"Response: <omitted, {response.content_length} bytes>")
         except Exception as e:
             app.logger.error(f"Error logging response: {str(e)}")
         return response
@@ -172,8 +458,6 @@ def init_log(app: Flask) -> Flask:
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(color_formatter)  # use color formatter
 
-    from .config import get_config
-
     if "gunicorn" in get_config("SERVER_SOFTWARE"):
         gunicorn_logger = logging.getLogger("gunicorn.info")
         if gunicorn_logger.handlers:
@@ -192,11 +476,27 @@ def init_log(app: Flask) -> Flask:
     feishu_webhook_url = get_config("FEISHU_LOG_WEBHOOK_URL", None)
     if feishu_webhook_url:
         app.logger.info("Feishu enabled.")
-        feishu_handler = FeishuLogHandler(feishu_webhook_url)
+        feishu_handler = FeishuLogHandler(
+            feishu_webhook_url,
+            batch_interval=float(get_config("FEISHU_LOG_BATCH_SECONDS")),
+            dedupe_window=float(get_config("FEISHU_LOG_DEDUPE_SECONDS")),
+            max_posts_per_minute=int(get_config("FEISHU_LOG_MAX_POSTS_PER_MINUTE")),
+            queue_size=int(get_config("FEISHU_LOG_QUEUE_SIZE")),
+            timeout=(
+                float(get_config("FEISHU_LOG_CONNECT_TIMEOUT")),
+                float(get_config("FEISHU_LOG_READ_TIMEOUT")),
+            ),
+        )
         feishu_handler.setFormatter(formatter)
         app.logger.addHandler(feishu_handler)
     else:
         app.logger.info("Feishu disabled.")
     app.logger.setLevel(logging.INFO)
     app.logger.propagate = False
+    access_log = create_access_logger(
+        app.logger,
+        AsyncAccessLogHandler(
+            app.logger.handlers, context_fields=request_context_fields
+        ),
+    )
     return app
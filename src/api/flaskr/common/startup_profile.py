@@ -0,0 +1,145 @@
+"""
+Startup profiling for ``create_app``.
+
+With STARTUP_PROFILE enabled, ``create_app`` times each startup phase and
+every module imported while it runs, then logs a report: phases in order,
+followed by the STARTUP_PROFILE_TOP slowest modules by self time (excluding
+the modules they import in turn) and their cumulative time.
+
+Module timing wraps the loaders handed out by the regular import finders,
+so it only sees modules imported after ``install`` and adds a little
+overhead of its own. It is off unless explicitly enabled.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+from .config import ENV_VARS
+
+
+def _env_value(key: str):
+    return ENV_VARS[key].convert_type(os.environ.get(key))
+
+
+class _TimingLoader:
+    """Loader wrapper that reports ``exec_module`` time to the profiler."""
+
+    def __init__(self, loader, profiler: "StartupProfiler"):
+        self._loader = loader
+        self._profiler = profiler
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module) -> None:
+        self._profiler._enter_module(module.__name__)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._exit_module()
+
+    def __getattr__(self, name: str):
+        return getattr(self._loader, name)
+
+
+class _TimingFinder:
+    """Meta path finder that wraps the loader found by the other finders."""
+
+    def __init__(self, profiler: "StartupProfiler"):
+        self._profiler = profiler
+
+    def find_spec(self, fullname, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            loader = spec.loader
+            if loader is not None and hasattr(loader, "exec_module"):
+                spec.loader = _TimingLoader(loader, self._profiler)
+            return spec
+        return None
+
+
+class StartupProfiler:
+    """Collects startup phase and module import timings."""
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        top: int = 30,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        self.enabled = enabled
+        self.top = top
+        self._clock = clock
+        self._finder: Optional[_TimingFinder] = None
+        # name -> [self seconds, cumulative seconds]
+        self.modules: dict[str, list[float]] = {}
+        self.phases: list[tuple[str, float]] = []
+        self._stack: list[list] = []
+        self._started_at = clock()
+
+    @classmethod
+    def from_env(cls) -> "StartupProfiler":
+        return cls(
+            enabled=bool(_env_value("STARTUP_PROFILE")),
+            top=int(_env_value("STARTUP_PROFILE_TOP")),
+        )
+
+    def install(self) -> None:
+        if self.enabled and self._finder is None:
+            self._finder = _TimingFinder(self)
+            sys.meta_path.insert(0, self._finder)
+
+    def uninstall(self) -> None:
+        if self._finder is not None:
+            try:
+                sys.meta_path.remove(self._finder)
+            except ValueError:  # pragma: no cover - removed elsewhere
+                pass
+            self._finder = None
+
+    def _enter_module(self, name: str) -> None:
+        # [name, start, time spent in child imports]
+        self._stack.append([name, self._clock(), 0.0])
+
+    def _exit_module(self) -> None:
+        name, start, children = self._stack.pop()
+        cumulative = self._clock() - start
+        self.modules[name] = [cumulative - children, cumulative]
+        if self._stack:
+            self._stack[-1][2] += cumulative
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        start = self._clock()
+        try:
+            yield
+        finally:
+            self.phases.append((name, self._clock() - start))
+
+    def report(self) -> str:
+        total = self._clock() - self._started_at
+        lines = [f"startup profile: {total * 1000:.0f}ms total"]
+        for name, seconds in self.phases:
+            lines.append(f"  phase {name:<24} {seconds * 1000:8.1f}ms")
+        slowest = sorted(self.modules.items(), key=lambda item: -item[1][0])
+        lines.append(
+            f"  {len(self.modules)} modules imported, slowest by self time"
+            " (self / cumulative):"
+        )
+        for name, (self_time, cumulative) in slowest[: self.top]:
+            lines.append(
+                f"  {self_time * 1000:8.1f}ms {cumulative * 1000:8.1f}ms  {name}"
+            )
+        return "\n".join(lines)
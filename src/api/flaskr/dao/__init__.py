@@ -1,6 +1,6 @@
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
-from redis import Redis
+from redis import BlockingConnectionPool, Redis
 from sqlalchemy import event
 import sqlparse
 import logging
@@ -85,23 +85,26 @@ def init_redis(app: Flask):
         )
     )
 
+    socket_timeout = float(app.config.get("REDIS_SOCKET_TIMEOUT") or 2.0)
+    pool_kwargs = {
+        "host": host,
+        "port": port,
+        "db": app.config["REDIS_DB"],
+        "socket_timeout": socket_timeout,
+        "socket_connect_timeout": float(
+            app.config.get("REDIS_SOCKET_CONNECT_TIMEOUT") or 1.0
+        ),
+        "max_connections": int(app.config.get("REDIS_MAX_CONNECTIONS") or 50),
+        # Wait for a free connection instead of failing when the pool is busy.
+        "timeout": socket_timeout,
+    }
     if (
         app.config.get("REDIS_PASSWORD") is not None
         and app.config["REDIS_PASSWORD"] != ""
     ):
-        redis_client = Redis(
-            host=host,
-            port=port,
-            db=app.config["REDIS_DB"],
-            password=app.config["REDIS_PASSWORD"],
-            username=app.config.get("REDIS_USER", None),
-        )
-    else:
-        redis_client = Redis(
-            host=host,
-            port=port,
-            db=app.config["REDIS_DB"],
-        )
+        pool_kwargs["password"] = app.config["REDIS_PASSWORD"]
+        pool_kwargs["username"] = app.config.get("REDIS_USER", None)
+    redis_client = Redis(connection_pool=BlockingConnectionPool(**pool_kwargs))
     app.logger.info("init redis done")
 
 
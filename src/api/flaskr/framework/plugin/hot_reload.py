@@ -30,14 +30,19 @@ class PluginHotReloader:
             # 1. unload plugin
             self._unload_plugin(plugin_path)
 
-            # 2. reload module
+            # 2. reload module (unloading removed it from sys.modules, so
+            # importing executes the new code once)
             module_name = plugin_path.replace("/", ".").replace(".py", "")
             module = importlib.import_module(module_name)
-            importlib.reload(module)
 
             # 3. register plugin
             self._register_plugin(module)
 
+            # 4. swap in the dispatch tables of the reloaded extensions
+            from .plugin_manager import plugin_manager
+
+            plugin_manager.recompile()
+
             self.app.logger.info(f"Hot reload plugin success: {plugin_path}")
         except Exception as e:
             self.app.logger.error(
@@ -76,6 +81,7 @@ class PluginHotReloader:
                 for func_name in list(plugin_manager.extension_functions.keys()):
                     if func_name.startswith(module_name):
                         plugin_manager.clear_extension(func_name)
+                plugin_manager.clear_module_extensions(module_name)
                 # Remove module from sys.modules
                 del sys.modules[module_name]
 
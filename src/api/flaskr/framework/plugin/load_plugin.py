@@ -1,4 +1,5 @@
 import importlib
+import json
 import os
 from flask import Flask
 from inspect import isfunction, getmembers
@@ -11,6 +12,107 @@ from .base import BasePlugin
 MIGRATION_DIR = "migrations"
 SRC_DIR = "src"
 
+# Precomputed result of walking the bundled plugin directories, so startup
+# does not have to list them. Regenerate with scripts/build_plugin_manifest.py
+# whenever a module is added, renamed or removed under one of them.
+MANIFEST_PATH = os.path.join(os.path.dirname(__file__), "plugin_manifest.json")
+MANIFEST_VERSION = 1
+
+# Load steps, in the order the directory walk performs them.
+STEP_PLUGIN_SRC = "plugin_src"
+STEP_TRANSLATIONS = "translations"
+STEP_MODULE = "module"
+
+
+def _manifest_key(plugins_dir: str) -> str:
+    return os.path.normpath(plugins_dir).replace(os.sep, "/")
+
+
+def _to_module_name(path: str) -> str:
+    return path.replace(os.sep, ".").replace("/", ".")
+
+
+def plan_directory(directory: str) -> list:
+    """Return the load steps for one plugin directory.
+
+    Paths in the steps use "/" so the plan can be stored in the manifest.
+    """
+    steps = []
+    files = sorted(os.listdir(directory))
+    if SRC_DIR in files:
+        migration_dir = None
+        if MIGRATION_DIR in files:
+            migration_dir = _manifest_key(os.path.join(directory, MIGRATION_DIR))
+        for filename in sorted(os.listdir(os.path.join(directory, SRC_DIR))):
+            if filename.endswith(".py"):
+                module_name = _to_module_name(f"{directory}.{SRC_DIR}.{filename[:-3]}")
+                steps.append([STEP_PLUGIN_SRC, module_name, migration_dir])
+    for filename in files:
+        if filename in ("__pycache__", MIGRATION_DIR) or filename.startswith("."):
+            continue
+        file_path = os.path.join(directory, filename)
+        if filename == TRANSLATIONS_DEFAULT_NAME:
+            steps.append([STEP_TRANSLATIONS, _manifest_key(file_path)])
+        elif os.path.isdir(file_path):
+            steps.extend(plan_directory(file_path))
+        elif filename.endswith(".py") and filename != "__init__.py":
+            module_name = _to_module_name(f"{directory}.{filename[:-3]}")
+            steps.append([STEP_MODULE, module_name])
+    return steps
+
+
+def build_manifest(plugins_dirs) -> dict:
+    """Walk ``plugins_dirs`` and return the manifest describing them."""
+    roots = {}
+    for plugins_dir in plugins_dirs:
+        plugins = []
+        for file in sorted(os.listdir(plugins_dir)):
+            path = os.path.join(plugins_dir, file)
+            if os.path.isdir(path) and not file.startswith((".", "__")):
+                plugins.append({"name": file, "steps": plan_directory(path)})
+        roots[_manifest_key(plugins_dir)] = plugins
+    return {"version": MANIFEST_VERSION, "roots": roots}
+
+
+def read_manifest(plugins_dir: str, manifest_path: str = None):
+    """Return the manifest entries for ``plugins_dir``, or None if absent."""
+    try:
+        with open(manifest_path or MANIFEST_PATH, encoding="utf-8") as fp:
+            manifest = json.load(fp)
+    except FileNotFoundError:
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest.get("roots", {}).get(_manifest_key(plugins_dir))
+
+
+def _run_steps(app: Flask, steps, plugin_manager: PluginManager = None):
+    for step in steps:
+        kind = step[0]
+        if kind == STEP_PLUGIN_SRC:
+            plugin_obj = importlib.import_module(step[1])
+            for name, obj in getmembers(plugin_obj):
+                if (
+                    isinstance(obj, type)
+                    and issubclass(obj, BasePlugin)
+                    and obj is not BasePlugin
+                ):
+                    plugin_define = obj()
+                    if step[2]:
+                        plugin_define.migration_dir = step[2].replace("/", os.sep)
+                    plugin_manager.plugins[plugin_define.name] = plugin_define
+                    app.logger.info(f"load plugin: {plugin_define.name}")
+        elif kind == STEP_TRANSLATIONS:
+            load_translations(app, step[1].replace("/", os.sep))
+        elif kind == STEP_MODULE:
+            module = importlib.import_module(step[1])
+            for name, obj in getmembers(module, isfunction):
+                if hasattr(obj, "inject"):
+                    app.logger.info(f"set inject for {name}")
+                    wrapped_func = partial(inject(obj), app=app)
+                    setattr(module, name, wrapped_func)
+                    wrapped_func()
+
 
 def load_plugins_from_dir(
     app: Flask, plugins_dir: str, plugin_manager: PluginManager = None
@@ -18,57 +120,28 @@ def load_plugins_from_dir(
     plugins = []
     app.logger.info("load modules from: {}".format(plugins_dir))
 
-    def load_from_directory(directory, plugin_manager: PluginManager = None):
-        files = os.listdir(directory)
-        plugin_obj = None
-        if SRC_DIR in files:
-            for filename in os.listdir(os.path.join(directory, SRC_DIR)):
-                if filename.endswith(".py"):
-                    plugin_obj = importlib.import_module(
-                        f"{directory}.{SRC_DIR}.{filename[:-3]}".replace(os.sep, ".")
-                    )
-                    for name, obj in getmembers(plugin_obj):
-                        if (
-                            isinstance(obj, type)
-                            and issubclass(obj, BasePlugin)
-                            and obj is not BasePlugin
-                        ):
-                            plugin_define = obj()
-                            if MIGRATION_DIR in files:
-                                plugin_define.migration_dir = os.path.join(
-                                    directory, MIGRATION_DIR
-                                )
-                            plugin_manager.plugins[plugin_define.name] = plugin_define
-                            app.logger.info(f"load plugin: {plugin_define.name}")
-        for filename in files:
-            if filename in ("__pycache__", MIGRATION_DIR) or filename.startswith("."):
-                continue
-            file_path = os.path.join(directory, filename)
-            if filename == TRANSLATIONS_DEFAULT_NAME:
-                load_translations(app, file_path)
-            elif os.path.isdir(file_path):
-                load_from_directory(file_path, plugin_manager)
-            elif filename.endswith(".py") and filename != "__init__.py":
-                module_name = filename[:-3]
-                module_full_name = f"{directory}.{module_name}".replace(os.sep, ".")
-                module = importlib.import_module(module_full_name)
-                for name, obj in getmembers(module, isfunction):
-                    if hasattr(obj, "inject"):
-                        app.logger.info(f"set inject for {name}")
-                        wrapped_func = partial(inject(obj), app=app)
-                        setattr(module, name, wrapped_func)
-                        wrapped_func()
+    entries = None
+    if app.config.get("PLUGIN_MANIFEST_ENABLED", True):
+        entries = read_manifest(plugins_dir)
+        if entries is not None:
+            app.logger.info("load modules from manifest: {}".format(MANIFEST_PATH))
+    if entries is None:
+        entries = []
+        for file in sorted(os.listdir(plugins_dir)):
+            if not os.path.isdir(os.path.join(plugins_dir, file)):
+                app.logger.warning("skip non-directory file: {}".format(file))
+            elif not file.startswith((".", "__")):
+                entries.append({"name": file, "steps": None})
 
     with app.app_context():
-        files = os.listdir(plugins_dir)
-        for file in files:
-            if os.path.isdir(os.path.join(plugins_dir, file)):
-                app.logger.info("begin load plugin: {}".format(file))
-                try:
-                    load_from_directory(os.path.join(plugins_dir, file), plugin_manager)
-                    app.logger.info("load plugin: {} success".format(file))
-                except Exception as e:
-                    app.logger.error("load plugin: {} error: {}".format(file, e))
-            else:
-                app.logger.warning("skip non-directory file: {}".format(file))
+        for entry in entries:
+            app.logger.info("begin load plugin: {}".format(entry["name"]))
+            try:
+                steps = entry["steps"]
+                if steps is None:
+                    steps = plan_directory(os.path.join(plugins_dir, entry["name"]))
+                _run_steps(app, steps, plugin_manager)
+                app.logger.info("load plugin: {} success".format(entry["name"]))
+            except Exception as e:
+                app.logger.error("load plugin: {} error: {}".format(entry["name"], e))
     return plugins
@@ -5,15 +5,63 @@ from functools import wraps
 plugin_manager = None
 
 
+def _unwrap(func):
+    while hasattr(func, "__wrapped__"):
+        func = func.__wrapped__
+    return func
+
+
 class PluginManager:
+    """
+    Registry of plugin extensions.
+
+    Registration compiles ``extension_dispatch`` and ``generic_dispatch``:
+    function name -> tuple of unwrapped callables. ``@extensible`` wrappers
+    return directly when their name has no entry, so unextended functions
+    cost one dict lookup per call. Both tables are rebuilt and swapped on
+    every change (registration, clearing, hot reload, disabling), so
+    callers never see a half-built table.
+
+    Set PLUGIN_DEBUG_LOGGING to log every dispatch at DEBUG level.
+    """
+
     def __init__(self, app: Flask):
         app.logger.info("PluginManager init")
         self.app = app
         self.extension_functions = {}
         self.extensible_generic_functions = {}
+        self.extension_dispatch = {}
+        self.generic_dispatch = {}
         self.hot_reloader = None
         self.plugins = {}
-        self.is_enabled = True
+        self._is_enabled = True
+        self.debug = _debug_logging_enabled(app)
+
+    @property
+    def is_enabled(self) -> bool:
+        return self._is_enabled
+
+    @is_enabled.setter
+    def is_enabled(self, value: bool):
+        self._is_enabled = bool(value)
+        self.recompile()
+
+    def recompile(self):
+        """rebuild the dispatch tables from the registered functions"""
+        if not self._is_enabled:
+            self.extension_dispatch = {}
+            self.generic_dispatch = {}
+            return
+        self.extension_dispatch = {
+            name: tuple(funcs)
+            for name, funcs in self.extension_functions.items()
+            if funcs
+        }
+        self.generic_dispatch = {
+            name: tuple(funcs)
+            for name, funcs in self.extensible_generic_functions.items()
+            if funcs
+        }
 
     def enable_hot_reload(self):
         """enable the hot reload"""
@@ -33,24 +81,38 @@ class PluginManager:
         """clear all registered functions for the specified extension point"""
         if target_func_name in self.extension_functions:
             del self.extension_functions[target_func_name]
+            self.recompile()
+
+    def clear_module_extensions(self, module_name):
+        """drop every function registered from the given module"""
+        for registry in (self.extension_functions, self.extensible_generic_functions):
+            for func_name, funcs in list(registry.items()):
+                kept = [
+                    f for f in funcs if getattr(f, "__module__", None) != module_name
+                ]
+                if kept:
+                    registry[func_name] = kept
+                else:
+                    del registry[func_name]
+        self.recompile()
 
     def register_extension(self, target_func_name, func):
         self.app.logger.info(
             f"register_extension: {target_func_name} -> {func.__name__}"
         )
-        while hasattr(func, "__wrapped__"):
+        if hasattr(func, "__wrapped__"):
             self.app.logger.warning(f"func is wrapped {func.__name__}")
-            func = func.__wrapped__
-        if target_func_name not in self.extension_functions:
-            self.extension_functions[target_func_name] = []
-        self.extension_functions[target_func_name].append(func)
+        self.extension_functions.setdefault(target_func_name, []).append(_unwrap(func))
+        self.recompile()
 
     def execute_extensions(self, func_name, result, *args, **kwargs):
-        self.app.logger.info(f"execute_extensions: {func_name}")
-        if not self.is_enabled:
-            return result
-        if func_name in self.extension_functions:
-            for func in self.extension_functions[func_name]:
+        extensions = self.extension_dispatch.get(func_name)
+        if self.debug:
+            self.app.logger.debug(
+                f"execute_extensions: {func_name} ({len(extensions or ())})"
+            )
+        if extensions:
+            for func in extensions:
                 result = func(result, *args, **kwargs)
         return result
 
@@ -58,28 +120,39 @@ class PluginManager:
         self.app.logger.info(
             f"register_extensible_generic: {func_name} -> {func.__name__}"
         )
-        while hasattr(func, "__wrapped__"):
+        if hasattr(func, "__wrapped__"):
             self.app.logger.warning(f"func is wrapped {func.__name__}")
-            func = func.__wrapped__
-        if func_name not in self.extensible_generic_functions:
-            self.extensible_generic_functions[func_name] = []
-        self.extensible_generic_functions[func_name].append(func)
+        self.extensible_generic_functions.setdefault(func_name, []).append(
+            _unwrap(func)
+        )
+        self.recompile()
 
     def execute_extensible_generic(self, func_name, result, *args, **kwargs):
-        self.app.logger.info(f"execute_extensible_generic: {func_name}")
-        if not self.is_enabled:
-            return result
-        if func_name in self.extensible_generic_functions:
-            for runc in self.extensible_generic_functions[func_name]:
-                while hasattr(runc, "__wrapped__"):
-                    self.app.logger.warning(f"func is wrapped {runc.__name__}")
-                    runc = runc.__wrapped__
-                result = runc(result, *args, **kwargs)
-                if result:
-                    yield from result
+        extensions = self.generic_dispatch.get(func_name)
+        if self.debug:
+            self.app.logger.debug(
+                f"execute_extensible_generic: {func_name} ({len(extensions or ())})"
+            )
+        if extensions:
+            for func in extensions:
+                output = func(result, *args, **kwargs)
+                if output:
+                    yield from output
         return None
 
 
+def _debug_logging_enabled(app: Flask) -> bool:
+    try:
+        from flaskr.common.config import get_config
+
+        value = get_config("PLUGIN_DEBUG_LOGGING", False)
+    except Exception:  # pragma: no cover - config not importable
+        return False
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    return bool(value)
+
+
 def enable_plugin_manager(app: Flask):
     app.logger.info("enable_plugin_manager")
     global plugin_manager
@@ -114,12 +187,18 @@ def extensible_generic_register(func_name):
 
 # extensible decorator
 def extensible(func):
+    func_name = func.__name__
+
     @wraps(func)
     def wrapper(*args, **kwargs):
         result = func(*args, **kwargs)
-        result = plugin_manager.execute_extensions(
-            func.__name__, result, *args, **kwargs
-        )
+        manager = plugin_manager
+        if manager.debug:
+            return manager.execute_extensions(func_name, result, *args, **kwargs)
+        extensions = manager.extension_dispatch.get(func_name)
+        if extensions:
+            for extension_func in extensions:
+                result = extension_func(result, *args, **kwargs)
         return result
 
     return wrapper
@@ -127,25 +206,20 @@ def extensible(func):
 
 # extensible_generic decorator
 def extensible_generic(func):
-    try:
-        from flask import current_app, has_app_context
-
-        if has_app_context():
-            current_app.logger.info(f"extensible_generic: {func.__name__}")
-    except ImportError:
-        pass
+    func_name = func.__name__
 
     @wraps(func)
     def wrapper(*args, **kwargs):
         result = func(*args, **kwargs)
         if result:
             yield from result
-        if func.__name__ in plugin_manager.extensible_generic_functions:
-            result = plugin_manager.execute_extensible_generic(
-                func.__name__, *args, **kwargs
-            )
-            if result:
-                yield from result
-        return
+        manager = plugin_manager
+        if manager.debug:
+            yield from manager.execute_extensible_generic(func_name, *args, **kwargs)
+            return
+        for extension_func in manager.generic_dispatch.get(func_name, ()):
+            output = extension_func(*args, **kwargs)
+            if output:
+                yield from output
 
     return wrapper
@@ -39,6 +39,7 @@ from ..service.user.auth import get_provider
 from ..service.user.auth.base import OAuthCallbackRequest
 from ..service.common.dtos import OAuthStartDTO
 from .common import make_common_response, bypass_token_validation, by_pass_login_func
+from flaskr.common.cache_provider import cache_health
 from flaskr.dao import db
 from flaskr.i18n import set_language
 
@@ -868,4 +869,9 @@ def register_user_handler(app: Flask, path_prefix: str) -> Flask:
         app.logger.info("health")
         return make_common_response("ok")
 
+    @app.route("/health/cache", methods=["GET"])
+    @bypass_token_validation
+    def cache_health_check():
+        return make_common_response(cache_health())
+
     return app
@@ -7,13 +7,12 @@ from typing import Any, Mapping, Optional
 
 import requests
 
-try:
-    import oss2  # type: ignore
-except ModuleNotFoundError:  # pragma: no cover
-    oss2 = None  # type: ignore[assignment]
-
 from flaskr.service.common.models import raise_error, raise_error_with_args
 from flaskr.service.config import get_config
+from flaskr.util.lazy_import import LazyModule
+
+# oss2 (and the crypto stack it pulls in) is loaded on the first OSS call.
+oss2 = LazyModule("oss2")
 
 
 OSS_PROFILE_DEFAULT = "default"
@@ -94,7 +93,7 @@ def is_oss_profile_configured(profile: str = OSS_PROFILE_DEFAULT) -> bool:
 
 
 def create_oss_bucket(config: OSSConfig) -> oss2.Bucket:
-    if oss2 is None:  # pragma: no cover
+    if not oss2.is_available:  # pragma: no cover
         raise RuntimeError("oss2 dependency is not installed")
     auth = oss2.Auth(config.access_key_id, config.access_key_secret)
     return oss2.Bucket(auth, config.endpoint, config.bucket)
@@ -230,3 +229,19 @@ def upload_to_oss(
         warm_up_cdn(app, url, resolved_config)
 
     return url, resolved_config.bucket
+
+
+def download_from_oss(
+    *,
+    file_id: str,
+    profile: str = OSS_PROFILE_DEFAULT,
+    config: Optional[OSSConfig] = None,
+    bucket: Optional[oss2.Bucket] = None,
+) -> Optional[bytes]:
+    """Return the object body, or None when the key does not exist."""
+    resolved_config = config or get_oss_config(profile)
+    resolved_bucket = bucket or create_oss_bucket(resolved_config)
+    try:
+        return resolved_bucket.get_object(file_id).read()
+    except oss2.exceptions.NoSuchKey:
+        return None
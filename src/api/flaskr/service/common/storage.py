@@ -12,6 +12,7 @@ from flask import Flask
 from flaskr.service.common.oss_utils import (
     OSS_PROFILE_COURSES,
     OSS_PROFILE_DEFAULT,
+    download_from_oss,
     is_oss_profile_configured,
     upload_to_oss,
 )
@@ -199,3 +200,24 @@ def upload_to_storage(
         content_type=content_type,
         profile=resolved_profile,
     )
+
+
+def read_from_storage(
+    app: Flask,
+    *,
+    object_key: str,
+    profile: str = OSS_PROFILE_DEFAULT,
+) -> bytes | None:
+    """Return the object stored under ``object_key``, or None if it is missing."""
+    _unused_app = app
+    resolved_profile = _normalize_profile(profile)
+    resolved_key = _normalize_object_key(object_key)
+
+    if _resolve_provider(resolved_profile) == STORAGE_PROVIDER_OSS:
+        return download_from_oss(file_id=resolved_key, profile=resolved_profile)
+
+    path = get_local_storage_path(resolved_profile, resolved_key)
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        return None
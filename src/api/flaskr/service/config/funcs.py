@@ -12,6 +12,8 @@ from flaskr.framework import extensible
 from sqlalchemy.exc import SQLAlchemyError
 import random
 
+from flaskr.service.config.local_cache import ABSENT, config_local_cache
+
 
 class ConfigCache(BaseModel):
     is_encrypted: bool = Field(default=False)
@@ -88,11 +90,36 @@ def _get_config_lock_key(app: Flask, key: str) -> str:
     return app.config["REDIS_KEY_PREFIX"] + "sys:config:lock:" + key
 
 
+def _get_config_version_key(app: Flask) -> str:
+    return app.config["REDIS_KEY_PREFIX"] + "sys:config:version"
+
+
+def _normalize_version(value) -> str:
+    if isinstance(value, bytes):
+        return value.decode()
+    return "" if value is None else str(value)
+
+
+def _invalidate_local_config(app: Flask) -> None:
+    """Bump the shared config version so every process drops its L1 entries."""
+    try:
+        version = redis.incr(_get_config_version_key(app))
+    except Exception as exc:  # pragma: no cover - defensive
+        app.logger.warning("Failed to bump config version: %s", exc)
+        version = None
+    config_local_cache.invalidate(
+        None if version is None else _normalize_version(version)
+    )
+
+
 @extensible
 def get_config(key: str, default: str = None) -> str:
     """
     Get config value by key, automatically decrypt if is_secret=1.
 
+    Lookup order: environment, process-local cache (see local_cache), Redis,
+    database.
+
     Args:
         key: Config key
         default: Default value if config is not found
@@ -108,18 +135,34 @@ def get_config(key: str, default: str = None) -> str:
     if not has_app_context():
         return get_config_from_common(key, default)
     app = current_app
+    env_value = get_config_from_common(key, default)
+    if env_value is not None:
+        return env_value
+    cache_key = _get_config_cache_key(app, key)
+    local = config_local_cache
+    local.configure(app)
+    if local.enabled:
+        try:
+            local.sync_version(
+                lambda: _normalize_version(redis.get(_get_config_version_key(app)))
+            )
+            found, value = local.get(cache_key)
+        except RuntimeError as exc:
+            app.logger.warning("Config version check failed for %s: %s", key, exc)
+            found, value = False, None
+        if found:
+            return default if value is ABSENT else value
     with app.app_context():
-        env_value = get_config_from_common(key, default)
-        if env_value is not None:
-            return env_value
         try:
-            cache_key = _get_config_cache_key(app, key)
             cache = redis.get(cache_key)
             if cache:
                 cache_config = ConfigCache.model_validate_json(cache)
                 if cache_config.is_encrypted:
-                    return _decrypt_config(app, cache_config.value)
-                return cache_config.value
+                    value = _decrypt_config(app, cache_config.value)
+                else:
+                    value = cache_config.value
+                local.put(cache_key, value)
+                return value
             lock_key = _get_config_lock_key(app, key)
             lock = redis.lock(lock_key, timeout=1, blocking_timeout=1)
             if lock.acquire(blocking=False):
@@ -133,6 +176,7 @@ def get_config(key: str, default: str = None) -> str:
                         .first()
                     )
                     if not config:
+                        local.put(cache_key, ABSENT)
                         return default
                     raw_value = config.value
                     if bool(config.is_encrypted):
@@ -147,6 +191,7 @@ def get_config(key: str, default: str = None) -> str:
                         ).model_dump_json(),
                         ex=86400 + random.randint(0, 3600),
                     )
+                    local.put(cache_key, value)
                     return value
                 finally:
                     lock.release()
@@ -193,6 +238,7 @@ def add_config(
                 ConfigCache(is_encrypted=is_secret, value=value).model_dump_json(),
                 ex=86400 + random.randint(0, 3600),
             )
+            _invalidate_local_config(app)
             return True
         # Config doesn't exist, add new one
         if value:
@@ -215,6 +261,7 @@ def add_config(
                 ConfigCache(is_encrypted=is_secret, value=value).model_dump_json(),
                 ex=86400 + random.randint(0, 3600),
             )
+            _invalidate_local_config(app)
             return True
         return False
 
@@ -270,5 +317,6 @@ def update_config(
                 ConfigCache(is_encrypted=is_secret, value=value).model_dump_json(),
                 ex=86400 + random.randint(0, 3600),
             )
+            _invalidate_local_config(app)
             return True
         return False
@@ -0,0 +1,138 @@
+"""
+Process-local (L1) cache for ``flaskr.service.config.get_config``.
+
+Redis stays the shared (L2) cache. The L1 cache keeps decrypted values, and
+records keys the database does not have, so hot paths skip the Redis
+round-trip, the JSON parsing and the Fernet decrypt.
+
+Entries expire after CONFIG_LOCAL_CACHE_TTL_SECONDS (found values) or
+CONFIG_LOCAL_CACHE_NEGATIVE_TTL_SECONDS (missing keys); a TTL of 0 disables
+that kind of entry. ``add_config``/``update_config`` bump a version counter
+in Redis; every process polls it at most once per ``version_check_interval``
+and drops its entries when it changes.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from flask import Flask
+
+
+ABSENT = object()
+
+
+class ConfigLocalCache:
+    """TTL cache of config values with negative entries and version checks."""
+
+    def __init__(
+        self,
+        *,
+        ttl: Optional[float] = None,
+        negative_ttl: Optional[float] = None,
+        version_check_interval: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._ttl = ttl
+        self._negative_ttl = negative_ttl
+        self.version_check_interval = version_check_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[float, Any]] = {}
+        self._version: Any = None
+        self._version_checked_at: Optional[float] = None
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def configure(self, app: Flask) -> None:
+        """Read TTLs from ``app`` unless they were given explicitly."""
+        if self._ttl is None:
+            self._ttl = float(app.config.get("CONFIG_LOCAL_CACHE_TTL_SECONDS", 0) or 0)
+        if self._negative_ttl is None:
+            self._negative_ttl = float(
+                app.config.get("CONFIG_LOCAL_CACHE_NEGATIVE_TTL_SECONDS", 0) or 0
+            )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._ttl or self._negative_ttl)
+
+    def sync_version(self, read_version: Callable[[], Any]) -> None:
+        """Drop every entry if the shared version changed since the last check."""
+        now = self._clock()
+        checked_at = self._version_checked_at
+        if checked_at is not None and now - checked_at < self.version_check_interval:
+            return
+        version = read_version()
+        with self._lock:
+            self._version_checked_at = now
+            if checked_at is not None and version != self._version:
+                self._drop_entries()
+            self._version = version
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        Look up ``key``.
+
+        Returns:
+            Tuple of (found, value); value is ``ABSENT`` for a cached miss
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                if entry[1] is ABSENT:
+                    self.negative_hits += 1
+                else:
+                    self.hits += 1
+                return True, entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key: str, value: Any) -> None:
+        """Cache ``value`` (or ``ABSENT`` for a key the database does not have)."""
+        ttl = self._negative_ttl if value is ABSENT else self._ttl
+        if not ttl:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock() + ttl, value)
+
+    def _drop_entries(self) -> None:
+        if self._entries:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def invalidate(self, version: Any = None) -> None:
+        """Drop every entry; ``version`` is the counter value after a write."""
+        with self._lock:
+            self._drop_entries()
+            if version is not None:
+                self._version = version
+                self._version_checked_at = self._clock()
+
+    def clear(self) -> None:
+        """Drop entries, counters and version state (used by tests)."""
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+            self._version_checked_at = None
+            self.hits = self.negative_hits = self.misses = self.invalidations = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
+
+
+config_local_cache = ConfigLocalCache()
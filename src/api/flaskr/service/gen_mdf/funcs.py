@@ -7,6 +7,7 @@ Handles communication with external MDF API service.
 import requests
 import logging
 from typing import Dict, Any
+from flaskr.common.http_client import http_client
 from flaskr.service.config import get_config
 from flaskr.service.common.models import raise_error_with_args
 
@@ -59,10 +60,11 @@ def convert_text_to_mdf(
         logger.info(f"Calling MDF API at {api_endpoint} for text length {len(text)}")
 
         # Make HTTP request to external MDF API
-        response = requests.post(
+        response = http_client.post(
             api_endpoint,
             json=payload,
             timeout=MDF_API_TIMEOUT,
+            endpoint="mdf.text2mdf",
             headers={
                 "Content-Type": "application/json",
                 "User-Agent": "AI-Shifu/1.0",
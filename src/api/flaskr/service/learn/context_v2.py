@@ -1,7 +1,6 @@
 import hashlib
 import inspect
 import json
-import queue
 import threading
 from decimal import Decimal
 from enum import Enum
@@ -61,6 +60,11 @@ from flaskr.service.shifu.consts import (
 
 from flaskr.service.user.repository import UserAggregate
 from flaskr.service.shifu.struct_utils import find_node_with_parents
+from flaskr.service.shifu.struct_index import (
+    StructIndex,
+    get_struct_index,
+    is_leaf_outline,
+)
 from flaskr.util import generate_id
 from flaskr.service.profile.funcs import get_user_profiles
 from flaskr.service.profile.constants import SYS_USER_LANGUAGE
@@ -79,10 +83,7 @@ from flaskr.service.learn.learn_dtos import (
 from flaskr.api.llm import chat_llm, get_allowed_models, get_current_models
 from flaskr.service.learn.handle_input_ask import handle_input_ask
 from flaskr.service.profile.funcs import save_user_profiles, ProfileToSave
-from flaskr.service.profile.profile_manage import (
-    get_profile_item_definition_list,
-    ProfileItemDefinition,
-)
+from flaskr.service.profile.definition_cache import get_profile_definition_snapshot
 from flaskr.service.metering import UsageContext
 from flaskr.service.metering.consts import (
     BILL_USAGE_SCENE_PREVIEW,
@@ -1026,9 +1027,9 @@ class RunScriptContextV2:
     is_paid: bool
 
     preview_mode: bool
-    _q: queue.Queue
     _outline_item_info: ShifuOutlineItemDto
     _struct: HistoryItem
+    _struct_index: StructIndex
     _user_info: UserAggregate
     _is_paid: bool
     _preview_mode: bool
@@ -1060,6 +1061,7 @@ class RunScriptContextV2:
         self._last_position = -1
         self.app = app
         self._struct = struct
+        self._struct_index = get_struct_index(struct)
         self._outline_item_info = outline_item_info
         self._user_info = user_info
         self._is_paid = is_paid
@@ -1080,16 +1082,7 @@ class RunScriptContextV2:
             self._outline_model = PublishedOutlineItem
             self._shifu_model = PublishedShifu
         # get current attend
-        self._q = queue.Queue()
-        self._q.put(struct)
-        while not self._q.empty():
-            item = self._q.get()
-            if item.bid == outline_item_info.bid:
-                self._current_outline_item = item
-                break
-            if item.children:
-                for child in item.children:
-                    self._q.put(child)
+        self._current_outline_item = self._struct_index.get(outline_item_info.bid)
         self._current_attend = None
         self._trace_args = {}
         chapter_title = self._outline_item_info.title
@@ -1148,7 +1141,7 @@ class RunScriptContextV2:
                     and not self._user_info.email
                 ):
                     raise UserNotLoginException()
-            parent_path = find_node_with_parents(self._struct, outline_bid)
+            parent_path = self._struct_index.path(outline_bid)
             attend_info = None
             for item in parent_path:
                 if item.type == "outline":
@@ -1174,28 +1167,13 @@ class RunScriptContextV2:
     # outline is a node when has outline item as children
     # outline is a leaf when has no children
     def _is_leaf_outline_item(self, outline_item_info: ShifuOutlineItemDto) -> bool:
-        if outline_item_info.children:
-            if outline_item_info.children[0].type == "block":
-                return True
-            if outline_item_info.children[0].type == "outline":
-                return False
-        if outline_item_info.type == "outline":
-            return True
-        return False
+        return is_leaf_outline(outline_item_info)
 
     # get the outline items to start or complete
     def _get_next_outline_item(self) -> list[OutlineItemUpdateDTO]:
         res = []
-        q = queue.Queue()
-        q.put(self._struct)
-        outline_ids = []
-        while not q.empty():
-            item: HistoryItem = q.get()
-            if item.type == "outline":
-                outline_ids.append(item.bid)
-            if item.children:
-                for child in item.children:
-                    q.put(child)
+        struct_index = self._struct_index
+        outline_ids = struct_index.outline_bids
         outline_item_info_db: list[tuple[str, bool, str]] = (
             db.session.query(
                 self._outline_model.outline_item_bid,
@@ -1218,8 +1196,6 @@ class RunScriptContextV2:
         def _mark_sub_node_completed(
             outline_item_info: HistoryItem, res: list[OutlineItemUpdateDTO]
         ):
-            q = queue.Queue()
-            q.put(self._struct)
             if self._is_leaf_outline_item(outline_item_info):
                 res.append(
                     OutlineItemUpdateDTO(
@@ -1238,54 +1214,44 @@ class RunScriptContextV2:
                         has_children=True,
                     )
                 )
-            while not q.empty():
-                item: HistoryItem = q.get()
-                if item.children and outline_item_info.bid in [
-                    child.bid for child in item.children
-                ]:
-                    index = [child.bid for child in item.children].index(
-                        outline_item_info.bid
-                    )
-                    while index < len(item.children) - 1:
-                        # not sub node
-                        current_node = item.children[index + 1]
-                        if outline_item_hidden_map.get(current_node.bid, True):
-                            index += 1
-                            continue
-                        while (
-                            current_node.children
-                            and current_node.children[0].type == "outline"
-                        ):
-                            res.append(
-                                OutlineItemUpdateDTO(
-                                    outline_bid=current_node.bid,
-                                    title=outline_item_title_map.get(
-                                        current_node.bid, ""
-                                    ),
-                                    status=LearnStatus.IN_PROGRESS,
-                                    has_children=True,
-                                )
-                            )
-                            current_node = current_node.children[0]
+            item: HistoryItem = struct_index.parent(outline_item_info.bid)
+            if item is not None:
+                index = struct_index.sibling_index(outline_item_info.bid)
+                while index < len(item.children) - 1:
+                    # not sub node
+                    current_node = item.children[index + 1]
+                    if outline_item_hidden_map.get(current_node.bid, True):
+                        index += 1
+                        continue
+                    while (
+                        current_node.children
+                        and current_node.children[0].type == "outline"
+                    ):
                         res.append(
                             OutlineItemUpdateDTO(
                                 outline_bid=current_node.bid,
                                 title=outline_item_title_map.get(current_node.bid, ""),
                                 status=LearnStatus.IN_PROGRESS,
-                                has_children=False,
+                                has_children=True,
                             )
                         )
-                        return
-                    if index == len(item.children) - 1 and item.type == "outline":
-                        _mark_sub_node_completed(item, res)
-                if item.children and item.children[0].type == "outline":
-                    for child in item.children:
-                        q.put(child)
+                        current_node = current_node.children[0]
+                    res.append(
+                        OutlineItemUpdateDTO(
+                            outline_bid=current_node.bid,
+                            title=outline_item_title_map.get(current_node.bid, ""),
+                            status=LearnStatus.IN_PROGRESS,
+                            has_children=False,
+                        )
+                    )
+                    return
+                if index == len(item.children) - 1 and item.type == "outline":
+                    _mark_sub_node_completed(item, res)
 
         def _mark_sub_node_start(
             outline_item_info: HistoryItem, res: list[OutlineItemUpdateDTO]
         ):
-            path = find_node_with_parents(self._struct, outline_item_info.bid)
+            path = struct_index.path(outline_item_info.bid)
             for item in path:
                 if item.type == "outline":
                     if item.children and item.children[0].type == "outline":
@@ -1516,18 +1482,7 @@ class RunScriptContextV2:
         self._input = input
 
     def _get_outline_struct(self, outline_item_id: str) -> HistoryItem:
-        q = queue.Queue()
-        q.put(self._struct)
-        outline_struct = None
-        while not q.empty():
-            item = q.get()
-            if item.bid == outline_item_id:
-                outline_struct = item
-                break
-            if item.children:
-                for child in item.children:
-                    q.put(child)
-        return outline_struct
+        return self._struct_index.get(outline_item_id)
 
     def _get_run_script_info(
         self, attend: LearnProgressRecord, is_ask: bool = False
@@ -1691,12 +1646,11 @@ class RunScriptContextV2:
             generated_blocks, run_script_info.mdflow, user_profile
         )
 
-        variable_definition: list[ProfileItemDefinition] = (
-            get_profile_item_definition_list(app, self._outline_item_info.shifu_bid)
+        variable_definition_key_id_map: dict[str, str] = (
+            get_profile_definition_snapshot(
+                app, self._outline_item_info.shifu_bid
+            ).key_id_map
         )
-        variable_definition_key_id_map: dict[str, str] = {
-            p.profile_key: p.profile_id for p in variable_definition
-        }
 
         if run_script_info.block_position >= len(block_list):
             outline_updates = self._get_next_outline_item()
@@ -2493,7 +2447,7 @@ class RunScriptContextV2:
         return self._can_continue
 
     def get_system_prompt(self, outline_item_bid: str) -> str:
-        path = find_node_with_parents(self._struct, outline_item_bid)
+        path = self._struct_index.path(outline_item_bid)
         path = list(reversed(path))
         outline_ids = [item.id for item in path if item.type == "outline"]
         shifu_ids = [item.id for item in path if item.type == "shifu"]
@@ -2534,7 +2488,7 @@ class RunScriptContextV2:
         return None
 
     def get_llm_settings(self, outline_bid: str) -> LLMSettings:
-        path = find_node_with_parents(self._struct, outline_bid)
+        path = self._struct_index.path(outline_bid)
         path.reverse()
         outline_ids = [item.id for item in path if item.type == "outline"]
         shifu_ids = [item.id for item in path if item.type == "shifu"]
@@ -297,8 +297,18 @@ class AudioSegmentDTO(BaseModel):
         default=None, description="AV boundary contract metadata"
     )
     segment_index: int = Field(..., description="Segment sequence number")
-    audio_data: str = Field(..., description="Base64-encoded audio data")
+    audio_data: str = Field(
+        default="", description="Base64-encoded audio data (inline delivery)"
+    )
+    audio_url: str | None = Field(
+        default=None,
+        description="URL of the segment audio (url delivery, short-lived)",
+    )
     duration_ms: int = Field(default=0, description="Segment duration in milliseconds")
+    start_offset_ms: int = Field(
+        default=0,
+        description="Play offset of the segment within its track: the summed duration of the segments before it",
+    )
     is_final: bool = Field(
         default=False, description="Whether this is the last segment"
     )
@@ -306,12 +316,14 @@ class AudioSegmentDTO(BaseModel):
     def __init__(
         self,
         segment_index: int,
-        audio_data: str,
+        audio_data: str = "",
         duration_ms: int = 0,
         is_final: bool = False,
         position: int = 0,
         slide_id: str | None = None,
         av_contract: Dict[str, Any] | None = None,
+        audio_url: str | None = None,
+        start_offset_ms: int = 0,
     ):
         super().__init__(
             position=position,
@@ -319,7 +331,9 @@ class AudioSegmentDTO(BaseModel):
             av_contract=av_contract,
             segment_index=segment_index,
             audio_data=audio_data,
+            audio_url=audio_url,
             duration_ms=duration_ms,
+            start_offset_ms=start_offset_ms,
             is_final=is_final,
         )
 
@@ -327,10 +341,14 @@ class AudioSegmentDTO(BaseModel):
         ret = {
             "position": self.position,
             "segment_index": self.segment_index,
-            "audio_data": self.audio_data,
             "duration_ms": self.duration_ms,
+            "start_offset_ms": self.start_offset_ms,
             "is_final": self.is_final,
         }
+        if self.audio_url is not None:
+            ret["audio_url"] = self.audio_url
+        else:
+            ret["audio_data"] = self.audio_data
         if self.slide_id is not None:
             ret["slide_id"] = self.slide_id
         if self.av_contract is not None:
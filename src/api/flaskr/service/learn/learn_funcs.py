@@ -2,7 +2,6 @@ from markdown_flow import (
     InteractionParser,
 )
 from flask import Flask, request
-import base64
 import time
 import logging
 from dataclasses import replace
@@ -50,6 +49,7 @@ from flaskr.api.tts import (
     is_tts_configured,
 )
 from flaskr.service.tts import preprocess_for_tts
+from flaskr.service.tts.segment_store import segment_audio_fields
 from flaskr.service.tts.audio_utils import (
     concat_audio_best_effort,
     get_audio_duration_ms,
@@ -938,14 +938,16 @@ def _build_audio_segment_message(
     segment_index: int,
     audio_data: bytes,
     duration_ms: int,
+    start_offset_ms: int = 0,
     position: int | None = None,
     av_contract: dict | None = None,
 ) -> RunMarkdownFlowDTO:
     content_kwargs = {
         "segment_index": segment_index,
-        "audio_data": base64.b64encode(audio_data).decode("utf-8"),
         "duration_ms": duration_ms,
+        "start_offset_ms": start_offset_ms,
         "is_final": False,
+        **segment_audio_fields(audio_data),
     }
     if position is not None:
         content_kwargs["position"] = position
@@ -1006,6 +1008,7 @@ def _yield_stream_tts_audio_segments(
     position: int | None = None,
     av_contract: dict | None = None,
 ):
+    start_offset_ms = 0
     for (
         index,
         audio_data,
@@ -1044,9 +1047,12 @@ def _yield_stream_tts_audio_segments(
             segment_index=index,
             audio_data=audio_data,
             duration_ms=duration_ms,
+            start_offset_ms=start_offset_ms,
             position=position,
             av_contract=av_contract,
         )
+        start_offset_ms += int(duration_ms or 0)
+        av_contract = None
 
 
 def stream_generated_block_audio(
@@ -1167,6 +1173,9 @@ def stream_generated_block_audio(
             )
 
             def _generate_av_audio():
+                # The contract is the same for every track of the block, so
+                # only the first streamed segment carries it.
+                segment_av_contract = av_contract
                 for position, speakable_text in enumerate(speakable_segments):
                     if position in existing_by_position:
                         record = existing_by_position[position]
@@ -1214,9 +1223,11 @@ def stream_generated_block_audio(
                         audio_parts=audio_parts,
                         stats=stats,
                         position=position,
-                        av_contract=av_contract,
+                        av_contract=segment_av_contract,
                     )
                     segment_count = int(stats.get("segment_count", 0))
+                    if segment_count:
+                        segment_av_contract = None
                     total_word_count = int(stats.get("total_word_count", 0))
 
                     oss_url, duration_ms = _finalize_tts_stream_audio(
@@ -1,7 +1,8 @@
+import io
 import json
 import uuid
 
-from flask import Flask, Response, request, stream_with_context
+from flask import Flask, Response, request, send_file, stream_with_context
 from pydantic import ValidationError
 
 from flaskr.framework.plugin.inject import inject
@@ -18,6 +19,11 @@ from flaskr.service.learn.learn_funcs import (
     stream_preview_tts_audio,
 )
 from flaskr.service.learn.runscript_v2 import run_script, get_run_status
+from flaskr.service.tts.segment_store import (
+    audio_mime_type,
+    get_segment,
+    segment_ttl_seconds,
+)
 from flaskr.service.learn.learn_dtos import PlaygroundPreviewRequest
 from flaskr.service.learn.context_v2 import RunScriptPreviewContextV2
 from flaskr.service.learn.learn_dtos import PreviewSSEMessage, PreviewSSEMessageType
@@ -641,6 +647,7 @@ def register_learn_routes(app: Flask, path_prefix: str = "/api/learn") -> Flask:
                         schema:
                             type: string
                             example: 'data: {"type":"audio_segment","content":{"segment_index":0,"audio_data":"...","duration_ms":123,"is_final":false}}'
+                            description: With TTS_SEGMENT_DELIVERY=url, segments carry "audio_url" (see /audio-segments/{segment_id}) instead of "audio_data".
         """
         user_bid = request.user.user_id
         preview_mode = request.args.get("preview_mode", "False")
@@ -662,6 +669,38 @@ def register_learn_routes(app: Flask, path_prefix: str = "/api/learn") -> Flask:
             error_log="synthesize generated block audio failed",
         )
 
+    @app.route(path_prefix + "/audio-segments/<segment_id>", methods=["GET"])
+    @bypass_token_validation
+    def get_audio_segment_api(segment_id: str):
+        """
+        Get the audio of a streamed TTS segment (TTS_SEGMENT_DELIVERY=url)
+        ---
+        tags:
+            - learn
+        parameters:
+            - name: segment_id
+              type: string
+              required: true
+        responses:
+            200:
+                description: segment audio; Range requests are answered with 206
+            404:
+                description: unknown or expired segment
+        """
+        stored = get_segment(segment_id)
+        if stored is None:
+            return Response(status=404)
+        audio, audio_format = stored
+        response = send_file(
+            io.BytesIO(audio),
+            mimetype=audio_mime_type(audio_format),
+            conditional=True,
+            max_age=segment_ttl_seconds(),
+        )
+        response.cache_control.public = False
+        response.cache_control.private = True
+        return response
+
     @app.route(path_prefix + "/shifu/<shifu_bid>/tts/preview", methods=["POST"])
     @with_shifu_context()
     def synthesize_preview_tts_audio_api(shifu_bid: str):
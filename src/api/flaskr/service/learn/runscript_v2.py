@@ -1,6 +1,5 @@
 import traceback
 import threading
-import queue
 import contextlib
 import time
 from typing import Any, Generator, Optional
@@ -9,7 +8,6 @@ from flask import Flask
 from flaskr.service.common.models import AppException, raise_error
 from flaskr.service.user.repository import load_user_aggregate
 from flaskr.i18n import _
-import json
 
 
 from flaskr.service.learn.learn_dtos import RunMarkdownFlowDTO, RunStatusDTO
@@ -28,9 +26,11 @@ from flaskr.service.order.models import Order
 from flaskr.service.order.consts import ORDER_STATUS_SUCCESS
 from flaskr.service.learn.context_v2 import RunScriptContextV2
 from flaskr.service.learn.learn_dtos import GeneratedType
-import datetime
 from flaskr.common.log import thread_local as log_thread_local
 from flaskr.service.learn.exceptions import BreakException
+from flaskr.service.learn.stream_runner import StreamQueueEmpty, get_stream_runner
+from flaskr.service.learn.sse_encoder import HEARTBEAT_FRAME, encode_sse_frame
+from flaskr.service.learn.stream_coalescer import ContentCoalescer
 from flaskr.i18n import get_current_language, set_language
 from flaskr.common.shifu_context import (
     get_shifu_context_snapshot,
@@ -144,13 +144,6 @@ def run_script_inner(
             app.logger.info("GeneratorExit")
 
 
-def fmt(o):
-    if isinstance(o, datetime.datetime):
-        return o.isoformat()
-    else:
-        return o.__json__()
-
-
 def run_script(
     app: Flask,
     shifu_bid: str,
@@ -162,7 +155,8 @@ def run_script(
     listen: bool = False,
     preview_mode: bool = False,
     shifu_context_snapshot: Optional[dict[str, Any]] = None,
-) -> Generator[str, None, None]:
+    stream_engine: Optional[str] = None,
+) -> Generator[bytes, None, None]:
     timeout = 5 * 60
     blocking_timeout = 1
     lock_retry_count = 5
@@ -195,7 +189,13 @@ def run_script(
 
     if acquired:
         stop_event = threading.Event()
-        output_queue: queue.Queue[tuple[str, object]] = queue.Queue()
+        runner = get_stream_runner(stream_engine)
+        output_queue = runner.new_queue()
+        coalescer = ContentCoalescer(
+            window_seconds=float(app.config.get("SSE_COALESCE_WINDOW_MS", 40) or 0)
+            / 1000,
+            max_bytes=int(app.config.get("SSE_COALESCE_MAX_BYTES", 1024) or 0),
+        )
         # Capture logging context from the request thread so logs in the producer thread keep the same identifiers
         parent_request_id = getattr(log_thread_local, "request_id", None)
         parent_url = getattr(log_thread_local, "url", None)
@@ -247,10 +247,7 @@ def run_script(
                     res.close()
                 output_queue.put(("done", None))
 
-        producer_thread = threading.Thread(
-            target=producer, name="run_script_stream_producer", daemon=True
-        )
-        producer_thread.start()
+        producer_worker = runner.spawn(producer)
 
         stream_error: Exception | None = None
         client_disconnected = False
@@ -258,57 +255,58 @@ def run_script(
         try:
             while True:
                 try:
-                    kind, payload = output_queue.get(timeout=heartbeat_interval)
-                except queue.Empty:
+                    kind, payload = output_queue.get(
+                        timeout=coalescer.timeout(heartbeat_interval)
+                    )
+                except StreamQueueEmpty:
                     if done_received or client_disconnected:
                         break
-                    try:
-                        yield (
-                            "data: "
-                            + json.dumps(
-                                {"type": "heartbeat"}, default=fmt, ensure_ascii=False
+                    if coalescer.has_pending:
+                        kind, payload = "flush", None
+                    else:
+                        try:
+                            yield HEARTBEAT_FRAME
+                        except GeneratorExit:
+                            client_disconnected = True
+                            stop_event.set()
+                            app.logger.info(
+                                "Client disconnected from SSE stream during heartbeat"
                             )
-                            + "\n\n".encode("utf-8").decode("utf-8")
-                        )
-                    except GeneratorExit:
-                        client_disconnected = True
-                        stop_event.set()
-                        app.logger.info(
-                            "Client disconnected from SSE stream during heartbeat"
-                        )
-                        break
-                    except (ConnectionError, BrokenPipeError, OSError) as exc:
-                        client_disconnected = True
-                        stop_event.set()
-                        app.logger.info(
-                            "Client disconnected from SSE stream during heartbeat: %s",
-                            repr(exc),
-                        )
-                        break
-                    continue
+                            break
+                        except (ConnectionError, BrokenPipeError, OSError) as exc:
+                            client_disconnected = True
+                            stop_event.set()
+                            app.logger.info(
+                                "Client disconnected from SSE stream during heartbeat: %s",
+                                repr(exc),
+                            )
+                            break
+                        continue
 
                 if kind == "data":
-                    try:
-                        yield (
-                            "data: "
-                            + json.dumps(payload, default=fmt, ensure_ascii=False)
-                            + "\n\n".encode("utf-8").decode("utf-8")
-                        )
-                    except GeneratorExit:
-                        client_disconnected = True
-                        stop_event.set()
-                        app.logger.info(
-                            "Client disconnected from SSE stream (GeneratorExit)"
-                        )
-                        break
-                    except (ConnectionError, BrokenPipeError, OSError) as exc:
-                        client_disconnected = True
-                        stop_event.set()
-                        app.logger.info(
-                            "Client disconnected from SSE stream: %s", repr(exc)
-                        )
-                        break
-                elif kind == "error":
+                    ready = coalescer.add(payload) + coalescer.flush_due()
+                else:
+                    # window elapsed, or the stream ended: write buffered content first
+                    ready = coalescer.flush()
+                try:
+                    for event in ready:
+                        yield encode_sse_frame(event)
+                except GeneratorExit:
+                    client_disconnected = True
+                    stop_event.set()
+                    app.logger.info(
+                        "Client disconnected from SSE stream (GeneratorExit)"
+                    )
+                    break
+                except (ConnectionError, BrokenPipeError, OSError) as exc:
+                    client_disconnected = True
+                    stop_event.set()
+                    app.logger.info(
+                        "Client disconnected from SSE stream: %s", repr(exc)
+                    )
+                    break
+
+                if kind == "error":
                     if isinstance(payload, Exception):
                         stream_error = payload
                     else:
@@ -319,9 +317,10 @@ def run_script(
                     break
         finally:
             stop_event.set()
-            producer_thread.join(timeout=0.1)
-            if producer_thread.is_alive():
-                app.logger.warning("run_script producer thread did not stop in time")
+            if not runner.join(producer_worker, timeout=0.1):
+                app.logger.warning(
+                    "run_script producer (%s) did not stop in time", runner.name
+                )
 
             lock.release()
 
@@ -344,64 +343,40 @@ def run_script(
 
                 if isinstance(stream_error, AppException):
                     app.logger.info(error_info)
-                    yield (
-                        "data: "
-                        + json.dumps(
-                            RunMarkdownFlowDTO(
-                                outline_bid=outline_bid,
-                                generated_block_bid="",
-                                type=GeneratedType.CONTENT,
-                                content=str(stream_error),
-                            ),
-                            default=fmt,
-                            ensure_ascii=False,
+                    yield encode_sse_frame(
+                        RunMarkdownFlowDTO(
+                            outline_bid=outline_bid,
+                            generated_block_bid="",
+                            type=GeneratedType.CONTENT,
+                            content=str(stream_error),
                         )
-                        + "\n\n".encode("utf-8").decode("utf-8")
                     )
                 else:
                     app.logger.error(error_info)
-                    yield (
-                        "data: "
-                        + json.dumps(
-                            RunMarkdownFlowDTO(
-                                outline_bid=outline_bid,
-                                generated_block_bid="",
-                                type=GeneratedType.CONTENT,
-                                content=str(_("server.common.unknownError")),
-                            ),
-                            default=fmt,
-                            ensure_ascii=False,
-                        )
-                        + "\n\n".encode("utf-8").decode("utf-8")
-                    )
-                yield (
-                    "data: "
-                    + json.dumps(
+                    yield encode_sse_frame(
                         RunMarkdownFlowDTO(
                             outline_bid=outline_bid,
                             generated_block_bid="",
-                            type=GeneratedType.BREAK,
-                            content="",
-                        ),
-                        default=fmt,
-                        ensure_ascii=False,
+                            type=GeneratedType.CONTENT,
+                            content=str(_("server.common.unknownError")),
+                        )
+                    )
+                yield encode_sse_frame(
+                    RunMarkdownFlowDTO(
+                        outline_bid=outline_bid,
+                        generated_block_bid="",
+                        type=GeneratedType.BREAK,
+                        content="",
                     )
-                    + "\n\n".encode("utf-8").decode("utf-8")
                 )
 
-        yield (
-            "data: "
-            + json.dumps(
-                RunMarkdownFlowDTO(
-                    outline_bid=outline_bid,
-                    generated_block_bid="",
-                    type=GeneratedType.DONE,
-                    content="",
-                ),
-                default=fmt,
-                ensure_ascii=False,
+        yield encode_sse_frame(
+            RunMarkdownFlowDTO(
+                outline_bid=outline_bid,
+                generated_block_bid="",
+                type=GeneratedType.DONE,
+                content="",
             )
-            + "\n\n".encode("utf-8").decode("utf-8")
         )
     else:
         app.logger.warning(
@@ -409,47 +384,29 @@ def run_script(
             user_bid,
             outline_bid,
         )
-        yield (
-            "data: "
-            + json.dumps(
-                RunMarkdownFlowDTO(
-                    outline_bid=outline_bid,
-                    generated_block_bid="",
-                    type=GeneratedType.CONTENT,
-                    content=str(_("server.learn.outputInProgress")),
-                ),
-                default=fmt,
-                ensure_ascii=False,
+        yield encode_sse_frame(
+            RunMarkdownFlowDTO(
+                outline_bid=outline_bid,
+                generated_block_bid="",
+                type=GeneratedType.CONTENT,
+                content=str(_("server.learn.outputInProgress")),
             )
-            + "\n\n".encode("utf-8").decode("utf-8")
         )
-        yield (
-            "data: "
-            + json.dumps(
-                RunMarkdownFlowDTO(
-                    outline_bid=outline_bid,
-                    generated_block_bid="",
-                    type=GeneratedType.BREAK,
-                    content="",
-                ),
-                default=fmt,
-                ensure_ascii=False,
+        yield encode_sse_frame(
+            RunMarkdownFlowDTO(
+                outline_bid=outline_bid,
+                generated_block_bid="",
+                type=GeneratedType.BREAK,
+                content="",
             )
-            + "\n\n".encode("utf-8").decode("utf-8")
         )
-        yield (
-            "data: "
-            + json.dumps(
-                RunMarkdownFlowDTO(
-                    outline_bid=outline_bid,
-                    generated_block_bid="",
-                    type=GeneratedType.DONE,
-                    content="",
-                ),
-                default=fmt,
-                ensure_ascii=False,
+        yield encode_sse_frame(
+            RunMarkdownFlowDTO(
+                outline_bid=outline_bid,
+                generated_block_bid="",
+                type=GeneratedType.DONE,
+                content="",
             )
-            + "\n\n".encode("utf-8").decode("utf-8")
         )
 
 
@@ -0,0 +1,62 @@
+"""
+SSE frame encoder for lesson streams.
+
+Frames are encoded straight to bytes in one pass: RunMarkdownFlowDTO.__json__
+already returns plain dicts, so the payload is serialized once with orjson when
+it is installed, or with the stdlib json module otherwise.
+"""
+
+from __future__ import annotations
+
+import datetime
+import json
+from typing import Any
+
+try:  # optional acceleration
+    import orjson
+except ImportError:  # pragma: no cover - orjson is listed in requirements
+    orjson = None
+
+SSE_FRAME_PREFIX = b"data: "
+SSE_FRAME_SUFFIX = b"\n\n"
+HEARTBEAT_FRAME = SSE_FRAME_PREFIX + b'{"type":"heartbeat"}' + SSE_FRAME_SUFFIX
+
+
+def _default(o: Any) -> Any:
+    if isinstance(o, datetime.datetime):
+        return o.isoformat()
+    if hasattr(o, "__json__"):
+        return o.__json__()
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def _dumps_stdlib(payload: Any) -> bytes:
+    return json.dumps(
+        payload, default=_default, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def dumps_payload(payload: Any) -> bytes:
+    """Serialize a frame payload to UTF-8 JSON bytes."""
+    if hasattr(payload, "__json__"):
+        payload = payload.__json__()
+    if orjson is not None:
+        try:
+            return orjson.dumps(payload, default=_default)
+        except (TypeError, orjson.JSONEncodeError):
+            # e.g. integers above 64 bits, fall back to the stdlib encoder
+            pass
+    return _dumps_stdlib(payload)
+
+
+def encode_sse_frame(payload: Any) -> bytes:
+    """
+    Encode one SSE data frame.
+
+    Args:
+        payload: RunMarkdownFlowDTO, any object with __json__, or plain JSON data
+    Returns:
+        bytes: b"data: <json>\\n\\n"
+    """
+    # join copies the body once, "a + b + c" would copy it twice
+    return b"".join((SSE_FRAME_PREFIX, dumps_payload(payload), SSE_FRAME_SUFFIX))
@@ -0,0 +1,112 @@
+"""
+Content coalescing for lesson SSE streams.
+
+The markdown-flow stream yields one CONTENT event per LLM delta, which is often
+just one or two characters. ContentCoalescer sits between the producer queue
+and the SSE writer in run_script and merges consecutive CONTENT deltas of the
+same generated block into one frame, flushed when
+
+- the batching window (SSE_COALESCE_WINDOW_MS) since the first buffered delta
+  has elapsed,
+- the buffered text reaches SSE_COALESCE_MAX_BYTES, or
+- any other event arrives (NEW_SLIDE, AUDIO_*, BREAK, DONE, ...), in which case
+  the merged content is written first so ordering is preserved and the other
+  event is never delayed.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Callable, List, Optional
+
+from flaskr.service.learn.learn_dtos import GeneratedType, RunMarkdownFlowDTO
+
+
+class ContentCoalescer:
+    def __init__(
+        self,
+        window_seconds: float,
+        max_bytes: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.window_seconds = max(float(window_seconds or 0), 0.0)
+        self.max_bytes = max(int(max_bytes or 0), 0)
+        self._clock = clock
+        self._pending: Optional[RunMarkdownFlowDTO] = None
+        self._parts: List[str] = []
+        self._size = 0
+        self._deadline = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.window_seconds > 0
+
+    @property
+    def has_pending(self) -> bool:
+        return self._pending is not None
+
+    def _can_merge(self, event: RunMarkdownFlowDTO) -> bool:
+        return (
+            self._pending is not None
+            and self._pending.outline_bid == event.outline_bid
+            and self._pending.generated_block_bid == event.generated_block_bid
+        )
+
+    def add(self, event: RunMarkdownFlowDTO) -> List[RunMarkdownFlowDTO]:
+        """
+        Feed one event from the producer.
+
+        Args:
+            event: next event in stream order
+        Returns:
+            List[RunMarkdownFlowDTO]: events to write now, in order
+        """
+        if (
+            not self.enabled
+            or not isinstance(event, RunMarkdownFlowDTO)
+            or event.type != GeneratedType.CONTENT
+            or not isinstance(event.content, str)
+        ):
+            return self.flush() + [event]
+
+        ready = [] if self._can_merge(event) else self.flush()
+        if self._pending is None:
+            self._pending = event
+            self._deadline = self._clock() + self.window_seconds
+        self._parts.append(event.content)
+        self._size += len(event.content.encode("utf-8"))
+        if self.max_bytes and self._size >= self.max_bytes:
+            ready.extend(self.flush())
+        return ready
+
+    def flush(self) -> List[RunMarkdownFlowDTO]:
+        """Return the buffered content as a single CONTENT event, if any."""
+        pending = self._pending
+        if pending is None:
+            return []
+        parts = self._parts
+        self._pending = None
+        self._parts = []
+        self._size = 0
+        if len(parts) == 1:
+            return [pending]
+        return [
+            RunMarkdownFlowDTO(
+                outline_bid=pending.outline_bid,
+                generated_block_bid=pending.generated_block_bid,
+                type=GeneratedType.CONTENT,
+                content="".join(parts),
+            )
+        ]
+
+    def flush_due(self) -> List[RunMarkdownFlowDTO]:
+        """Flush the buffer when its batching window has elapsed."""
+        if self._pending is not None and self._clock() >= self._deadline:
+            return self.flush()
+        return []
+
+    def timeout(self, idle_timeout: float) -> float:
+        """How long the writer may block waiting for the next event."""
+        if self._pending is None:
+            return idle_timeout
+        return max(min(idle_timeout, self._deadline - self._clock()), 0.0)
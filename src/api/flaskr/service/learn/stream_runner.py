@@ -0,0 +1,112 @@
+"""
+Stream runners for SSE lesson streams.
+
+run_script drives run_script_inner in a producer and hands events to the
+response generator through a queue. The runner decides what the producer is:
+
+- thread: a dedicated OS thread and a stdlib queue per stream (default for
+  sync/gthread workers).
+- gevent: a greenlet and a gevent queue per stream, so a gevent worker can hold
+  many concurrent streams cooperatively without OS threads.
+
+SSE_STREAM_ENGINE selects the runner ("thread", "gevent" or "auto"). gevent is
+only used when threading and socket are monkey patched (gunicorn -k gevent);
+otherwise the producer's blocking I/O would stall the consumer's heartbeats,
+so "gevent" falls back to threads with a warning and "auto" picks threads.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+from typing import Any, Callable
+
+from flaskr.common.config import get_config
+from flaskr.common.log import AppLoggerProxy
+
+logger = AppLoggerProxy(logging.getLogger(__name__))
+
+STREAM_ENGINE_THREAD = "thread"
+STREAM_ENGINE_GEVENT = "gevent"
+STREAM_ENGINE_AUTO = "auto"
+
+# gevent.queue re-exports the stdlib exception, so one type covers both runners.
+StreamQueueEmpty = queue.Empty
+
+
+class ThreadStreamRunner:
+    name = STREAM_ENGINE_THREAD
+
+    def new_queue(self) -> Any:
+        return queue.Queue()
+
+    def spawn(self, target: Callable[[], None]) -> threading.Thread:
+        worker = threading.Thread(
+            target=target, name="run_script_stream_producer", daemon=True
+        )
+        worker.start()
+        return worker
+
+    def join(self, worker: threading.Thread, timeout: float) -> bool:
+        """Wait for the producer, return True when it has stopped."""
+        worker.join(timeout=timeout)
+        return not worker.is_alive()
+
+
+class GeventStreamRunner:
+    name = STREAM_ENGINE_GEVENT
+
+    def __init__(self):
+        import gevent
+        import gevent.queue
+
+        self._gevent = gevent
+        self._queue_module = gevent.queue
+
+    def new_queue(self) -> Any:
+        return self._queue_module.Queue()
+
+    def spawn(self, target: Callable[[], None]) -> Any:
+        return self._gevent.spawn(target)
+
+    def join(self, worker: Any, timeout: float) -> bool:
+        worker.join(timeout=timeout)
+        return bool(worker.dead)
+
+
+def _is_gevent_patched() -> bool:
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return bool(
+        monkey.is_module_patched("threading") and monkey.is_module_patched("socket")
+    )
+
+
+def resolve_stream_engine(engine: str | None = None) -> str:
+    engine = (engine or get_config("SSE_STREAM_ENGINE") or STREAM_ENGINE_AUTO).lower()
+    if engine == STREAM_ENGINE_AUTO:
+        return STREAM_ENGINE_GEVENT if _is_gevent_patched() else STREAM_ENGINE_THREAD
+    if engine == STREAM_ENGINE_GEVENT:
+        if _is_gevent_patched():
+            return STREAM_ENGINE_GEVENT
+        logger.warning(
+            "SSE_STREAM_ENGINE=gevent but threading/socket are not monkey "
+            "patched; using the thread stream runner"
+        )
+    return STREAM_ENGINE_THREAD
+
+
+def get_stream_runner(engine: str | None = None):
+    """
+    Get the stream runner for the configured engine.
+    Falls back to threads when gevent is not importable or not patched in.
+    """
+    if resolve_stream_engine(engine) == STREAM_ENGINE_GEVENT:
+        try:
+            return GeventStreamRunner()
+        except ImportError:
+            pass
+    return ThreadStreamRunner()
@@ -14,6 +14,7 @@ from .consts import (  # noqa: F401
 )
 from .models import BillUsageRecord  # noqa: F401
 from .recorder import UsageContext, record_llm_usage, record_tts_usage  # noqa: F401
+from .writer import flush_usage_records  # noqa: F401
 
 register_dict("bill_usage_type", "Bill usage type", BILL_USAGE_TYPE_DICT)
 register_dict("bill_usage_scene", "Bill usage scene", BILL_USAGE_SCENE_DICT)
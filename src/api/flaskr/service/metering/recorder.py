@@ -1,7 +1,9 @@
 """
 Usage metering recorder.
 
-Provides best-effort helpers to persist LLM and TTS usage records.
+Provides best-effort helpers to persist LLM and TTS usage records. Records are
+handed to the batched writer (see writer.py) unless METERING_ASYNC_ENABLED is
+off, in which case each record is committed directly.
 """
 
 from __future__ import annotations
@@ -22,6 +24,7 @@ from .consts import (
     normalize_usage_scene,
 )
 from .models import BillUsageRecord
+from .writer import get_usage_writer, record_to_values
 
 
 @dataclass(frozen=True)
@@ -50,6 +53,15 @@ def _resolve_billable(usage_scene: int, billable: Optional[int]) -> int:
 
 
 def _persist_usage_record(app: Flask, record: BillUsageRecord) -> bool:
+    writer = get_usage_writer(app)
+    if writer is not None:
+        try:
+            writer.submit(record_to_values(record))
+            return True
+        except Exception as exc:
+            app.logger.warning(
+                "Usage metering buffer failed, writing directly: %s", exc
+            )
     try:
         with app.app_context():
             db.session.add(record)
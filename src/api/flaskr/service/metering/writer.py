@@ -0,0 +1,401 @@
+"""
+Asynchronous batched writer for usage records.
+
+Usage records are appended to a per-process spill file (one JSON line per
+record) and buffered in memory; a background thread bulk-inserts them when
+METERING_BATCH_SIZE records are pending or METERING_FLUSH_INTERVAL_MS has
+elapsed, then deletes the spilled batch. Batches that fail to insert stay on
+disk and are retried, so callers never touch the database.
+
+Spill files are locked with ``flock`` by the process that owns them. When
+its background thread starts, a writer replays spill files nobody holds (left
+behind by a crashed worker), skipping records whose usage_bid is already
+stored.
+"""
+
+from __future__ import annotations
+
+import atexit
+import datetime
+import itertools
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from flask import Flask
+from sqlalchemy import insert
+
+from flaskr.common.log import AppLoggerProxy
+from flaskr.dao import db
+
+from .models import BillUsageRecord
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None  # type: ignore[assignment]
+
+
+logger = AppLoggerProxy(logging.getLogger(__name__))
+
+_SPILL_PREFIX = "usage-"
+_ACTIVE_SUFFIX = ".wal"
+_FLUSHING_SUFFIX = ".flushing"
+_DATETIME_FIELDS = ("created_at", "updated_at")
+_EXTENSION_KEY = "metering_usage_writer"
+
+
+def record_to_values(record: BillUsageRecord) -> Dict[str, Any]:
+    """Return the insert values of a transient record, filling column defaults."""
+    now = datetime.datetime.now()
+    values: Dict[str, Any] = {}
+    for column in BillUsageRecord.__table__.columns:
+        if column.primary_key:
+            continue
+        value = getattr(record, column.key, None)
+        if value is None:
+            if column.name in _DATETIME_FIELDS:
+                value = now
+            elif column.default is not None and column.default.is_scalar:
+                value = column.default.arg
+        values[column.key] = value
+    return values
+
+
+def _encode_values(values: Dict[str, Any]) -> str:
+    encoded = dict(values)
+    for key in _DATETIME_FIELDS:
+        if isinstance(encoded.get(key), datetime.datetime):
+            encoded[key] = encoded[key].isoformat()
+    return json.dumps(encoded, ensure_ascii=False, separators=(",", ":"))
+
+
+def _decode_values(line: str) -> Dict[str, Any]:
+    values = json.loads(line)
+    for key in _DATETIME_FIELDS:
+        if isinstance(values.get(key), str):
+            values[key] = datetime.datetime.fromisoformat(values[key])
+    return values
+
+
+class _SpillFile:
+    """Append-only JSON-lines file holding one batch, locked while open."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.count = 0
+        self._handle = open(path, "a", encoding="utf-8")
+        if fcntl is not None:
+            try:
+                fcntl.flock(self._handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                self._handle.close()
+                raise
+
+    @classmethod
+    def create(cls, path: Path) -> "_SpillFile":
+        # Lock under a private name first so replay never sees it unlocked.
+        spill = cls(path.with_suffix(".new"))
+        os.replace(spill.path, path)
+        spill.path = path
+        return spill
+
+    def append(self, values: Dict[str, Any]) -> None:
+        self._handle.write(_encode_values(values) + "\n")
+        # Reach the OS page cache so a crashed worker does not lose records.
+        self._handle.flush()
+        self.count += 1
+
+    def seal(self) -> None:
+        target = self.path.with_suffix(_FLUSHING_SUFFIX)
+        os.replace(self.path, target)
+        self.path = target
+
+    def read(self) -> List[Dict[str, Any]]:
+        return _read_spill(self.path)
+
+    def remove(self) -> None:
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+        self._handle.close()
+
+
+def _read_spill(path: Path) -> List[Dict[str, Any]]:
+    rows = []
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rows.append(_decode_values(line))
+            except ValueError:
+                # A torn final line from a crash mid-write.
+                logger.warning("Skipping unreadable usage spill line in %s", path)
+    return rows
+
+
+class UsageRecordWriter:
+    """Buffers usage records and bulk-inserts them from a background thread."""
+
+    def __init__(
+        self,
+        app: Flask,
+        *,
+        spill_dir: str,
+        batch_size: int = 200,
+        flush_interval: float = 1.0,
+        max_pending: int = 10000,
+        retry_interval: float = 5.0,
+    ):
+        self.app = app
+        self.spill_dir = Path(spill_dir)
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = max(0.01, float(flush_interval))
+        self.max_pending = max(self.batch_size, int(max_pending))
+        self.retry_interval = retry_interval
+
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._pending: List[Dict[str, Any]] = []
+        self._spill: Optional[_SpillFile] = None
+        self._failed: List[_SpillFile] = []
+        self._file_seq = itertools.count()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+        self._next_retry = 0.0
+
+        self.submitted = 0
+        self.written = 0
+        self.flushes = 0
+        self.failures = 0
+        self.replayed = 0
+
+    def start(self) -> None:
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(
+            target=self._run, name="metering_writer", daemon=True
+        )
+        self._thread.start()
+
+    def _new_spill(self) -> _SpillFile:
+        name = (
+            f"{_SPILL_PREFIX}{os.getpid()}-{uuid.uuid4().hex[:8]}-"
+            f"{next(self._file_seq)}{_ACTIVE_SUFFIX}"
+        )
+        return _SpillFile.create(self.spill_dir / name)
+
+    def submit(self, values: Dict[str, Any]) -> None:
+        """Buffer one record; flushes inline when the buffer is full."""
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError("Usage record writer has been shut down")
+            if self._spill is None:
+                self._spill = self._new_spill()
+            self._spill.append(values)
+            self._pending.append(values)
+            self.submitted += 1
+            pending = len(self._pending)
+            if pending >= self.batch_size:
+                self._cond.notify()
+        if pending >= self.max_pending:
+            # Backpressure: the caller pays for the flush instead of growing
+            # the buffer without bound.
+            self.flush()
+
+    def _take_batch(self):
+        with self._cond:
+            if not self._pending:
+                return None, None
+            batch, spill = self._pending, self._spill
+            self._pending, self._spill = [], None
+        spill.seal()
+        return batch, spill
+
+    def _insert(self, rows: List[Dict[str, Any]], *, dedupe: bool = False) -> int:
+        with self.app.app_context():
+            try:
+                if dedupe and rows:
+                    bids = [row["usage_bid"] for row in rows]
+                    existing = set()
+                    for start in range(0, len(bids), 500):
+                        existing.update(
+                            bid
+                            for (bid,) in db.session.query(BillUsageRecord.usage_bid)
+                            .filter(
+                                BillUsageRecord.usage_bid.in_(bids[start : start + 500])
+                            )
+                            .all()
+                        )
+                    rows = [row for row in rows if row["usage_bid"] not in existing]
+                for start in range(0, len(rows), self.batch_size):
+                    db.session.execute(
+                        insert(BillUsageRecord), rows[start : start + self.batch_size]
+                    )
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+        return len(rows)
+
+    def _write_spill(self, spill: _SpillFile, rows, *, dedupe: bool) -> Optional[int]:
+        """Insert ``rows`` and drop their spill file; None if the insert failed."""
+        try:
+            inserted = self._insert(rows, dedupe=dedupe)
+        except Exception as exc:
+            self.failures += 1
+            logger.error(
+                "Usage metering flush failed (%s records kept in %s): %s",
+                len(rows),
+                spill.path,
+                exc,
+            )
+            return None
+        spill.remove()
+        self.written += inserted
+        self.flushes += 1
+        return inserted
+
+    def _retry_failed(self) -> bool:
+        while self._failed:
+            spill = self._failed[0]
+            # A failed batch may have been partially committed.
+            if self._write_spill(spill, spill.read(), dedupe=True) is None:
+                return False
+            self._failed.pop(0)
+        return True
+
+    def flush(self) -> bool:
+        """Write every buffered record now. Returns False if any batch failed."""
+        with self._flush_lock:
+            ok = self._retry_failed()
+            if not ok:
+                # The database is still failing: keep buffering into the
+                # current spill file and only seal it once the buffer is full.
+                with self._cond:
+                    full = len(self._pending) >= self.max_pending
+                if full:
+                    batch, spill = self._take_batch()
+                    if batch is not None:
+                        self._failed.append(spill)
+                return False
+            batch, spill = self._take_batch()
+            if batch is None:
+                return True
+            if self._write_spill(spill, batch, dedupe=False) is None:
+                self._failed.append(spill)
+                return False
+            return True
+
+    def _run(self) -> None:
+        # Replay here rather than in start(), which runs on the first metered
+        # request of the process.
+        try:
+            self.replay_orphans()
+        except Exception as exc:
+            logger.error("Usage metering spill replay failed: %s", exc)
+        while True:
+            with self._cond:
+                if not self._stopped and len(self._pending) < self.batch_size:
+                    self._cond.wait(timeout=self.flush_interval)
+                stopped = self._stopped
+            if self._failed and time.monotonic() < self._next_retry:
+                if stopped:
+                    return
+                continue
+            if not self.flush():
+                self._next_retry = time.monotonic() + self.retry_interval
+            if stopped:
+                return
+
+    def replay_orphans(self) -> int:
+        """Insert records from spill files left behind by dead processes."""
+        if not self.spill_dir.is_dir():
+            return 0
+        replayed = 0
+        for path in sorted(self.spill_dir.glob(f"{_SPILL_PREFIX}*")):
+            if path.suffix not in (_ACTIVE_SUFFIX, _FLUSHING_SUFFIX):
+                continue
+            try:
+                spill = _SpillFile(path)
+            except OSError:
+                continue  # owned by a live process, or just removed
+            inserted = self._write_spill(spill, spill.read(), dedupe=True)
+            if inserted is None:
+                with self._flush_lock:
+                    self._failed.append(spill)
+            else:
+                replayed += inserted
+        if replayed:
+            logger.warning("Replayed %s usage records from spill files", replayed)
+        self.replayed += replayed
+        return replayed
+
+    def shutdown(self, timeout: Optional[float] = 10.0) -> None:
+        """Stop the background thread after a final flush."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            pending = len(self._pending)
+        return {
+            "pending": pending,
+            "failed_batches": len(self._failed),
+            "submitted": self.submitted,
+            "written": self.written,
+            "flushes": self.flushes,
+            "failures": self.failures,
+            "replayed": self.replayed,
+        }
+
+
+_writers_lock = threading.Lock()
+
+
+def get_usage_writer(app: Flask) -> Optional[UsageRecordWriter]:
+    """Return the app's usage writer, or None when METERING_ASYNC_ENABLED is off."""
+    writer = app.extensions.get(_EXTENSION_KEY)
+    if writer is not None:
+        return writer or None
+    with _writers_lock:
+        writer = app.extensions.get(_EXTENSION_KEY)
+        if writer is not None:
+            return writer or None
+        if not app.config.get("METERING_ASYNC_ENABLED", False):
+            app.extensions[_EXTENSION_KEY] = False
+            return None
+        spill_dir = str(app.config.get("METERING_SPILL_DIR") or "").strip()
+        writer = UsageRecordWriter(
+            app,
+            spill_dir=spill_dir
+            or os.path.join(tempfile.gettempdir(), "ai-shifu-metering"),
+            batch_size=int(app.config.get("METERING_BATCH_SIZE", 200) or 200),
+            flush_interval=int(app.config.get("METERING_FLUSH_INTERVAL_MS", 1000))
+            / 1000,
+            max_pending=int(app.config.get("METERING_MAX_PENDING", 10000) or 0),
+        )
+        writer.start()
+        app.extensions[_EXTENSION_KEY] = writer
+        atexit.register(writer.shutdown)
+        return writer
+
+
+def flush_usage_records(app: Flask) -> bool:
+    """Write buffered usage records of ``app`` now (no-op when synchronous)."""
+    writer = app.extensions.get(_EXTENSION_KEY)
+    if not writer:
+        return True
+    return writer.flush()
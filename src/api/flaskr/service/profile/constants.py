@@ -2,3 +2,16 @@
 
 SYS_USER_LANGUAGE = "sys_user_language"
 SYS_USER_NICKNAME = "sys_user_nickname"
+
+# Keys of get_profile_labels(): values of these keys are stored globally.
+PROFILE_LABEL_KEYS = frozenset(
+    {
+        SYS_USER_NICKNAME,
+        "sys_user_background",
+        "sex",
+        "birth",
+        "avatar",
+        "language",
+        "sys_user_style",
+    }
+)
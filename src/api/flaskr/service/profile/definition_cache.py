@@ -0,0 +1,266 @@
+"""
+Profile definition cache
+
+Process-local LRU cache of the variable definitions visible to a shifu (its
+own definitions plus the system ones), shared by every request of the worker.
+
+Each entry remembers the shared definition versions it was loaded at. Writers
+(``profile_manage``) bump the version of the shifu they changed in the cache
+provider, or the system version for system definitions; readers re-check the
+versions at most once per PROFILE_DEFINITION_CACHE_VERSION_CHECK_SECONDS and
+reload the entry when either changed. The writing process drops its own entry
+immediately.
+
+Snapshots are immutable and also carry the key -> variable_bid map and the
+label keys used by the lesson run loop, so the hot path does no definition
+queries at all.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, NamedTuple, Optional
+
+from flask import Flask
+
+from flaskr.common.cache_provider import cache as redis
+from flaskr.common.config import get_config
+from flaskr.i18n import get_current_language
+
+from .constants import PROFILE_LABEL_KEYS
+from .dtos import ProfileItemDefinition
+from .models import Variable
+
+
+class DefinitionRow(NamedTuple):
+    """Detached copy of the Variable columns a definition DTO is built from."""
+
+    key: str
+    variable_bid: str
+    shifu_bid: str
+    is_hidden: int
+
+
+class ProfileDefinitionSnapshot:
+    """Definitions visible to one shifu at one version, ordered by id."""
+
+    def __init__(self, shifu_bid: str, rows: tuple[DefinitionRow, ...]):
+        self.shifu_bid = shifu_bid
+        self.rows = rows
+        # Later definitions win, like the dict comprehension callers used.
+        self.key_id_map: dict[str, str] = {row.key: row.variable_bid for row in rows}
+        self.label_keys: frozenset[str] = frozenset(
+            row.key for row in rows if row.key in PROFILE_LABEL_KEYS
+        )
+        self._definitions: dict[str, tuple[ProfileItemDefinition, ...]] = {}
+
+    def definitions(self) -> list[ProfileItemDefinition]:
+        """Definition DTOs in the current language."""
+        language = get_current_language()
+        definitions = self._definitions.get(language)
+        if definitions is None:
+            # Imported here: profile_manage imports this module.
+            from .profile_manage import (
+                convert_variable_definition_to_profile_item_definition,
+            )
+
+            definitions = tuple(
+                convert_variable_definition_to_profile_item_definition(row)
+                for row in self.rows
+            )
+            self._definitions[language] = definitions
+        return list(definitions)
+
+
+class _Entry:
+    __slots__ = ("snapshot", "versions", "checked_at")
+
+    def __init__(
+        self,
+        snapshot: ProfileDefinitionSnapshot,
+        versions: tuple[str, str],
+        checked_at: float,
+    ):
+        self.snapshot = snapshot
+        self.versions = versions
+        self.checked_at = checked_at
+
+
+class ProfileDefinitionCache:
+    """
+    Size-bounded LRU cache of ProfileDefinitionSnapshot keyed by shifu_bid.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        version_check_interval: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._max_entries = max_entries
+        self._version_check_interval = version_check_interval
+        self._clock = clock
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def max_entries(self) -> int:
+        if self._max_entries is None:
+            try:
+                self._max_entries = int(
+                    get_config("PROFILE_DEFINITION_CACHE_SIZE", 1024)
+                )
+            except (TypeError, ValueError):
+                self._max_entries = 1024
+        return self._max_entries
+
+    @property
+    def version_check_interval(self) -> float:
+        if self._version_check_interval is None:
+            try:
+                self._version_check_interval = float(
+                    get_config("PROFILE_DEFINITION_CACHE_VERSION_CHECK_SECONDS", 1.0)
+                )
+            except (TypeError, ValueError):
+                self._version_check_interval = 1.0
+        return self._version_check_interval
+
+    def get(
+        self,
+        shifu_bid: str,
+        read_versions: Callable[[], tuple[str, str]],
+        load: Callable[[], tuple[DefinitionRow, ...]],
+    ) -> ProfileDefinitionSnapshot:
+        """
+        Return the snapshot of ``shifu_bid``, reloading it with ``load`` when
+        it is missing or ``read_versions`` reports a newer version.
+        """
+        if self.max_entries <= 0:
+            return ProfileDefinitionSnapshot(shifu_bid, load())
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(shifu_bid)
+            if entry is not None and now - entry.checked_at < (
+                self.version_check_interval
+            ):
+                self._entries.move_to_end(shifu_bid)
+                self.hits += 1
+                return entry.snapshot
+
+        versions = read_versions()
+        if entry is not None and entry.versions == versions:
+            with self._lock:
+                entry.checked_at = now
+                self.hits += 1
+            return entry.snapshot
+
+        snapshot = ProfileDefinitionSnapshot(shifu_bid, load())
+        with self._lock:
+            self.misses += 1
+            self._entries[shifu_bid] = _Entry(snapshot, versions, now)
+            self._entries.move_to_end(shifu_bid)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return snapshot
+
+    def invalidate(self, shifu_bid: str) -> int:
+        """Drop the entry of ``shifu_bid``; the system scope drops every entry."""
+        with self._lock:
+            if not shifu_bid:
+                dropped = len(self._entries)
+                self._entries.clear()
+                return dropped
+            return 1 if self._entries.pop(shifu_bid, None) is not None else 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+profile_definition_cache = ProfileDefinitionCache()
+
+
+def _version_key(app: Flask, shifu_bid: str) -> str:
+    return (
+        app.config["REDIS_KEY_PREFIX"]
+        + "profile:definitions:version:"
+        + (shifu_bid or "system")
+    )
+
+
+def _normalize_version(value) -> str:
+    if isinstance(value, bytes):
+        return value.decode()
+    return "" if value is None else str(value)
+
+
+def _load_rows(shifu_bid: str) -> tuple[DefinitionRow, ...]:
+    definitions = (
+        Variable.query.filter(
+            Variable.shifu_bid.in_([shifu_bid, ""]),
+            Variable.deleted == 0,
+        )
+        .order_by(Variable.id.asc())
+        .all()
+    )
+    return tuple(
+        DefinitionRow(
+            item.key or "",
+            item.variable_bid or "",
+            item.shifu_bid or "",
+            int(item.is_hidden or 0),
+        )
+        for item in definitions
+    )
+
+
+def get_profile_definition_snapshot(
+    app: Flask, shifu_bid: Optional[str]
+) -> ProfileDefinitionSnapshot:
+    """
+    Get the definitions visible to a shifu
+    Args:
+        app: Flask application instance
+        shifu_bid: Shifu bid, empty for system definitions only
+    Returns:
+        ProfileDefinitionSnapshot: Shared, read-only snapshot
+    """
+    normalized = shifu_bid or ""
+
+    def read_versions() -> tuple[str, str]:
+        try:
+            return (
+                _normalize_version(redis.get(_version_key(app, normalized))),
+                _normalize_version(redis.get(_version_key(app, ""))),
+            )
+        except Exception as exc:  # pragma: no cover - defensive
+            app.logger.warning("Profile definition version check failed: %s", exc)
+            # An unreadable version never matches, so the entry is reloaded.
+            return (str(time.monotonic_ns()), "")
+
+    with app.app_context():
+        return profile_definition_cache.get(
+            normalized, read_versions, lambda: _load_rows(normalized)
+        )
+
+
+def invalidate_profile_definitions(app: Flask, shifu_bid: Optional[str]) -> None:
+    """
+    Publish a definition change of a shifu (or of the system definitions when
+    ``shifu_bid`` is empty) to every process. Call after the change committed.
+    """
+    normalized = shifu_bid or ""
+    try:
+        redis.incr(_version_key(app, normalized))
+    except Exception as exc:  # pragma: no cover - defensive
+        app.logger.warning("Failed to bump profile definition version: %s", exc)
+    profile_definition_cache.invalidate(normalized)
@@ -2,6 +2,12 @@ from flask import Flask
 
 
 from .constants import SYS_USER_LANGUAGE, SYS_USER_NICKNAME
+from .definition_cache import get_profile_definition_snapshot
+from .latest_values import (
+    LatestValueIndex,
+    load_latest_value_index,
+    record_latest_values,
+)
 from .models import VariableValue
 from ...dao import db
 from typing import Optional
@@ -65,66 +71,6 @@ _LANGUAGE_SPECIFIC_DISPLAY = {
 _DEFAULT_LANGUAGE_DISPLAY = "English"
 
 
-def _get_latest_variable_value(
-    values: list[VariableValue],
-    variable_key: str,
-    shifu_bid: str,
-    variable_bid: Optional[str] = None,
-) -> Optional[VariableValue]:
-    """
-    Return the newest variable value row from a pre-fetched, id-desc sorted
-    collection.
-
-    Precedence:
-    1) shifu scope (shifu_bid)
-    2) global/system scope (empty shifu_bid)
-    """
-    target_shifu = shifu_bid or ""
-
-    if variable_bid:
-        scoped = next(
-            (
-                item
-                for item in values
-                if item.variable_bid == variable_bid and item.shifu_bid == target_shifu
-            ),
-            None,
-        )
-        if scoped:
-            return scoped
-
-    scoped = next(
-        (
-            item
-            for item in values
-            if item.key == variable_key and item.shifu_bid == target_shifu
-        ),
-        None,
-    )
-    if scoped:
-        return scoped
-
-    if not target_shifu:
-        return None
-
-    if variable_bid:
-        fallback = next(
-            (
-                item
-                for item in values
-                if item.variable_bid == variable_bid and item.shifu_bid == ""
-            ),
-            None,
-        )
-        if fallback:
-            return fallback
-
-    return next(
-        (item for item in values if item.key == variable_key and item.shifu_bid == ""),
-        None,
-    )
-
-
 def _fetch_latest_variable_value(
     user_bid: str,
     variable_key: str,
@@ -371,6 +317,7 @@ def save_user_profile(
             deleted=0,
         )
         db.session.add(user_profile)
+        record_latest_values(user_id, [user_profile])
     if profile_key in PROFILES_LABLES:
         profile_lable = PROFILES_LABLES[profile_key]
         if profile_lable.get("mapping"):
@@ -399,23 +346,12 @@ def save_user_profiles(
     aggregate = _ensure_user_aggregate(user_id)
     profiles_items = get_profile_item_definition_list(app, course_id)
 
-    candidate_shifus = [course_id or ""]
-    if course_id:
-        candidate_shifus.append("")
-
     try:
-        user_values: list[VariableValue] = (
-            VariableValue.query.filter(
-                VariableValue.user_bid == user_id,
-                VariableValue.deleted == 0,
-                VariableValue.shifu_bid.in_(candidate_shifus),
-            )
-            .order_by(VariableValue.id.desc())
-            .all()
-        )
+        latest_values = load_latest_value_index(user_id, course_id)
     except Exception as exc:  # pragma: no cover - defensive fallback
         app.logger.warning("Failed to load var_variable_values: %s", exc)
-        user_values = []
+        latest_values = LatestValueIndex()
+    new_values: list[VariableValue] = []
 
     for profile in profiles:
         profile_item = next(
@@ -426,8 +362,7 @@ def save_user_profiles(
         )
         target_shifu = "" if profile.key in PROFILES_LABLES else (course_id or "")
 
-        latest_value = _get_latest_variable_value(
-            user_values,
+        latest_value = latest_values.lookup(
             variable_key=profile.key,
             shifu_bid=target_shifu,
             variable_bid=variable_bid or None,
@@ -443,7 +378,8 @@ def save_user_profiles(
                 deleted=0,
             )
             db.session.add(user_value)
-            user_values.insert(0, user_value)
+            latest_values.add(user_value)
+            new_values.append(user_value)
 
         if profile.key in PROFILES_LABLES:
             profile_lable = PROFILES_LABLES[profile.key]
@@ -457,6 +393,7 @@ def save_user_profiles(
                 )
                 _update_aggregate_field(aggregate, profile_lable["mapping"], normalized)
 
+    record_latest_values(user_id, new_values)
     db.session.flush()
     return True
 
@@ -473,50 +410,36 @@ def get_user_profiles(app: Flask, user_id: str, course_id: str) -> dict:
     from what the user sees in "个人设置".
     """
 
-    PROFILES_LABLES = get_profile_labels()
-    profiles_items = get_profile_item_definition_list(app, course_id)
-
-    candidate_shifus = [course_id or ""]
-    if course_id:
-        candidate_shifus.append("")
+    definitions = get_profile_definition_snapshot(app, course_id)
 
     try:
-        user_values: list[VariableValue] = (
-            VariableValue.query.filter(
-                VariableValue.user_bid == user_id,
-                VariableValue.deleted == 0,
-                VariableValue.shifu_bid.in_(candidate_shifus),
-            )
-            .order_by(VariableValue.id.desc())
-            .all()
-        )
+        latest_values = load_latest_value_index(user_id, course_id)
     except Exception as exc:  # pragma: no cover - defensive fallback
         app.logger.warning("Failed to load var_variable_values: %s", exc)
-        user_values = []
+        latest_values = LatestValueIndex()
 
     user_info: UserEntity = UserEntity.query.filter(
         UserEntity.user_bid == user_id
     ).first()
 
     result: dict[str, str] = {}
-    for profile_item in profiles_items:
+    for definition in definitions.rows:
         # Follow save_user_profiles routing: label keys are global, others per-course.
         target_shifu = (
-            "" if profile_item.profile_key in PROFILES_LABLES else (course_id or "")
+            "" if definition.key in definitions.label_keys else (course_id or "")
         )
 
         user_value = (
-            _get_latest_variable_value(
-                user_values,
-                variable_key=profile_item.profile_key,
+            latest_values.lookup(
+                variable_key=definition.key,
                 shifu_bid=target_shifu,
-                variable_bid=(profile_item.profile_id or None),
+                variable_bid=(definition.variable_bid or None),
             )
-            if user_values
+            if latest_values
             else None
         )
         if user_value:
-            result[profile_item.profile_key] = user_value.value
+            result[definition.key] = user_value.value
 
     # Ensure system variables are always available.
     if result.get(SYS_USER_LANGUAGE) is None:
@@ -541,23 +464,11 @@ def get_user_profile_labels(
         list: User profile labels
     """
     app.logger.info("get user profile labels:{}".format(course_id))
-    candidate_shifus = [course_id or ""]
-    if course_id:
-        candidate_shifus.append("")
-
     try:
-        user_values: list[VariableValue] = (
-            VariableValue.query.filter(
-                VariableValue.user_bid == user_id,
-                VariableValue.deleted == 0,
-                VariableValue.shifu_bid.in_(candidate_shifus),
-            )
-            .order_by(VariableValue.id.desc())
-            .all()
-        )
+        latest_values = load_latest_value_index(user_id, course_id)
     except Exception as exc:  # pragma: no cover - defensive fallback
         app.logger.warning("Failed to load var_variable_values: %s", exc)
-        user_values = []
+        latest_values = LatestValueIndex()
     profiles_items = get_profile_item_definition_list(app, course_id)
     PROFILES_LABLES = get_profile_labels()
     aggregate = load_user_aggregate(user_id)
@@ -573,12 +484,11 @@ def get_user_profile_labels(
             raw_value = _current_core_value(aggregate, mapping)
             if raw_value is None:
                 value_entry = (
-                    _get_latest_variable_value(
-                        user_values,
+                    latest_values.lookup(
                         variable_key=key,
                         shifu_bid="",
                     )
-                    if user_values
+                    if latest_values
                     else None
                 )
                 if value_entry:
@@ -620,18 +530,16 @@ def get_user_profile_labels(
             (item for item in profiles_items if item.profile_key == profile_key), None
         )
         if profile_item:
-            if user_values:
-                user_value = _get_latest_variable_value(
-                    user_values,
+            if latest_values:
+                user_value = latest_values.lookup(
                     variable_key=profile_key,
                     shifu_bid="",
                     variable_bid=profile_item.profile_id or None,
                 )
         else:
             app.logger.info("profile_item not found:{}".format(profile_key))
-        if user_value is None and user_values:
-            user_value = _get_latest_variable_value(
-                user_values,
+        if user_value is None and latest_values:
+            user_value = latest_values.lookup(
                 variable_key=profile_key,
                 shifu_bid="",
             )
@@ -684,23 +592,12 @@ def update_user_profile_with_lable(
     if background and not check_text_content(app, user_id, background.get("value")):
         raise_error("server.common.backgroundNotAllowed")
 
-    candidate_shifus = [course_id or ""]
-    if course_id:
-        candidate_shifus.append("")
-
     try:
-        user_values: list[VariableValue] = (
-            VariableValue.query.filter(
-                VariableValue.user_bid == user_id,
-                VariableValue.deleted == 0,
-                VariableValue.shifu_bid.in_(candidate_shifus),
-            )
-            .order_by(VariableValue.id.desc())
-            .all()
-        )
+        latest_values = load_latest_value_index(user_id, course_id)
     except Exception as exc:  # pragma: no cover - defensive fallback
         app.logger.warning("Failed to load var_variable_values: %s", exc)
-        user_values = []
+        latest_values = LatestValueIndex()
+    new_values: list[VariableValue] = []
 
     for profile in profiles:
         key = profile.get("key")
@@ -750,8 +647,7 @@ def update_user_profile_with_lable(
             profile_value not in (None, "") and profile_value != default_value
         )
         if should_persist_value:
-            latest_value = _get_latest_variable_value(
-                user_values,
+            latest_value = latest_values.lookup(
                 variable_key=key,
                 shifu_bid="",
                 variable_bid=(profile_item.profile_id if profile_item else None),
@@ -768,6 +664,8 @@ def update_user_profile_with_lable(
                     deleted=0,
                 )
                 db.session.add(new_value)
-                user_values.insert(0, new_value)
+                latest_values.add(new_value)
+                new_values.append(new_value)
+    record_latest_values(user_id, new_values)
     db.session.flush()
     return True
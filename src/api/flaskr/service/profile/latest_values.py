@@ -0,0 +1,229 @@
+"""
+Latest-value index for user profile variables.
+
+``var_variable_values`` keeps every value a learner ever entered. Profile
+reads only need the newest value per variable, so the newest row of each
+(user, scope, variable_bid, key) combination is materialized in
+``var_variable_latest_values`` and loaded with one indexed query.
+
+A scope (a user's values for one shifu, or the global scope) is either fully
+materialized or absent from the latest table:
+- the first write into a scope rebuilds it from the history table
+- ``flask console backfill_profile_latest_values`` rebuilds every scope
+Reads of a scope that is not materialized yet fall back to the history table.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Iterable, Optional, Sequence
+
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from flaskr.dao import db
+
+from .models import VariableLatestValue, VariableValue
+
+
+logger = logging.getLogger(__name__)
+
+
+def _source_id(row) -> int:
+    if isinstance(row, VariableLatestValue):
+        return int(row.source_id or 0)
+    # Rows not flushed yet have no id and are newer than anything stored.
+    return int(row.id) if row.id is not None else 1 << 62
+
+
+class LatestValueIndex:
+    """
+    Newest value rows of one user, looked up by variable_bid or key.
+
+    ``lookup`` applies the same precedence as a newest-first scan of the
+    history table: scoped variable_bid, scoped key, then the same two in the
+    global scope.
+    """
+
+    def __init__(self, rows: Iterable = ()):
+        self._by_bid: dict[tuple[str, str], object] = {}
+        self._by_key: dict[tuple[str, str], object] = {}
+        for row in sorted(rows, key=_source_id):
+            self.add(row)
+
+    def add(self, row) -> None:
+        """Record ``row`` as the newest value of its variable_bid and key."""
+        shifu_bid = row.shifu_bid or ""
+        if row.variable_bid:
+            self._by_bid[(shifu_bid, row.variable_bid)] = row
+        if row.key:
+            self._by_key[(shifu_bid, row.key)] = row
+
+    def __bool__(self) -> bool:
+        return bool(self._by_bid or self._by_key)
+
+    def lookup(
+        self,
+        variable_key: str,
+        shifu_bid: str,
+        variable_bid: Optional[str] = None,
+    ):
+        target_shifu = shifu_bid or ""
+        if variable_bid:
+            row = self._by_bid.get((target_shifu, variable_bid))
+            if row is not None:
+                return row
+        row = self._by_key.get((target_shifu, variable_key))
+        if row is not None or not target_shifu:
+            return row
+        if variable_bid:
+            row = self._by_bid.get(("", variable_bid))
+            if row is not None:
+                return row
+        return self._by_key.get(("", variable_key))
+
+
+def _candidate_shifus(shifu_bid: Optional[str]) -> list[str]:
+    candidates = [shifu_bid or ""]
+    if shifu_bid:
+        candidates.append("")
+    return candidates
+
+
+def _history_rows(user_bid: str, shifu_bids: Sequence[str]) -> list[VariableValue]:
+    if not shifu_bids:
+        return []
+    return (
+        VariableValue.query.filter(
+            VariableValue.user_bid == user_bid,
+            VariableValue.deleted == 0,
+            VariableValue.shifu_bid.in_(list(shifu_bids)),
+        )
+        .order_by(VariableValue.id.asc())
+        .all()
+    )
+
+
+def _latest_rows(user_bid: str, shifu_bids: Sequence[str]):
+    return VariableLatestValue.query.filter(
+        VariableLatestValue.user_bid == user_bid,
+        VariableLatestValue.shifu_bid.in_(list(shifu_bids)),
+    ).all()
+
+
+def load_latest_value_index(
+    user_bid: str, shifu_bid: Optional[str]
+) -> LatestValueIndex:
+    """Load the newest values of ``user_bid`` for a shifu and the global scope."""
+    candidates = _candidate_shifus(shifu_bid)
+    rows = list(_latest_rows(user_bid, candidates))
+    materialized = {row.shifu_bid for row in rows}
+    missing = [scope for scope in candidates if scope not in materialized]
+    if missing:
+        rows.extend(_history_rows(user_bid, missing))
+    return LatestValueIndex(rows)
+
+
+def _upsert_latest(value: VariableValue) -> None:
+    filters = (
+        VariableLatestValue.user_bid == value.user_bid,
+        VariableLatestValue.shifu_bid == (value.shifu_bid or ""),
+        VariableLatestValue.variable_bid == (value.variable_bid or ""),
+        VariableLatestValue.key == (value.key or ""),
+    )
+    existing = VariableLatestValue.query.filter(*filters).first()
+    if existing is None:
+        try:
+            with db.session.begin_nested():
+                db.session.add(
+                    VariableLatestValue(
+                        user_bid=value.user_bid,
+                        shifu_bid=value.shifu_bid or "",
+                        variable_bid=value.variable_bid or "",
+                        key=value.key or "",
+                        value=value.value or "",
+                        variable_value_bid=value.variable_value_bid or "",
+                        source_id=value.id,
+                    )
+                )
+            return
+        except IntegrityError:
+            # A concurrent request inserted the same combination first.
+            existing = VariableLatestValue.query.filter(*filters).first()
+            if existing is None:
+                raise
+    if (existing.source_id or 0) <= value.id:
+        existing.value = value.value or ""
+        existing.variable_value_bid = value.variable_value_bid or ""
+        existing.source_id = value.id
+
+
+def rebuild_latest_values(user_bid: str, shifu_bids: Sequence[str]) -> int:
+    """
+    Rebuild the latest rows of the given scopes from history; returns rows kept.
+
+    Runs in a savepoint, so a failed rebuild leaves the outer transaction
+    usable.
+    """
+    with db.session.begin_nested():
+        VariableLatestValue.query.filter(
+            VariableLatestValue.user_bid == user_bid,
+            VariableLatestValue.shifu_bid.in_(list(shifu_bids)),
+        ).delete(synchronize_session=False)
+        newest: dict[tuple[str, str, str], VariableValue] = {}
+        for row in _history_rows(user_bid, shifu_bids):
+            newest[(row.shifu_bid or "", row.variable_bid or "", row.key or "")] = row
+        for row in newest.values():
+            db.session.add(
+                VariableLatestValue(
+                    user_bid=user_bid,
+                    shifu_bid=row.shifu_bid or "",
+                    variable_bid=row.variable_bid or "",
+                    key=row.key or "",
+                    value=row.value or "",
+                    variable_value_bid=row.variable_value_bid or "",
+                    source_id=row.id,
+                )
+            )
+        db.session.flush()
+    return len(newest)
+
+
+def record_latest_values(user_bid: str, values: Sequence[VariableValue]) -> None:
+    """
+    Apply newly added history rows of ``user_bid`` to the latest table.
+
+    Flushes the session so the rows have ids. Scopes that are not
+    materialized yet are rebuilt from history, which includes ``values``; if
+    that rebuild races another writer, ``values`` are upserted instead.
+    """
+    if not values:
+        return
+    db.session.flush()
+    scopes = {value.shifu_bid or "" for value in values}
+    materialized = {
+        shifu_bid
+        for (shifu_bid,) in db.session.query(VariableLatestValue.shifu_bid)
+        .filter(
+            VariableLatestValue.user_bid == user_bid,
+            VariableLatestValue.shifu_bid.in_(list(scopes)),
+        )
+        .distinct()
+        .all()
+    }
+    missing = [scope for scope in scopes if scope not in materialized]
+    if missing:
+        try:
+            rebuild_latest_values(user_bid, missing)
+        except (IntegrityError, OperationalError):
+            # A concurrent first write (or the backfill) rebuilt the same
+            # scopes; apply our rows on top of its result instead.
+            logger.warning(
+                "latest value rebuild for user %s conflicted; upserting instead",
+                user_bid,
+                exc_info=True,
+            )
+            materialized.update(missing)
+    for value in values:
+        if (value.shifu_bid or "") in materialized:
+            _upsert_latest(value)
+    db.session.flush()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, SmallInteger, String, Text
+from sqlalchemy import Column, DateTime, SmallInteger, String, Text, UniqueConstraint
 from sqlalchemy.dialects.mysql import BIGINT
 from sqlalchemy.sql import func
 
@@ -216,3 +216,90 @@ class VariableValue(db.Model):
         onupdate=func.now(),
         comment="Last update timestamp",
     )
+
+
+class VariableLatestValue(db.Model):
+    """
+    Latest user variable value per (user, scope, variable_bid, key).
+
+    Materializes the newest var_variable_values row of each combination so
+    profile reads load one row per variable instead of the whole history.
+    source_id is the id of that var_variable_values row and orders rows the
+    same way the history table does.
+    """
+
+    __tablename__ = "var_variable_latest_values"
+    __table_args__ = (
+        UniqueConstraint(
+            "user_bid",
+            "shifu_bid",
+            "variable_bid",
+            "key",
+            name="uk_var_variable_latest_values_scope",
+        ),
+        {
+            "comment": (
+                "Latest user variable value per user, scope, variable and key. "
+                "Materialized from var_variable_values for profile reads."
+            )
+        },
+    )
+
+    id = Column(BIGINT, primary_key=True, autoincrement=True, comment="Unique ID")
+    user_bid = Column(
+        String(32),
+        nullable=False,
+        default="",
+        comment="User business identifier",
+    )
+    shifu_bid = Column(
+        String(32),
+        nullable=False,
+        default="",
+        comment="Shifu business identifier (empty=global/system scope)",
+    )
+    variable_bid = Column(
+        String(32),
+        nullable=False,
+        default="",
+        comment="Variable business identifier",
+    )
+    key = Column(
+        String(255),
+        nullable=False,
+        default="",
+        comment="Variable key",
+    )
+    value = Column(
+        Text,
+        nullable=False,
+        default="",
+        comment="Variable value",
+    )
+    variable_value_bid = Column(
+        String(32),
+        nullable=False,
+        default="",
+        comment="Business identifier of the source var_variable_values row",
+    )
+    source_id = Column(
+        BIGINT,
+        nullable=False,
+        default=0,
+        comment="ID of the source var_variable_values row",
+    )
+    created_at = Column(
+        DateTime,
+        nullable=False,
+        default=func.now(),
+        server_default=func.now(),
+        comment="Creation timestamp",
+    )
+    updated_at = Column(
+        DateTime,
+        nullable=False,
+        default=func.now(),
+        server_default=func.now(),
+        onupdate=func.now(),
+        comment="Last update timestamp",
+    )
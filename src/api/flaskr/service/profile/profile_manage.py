@@ -11,6 +11,10 @@ from flaskr.i18n import _
 from flaskr.service.common import raise_error
 from flaskr.service.shifu.models import DraftOutlineItem
 from flaskr.util.uuid import generate_id
+from .definition_cache import (
+    get_profile_definition_snapshot,
+    invalidate_profile_definitions,
+)
 from .dtos import (
     ColorSetting,
     DEFAULT_COLOR_SETTINGS,
@@ -129,20 +133,7 @@ def get_profile_item_definition_list(
     if type == CONST_PROFILE_TYPE_OPTION:
         return []
 
-    normalized_parent_id = parent_id or ""
-    with app.app_context():
-        definitions = (
-            Variable.query.filter(
-                Variable.shifu_bid.in_([normalized_parent_id, ""]),
-                Variable.deleted == 0,
-            )
-            .order_by(Variable.id.asc())
-            .all()
-        )
-        return [
-            convert_variable_definition_to_profile_item_definition(item)
-            for item in (definitions or [])
-        ]
+    return get_profile_definition_snapshot(app, parent_id).definitions()
 
 
 def update_profile_item_hidden_state(
@@ -172,6 +163,7 @@ def update_profile_item_hidden_state(
                 item.updated_at = datetime.now()
                 item.updated_user_bid = user_id or ""
             db.session.commit()
+            invalidate_profile_definitions(app, parent_id)
         return get_profile_item_definition_list(app, parent_id=parent_id)
 
 
@@ -237,6 +229,9 @@ def add_profile_item_quick(app: Flask, parent_id: str, key: str, user_id: str):
             raise_error("server.profile.keyRequire")
         ret = add_profile_item_quick_internal(app, parent_id, key, user_id)
         db.session.commit()
+        # Publish again after commit: a reader in between may have cached the
+        # definitions without the new item at the bumped version.
+        invalidate_profile_definitions(app, parent_id)
         return ret
 
 
@@ -264,6 +259,7 @@ def add_profile_item_quick_internal(app: Flask, parent_id: str, key: str, user_i
     )
     db.session.add(definition)
     db.session.flush()
+    invalidate_profile_definitions(app, parent_id)
     return convert_variable_definition_to_profile_item_definition(definition)
 
 
@@ -349,6 +345,7 @@ def save_profile_item(
             db.session.add(definition)
 
         db.session.commit()
+        invalidate_profile_definitions(app, normalized_parent_id)
         return convert_variable_definition_to_profile_item_definition(definition)
 
 
@@ -367,4 +364,5 @@ def delete_profile_item(app: Flask, user_id: str, profile_id: str):
         definition.updated_at = datetime.now()
         definition.updated_user_bid = user_id or ""
         db.session.commit()
+        invalidate_profile_definitions(app, definition.shifu_bid)
         return True
@@ -37,15 +37,17 @@ format:
 """
 
 from flask import Flask
-from typing import Generic, TypeVar, List, Optional
-from pydantic import BaseModel
+from typing import Any, Generic, TypeVar, List, Optional, Tuple
+from pydantic import BaseModel, ConfigDict, PrivateAttr
 from .models import DraftOutlineItem, LogDraftStruct
 from flaskr.dao import db
 from flaskr.util import generate_id
-import queue
+from collections import deque
 from datetime import datetime
 import re
 from flaskr.service.user.models import UserInfo
+from flaskr.service.shifu.shifu_struct_cache import invalidate_shifu_struct_cache
+from flaskr.service.shifu.struct_index import StructIndex
 
 T = TypeVar("T", bound="HistoryItem")
 OUTLINE_CONTENT_LOOKBACK_LIMIT = 1000
@@ -77,6 +79,20 @@ class HistoryItem(BaseModel, Generic[T]):
         return cls.model_validate_json(json)
 
 
+class FrozenHistoryItem(HistoryItem):
+    """
+    Immutable history item
+    children are tuples and fields can not be reassigned,
+    so one parsed tree can be shared between concurrent requests
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    children: Tuple["FrozenHistoryItem", ...] = ()
+    # compiled StructIndex, built lazily by struct_index.get_struct_index
+    _struct_index: Any = PrivateAttr(default=None)
+
+
 class HistoryInfo(BaseModel):
     """
     History info
@@ -288,6 +304,7 @@ def __save_shifu_history(
     )
     db.session.add(shifu_history)
     db.session.flush()
+    invalidate_shifu_struct_cache(shifu_bid, is_preview=True)
     return shifu_history
 
 
@@ -324,20 +341,12 @@ def save_blocks_history(
         block_infos: Block infos
     """
     history = get_shifu_history(app, shifu_bid)
-    q = queue.Queue()
-    q.put(history)
-    while not q.empty():
-        item = q.get()
-        if item.bid == outline_bid:
-            item.children = [
-                HistoryItem(
-                    bid=block_info.bid, id=block_info.id, type="block", children=[]
-                )
-                for block_info in block_infos
-            ]
-            break
-        for child in item.children:
-            q.put(child)
+    item = StructIndex(history).get(outline_bid)
+    if item is not None:
+        item.children = [
+            HistoryItem(bid=block_info.bid, id=block_info.id, type="block", children=[])
+            for block_info in block_infos
+        ]
     __save_shifu_history(app, user_id, shifu_bid, history)
 
 
@@ -376,17 +385,9 @@ def __save_new_item_history(
         __save_shifu_history(app, user_id, shifu_bid, history)
         return
 
-    q = queue.Queue()
-    q.put(history)
-    while not q.empty():
-        item = q.get()
-        if item.bid == parent_bid:
-            item.children.append(
-                HistoryItem(bid=item_bid, id=id, type=type, children=[])
-            )
-            break
-        for child in item.children:
-            q.put(child)
+    parent = StructIndex(history).get(parent_bid)
+    if parent is not None:
+        parent.children.append(HistoryItem(bid=item_bid, id=id, type=type, children=[]))
 
     __save_shifu_history(app, user_id, shifu_bid, history)
 
@@ -404,17 +405,10 @@ def __delete_item_history(app: Flask, user_id: str, shifu_bid: str, item_bid: st
         None
     """
     history = get_shifu_history(app, shifu_bid)
-    q = queue.Queue()
-    q.put(history)
-    while not q.empty():
-        item = q.get()
-        if item.children and len(item.children) > 0:
-            for child in item.children:
-                if child.bid == item_bid:
-                    item.children.remove(child)
-                    break
-            for child in item.children:
-                q.put(child)
+    index = StructIndex(history)
+    parent = index.parent(item_bid)
+    if parent is not None:
+        parent.children.remove(index.get(item_bid))
     __save_shifu_history(app, user_id, shifu_bid, history)
 
 
@@ -490,17 +484,11 @@ def save_outline_history(
         None
     """
     history = get_shifu_history(app, shifu_bid)
-    q = queue.Queue()
-    q.put(history)
-    while not q.empty():
-        item = q.get()
-        if item.bid == outline_bid:
-            item.id = id
-            if child_count > 0:
-                item.child_count = child_count
-            break
-        for child in item.children:
-            q.put(child)
+    item = StructIndex(history).get(outline_bid)
+    if item is not None:
+        item.id = id
+        if child_count > 0:
+            item.child_count = child_count
     log = __save_shifu_history(app, user_id, shifu_bid, history)
     return int(log.id) if log else 0
 
@@ -554,26 +542,23 @@ def save_outline_tree_history(
     history = get_shifu_history(app, shifu_bid)
     if shifu_id is not None:
         history.id = shifu_id
-    q = queue.Queue()
-    q.put(history)
+    q = deque([history])
     blocks_infos = {}
-    while not q.empty():
-        item = q.get()
+    while q:
+        item = q.popleft()
         if not item.children or len(item.children) == 0:
             continue
         first_child = item.children[0]
         if first_child.type == "block":
             blocks_infos[item.bid] = item.children
         elif first_child.type == "outline":
-            for child in item.children:
-                q.put(child)
+            q.extend(item.children)
     history.children = outline_tree
-    q.put(history)
-    while not q.empty():
-        item = q.get()
+    q.append(history)
+    while q:
+        item = q.popleft()
         if item.bid in blocks_infos:
             item.children = blocks_infos[item.bid]
         else:
-            for child in item.children:
-                q.put(child)
+            q.extend(item.children)
     __save_shifu_history(app, user_id, shifu_bid, history)
@@ -22,6 +22,7 @@ from flaskr.service.shifu.shifu_outline_funcs import (
 )
 from flaskr.service.shifu.shifu_history_manager import HistoryItem
 from flaskr.service.shifu.shifu_struct_manager import get_shifu_outline_tree
+from flaskr.service.shifu.shifu_struct_cache import invalidate_shifu_struct_cache
 from flaskr.util import generate_id
 from datetime import datetime
 import threading
@@ -194,6 +195,7 @@ def publish_shifu_draft(
         shifu_log_published_struct.created_at = now_time
         db.session.add(shifu_log_published_struct)
         db.session.commit()
+        invalidate_shifu_struct_cache(shifu_id, is_preview=False)
         parent_shifu_context = get_shifu_context_snapshot()
         if sync_summary:
             _run_summary_with_error_handling(app, shifu_id, parent_shifu_context)
@@ -0,0 +1,114 @@
+"""
+Shifu struct cache
+
+Process-local LRU cache for parsed shifu structs.
+
+Entries are keyed by (shifu_bid, is_preview, struct_id) where struct_id is the
+id of the LogDraftStruct/LogPublishedStruct row the tree was parsed from.
+Because every publish/save writes a new row, a stale entry can never be served:
+readers always look up the newest row id first. Explicit invalidation from the
+writers only releases memory for versions that are no longer reachable.
+
+Cached trees are frozen (see FrozenHistoryItem) so they can be shared by
+concurrent lesson runs without copying.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from flaskr.common.config import get_config
+
+StructCacheKey = Tuple[str, bool, int]
+
+
+class ShifuStructCache:
+    """
+    Size-bounded LRU cache of parsed shifu structs.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[StructCacheKey, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def max_entries(self) -> int:
+        if self._max_entries is None:
+            try:
+                self._max_entries = int(get_config("SHIFU_STRUCT_CACHE_SIZE", 256))
+            except (TypeError, ValueError):
+                self._max_entries = 256
+        return self._max_entries
+
+    def get(self, shifu_bid: str, is_preview: bool, struct_id: int):
+        key = (shifu_bid, bool(is_preview), int(struct_id))
+        with self._lock:
+            struct = self._entries.get(key)
+            if struct is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return struct
+
+    def put(self, shifu_bid: str, is_preview: bool, struct_id: int, struct: Any):
+        max_entries = self.max_entries
+        if max_entries <= 0:
+            return
+        key = (shifu_bid, bool(is_preview), int(struct_id))
+        with self._lock:
+            # Older versions of the same shifu are unreachable once a newer
+            # row exists, so drop them eagerly.
+            for stale_key in [
+                k
+                for k in self._entries
+                if k[0] == key[0] and k[1] == key[1] and k[2] < key[2]
+            ]:
+                del self._entries[stale_key]
+            self._entries[key] = struct
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, shifu_bid: str, is_preview: Optional[bool] = None) -> int:
+        with self._lock:
+            keys = [
+                k
+                for k in self._entries
+                if k[0] == shifu_bid and (is_preview is None or k[1] == is_preview)
+            ]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+shifu_struct_cache = ShifuStructCache()
+
+
+def invalidate_shifu_struct_cache(
+    shifu_bid: str, is_preview: Optional[bool] = None
+) -> int:
+    """
+    Drop cached structs of a shifu
+    Args:
+        shifu_bid: Shifu bid
+        is_preview: Only drop draft (True) or published (False) structs,
+            None drops both
+    Returns:
+        int: Number of dropped entries
+    """
+    return shifu_struct_cache.invalidate(shifu_bid, is_preview)
@@ -21,9 +21,10 @@ from flaskr.service.shifu.models import (
     PublishedOutlineItem,
 )
 
-from flaskr.service.shifu.shifu_history_manager import HistoryItem
+from flaskr.service.shifu.shifu_history_manager import HistoryItem, FrozenHistoryItem
+from flaskr.service.shifu.shifu_struct_cache import shifu_struct_cache
+from flaskr.service.shifu.struct_index import get_struct_index
 from flaskr.service.common import raise_error
-import queue
 from typing import List, Union
 from pydantic import BaseModel
 from decimal import Decimal
@@ -68,6 +69,8 @@ def get_shifu_struct(
 ) -> HistoryItem:
     """
     Get shifu struct
+    the returned struct is immutable and shared with other requests,
+    use model_copy(deep=True) or get_shifu_history to get a mutable tree
     Args:
         app: Flask application instance
         shifu_bid: Shifu bid
@@ -81,8 +84,10 @@ def get_shifu_struct(
             model = LogDraftStruct
         else:
             model = LogPublishedStruct
-        shifu_struct = (
-            model.query.filter(
+        # only fetch the newest row id, the struct json is parsed once per version
+        latest = (
+            model.query.with_entities(model.id)
+            .filter(
                 model.shifu_bid == shifu_bid,
             )
             .order_by(
@@ -90,9 +95,17 @@ def get_shifu_struct(
             )
             .first()
         )
+        if not latest:
+            raise_error("server.shifu.shifuNotFound")
+        struct = shifu_struct_cache.get(shifu_bid, is_preview, latest.id)
+        if struct is not None:
+            return struct
+        shifu_struct = model.query.filter(model.id == latest.id).first()
         if not shifu_struct:
             raise_error("server.shifu.shifuNotFound")
-        return HistoryItem.from_json(shifu_struct.struct)
+        struct = FrozenHistoryItem.from_json(shifu_struct.struct)
+        shifu_struct_cache.put(shifu_bid, is_preview, shifu_struct.id, struct)
+        return struct
 
 
 def get_shifu_outline_tree(
@@ -108,19 +121,11 @@ def get_shifu_outline_tree(
             shifu_model = PublishedShifu
             outline_item_model = PublishedOutlineItem
 
-        shifu_ids = []
-        outline_item_ids = []
-        q = queue.Queue()
-        q.put(struct)
-        while not q.empty():
-            item = q.get()
-            if item.type == "shifu":
-                shifu_ids.append(item.id)
-            elif item.type == "outline":
-                outline_item_ids.append(item.id)
-            if item.children:
-                for child in item.children:
-                    q.put(child)
+        struct_index = get_struct_index(struct)
+        shifu_ids = [struct.id] if struct.type == "shifu" else []
+        outline_item_ids = [
+            struct_index.get(bid).id for bid in struct_index.outline_bids
+        ]
         if len(shifu_ids) != 1:
             raise_error("server.shifu.shifuNotFound")
         shifu: Union[DraftShifu, PublishedShifu] = shifu_model.query.filter(
@@ -0,0 +1,119 @@
+"""
+Shifu struct index
+
+This module contains a compiled index over a shifu struct tree,
+so lookups by bid do not need a full tree walk.
+
+the index of an immutable (cached) struct is built once and kept on the
+struct itself, mutable structs get a fresh index on every call.
+
+Author: yfge
+Date: 2025-08-07
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from flaskr.service.shifu.shifu_history_manager import HistoryItem
+
+
+def is_leaf_outline(item: "HistoryItem") -> bool:
+    """
+    outline is a leaf when has block item as children
+    outline is a node when has outline item as children
+    outline is a leaf when has no children
+    """
+    if item.children:
+        if item.children[0].type == "block":
+            return True
+        if item.children[0].type == "outline":
+            return False
+    return item.type == "outline"
+
+
+class StructIndex:
+    """
+    Struct index
+    bid -> node and parent, plus the outline bids in pre-order
+    """
+
+    def __init__(self, root: "HistoryItem"):
+        self.root = root
+        self._nodes: dict[str, "HistoryItem"] = {}
+        self._parents: dict[str, Optional["HistoryItem"]] = {}
+        self.outline_bids: list[str] = []
+
+        stack: list[tuple["HistoryItem", Optional["HistoryItem"]]] = [(root, None)]
+        while stack:
+            item, parent = stack.pop()
+            # keep the first occurrence in pre-order (depth first); the
+            # previous breadth-first walks could pick another node when a
+            # bid appears twice at different depths
+            if item.bid not in self._nodes:
+                self._nodes[item.bid] = item
+                self._parents[item.bid] = parent
+                if item.type == "outline":
+                    self.outline_bids.append(item.bid)
+            if item.children:
+                for child in reversed(item.children):
+                    stack.append((child, item))
+
+    def __contains__(self, bid: str) -> bool:
+        return bid in self._nodes
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def get(self, bid: str) -> Optional["HistoryItem"]:
+        return self._nodes.get(bid)
+
+    def parent(self, bid: str) -> Optional["HistoryItem"]:
+        return self._parents.get(bid)
+
+    def path(self, bid: str) -> Optional[list["HistoryItem"]]:
+        """
+        Get the path from root to the node
+        Args:
+            bid: Node bid
+        Returns:
+            Optional[list[HistoryItem]]: root first, node last
+        """
+        node = self._nodes.get(bid)
+        if node is None:
+            return None
+        path = [node]
+        parent = self._parents.get(bid)
+        while parent is not None:
+            path.append(parent)
+            parent = self._parents.get(parent.bid)
+        path.reverse()
+        return path
+
+    def sibling_index(self, bid: str) -> int:
+        parent = self._parents.get(bid)
+        if parent is None:
+            return -1
+        for index, child in enumerate(parent.children):
+            if child.bid == bid:
+                return index
+        return -1
+
+
+def get_struct_index(struct: "HistoryItem") -> StructIndex:
+    """
+    Get struct index
+    immutable structs cache their index, mutable structs are indexed on demand
+    Args:
+        struct: Root of the struct
+    Returns:
+        StructIndex: Struct index
+    """
+    if not struct.model_config.get("frozen"):
+        return StructIndex(struct)
+    index = getattr(struct, "_struct_index", None)
+    if index is None or index.root is not struct:
+        index = StructIndex(struct)
+        struct._struct_index = index
+    return index
@@ -9,6 +9,7 @@ Date: 2025-08-07
 
 from typing import Optional
 from flaskr.service.shifu.shifu_history_manager import HistoryItem
+from flaskr.service.shifu.struct_index import get_struct_index
 
 
 def find_node_with_parents(
@@ -23,15 +24,9 @@ def find_node_with_parents(
     Returns:
         Optional[list[HistoryItem]]: Path to target node
     """
-    if current_path is None:
-        current_path = []
-    current_path.append(root)
-    if root.bid == target_bid:
-        return current_path.copy()
-
-    for i, child in enumerate(root.children):
-        result = find_node_with_parents(child, target_bid, current_path)
-        if result:
-            return result
-    current_path.pop()
-    return None
+    path = get_struct_index(root).path(target_bid)
+    if path is None:
+        return None
+    if current_path:
+        return current_path + path
+    return path
@@ -6,6 +6,7 @@ This module provides text preprocessing for TTS synthesis.
 
 import logging
 import html
+import re
 
 # Import models to ensure they are registered with SQLAlchemy
 from .models import LearnGeneratedAudio  # noqa: F401
@@ -18,10 +19,11 @@ from flaskr.service.tts.patterns import (
     HEADER,
     IMAGE_MD,
     LINK,
+    HTML_CHARREF,
     LIST_MARKER,
     MERMAID_BLOCK,
     MULTI_NEWLINE,
-    MULTI_SPACE,
+    MULTI_SPACE_COLLAPSE,
     SVG_BLOCK,
     SVG_TEXT_TAGS,
     XML_BLOCK,
@@ -31,6 +33,8 @@ from flaskr.service.tts.patterns import (
 logger = AppLoggerProxy(logging.getLogger(__name__))
 
 _FENCE = "```"
+# Block elements that are never spoken and are stripped while still incomplete.
+NON_SPEAKABLE_XML_TAGS = ("svg", "math", "script", "style")
 
 
 def _strip_incomplete_fenced_code(text: str) -> tuple[str, bool]:
@@ -155,7 +159,7 @@ def _strip_incomplete_blocks(text: str) -> tuple[str, bool]:
     had_incomplete = had_incomplete or removed
 
     # Strip incomplete non-speakable XML blocks (most important: SVG).
-    for tag in ("svg", "math", "script", "style"):
+    for tag in NON_SPEAKABLE_XML_TAGS:
         text, removed = _strip_incomplete_xml_block(text, tag)
         had_incomplete = had_incomplete or removed
 
@@ -215,19 +219,46 @@ def has_incomplete_block(text: str) -> bool:
     return False
 
 
-def preprocess_for_tts(text: str) -> str:
-    """
-    Remove code blocks and markdown formatting not suitable for TTS.
+# Regex cleanup applied by preprocess_for_tts after incomplete tail blocks are
+# stripped, in order. Replacements are either literals or group references only,
+# so preprocess_for_tts_with_offsets can replay the same steps with an offset map.
+_CLEANUP_STEPS = (
+    # IMPORTANT: Remove code blocks FIRST (they may contain SVG, mermaid, etc.)
+    (CODE_BLOCK, ""),
+    # Remove mermaid diagrams (in case they're not in code blocks)
+    (MERMAID_BLOCK, ""),
+    # Remove SVG blocks - handle multiline and nested content
+    (SVG_BLOCK, ""),
+    # Remove other XML block elements (math, script, style)
+    (XML_BLOCK, ""),
+    # Remove stray SVG text-related elements that can leak when the model emits
+    # malformed/incomplete SVG (e.g. we might end up with a `<text>` fragment
+    # without the surrounding `<svg>` block in streaming).
+    *((pat, "") for pat in SVG_TEXT_TAGS),
+    # Remove any remaining angle bracket content that looks like tags
+    # This catches malformed or partial SVG/HTML
+    (ANY_HTML_TAG, ""),
+    # Remove markdown headers (keep the text)
+    (HEADER, ""),
+    # Remove images completely
+    (IMAGE_MD, ""),
+    # Keep link text but remove URL
+    (LINK, r"\1"),
+    # Remove bold/italic markers but keep text
+    (BOLD_ITALIC, r"\1\2"),
+    # Remove list markers
+    (LIST_MARKER, ""),
+    # Remove data URIs (base64 encoded content)
+    (DATA_URI, ""),
+    # Normalize whitespace
+    (MULTI_NEWLINE, "\n\n"),
+    (MULTI_SPACE_COLLAPSE, " "),
+)
 
-    Args:
-        text: Raw markdown text
+_GROUP_REFERENCE = re.compile(r"\\(\d+)")
 
-    Returns:
-        Cleaned text suitable for TTS synthesis
-    """
-    if not text:
-        return ""
 
+def _unescape_html(text: str) -> str:
     # Normalize common HTML entity escaping (e.g. '&lt;p&gt;') so tag stripping
     # works consistently for content coming from HTML renderers.
     try:
@@ -239,6 +270,23 @@ def preprocess_for_tts(text: str) -> str:
     except Exception:
         # Best-effort only; keep original text on unescape errors.
         pass
+    return text
+
+
+def preprocess_for_tts(text: str) -> str:
+    """
+    Remove code blocks and markdown formatting not suitable for TTS.
+
+    Args:
+        text: Raw markdown text
+
+    Returns:
+        Cleaned text suitable for TTS synthesis
+    """
+    if not text:
+        return ""
+
+    text = _unescape_html(text)
 
     # Replace non-breaking spaces from HTML with regular spaces.
     if "\xa0" in text:
@@ -248,52 +296,119 @@ def preprocess_for_tts(text: str) -> str:
     # partial SVG/code blocks leaking into TTS between chunks.
     text, _ = _strip_incomplete_blocks(text)
 
-    # IMPORTANT: Remove code blocks FIRST (they may contain SVG, mermaid, etc.)
-    text = CODE_BLOCK.sub("", text)
-
-    # Remove mermaid diagrams (in case they're not in code blocks)
-    text = MERMAID_BLOCK.sub("", text)
-
-    # Remove SVG blocks - handle multiline and nested content
-    text = SVG_BLOCK.sub("", text)
+    for pattern, replacement in _CLEANUP_STEPS:
+        text = pattern.sub(replacement, text)
 
-    # Remove other XML block elements (math, script, style)
-    text = XML_BLOCK.sub("", text)
+    # Remove leading/trailing whitespace from each line
+    lines = [line.strip() for line in text.split("\n")]
+    text = "\n".join(lines)
 
-    # Remove stray SVG text-related elements that can leak when the model emits
-    # malformed/incomplete SVG (e.g. we might end up with a `<text>` fragment
-    # without the surrounding `<svg>` block in streaming).
-    for pat in SVG_TEXT_TAGS:
-        text = pat.sub("", text)
+    return text.strip()
 
-    # Remove any remaining angle bracket content that looks like tags
-    # This catches malformed or partial SVG/HTML
-    text = ANY_HTML_TAG.sub("", text)
 
-    # Remove markdown headers (keep the text)
-    text = HEADER.sub("", text)
+def _sub_with_offsets(
+    pattern: re.Pattern, replacement: str, text: str, ends: list[int]
+) -> tuple[str, list[int]]:
+    replaced = pattern.sub(replacement, text)
+    if replaced == text:
+        return text, ends
+    groups = [int(group) for group in _GROUP_REFERENCE.findall(replacement)]
+    new_ends: list[int] = []
+    cursor = 0
+    for match in pattern.finditer(text):
+        start, end = match.span()
+        new_ends.extend(ends[cursor:start])
+        if groups:
+            piece: list[int] = []
+            for group in groups:
+                group_start, group_end = match.span(group)
+                if group_start >= 0:
+                    piece.extend(ends[group_start:group_end])
+        else:
+            piece = [ends[end - 1]] * len(replacement)
+        if piece and end > start:
+            # Cutting after the last kept character consumes the whole match,
+            # e.g. the closing `**` of a bold span.
+            piece[-1] = max(piece[-1], ends[end - 1])
+        new_ends.extend(piece)
+        cursor = end
+    new_ends.extend(ends[cursor:])
+    return replaced, new_ends
+
+
+def _unescape_html_with_offsets(text: str, ends: list[int]) -> tuple[str, list[int]]:
+    for _ in range(2):
+        if "&" not in text:
+            break
+        parts: list[str] = []
+        new_ends: list[int] = []
+        cursor = 0
+        for match in HTML_CHARREF.finditer(text):
+            start, end = match.span()
+            parts.append(text[cursor:start])
+            new_ends.extend(ends[cursor:start])
+            unescaped = html.unescape(match.group(0))
+            parts.append(unescaped)
+            new_ends.extend([ends[end - 1]] * len(unescaped))
+            cursor = end
+        parts.append(text[cursor:])
+        new_ends.extend(ends[cursor:])
+        unescaped_text = "".join(parts)
+        if unescaped_text == text:
+            break
+        text, ends = unescaped_text, new_ends
+    return text, ends
+
+
+def _strip_lines_with_offsets(text: str, ends: list[int]) -> tuple[str, list[int]]:
+    lines = text.split("\n")
+    stripped_lines = [line.strip() for line in lines]
+    stripped = "\n".join(stripped_lines)
+    if stripped == text:
+        return text, ends
+    new_ends: list[int] = []
+    position = 0
+    for index, (line, stripped_line) in enumerate(zip(lines, stripped_lines)):
+        if index:
+            new_ends.append(ends[position - 1])  # the newline
+        lead = len(line) - len(line.lstrip())
+        new_ends.extend(ends[position + lead : position + lead + len(stripped_line)])
+        position += len(line) + 1
+    return stripped, new_ends
+
+
+def preprocess_for_tts_with_offsets(text: str) -> tuple[str, list[int]]:
+    """
+    preprocess_for_tts plus a map from cleaned text back to the raw text.
 
-    # Remove images completely
-    text = IMAGE_MD.sub("", text)
+    Args:
+        text: Raw markdown text
 
-    # Keep link text but remove URL
-    text = LINK.sub(r"\1", text)
+    Returns:
+        (cleaned_text, ends) where cleaned_text == preprocess_for_tts(text) and
+        ends[i] is the raw prefix length that covers cleaned_text[: i + 1]
+        (including markup that closes around that character).
+    """
+    if not text:
+        return "", []
 
-    # Remove bold/italic markers but keep text
-    text = BOLD_ITALIC.sub(r"\1\2", text)
+    ends = list(range(1, len(text) + 1))
+    try:
+        text, ends = _unescape_html_with_offsets(text, ends)
+    except Exception:
+        pass
 
-    # Remove list markers
-    text = LIST_MARKER.sub("", text)
+    if "\xa0" in text:
+        text = text.replace("\xa0", " ")
 
-    # Remove data URIs (base64 encoded content)
-    text = DATA_URI.sub("", text)
+    stripped, _ = _strip_incomplete_blocks(text)
+    text, ends = stripped, ends[: len(stripped)]
 
-    # Normalize whitespace
-    text = MULTI_NEWLINE.sub("\n\n", text)
-    text = MULTI_SPACE.sub(" ", text)
+    for pattern, replacement in _CLEANUP_STEPS:
+        text, ends = _sub_with_offsets(pattern, replacement, text, ends)
 
-    # Remove leading/trailing whitespace from each line
-    lines = [line.strip() for line in text.split("\n")]
-    text = "\n".join(lines)
+    text, ends = _strip_lines_with_offsets(text, ends)
 
-    return text.strip()
+    lead = len(text) - len(text.lstrip())
+    cleaned = text.strip()
+    return cleaned, ends[lead : lead + len(cleaned)]
@@ -0,0 +1,407 @@
+"""
+Content-addressed TTS segment audio cache.
+
+Segments are keyed by a hash of (provider, model, voice settings, audio
+settings, normalized text), so identical sentences in published lessons are
+synthesized once and replayed for every learner.
+
+Two tiers are consulted in order:
+1) a process-local LRU on disk (TTS_AUDIO_CACHE_DIR, TTS_AUDIO_CACHE_MAX_BYTES)
+2) object storage via ``upload_to_storage`` / ``read_from_storage``
+   (TTS_AUDIO_CACHE_STORAGE_ENABLED), shared across processes and hosts
+
+Hits from the storage tier are written back to the disk tier. Concurrent
+misses for the same key in one process share a single provider call; only
+the caller that made it reports the segment as synthesized (and bills it).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from flask import Flask
+
+from flaskr.api.tts import _resolve_provider_name, synthesize_text
+from flaskr.api.tts.base import AudioSettings, TTSResult, VoiceSettings
+from flaskr.common.config import get_config
+from flaskr.common.log import AppLoggerProxy
+from flaskr.service.common.oss_utils import OSS_PROFILE_COURSES
+from flaskr.service.common.storage import read_from_storage, upload_to_storage
+
+
+logger = AppLoggerProxy(logging.getLogger(__name__))
+
+CACHE_KEY_VERSION = "v1"
+STORAGE_KEY_PREFIX = "tts-cache"
+_ENTRY_MAGIC = b"TTSC1\n"
+
+# Where a segment's audio came from, as returned by ``synthesize``.
+SEGMENT_SYNTHESIZED = "synthesized"  # this caller called the provider
+SEGMENT_CACHED = "cached"  # read from the disk or storage tier
+SEGMENT_SHARED = "shared"  # waited on another caller's in-flight synthesis
+
+
+def normalize_cache_text(text: str) -> str:
+    """Collapse whitespace so formatting-only differences share an entry."""
+    return " ".join((text or "").split())
+
+
+def build_tts_cache_key(
+    *,
+    text: str,
+    provider: str,
+    model: str,
+    voice_settings: VoiceSettings,
+    audio_settings: AudioSettings,
+) -> str:
+    """Return the hex SHA-256 cache key of one synthesis request."""
+    payload = {
+        "version": CACHE_KEY_VERSION,
+        "provider": (provider or "").strip().lower(),
+        "model": (model or "").strip(),
+        "voice": asdict(voice_settings),
+        "audio": asdict(audio_settings),
+        "text": normalize_cache_text(text),
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def encode_cache_entry(result: TTSResult) -> bytes:
+    meta = {
+        "duration_ms": int(result.duration_ms or 0),
+        "sample_rate": int(result.sample_rate or 0),
+        "format": result.format or "",
+        "word_count": int(result.word_count or 0),
+    }
+    header = json.dumps(meta, separators=(",", ":")).encode("utf-8")
+    return _ENTRY_MAGIC + header + b"\n" + result.audio_data
+
+
+def decode_cache_entry(data: bytes) -> Optional[TTSResult]:
+    if not data or not data.startswith(_ENTRY_MAGIC):
+        return None
+    header_end = data.find(b"\n", len(_ENTRY_MAGIC))
+    if header_end < 0:
+        return None
+    try:
+        meta = json.loads(data[len(_ENTRY_MAGIC) : header_end])
+    except ValueError:
+        return None
+    audio = data[header_end + 1 :]
+    if not audio:
+        return None
+    return TTSResult(
+        audio_data=audio,
+        duration_ms=int(meta.get("duration_ms") or 0),
+        sample_rate=int(meta.get("sample_rate") or 0),
+        format=str(meta.get("format") or ""),
+        word_count=int(meta.get("word_count") or 0),
+    )
+
+
+class DiskLRUCache:
+    """Size-bounded directory of cache entries evicted least-recently-used."""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max(0, int(max_bytes))
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._loaded = False
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.bin"
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.directory.is_dir():
+            return
+        found = []
+        for path in self.directory.glob("*/*.bin"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            found.append((stat.st_mtime, path.stem, stat.st_size))
+        for _mtime, key, size in sorted(found):
+            self._entries[key] = size
+            self._total_bytes += size
+        self._evict()
+
+    def _evict(self) -> None:
+        while self._entries and self._total_bytes > self.max_bytes:
+            key, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                self._path(key).unlink()
+            except OSError:
+                pass
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            self._load()
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+            # mtime carries recency across restarts (see _load)
+            os.utime(path)
+            return data
+        except OSError:
+            with self._lock:
+                size = self._entries.pop(key, None)
+                if size is not None:
+                    self._total_bytes -= size
+            return None
+
+    def put(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        with self._lock:
+            self._load()
+            previous = self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            self._total_bytes += len(data) - previous
+            self._evict()
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            self._load()
+            return self._total_bytes
+
+
+class TTSAudioCache:
+    """Two-tier (disk LRU + object storage) cache of synthesized segments."""
+
+    def __init__(
+        self,
+        *,
+        disk: Optional[DiskLRUCache],
+        storage_enabled: bool,
+        storage_profile: str = OSS_PROFILE_COURSES,
+    ):
+        self.disk = disk
+        self.storage_enabled = storage_enabled
+        self.storage_profile = storage_profile
+        self._inflight_lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self.hits = 0
+        self.storage_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def storage_key(key: str) -> str:
+        return f"{STORAGE_KEY_PREFIX}/{key[:2]}/{key}.bin"
+
+    def get(self, app: Flask, key: str) -> Optional[TTSResult]:
+        if self.disk is not None:
+            try:
+                result = decode_cache_entry(self.disk.get(key) or b"")
+            except Exception as exc:
+                logger.warning("TTS disk cache read failed: %s", exc)
+                result = None
+            if result is not None:
+                self.hits += 1
+                return result
+        if not self.storage_enabled:
+            return None
+        try:
+            data = read_from_storage(
+                app, object_key=self.storage_key(key), profile=self.storage_profile
+            )
+        except Exception as exc:
+            logger.warning("TTS storage cache read failed: %s", exc)
+            return None
+        result = decode_cache_entry(data or b"")
+        if result is None:
+            return None
+        self.hits += 1
+        self.storage_hits += 1
+        self._put_disk(key, data)
+        return result
+
+    def _put_disk(self, key: str, data: bytes) -> None:
+        if self.disk is None:
+            return
+        try:
+            self.disk.put(key, data)
+        except Exception as exc:
+            logger.warning("TTS disk cache write failed: %s", exc)
+
+    def put(self, app: Flask, key: str, result: TTSResult) -> None:
+        data = encode_cache_entry(result)
+        self._put_disk(key, data)
+        if not self.storage_enabled:
+            return
+        try:
+            upload_to_storage(
+                app,
+                file_content=data,
+                object_key=self.storage_key(key),
+                content_type="application/octet-stream",
+                profile=self.storage_profile,
+                warm_up=False,
+            )
+        except Exception as exc:
+            logger.warning("TTS storage cache write failed: %s", exc)
+
+    def synthesize(
+        self,
+        app: Flask,
+        *,
+        text: str,
+        voice_settings: VoiceSettings,
+        audio_settings: AudioSettings,
+        model: Optional[str],
+        provider_name: str,
+    ) -> Tuple[TTSResult, str]:
+        """Return ``(result, source)``, calling the provider only on a miss.
+
+        ``source`` is one of the ``SEGMENT_*`` constants.
+        """
+        key = build_tts_cache_key(
+            text=text,
+            provider=_resolve_provider_name(provider_name),
+            model=model or "",
+            voice_settings=voice_settings,
+            audio_settings=audio_settings,
+        )
+        result = self.get(app, key)
+        if result is not None:
+            return result, SEGMENT_CACHED
+
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+        if not owner:
+            return future.result(), SEGMENT_SHARED
+
+        try:
+            self.misses += 1
+            result = synthesize_text(
+                text=text,
+                voice_settings=voice_settings,
+                audio_settings=audio_settings,
+                model=model,
+                provider_name=provider_name,
+            )
+            if result.audio_data:
+                self.put(app, key, result)
+            future.set_result(result)
+            return result, SEGMENT_SYNTHESIZED
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+
+
+_cache_lock = threading.Lock()
+_cache: Optional[TTSAudioCache] = None
+_cache_configured = False
+
+
+def get_tts_audio_cache() -> Optional[TTSAudioCache]:
+    """Return the process-wide cache, or None when TTS_AUDIO_CACHE_ENABLED is off."""
+    global _cache, _cache_configured
+    if _cache_configured:
+        return _cache
+    with _cache_lock:
+        if _cache_configured:
+            return _cache
+        if get_config("TTS_AUDIO_CACHE_ENABLED"):
+            max_bytes = int(get_config("TTS_AUDIO_CACHE_MAX_BYTES") or 0)
+            directory = str(get_config("TTS_AUDIO_CACHE_DIR") or "").strip()
+            disk = None
+            if max_bytes > 0:
+                disk = DiskLRUCache(
+                    directory
+                    or os.path.join(tempfile.gettempdir(), "ai-shifu-tts-cache"),
+                    max_bytes,
+                )
+            _cache = TTSAudioCache(
+                disk=disk,
+                storage_enabled=bool(get_config("TTS_AUDIO_CACHE_STORAGE_ENABLED")),
+            )
+        _cache_configured = True
+        return _cache
+
+
+def reset_tts_audio_cache() -> None:
+    """Drop the process-wide cache so the next call re-reads configuration."""
+    global _cache, _cache_configured
+    with _cache_lock:
+        _cache = None
+        _cache_configured = False
+
+
+def synthesize_text_cached(
+    app: Flask,
+    *,
+    text: str,
+    voice_settings: VoiceSettings,
+    audio_settings: AudioSettings,
+    model: Optional[str],
+    provider_name: str,
+) -> Tuple[TTSResult, str]:
+    """
+    Synthesize ``text`` through the audio cache when it is enabled.
+
+    Returns:
+        Tuple of (TTSResult, source), source being one of the ``SEGMENT_*``
+        constants
+    """
+    cache = get_tts_audio_cache()
+    if cache is None:
+        return (
+            synthesize_text(
+                text=text,
+                voice_settings=voice_settings,
+                audio_settings=audio_settings,
+                model=model,
+                provider_name=provider_name,
+            ),
+            SEGMENT_SYNTHESIZED,
+        )
+    return cache.synthesize(
+        app,
+        text=text,
+        voice_settings=voice_settings,
+        audio_settings=audio_settings,
+        model=model,
+        provider_name=provider_name,
+    )
@@ -1,36 +1,69 @@
 """
 Audio Processing Utilities.
 
-This module provides audio concatenation and processing functions using pydub/ffmpeg.
+This module provides audio concatenation and processing functions. MP3 segments
+are joined frame by frame (see mp3_frames); pydub/ffmpeg is used when frames
+cannot be joined directly or TTS_AUDIO_CONCAT_MODE is "reencode".
 """
 
 import io
 import logging
 from typing import List, Sequence
 
+from flaskr.common.config import get_config
 from flaskr.common.log import AppLoggerProxy
+from flaskr.service.tts.mp3_frames import concat_mp3_frames, mp3_duration_ms
+from flaskr.util.lazy_import import LazyModule
 
 logger = AppLoggerProxy(logging.getLogger(__name__))
 
-# Try to import pydub, which wraps ffmpeg
-try:
-    from pydub import AudioSegment
-
-    PYDUB_AVAILABLE = True
-except ImportError:
-    PYDUB_AVAILABLE = False
+# pydub wraps ffmpeg and probes for it on import; it is only needed when MP3
+# frames cannot be joined directly, so it is loaded on first use.
+pydub = LazyModule("pydub")
+PYDUB_AVAILABLE = pydub.is_available
+if not PYDUB_AVAILABLE:
     logger.warning("pydub is not installed. Audio concatenation will not be available.")
 
 
+AUDIO_CONCAT_MODE_FRAMES = "frames"
+AUDIO_CONCAT_MODE_REENCODE = "reencode"
+
+
 def is_audio_processing_available() -> bool:
     """Check if audio processing is available."""
     return PYDUB_AVAILABLE
 
 
+def _concat_frames_enabled(output_format: str) -> bool:
+    if (output_format or "").lower() != "mp3":
+        return False
+    mode = str(get_config("TTS_AUDIO_CONCAT_MODE") or AUDIO_CONCAT_MODE_FRAMES)
+    return mode.strip().lower() != AUDIO_CONCAT_MODE_REENCODE
+
+
+def _try_concat_frames(segments: Sequence[bytes], output_format: str):
+    if not _concat_frames_enabled(output_format):
+        return None
+    try:
+        joined = concat_mp3_frames(segments)
+    except Exception as exc:
+        logger.warning("MP3 frame concatenation failed: %s", exc)
+        return None
+    if joined is None:
+        logger.info(
+            "MP3 segments differ in format or cannot be parsed; re-encoding instead"
+        )
+    return joined
+
+
 def concat_audio_mp3(segments: List[bytes], output_format: str = "mp3") -> bytes:
     """
     Concatenate multiple MP3 audio segments into a single audio file.
 
+    Frames are copied without decoding when every segment has the same sample
+    rate and channel count; otherwise segments are decoded, crossfaded and
+    re-encoded with pydub.
+
     Args:
         segments: List of audio data bytes (MP3 format)
         output_format: Output format (default: mp3)
@@ -42,18 +75,22 @@ def concat_audio_mp3(segments: List[bytes], output_format: str = "mp3") -> bytes
         ImportError: If pydub is not available
         ValueError: If no segments provided
     """
-    if not PYDUB_AVAILABLE:
-        raise ImportError(
-            "pydub is required for audio concatenation. "
-            "Install it with: pip install pydub"
-        )
-
     if not segments:
         raise ValueError("No audio segments to concatenate")
 
     if len(segments) == 1:
         return segments[0]
 
+    joined = _try_concat_frames(segments, output_format)
+    if joined is not None:
+        return joined
+
+    if not PYDUB_AVAILABLE:
+        raise ImportError(
+            "pydub is required for audio concatenation. "
+            "Install it with: pip install pydub"
+        )
+
     logger.info(f"Concatenating {len(segments)} audio segments")
 
     # Initialize combined audio
@@ -63,7 +100,7 @@ def concat_audio_mp3(segments: List[bytes], output_format: str = "mp3") -> bytes
         try:
             # Load audio segment from bytes
             segment_io = io.BytesIO(segment_data)
-            segment = AudioSegment.from_mp3(segment_io)
+            segment = pydub.AudioSegment.from_mp3(segment_io)
 
             if combined is None:
                 combined = segment
@@ -98,20 +135,21 @@ def concat_audio_best_effort(
     """
     Concatenate audio segments with graceful fallback when processing is unavailable.
 
-    Falls back to raw byte-join if pydub/ffmpeg are not available or fail.
+    Falls back to raw byte-join if frames cannot be joined directly and
+    pydub/ffmpeg are not available or fail.
     """
     if not segments:
         return b""
     if len(segments) == 1:
         return segments[0]
 
-    if is_audio_processing_available():
-        try:
-            return concat_audio_mp3(list(segments), output_format=output_format)
-        except Exception as exc:
-            logger.warning(
-                "Audio concatenation failed; falling back to byte-join: %s", exc
-            )
+    try:
+        return concat_audio_mp3(list(segments), output_format=output_format)
+    except ImportError:
+        # Frames could not be joined directly and pydub is not installed.
+        pass
+    except Exception as exc:
+        logger.warning("Audio concatenation failed; falling back to byte-join: %s", exc)
 
     return b"".join(segments)
 
@@ -127,6 +165,15 @@ def get_audio_duration_ms(audio_data: bytes, format: str = "mp3") -> int:
     Returns:
         Duration in milliseconds
     """
+    if (format or "").lower() == "mp3":
+        try:
+            duration_ms = mp3_duration_ms(audio_data)
+        except Exception as e:
+            logger.warning(f"Error parsing MP3 frames for duration: {e}")
+            duration_ms = None
+        if duration_ms is not None:
+            return duration_ms
+
     if not PYDUB_AVAILABLE:
         # Rough estimate based on bitrate (128kbps for MP3)
         # 128kbps = 16KB/s, so duration = size_bytes / 16000 * 1000
@@ -134,7 +181,7 @@ def get_audio_duration_ms(audio_data: bytes, format: str = "mp3") -> int:
 
     try:
         audio_io = io.BytesIO(audio_data)
-        audio = AudioSegment.from_file(audio_io, format=format)
+        audio = pydub.AudioSegment.from_file(audio_io, format=format)
         return len(audio)  # pydub returns duration in ms
     except Exception as e:
         logger.error(f"Error getting audio duration: {e}")
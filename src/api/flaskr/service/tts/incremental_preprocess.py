@@ -0,0 +1,153 @@
+"""
+Incremental TTS text normalization for streaming content.
+
+StreamingTTSProcessor receives LLM output in small chunks and submits TTS work
+sentence by sentence. Re-running preprocess_for_tts over the whole unconsumed
+buffer on every chunk, and again on O(log n) prefixes to map the cut back to
+raw text, makes long paragraphs and big SVG/code blocks quadratic.
+
+IncrementalTTSNormalizer keeps the unconsumed raw text and only rescans it when
+the new chunk can change the answer:
+
+- a sentence ending, or a mark that completes a stripped incomplete tail
+  (fence, tag, image, entity), arrived or follows one; other text can never
+  produce a new sentence ending;
+- while an incomplete non-speakable block (fence, <svg>, <math>, <script>,
+  <style>) is open, everything after its start is stripped anyway, so only its
+  closing token (or a fence/entity that changes what is stripped) triggers a
+  rescan.
+
+A rescan runs preprocess_for_tts_with_offsets once, which also returns the
+cleaned -> raw offset map, so the consumed raw length is a lookup instead of a
+binary search.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+from flaskr.service.tts import (
+    NON_SPEAKABLE_XML_TAGS,
+    preprocess_for_tts,
+    preprocess_for_tts_with_offsets,
+)
+from flaskr.service.tts.patterns import SENTENCE_ENDINGS, TTS_RESCAN_TRIGGER
+
+_FENCE = "```"
+# An HTML character reference is at most "&" + 32 chars + ";"
+_CHARREF_MAX_LEN = 34
+# Long enough to find a closing token split across chunks ("</script>")
+_TOKEN_OVERLAP = 16
+
+
+class IncrementalTTSNormalizer:
+    """
+    Turns streamed raw markdown into complete, cleaned sentences for TTS.
+
+    feed() returns the same sentences as scanning the whole unconsumed buffer
+    on every chunk would: its cleaned text up to the last sentence ending.
+    """
+
+    def __init__(self):
+        self._raw = ""
+        # Raw text already returned as sentences (or drained), in order.
+        self._consumed: list[str] = []
+        # Closing/opening tokens of open non-speakable blocks; None when no
+        # block is open at the buffer tail.
+        self._wait_tokens: Optional[tuple[str, ...]] = None
+        self._wait_from = 0
+        # A sentence ending was found but the cleaned text was too short to
+        # submit; any further text can make it long enough.
+        self._too_short = False
+        self.scan_count = 0
+
+    @property
+    def pending_raw(self) -> str:
+        """Raw text received but not yet returned as a complete sentence."""
+        return self._raw
+
+    @property
+    def raw_text(self) -> str:
+        """All raw text fed so far."""
+        return "".join(self._consumed) + self._raw
+
+    def feed(self, chunk: str) -> str:
+        """
+        Append a streamed chunk.
+
+        Args:
+            chunk: Raw markdown chunk
+
+        Returns:
+            Cleaned text up to the last complete sentence ending ("" if none);
+            the matching raw text is consumed.
+        """
+        if not chunk:
+            return ""
+        self._raw += chunk
+        if not self._should_scan(chunk):
+            return ""
+        return self._scan()
+
+    def drain(self) -> str:
+        """Clean and return everything that is left, e.g. on finalize."""
+        remaining = preprocess_for_tts(self._raw).strip() if self._raw else ""
+        if self._raw:
+            self._consumed.append(self._raw)
+        self._raw = ""
+        self._wait_tokens = None
+        self._too_short = False
+        return remaining
+
+    def _should_scan(self, chunk: str) -> bool:
+        if self._too_short:
+            return True
+        if self._wait_tokens is None:
+            # Include the previous character: "<" or "![" at the old tail can be
+            # completed or invalidated by whatever follows them.
+            if TTS_RESCAN_TRIGGER.search(
+                self._raw, max(len(self._raw) - len(chunk) - 1, 0)
+            ):
+                return True
+            # An entity can complete without a trigger character ("&#46" + "x")
+            return "&" in self._raw[-(len(chunk) + _CHARREF_MAX_LEN) :]
+
+        if "`" in chunk or "&" in chunk:
+            return True
+        window = self._raw[max(self._wait_from - _TOKEN_OVERLAP, 0) :].lower()
+        self._wait_from = len(self._raw)
+        return any(token in window for token in self._wait_tokens)
+
+    def _scan(self) -> str:
+        self.scan_count += 1
+        self._wait_tokens = None
+        cleaned, ends = preprocess_for_tts_with_offsets(self._raw)
+        last_match = None
+        for last_match in SENTENCE_ENDINGS.finditer(cleaned):
+            pass
+        self._too_short = last_match is not None and len(cleaned) < 2
+        if last_match is None or self._too_short:
+            self._update_wait_state()
+            return ""
+        end = last_match.end()
+        cut = ends[end - 1]
+        self._consumed.append(self._raw[:cut])
+        self._raw = self._raw[cut:]
+        return cleaned[:end]
+
+    def _update_wait_state(self):
+        raw = self._raw
+        if raw.count(_FENCE) % 2 == 1:
+            # Only a fence (checked per chunk) can end an open code block.
+            self._wait_tokens = ()
+            self._wait_from = len(raw)
+            return
+        lower = raw.lower()
+        tokens: list[str] = []
+        for tag in NON_SPEAKABLE_XML_TAGS:
+            start = lower.rfind(f"<{tag}")
+            if start != -1 and lower.find(f"</{tag}>", start) == -1:
+                tokens.extend((f"</{tag}>", f"<{tag}"))
+        if tokens:
+            self._wait_tokens = tuple(tokens)
+            self._wait_from = len(raw)
@@ -0,0 +1,404 @@
+"""
+MP3 frame parsing and frame-level concatenation.
+
+TTS providers return MPEG audio Layer III segments encoded with the same
+settings, so a lesson block can be joined by copying frames instead of decoding
+to PCM and re-encoding. This module parses frame headers in pure Python,
+strips ID3v2/ID3v1/APE tags and Xing/Info/VBRI header frames, and writes one
+new Xing/Info + LAME header for the joined stream. Durations come from frame
+headers, so no decoder is needed to measure them either.
+
+Segments with a different sample rate, MPEG version or channel count cannot be
+joined this way; concat_mp3_frames returns None and the caller falls back to
+pydub.
+"""
+
+from __future__ import annotations
+
+import struct
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence
+
+# MPEG version bits -> version id used below
+_MPEG1 = 3
+_MPEG2 = 2
+_MPEG25 = 0
+
+_LAYER3 = 1  # layer bits 01
+
+_BITRATES_KBPS = {
+    _MPEG1: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    _MPEG2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_BITRATES_KBPS[_MPEG25] = _BITRATES_KBPS[_MPEG2]
+
+_SAMPLE_RATES = {
+    _MPEG1: (44100, 48000, 32000),
+    _MPEG2: (22050, 24000, 16000),
+    _MPEG25: (11025, 12000, 8000),
+}
+
+_CHANNEL_MODE_MONO = 3
+
+_XING_TAGS = (b"Xing", b"Info")
+_VBRI_OFFSET = 36
+_LAME_TAG_SIZE = 36
+_XING_FLAGS = 0x0F  # frames, bytes, TOC, quality
+_XING_QUALITY = 100
+_ENCODER = b"LAME3.100"
+
+
+@dataclass(frozen=True)
+class FrameHeader:
+    version: int
+    bitrate_index: int
+    sample_rate_index: int
+    padding: int
+    channel_mode: int
+    raw: bytes
+
+    @property
+    def bitrate(self) -> int:
+        return _BITRATES_KBPS[self.version][self.bitrate_index] * 1000
+
+    @property
+    def sample_rate(self) -> int:
+        return _SAMPLE_RATES[self.version][self.sample_rate_index]
+
+    @property
+    def channels(self) -> int:
+        return 1 if self.channel_mode == _CHANNEL_MODE_MONO else 2
+
+    @property
+    def samples_per_frame(self) -> int:
+        return 1152 if self.version == _MPEG1 else 576
+
+    @property
+    def frame_length(self) -> int:
+        coefficient = 144 if self.version == _MPEG1 else 72
+        return coefficient * self.bitrate // self.sample_rate + self.padding
+
+    @property
+    def side_info_size(self) -> int:
+        if self.version == _MPEG1:
+            return 17 if self.channels == 1 else 32
+        return 9 if self.channels == 1 else 17
+
+    def same_format(self, other: "FrameHeader") -> bool:
+        return (
+            self.version == other.version
+            and self.sample_rate_index == other.sample_rate_index
+            and self.channels == other.channels
+        )
+
+
+def parse_frame_header(data: bytes, offset: int = 0) -> Optional[FrameHeader]:
+    """Parse a Layer III frame header at offset, or return None."""
+    if offset + 4 > len(data):
+        return None
+    b0, b1, b2, b3 = data[offset : offset + 4]
+    if b0 != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+    version = (b1 >> 3) & 0x03
+    layer = (b1 >> 1) & 0x03
+    bitrate_index = (b2 >> 4) & 0x0F
+    sample_rate_index = (b2 >> 2) & 0x03
+    # reserved version, non Layer III, free format or invalid bitrate/rate
+    if version == 1 or layer != _LAYER3:
+        return None
+    if bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+    return FrameHeader(
+        version=version,
+        bitrate_index=bitrate_index,
+        sample_rate_index=sample_rate_index,
+        padding=(b2 >> 1) & 0x01,
+        channel_mode=(b3 >> 6) & 0x03,
+        raw=bytes(data[offset : offset + 4]),
+    )
+
+
+@dataclass
+class Mp3Stream:
+    """Audio frames of one MP3 file, without tags and info frames."""
+
+    header: FrameHeader
+    frames: List[memoryview] = field(default_factory=list)
+    encoder_delay: Optional[int] = None
+    encoder_padding: Optional[int] = None
+
+    @property
+    def frame_count(self) -> int:
+        return len(self.frames)
+
+    @property
+    def byte_length(self) -> int:
+        return sum(len(frame) for frame in self.frames)
+
+    @property
+    def sample_count(self) -> int:
+        return self.frame_count * self.header.samples_per_frame
+
+    @property
+    def duration_ms(self) -> int:
+        samples = self.sample_count - (self.encoder_delay or 0)
+        samples -= self.encoder_padding or 0
+        return int(max(samples, 0) * 1000 / self.header.sample_rate)
+
+
+def _skip_id3v2(data: bytes, offset: int) -> int:
+    while data[offset : offset + 3] == b"ID3" and offset + 10 <= len(data):
+        size_bytes = data[offset + 6 : offset + 10]
+        if any(byte & 0x80 for byte in size_bytes):
+            break
+        size = 0
+        for byte in size_bytes:
+            size = (size << 7) | byte
+        footer = 10 if data[offset + 5] & 0x10 else 0
+        offset += 10 + size + footer
+    return offset
+
+
+def _audio_end(data: bytes) -> int:
+    end = len(data)
+    if end >= 128 and data[end - 128 : end - 125] == b"TAG":
+        end -= 128
+    # APEv2 footer: "APETAGEX", version, tag size (incl. footer), items, flags
+    if end >= 32 and data[end - 32 : end - 24] == b"APETAGEX":
+        tag_size, _items, flags = struct.unpack("<III", data[end - 20 : end - 8])
+        end -= tag_size + (32 if flags & 0x80000000 else 0)
+    return max(end, 0)
+
+
+def _is_info_frame(frame: memoryview, header: FrameHeader) -> bool:
+    xing_offset = 4 + header.side_info_size
+    if bytes(frame[xing_offset : xing_offset + 4]) in _XING_TAGS:
+        return True
+    return bytes(frame[_VBRI_OFFSET : _VBRI_OFFSET + 4]) == b"VBRI"
+
+
+def _read_lame_delay(frame: memoryview, header: FrameHeader) -> Optional[tuple]:
+    xing_offset = 4 + header.side_info_size
+    if bytes(frame[xing_offset : xing_offset + 4]) not in _XING_TAGS:
+        return None
+    flags = struct.unpack(">I", frame[xing_offset + 4 : xing_offset + 8])[0]
+    lame_offset = xing_offset + 8
+    lame_offset += 4 if flags & 0x01 else 0
+    lame_offset += 4 if flags & 0x02 else 0
+    lame_offset += 100 if flags & 0x04 else 0
+    lame_offset += 4 if flags & 0x08 else 0
+    if (
+        len(frame) < lame_offset + 24
+        or not bytes(frame[lame_offset : lame_offset + 4]).isalpha()
+    ):
+        return None
+    b0, b1, b2 = frame[lame_offset + 21 : lame_offset + 24]
+    return (b0 << 4) | (b1 >> 4), ((b1 & 0x0F) << 8) | b2
+
+
+def parse_mp3(data: bytes) -> Optional[Mp3Stream]:
+    """
+    Split MP3 data into audio frames.
+
+    Args:
+        data: MP3 file bytes
+
+    Returns:
+        Mp3Stream, or None when no Layer III frames are found
+    """
+    if not data:
+        return None
+    view = memoryview(data)
+    offset = _skip_id3v2(data, 0)
+    end = _audio_end(data)
+    stream: Optional[Mp3Stream] = None
+    while offset + 4 <= end:
+        header = parse_frame_header(data, offset)
+        if header is not None and (stream is None or header.same_format(stream.header)):
+            length = header.frame_length
+            if offset + length > end:
+                break  # truncated last frame
+            if stream is None:
+                # Require the next frame to agree before trusting the first sync.
+                following = parse_frame_header(data, offset + length)
+                if offset + length < end and (
+                    following is None or not following.same_format(header)
+                ):
+                    header = None
+            if header is not None:
+                frame = view[offset : offset + length]
+                if stream is None:
+                    stream = Mp3Stream(header=header)
+                if _is_info_frame(frame, header):
+                    # Xing/Info/VBRI frames are silent metadata, not audio.
+                    if not stream.frames and stream.encoder_delay is None:
+                        delay = _read_lame_delay(frame, header)
+                        if delay is not None:
+                            stream.encoder_delay, stream.encoder_padding = delay
+                else:
+                    stream.frames.append(frame)
+                offset += length
+                continue
+        # Lost sync (junk or an embedded tag): scan for the next frame.
+        next_sync = data.find(b"\xff", offset + 1, end)
+        if next_sync == -1:
+            break
+        offset = next_sync
+    if stream is None or not stream.frames:
+        return None
+    return stream
+
+
+def _crc16_table() -> tuple:
+    table = []
+    for value in range(256):
+        crc = value
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+        table.append(crc)
+    return tuple(table)
+
+
+_CRC16_TABLE = _crc16_table()
+
+
+def _crc16(chunks: Sequence[bytes]) -> int:
+    """CRC-16 (poly 0x8005, reflected) as used by the LAME tag."""
+    crc = 0
+    table = _CRC16_TABLE
+    for chunk in chunks:
+        for byte in chunk:
+            crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
+    return crc
+
+
+def _info_frame_header(template: FrameHeader, min_length: int) -> FrameHeader:
+    for bitrate_index in range(1, 15):
+        header = FrameHeader(
+            version=template.version,
+            bitrate_index=bitrate_index,
+            sample_rate_index=template.sample_rate_index,
+            padding=0,
+            channel_mode=template.channel_mode,
+            raw=b"",
+        )
+        if header.frame_length >= min_length:
+            b1 = 0xE0 | (template.version << 3) | (_LAYER3 << 1) | 0x01  # no CRC
+            b2 = (bitrate_index << 4) | (template.sample_rate_index << 2)
+            b3 = (template.channel_mode << 6) | (template.raw[3] & 0x0F)
+            return FrameHeader(
+                version=template.version,
+                bitrate_index=bitrate_index,
+                sample_rate_index=template.sample_rate_index,
+                padding=0,
+                channel_mode=template.channel_mode,
+                raw=bytes((0xFF, b1, b2, b3)),
+            )
+    raise ValueError("No bitrate can hold the Xing/LAME header")
+
+
+def build_info_frame(
+    template: FrameHeader,
+    frames: Sequence[memoryview],
+    *,
+    encoder_delay: int = 0,
+    encoder_padding: int = 0,
+) -> bytes:
+    """
+    Build a Xing ("Info" for CBR) + LAME header frame describing frames.
+
+    Args:
+        template: header of the audio frames (version, rate, channel mode)
+        frames: the audio frames that follow the header frame
+        encoder_delay: samples to skip at the start (gapless playback)
+        encoder_padding: samples to skip at the end
+
+    Returns:
+        bytes: one silent MP3 frame carrying the headers
+    """
+    xing_offset = 4 + template.side_info_size
+    lame_offset = xing_offset + 4 + 4 + 4 + 4 + 100 + 4
+    header = _info_frame_header(template, lame_offset + _LAME_TAG_SIZE)
+    frame = bytearray(header.frame_length)
+    frame[0:4] = header.raw
+
+    audio_bytes = sum(len(chunk) for chunk in frames)
+    total_bytes = len(frame) + audio_bytes
+    is_cbr = len({chunk[2] >> 4 for chunk in frames}) <= 1
+
+    toc = bytearray(100)
+    if frames and audio_bytes:
+        positions = []
+        position = len(frame)
+        for chunk in frames:
+            positions.append(position)
+            position += len(chunk)
+        for percent in range(100):
+            index = min(len(frames) * percent // 100, len(frames) - 1)
+            toc[percent] = min(positions[index] * 256 // total_bytes, 255)
+
+    struct.pack_into(
+        ">4sIII",
+        frame,
+        xing_offset,
+        b"Info" if is_cbr else b"Xing",
+        _XING_FLAGS,
+        len(frames),
+        total_bytes,
+    )
+    frame[xing_offset + 16 : xing_offset + 116] = toc
+    struct.pack_into(">I", frame, xing_offset + 116, _XING_QUALITY)
+
+    delay = max(min(int(encoder_delay), 0xFFF), 0)
+    padding = max(min(int(encoder_padding), 0xFFF), 0)
+    lame = bytearray(_LAME_TAG_SIZE)
+    lame[0:9] = _ENCODER
+    lame[9] = 0x00 if is_cbr else 0x03  # tag revision 0, VBR method
+    lame[21:24] = bytes(
+        ((delay >> 4) & 0xFF, ((delay & 0x0F) << 4) | (padding >> 8), padding & 0xFF)
+    )
+    struct.pack_into(">IH", lame, 28, total_bytes, _crc16(frames))
+    frame[lame_offset : lame_offset + _LAME_TAG_SIZE] = lame
+    tag_crc = _crc16([frame[: lame_offset + _LAME_TAG_SIZE - 2]])
+    struct.pack_into(">H", frame, lame_offset + _LAME_TAG_SIZE - 2, tag_crc)
+    return bytes(frame)
+
+
+def concat_mp3_frames(segments: Sequence[bytes]) -> Optional[bytes]:
+    """
+    Join MP3 segments frame by frame, without decoding.
+
+    Args:
+        segments: MP3 files from the same voice/settings
+
+    Returns:
+        bytes: one MP3 with a fresh Xing/LAME header, or None when a segment
+        cannot be parsed or the formats (rate, version, channels) differ
+    """
+    streams = []
+    for segment in segments:
+        stream = parse_mp3(segment)
+        if stream is None:
+            return None
+        if streams and not stream.header.same_format(streams[0].header):
+            return None
+        streams.append(stream)
+    if not streams:
+        return None
+
+    frames = [frame for stream in streams for frame in stream.frames]
+    info_frame = build_info_frame(
+        streams[0].header,
+        frames,
+        encoder_delay=streams[0].encoder_delay or 0,
+        encoder_padding=streams[-1].encoder_padding or 0,
+    )
+    return b"".join([info_frame, *frames])
+
+
+def mp3_duration_ms(data: bytes) -> Optional[int]:
+    """Duration from frame headers (minus encoder delay/padding), or None."""
+    stream = parse_mp3(data)
+    if stream is None:
+        return None
+    return stream.duration_ms
@@ -22,6 +22,8 @@ XML_BLOCK = re.compile(r"<(svg|math|script|style)[^>]*>[\s\S]*?</\1>", re.IGNORE
 DATA_URI = re.compile(r"data:[a-zA-Z0-9/+;=,]+")
 MULTI_NEWLINE = re.compile(r"\n{3,}")
 MULTI_SPACE = re.compile(r"[ \t]+")
+# Same effect as MULTI_SPACE -> " " but skips single spaces, which are no-ops.
+MULTI_SPACE_COLLAPSE = re.compile(r"[ \t]{2,}|\t")
 ANY_HTML_TAG = re.compile(r"<[^>]*>")
 
 # Stray SVG text elements (malformed streaming fragments)
@@ -67,6 +69,13 @@ FIXED_MARKER_TAIL = re.compile(r"^[\s!=]*$")
 # Streaming TTS
 # ---------------------------------------------------------------------------
 SENTENCE_ENDINGS = re.compile(r"[.!?。！？；;]")
+# Characters after which rescanning a stream buffer can reveal a new sentence
+# ending: the endings themselves, marks that complete or invalidate a stripped
+# incomplete tail (fences, tags, images) and entity starts.
+TTS_RESCAN_TRIGGER = re.compile(r"[.!?。！？；;`<>\[)&]")
+
+# HTML character references, as matched by html.unescape
+HTML_CHARREF = re.compile(r"&(#[0-9]+;?|#[xX][0-9a-fA-F]+;?|[^\t\n\f <&#;]{1,32};?)")
 
 # ---------------------------------------------------------------------------
 # HTML tag extraction helpers
@@ -21,15 +21,14 @@ import logging
 import re
 import time
 import uuid
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from dataclasses import dataclass
+from concurrent.futures import FIRST_COMPLETED, wait
+from dataclasses import dataclass, replace
 from typing import Optional, Sequence
 
 from flask import Flask
 
 from flaskr.common.config import get_config
 from flaskr.api.tts import (
-    synthesize_text,
     is_tts_configured,
     get_default_voice_settings,
     get_default_audio_settings,
@@ -41,6 +40,13 @@ from flaskr.service.tts.audio_utils import (
     concat_audio_best_effort,
     get_audio_duration_ms,
 )
+from flaskr.service.tts.audio_cache import (
+    SEGMENT_CACHED,
+    SEGMENT_SHARED,
+    SEGMENT_SYNTHESIZED,
+    synthesize_text_cached,
+)
+from flaskr.service.tts.scheduler import PRIORITY_BATCH, tts_scheduler
 from flaskr.service.tts.tts_handler import upload_audio_to_oss
 from flaskr.common.log import AppLoggerProxy
 from flaskr.service.metering import UsageContext, record_tts_usage
@@ -718,8 +724,10 @@ def synthesize_long_text_to_oss(
     Synthesize a long text, upload the final audio to OSS, and return URL + metrics.
 
     Notes:
-    - Uses the unified TTS client (`flaskr.api.tts.synthesize_text`).
-    - Segments are synthesized in parallel (bounded by `max_workers`).
+    - Uses the unified TTS client (`flaskr.api.tts.synthesize_text`) through the
+      TTS audio cache; cached segments are recorded as non-billable usage.
+    - Segments are synthesized in parallel on the shared TTS scheduler
+      (at most `max_workers` queued at a time, batch priority).
     - Final output is uploaded as an MP3 file for browser playback.
     """
     provider = (provider_name or "").strip().lower()
@@ -743,6 +751,9 @@ def synthesize_long_text_to_oss(
     usage_parent_bid = ""
     usage_metadata: Optional[dict] = None
     total_word_count = 0
+    cache_hit_count = 0
+    shared_count = 0
+    unbilled_length = 0
     if usage_context is not None:
         usage_parent_bid = parent_usage_bid or generate_id(app)
 
@@ -772,26 +783,60 @@ def synthesize_long_text_to_oss(
     if sleep_between_segments < 0:
         raise ValueError("sleep_between_segments must be >= 0")
 
+    def _synthesize_in_app_context(segment_text: str):
+        with app.app_context():
+            return synthesize_text_cached(
+                app,
+                text=segment_text,
+                voice_settings=voice_settings,
+                audio_settings=audio_settings,
+                model=(model or "").strip() or None,
+                provider_name=provider,
+            )
+
+    def _segment_usage_context(source: str):
+        # Cached segments skipped the provider call and shared ones are
+        # billed to the caller that ran the synthesis.
+        if source != SEGMENT_SYNTHESIZED:
+            return replace(usage_context, billable=0)
+        return usage_context
+
+    def _segment_usage_extra(source: str):
+        if source == SEGMENT_CACHED:
+            return {**(usage_metadata or {}), "cache_hit": True}
+        if source == SEGMENT_SHARED:
+            return {**(usage_metadata or {}), "shared_synthesis": True}
+        return usage_metadata
+
+    def _schedule(segment_text: str):
+        return tts_scheduler.submit(
+            _synthesize_in_app_context,
+            segment_text,
+            provider=provider,
+            priority=PRIORITY_BATCH,
+        )
+
     if max_workers == 1:
         audio_parts: list[bytes] = []
         with app.app_context():
             for index, segment_text in enumerate(segments):
                 segment_start = time.monotonic()
-                result = synthesize_text(
-                    text=segment_text,
-                    voice_settings=voice_settings,
-                    audio_settings=audio_settings,
-                    model=(model or "").strip() or None,
-                    provider_name=provider,
-                )
+                result, source = _schedule(segment_text).result()
                 audio_parts.append(result.audio_data)
                 if usage_context is not None:
                     segment_length = len(segment_text or "")
-                    total_word_count += int(result.word_count or 0)
+                    if source == SEGMENT_SYNTHESIZED:
+                        total_word_count += int(result.word_count or 0)
+                    else:
+                        unbilled_length += segment_length
+                        if source == SEGMENT_CACHED:
+                            cache_hit_count += 1
+                        else:
+                            shared_count += 1
                     latency_ms = int((time.monotonic() - segment_start) * 1000)
                     record_tts_usage(
                         app,
-                        usage_context,
+                        _segment_usage_context(source),
                         provider=provider,
                         model=(model or "").strip(),
                         is_stream=False,
@@ -805,7 +850,7 @@ def synthesize_long_text_to_oss(
                         parent_usage_bid=usage_parent_bid,
                         segment_index=index,
                         segment_count=0,
-                        extra=usage_metadata,
+                        extra=_segment_usage_extra(source),
                     )
                 if sleep_between_segments and index < len(segments) - 1:
                     time.sleep(sleep_between_segments)
@@ -818,53 +863,53 @@ def synthesize_long_text_to_oss(
         audio_parts = [b""] * len(segments)
         segment_map = {idx: segment for idx, segment in enumerate(segments)}
 
-        def _synthesize_in_app_context(segment_text: str):
-            with app.app_context():
-                return synthesize_text(
-                    text=segment_text,
-                    voice_settings=voice_settings,
-                    audio_settings=audio_settings,
-                    model=(model or "").strip() or None,
-                    provider_name=provider,
-                )
-
-        with ThreadPoolExecutor(
-            max_workers=min(max_workers, len(segments))
-        ) as executor:
-            future_map = {
-                executor.submit(
-                    _synthesize_in_app_context,
-                    segment_text,
-                ): index
-                for index, segment_text in enumerate(segments)
-            }
-
-            for future in as_completed(future_map):
-                index = future_map[future]
-                result = future.result()
-                audio_parts[index] = result.audio_data
-                if usage_context is not None:
-                    segment_text = segment_map.get(index, "")
-                    segment_length = len(segment_text or "")
-                    total_word_count += int(result.word_count or 0)
-                    record_tts_usage(
-                        app,
-                        usage_context,
-                        provider=provider,
-                        model=(model or "").strip(),
-                        is_stream=False,
-                        input=segment_length,
-                        output=segment_length,
-                        total=segment_length,
-                        word_count=int(result.word_count or 0),
-                        duration_ms=int(result.duration_ms or 0),
-                        latency_ms=0,
-                        record_level=1,
-                        parent_usage_bid=usage_parent_bid,
-                        segment_index=index,
-                        segment_count=0,
-                        extra=usage_metadata,
-                    )
+        # Keep at most `max_workers` segments of this call queued so other
+        # jobs (and live streaming) interleave on the shared scheduler.
+        window = min(max_workers, len(segments))
+        future_map = {}
+        next_index = 0
+        try:
+            while future_map or next_index < len(segments):
+                while next_index < len(segments) and len(future_map) < window:
+                    future_map[_schedule(segments[next_index])] = next_index
+                    next_index += 1
+                done, _ = wait(future_map, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = future_map.pop(future)
+                    result, source = future.result()
+                    audio_parts[index] = result.audio_data
+                    if usage_context is not None:
+                        segment_text = segment_map.get(index, "")
+                        segment_length = len(segment_text or "")
+                        if source == SEGMENT_SYNTHESIZED:
+                            total_word_count += int(result.word_count or 0)
+                        else:
+                            unbilled_length += segment_length
+                            if source == SEGMENT_CACHED:
+                                cache_hit_count += 1
+                            else:
+                                shared_count += 1
+                        record_tts_usage(
+                            app,
+                            _segment_usage_context(source),
+                            provider=provider,
+                            model=(model or "").strip(),
+                            is_stream=False,
+                            input=segment_length,
+                            output=segment_length,
+                            total=segment_length,
+                            word_count=int(result.word_count or 0),
+                            duration_ms=int(result.duration_ms or 0),
+                            latency_ms=0,
+                            record_level=1,
+                            parent_usage_bid=usage_parent_bid,
+                            segment_index=index,
+                            segment_count=0,
+                            extra=_segment_usage_extra(source),
+                        )
+        finally:
+            for future in future_map:
+                future.cancel()
 
     final_audio = concat_audio_best_effort(audio_parts)
     if not final_audio:
@@ -879,9 +924,24 @@ def synthesize_long_text_to_oss(
     elapsed = time.monotonic() - start
 
     if usage_context is not None:
+        summary_context = usage_context
+        if cache_hit_count or shared_count:
+            # Bill only the synthesized segments, like their segment records.
+            usage_metadata = {
+                **usage_metadata,
+                "cache_hit_count": cache_hit_count,
+                "shared_count": shared_count,
+                "unbilled_length": unbilled_length,
+            }
+            if cache_hit_count + shared_count >= len(segments):
+                summary_context = replace(usage_context, billable=0)
+                raw_length = cleaned_length = 0
+            else:
+                raw_length = max(0, raw_length - unbilled_length)
+                cleaned_length = max(0, cleaned_length - unbilled_length)
         record_tts_usage(
             app,
-            usage_context,
+            summary_context,
             usage_bid=usage_parent_bid,
             provider=provider,
             model=(model or "").strip(),
@@ -0,0 +1,403 @@
+"""
+Shared TTS scheduler.
+
+Every TTS path (listen-mode streaming and batch synthesis) submits work to the
+process-wide ``tts_scheduler``. It runs tasks on one bounded worker pool and
+dispatches them by priority (live streaming before batch), while keeping each
+provider under its own concurrency and QPS limits.
+
+Configuration (read when the first task is submitted):
+- TTS_WORKER_POOL_SIZE: worker threads shared by all providers
+- TTS_QUEUE_MAX_SIZE: maximum queued tasks before submissions are rejected
+- TTS_STREAM_RESERVED_WORKERS: workers batch tasks may never occupy
+- TTS_PROVIDER_MAX_CONCURRENCY: default in-flight limit per provider
+- TTS_PROVIDER_LIMITS: per-provider overrides, e.g. "minimax=4:10,baidu=2"
+  (concurrency[:requests per second])
+"""
+
+from __future__ import annotations
+
+import atexit
+import heapq
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from flaskr.common.config import get_config
+from flaskr.common.log import AppLoggerProxy
+
+
+logger = AppLoggerProxy(logging.getLogger(__name__))
+
+PRIORITY_STREAM = 0
+PRIORITY_BATCH = 10
+
+DEFAULT_PROVIDER_KEY = "default"
+
+
+class TTSQueueFullError(RuntimeError):
+    """Raised when the scheduler queue is at capacity."""
+
+
+@dataclass(frozen=True)
+class ProviderLimit:
+    """Concurrency and rate limit for one provider (rate 0 means unlimited)."""
+
+    max_concurrency: int
+    rate_per_second: float = 0.0
+
+
+def parse_provider_limits(value: str) -> Dict[str, ProviderLimit]:
+    """Parse ``"minimax=4:10,baidu=2"`` into provider limits."""
+    limits: Dict[str, ProviderLimit] = {}
+    for item in (value or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, sep, spec = item.partition("=")
+        name = name.strip().lower()
+        if not sep or not name:
+            logger.warning("Ignoring malformed TTS provider limit: %s", item)
+            continue
+        concurrency, _, rate = spec.partition(":")
+        try:
+            limits[name] = ProviderLimit(
+                max_concurrency=max(1, int(concurrency)),
+                rate_per_second=max(0.0, float(rate or 0)),
+            )
+        except ValueError:
+            logger.warning("Ignoring malformed TTS provider limit: %s", item)
+    return limits
+
+
+@dataclass(order=True)
+class _Task:
+    priority: int
+    seq: int
+    provider: str = field(compare=False)
+    fn: Callable[..., Any] = field(compare=False)
+    args: Tuple[Any, ...] = field(compare=False)
+    kwargs: Dict[str, Any] = field(compare=False)
+    future: Future = field(compare=False)
+    enqueued_at: float = field(compare=False)
+
+
+class _ProviderState:
+    """Pending tasks, in-flight count and token bucket for one provider."""
+
+    def __init__(self, limit: ProviderLimit, now: float):
+        self.limit = limit
+        self.pending: List[_Task] = []
+        self.in_flight = 0
+        self.tokens = 1.0
+        self.refilled_at = now
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+
+    def _refill(self, now: float) -> None:
+        rate = self.limit.rate_per_second
+        if rate <= 0:
+            return
+        burst = max(1.0, rate)
+        self.tokens = min(burst, self.tokens + (now - self.refilled_at) * rate)
+        self.refilled_at = now
+
+    def ready_in(self, now: float) -> float:
+        """Seconds until the head task may start (0 when it may start now)."""
+        if self.in_flight >= self.limit.max_concurrency:
+            return float("inf")
+        if self.limit.rate_per_second <= 0:
+            return 0.0
+        self._refill(now)
+        if self.tokens >= 1.0:
+            return 0.0
+        return (1.0 - self.tokens) / self.limit.rate_per_second
+
+    def take_token(self) -> None:
+        if self.limit.rate_per_second > 0:
+            self.tokens -= 1.0
+
+
+class TTSScheduler:
+    """Bounded, prioritized worker pool shared by all TTS synthesis."""
+
+    def __init__(
+        self,
+        *,
+        max_workers: Optional[int] = None,
+        max_queue_size: Optional[int] = None,
+        reserved_stream_workers: Optional[int] = None,
+        default_concurrency: Optional[int] = None,
+        provider_limits: Optional[Dict[str, ProviderLimit]] = None,
+        clock: Callable[[], float] = time.monotonic,
+        thread_name_prefix: str = "tts_",
+    ):
+        self._max_workers = max_workers
+        self._max_queue_size = max_queue_size
+        self._reserved_stream_workers = reserved_stream_workers
+        self._default_concurrency = default_concurrency
+        self._provider_limits = provider_limits
+        self._clock = clock
+        self._thread_name_prefix = thread_name_prefix
+
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        self._providers: Dict[str, _ProviderState] = {}
+        self._workers: List[threading.Thread] = []
+        self._configured = False
+        self._shutdown = False
+        self._queued = 0
+        self._running = 0
+        self._running_batch = 0
+        self._rejected = 0
+        self._wait_count = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _configure(self) -> None:
+        if self._configured:
+            return
+        if self._max_workers is None:
+            self._max_workers = int(get_config("TTS_WORKER_POOL_SIZE") or 8)
+        if self._max_queue_size is None:
+            self._max_queue_size = int(get_config("TTS_QUEUE_MAX_SIZE") or 0)
+        if self._reserved_stream_workers is None:
+            self._reserved_stream_workers = int(
+                get_config("TTS_STREAM_RESERVED_WORKERS") or 0
+            )
+        if self._default_concurrency is None:
+            self._default_concurrency = int(
+                get_config("TTS_PROVIDER_MAX_CONCURRENCY") or 4
+            )
+        if self._provider_limits is None:
+            self._provider_limits = parse_provider_limits(
+                str(get_config("TTS_PROVIDER_LIMITS") or "")
+            )
+        self._max_workers = max(1, self._max_workers)
+        self._reserved_stream_workers = min(
+            max(0, self._reserved_stream_workers), self._max_workers - 1
+        )
+        self._configured = True
+
+    def _provider_state(self, provider: str) -> _ProviderState:
+        state = self._providers.get(provider)
+        if state is None:
+            limit = self._provider_limits.get(provider) or ProviderLimit(
+                max_concurrency=max(1, self._default_concurrency)
+            )
+            state = _ProviderState(limit, self._clock())
+            self._providers[provider] = state
+        return state
+
+    def _start_workers(self) -> None:
+        while len(self._workers) < self._max_workers:
+            worker = threading.Thread(
+                target=self._worker_loop,
+                name=f"{self._thread_name_prefix}{len(self._workers)}",
+                daemon=True,
+            )
+            self._workers.append(worker)
+            worker.start()
+
+    def submit(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        provider: str = "",
+        priority: int = PRIORITY_BATCH,
+        **kwargs: Any,
+    ) -> Future:
+        """
+        Queue ``fn(*args, **kwargs)`` and return a Future for its result.
+
+        Raises:
+            RuntimeError: If the scheduler has been shut down
+            TTSQueueFullError: If the queue is at capacity
+        """
+        provider_key = (provider or "").strip().lower() or DEFAULT_PROVIDER_KEY
+        future: Future = Future()
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("TTS scheduler has been shut down")
+            self._configure()
+            if self._max_queue_size and self._queued >= self._max_queue_size:
+                self._rejected += 1
+                raise TTSQueueFullError(
+                    f"TTS queue is full ({self._queued} tasks, provider={provider_key})"
+                )
+            state = self._provider_state(provider_key)
+            task = _Task(
+                priority=priority,
+                seq=next(self._seq),
+                provider=provider_key,
+                fn=fn,
+                args=args,
+                kwargs=kwargs,
+                future=future,
+                enqueued_at=self._clock(),
+            )
+            heapq.heappush(state.pending, task)
+            state.submitted += 1
+            self._queued += 1
+            self._start_workers()
+            self._cond.notify()
+        return future
+
+    def _next_task(self) -> Tuple[Optional[_Task], Optional[float]]:
+        """Pick the best runnable task, or return how long to wait for one."""
+        now = self._clock()
+        batch_slots = self._max_workers - self._reserved_stream_workers
+        best: Optional[_Task] = None
+        best_state: Optional[_ProviderState] = None
+        wait: Optional[float] = None
+        for state in self._providers.values():
+            if not state.pending:
+                continue
+            head = state.pending[0]
+            if head.priority > PRIORITY_STREAM and self._running_batch >= batch_slots:
+                continue
+            ready_in = state.ready_in(now)
+            if ready_in > 0:
+                if ready_in != float("inf"):
+                    wait = ready_in if wait is None else min(wait, ready_in)
+                continue
+            if best is None or head < best:
+                best, best_state = head, state
+        if best is None:
+            return None, wait
+        heapq.heappop(best_state.pending)
+        best_state.take_token()
+        best_state.in_flight += 1
+        self._queued -= 1
+        self._running += 1
+        if best.priority > PRIORITY_STREAM:
+            self._running_batch += 1
+        waited = now - best.enqueued_at
+        self._wait_count += 1
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+        return best, None
+
+    def _worker_loop(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    task, wait = self._next_task()
+                    if task is not None:
+                        break
+                    if self._shutdown and self._queued == 0:
+                        return
+                    self._cond.wait(timeout=wait)
+            self._run(task)
+
+    def _run(self, task: _Task) -> None:
+        error: Optional[BaseException] = None
+        result: Any = None
+        run = task.future.set_running_or_notify_cancel()
+        if run:
+            try:
+                result = task.fn(*task.args, **task.kwargs)
+            except BaseException as exc:
+                error = exc
+        # Release the slot before resolving the future so waiters observe
+        # up-to-date stats and can submit follow-up work immediately.
+        with self._cond:
+            state = self._providers[task.provider]
+            state.in_flight -= 1
+            if error is not None:
+                state.failed += 1
+            else:
+                state.completed += 1
+            self._running -= 1
+            if task.priority > PRIORITY_STREAM:
+                self._running_batch -= 1
+            self._cond.notify_all()
+        if not run:
+            return
+        if error is not None:
+            task.future.set_exception(error)
+        else:
+            task.future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of queue depth, wait times and per-provider load."""
+        with self._cond:
+            return {
+                "workers": len(self._workers),
+                "queued": self._queued,
+                "running": self._running,
+                "rejected": self._rejected,
+                "wait_count": self._wait_count,
+                "wait_avg_ms": (
+                    int(self._wait_total / self._wait_count * 1000)
+                    if self._wait_count
+                    else 0
+                ),
+                "wait_max_ms": int(self._wait_max * 1000),
+                "providers": {
+                    name: {
+                        "queued": len(state.pending),
+                        "in_flight": state.in_flight,
+                        "max_concurrency": state.limit.max_concurrency,
+                        "rate_per_second": state.limit.rate_per_second,
+                        "submitted": state.submitted,
+                        "completed": state.completed,
+                        "failed": state.failed,
+                    }
+                    for name, state in self._providers.items()
+                },
+            }
+
+    def shutdown(
+        self,
+        wait: bool = True,
+        *,
+        cancel_pending: bool = False,
+        timeout: Optional[float] = None,
+    ) -> None:
+        """
+        Stop accepting tasks and let workers exit once the queue is drained.
+
+        Args:
+            wait: Block until workers exit (bounded by ``timeout``)
+            cancel_pending: Cancel queued tasks instead of running them
+            timeout: Maximum seconds to wait for all workers
+        """
+        with self._cond:
+            self._shutdown = True
+            if cancel_pending:
+                for state in self._providers.values():
+                    for task in state.pending:
+                        task.future.cancel()
+                    self._queued -= len(state.pending)
+                    state.pending.clear()
+            self._cond.notify_all()
+            workers = list(self._workers)
+        if not wait:
+            return
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for worker in workers:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                break
+            worker.join(remaining)
+        with self._cond:
+            if self._queued:
+                logger.warning(
+                    "TTS scheduler stopped with %s queued tasks", self._queued
+                )
+
+
+tts_scheduler = TTSScheduler()
+
+
+def _shutdown_at_exit() -> None:
+    tts_scheduler.shutdown(wait=True, cancel_pending=True, timeout=10)
+
+
+atexit.register(_shutdown_at_exit)
@@ -0,0 +1,88 @@
+"""
+Short-lived store for streamed TTS segment audio.
+
+With TTS_SEGMENT_DELIVERY=url, ``audio_segment`` SSE events carry the URL of
+a segment instead of its base64 audio. The bytes are kept here for
+TTS_SEGMENT_TTL_SECONDS and served, with HTTP Range support, by
+``GET /api/learn/audio-segments/<segment_id>``.
+
+Entries go through the cache provider, so every worker can serve them when
+Redis is configured. Without Redis they live in the in-process cache, which
+only works when the player's request reaches the process that streamed the
+event. Segment ids are random and unguessable and are the only credential
+the endpoint checks, like a presigned storage URL.
+"""
+
+from __future__ import annotations
+
+import base64
+import re
+import uuid
+from typing import Optional, Tuple
+
+from flaskr.common.cache_provider import cache
+from flaskr.common.config import get_config
+
+DELIVERY_INLINE = "inline"
+DELIVERY_URL = "url"
+
+SEGMENT_URL_PATH = "/api/learn/audio-segments/"
+_SEGMENT_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+_MIME_TYPES = {
+    "mp3": "audio/mpeg",
+    "wav": "audio/wav",
+    "pcm": "audio/L16",
+    "ogg": "audio/ogg",
+    "aac": "audio/aac",
+}
+
+
+def audio_mime_type(audio_format: str) -> str:
+    return _MIME_TYPES.get((audio_format or "mp3").lower(), "application/octet-stream")
+
+
+def segment_delivery_mode() -> str:
+    mode = str(get_config("TTS_SEGMENT_DELIVERY") or DELIVERY_INLINE)
+    return DELIVERY_URL if mode.strip().lower() == DELIVERY_URL else DELIVERY_INLINE
+
+
+def segment_ttl_seconds() -> int:
+    return max(1, int(get_config("TTS_SEGMENT_TTL_SECONDS") or 600))
+
+
+def _cache_key(segment_id: str) -> str:
+    prefix = get_config("REDIS_KEY_PREFIX", "") or ""
+    return f"{prefix}tts:segment:{segment_id}"
+
+
+def put_segment(audio: bytes, audio_format: str = "mp3") -> str:
+    """Store ``audio`` and return its segment id."""
+    segment_id = uuid.uuid4().hex
+    header = (audio_format or "mp3").encode("ascii", "ignore") + b"\n"
+    cache.set(_cache_key(segment_id), header + audio, ex=segment_ttl_seconds())
+    return segment_id
+
+
+def get_segment(segment_id: str) -> Optional[Tuple[bytes, str]]:
+    """Return ``(audio, format)`` for a stored segment, or None if expired."""
+    if not _SEGMENT_ID_RE.match(segment_id or ""):
+        return None
+    raw = cache.get(_cache_key(segment_id))
+    if not raw:
+        return None
+    if isinstance(raw, str):
+        raw = raw.encode("latin-1")
+    audio_format, _, audio = raw.partition(b"\n")
+    return audio, audio_format.decode("ascii", "ignore")
+
+
+def segment_audio_fields(audio: bytes, audio_format: str = "mp3") -> dict:
+    """``AudioSegmentDTO`` keyword arguments carrying ``audio``.
+
+    Inline mode embeds the base64 audio; url mode stores it and returns the
+    relative URL the player fetches it from.
+    """
+    if segment_delivery_mode() == DELIVERY_URL:
+        return {"audio_url": SEGMENT_URL_PATH + put_segment(audio, audio_format)}
+    return {"audio_data": base64.b64encode(audio).decode("utf-8")}
@@ -7,7 +7,6 @@ This module provides real-time TTS synthesis during content streaming.
 - TTS synthesis runs in background threads to avoid blocking content streaming
 """
 
-import base64
 import logging
 import traceback
 import uuid
@@ -15,12 +14,12 @@ import threading
 import time
 from typing import Any, Generator, Optional, List, Dict
 from dataclasses import dataclass
-from concurrent.futures import ThreadPoolExecutor, Future
+from concurrent.futures import FIRST_COMPLETED, Future
+from concurrent.futures import wait as wait_futures
 
 from flask import Flask
 
 from flaskr.api.tts import (
-    synthesize_text,
     is_tts_configured,
     VoiceSettings,
     AudioSettings,
@@ -28,11 +27,18 @@ from flaskr.api.tts import (
     get_default_audio_settings,
 )
 from flaskr.service.tts import preprocess_for_tts
+from flaskr.service.tts.incremental_preprocess import IncrementalTTSNormalizer
+from flaskr.service.tts.audio_cache import (
+    SEGMENT_CACHED,
+    SEGMENT_SYNTHESIZED,
+    synthesize_text_cached,
+)
 from flaskr.service.tts.audio_utils import (
     concat_audio_best_effort,
     get_audio_duration_ms,
     is_audio_processing_available,
 )
+from flaskr.common.config import get_config
 from flaskr.common.log import AppLoggerProxy
 from flaskr.service.tts.audio_record_utils import (
     build_completed_audio_record,
@@ -57,13 +63,12 @@ from flaskr.service.tts.pipeline import (
     build_av_segmentation_contract,
     _find_next_av_boundary,
 )
+from flaskr.service.tts.scheduler import PRIORITY_STREAM, tts_scheduler
+from flaskr.service.tts.segment_store import segment_audio_fields
 
 
 logger = AppLoggerProxy(logging.getLogger(__name__))
 
-# Global thread pool for TTS synthesis
-_tts_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="tts_")
-
 _VISUAL_SLIDE_KINDS = frozenset(
     {
         "fence",
@@ -92,6 +97,11 @@ _VISUAL_SKIP_KINDS = frozenset(
 _SANDBOX_VISUAL_KINDS = frozenset({"iframe", "sandbox", "html_table"})
 
 
+def _finalize_deadline() -> float:
+    """Return the monotonic time by which finalize stops waiting for segments."""
+    return time.monotonic() + float(get_config("TTS_STREAM_FINALIZE_TIMEOUT") or 60)
+
+
 @dataclass
 class TTSSegment:
     """A segment of text to be synthesized."""
@@ -157,12 +167,17 @@ class StreamingTTSProcessor:
         self.audio_settings = get_default_audio_settings(tts_provider)
 
         # State
-        self._buffer = ""
-        self._raw_offset = 0  # tracks position in raw (unprocessed) buffer
+        # the normalizer holds the text; only its length is tracked here
+        self._received_chars = 0
+        # cleans the stream incrementally and tracks the unconsumed raw text
+        self._normalizer = IncrementalTTSNormalizer()
         self._segment_index = 0
         self._audio_bid = str(uuid.uuid4()).replace("-", "")
         self._usage_parent_bid = generate_id(app)
         self._word_count_total = 0
+        self._cache_hit_count = 0
+        self._shared_count = 0
+        self._unbilled_length = 0
         self._usage_scene = usage_scene
         self.usage_context = UsageContext(
             user_bid=user_bid,
@@ -178,6 +193,11 @@ class StreamingTTSProcessor:
         self._completed_segments: Dict[int, TTSSegment] = {}
         self._pending_futures: List[Future] = []
         self._next_yield_index = 0
+        self._next_start_offset_ms = 0
+        self._av_contract_sent = False
+        self._input_closed = False
+        self._completed = False
+        self._raw_text = ""
         self._lock = threading.Lock()
 
         # Storage for all yielded audio data (for final concatenation)
@@ -202,96 +222,27 @@ class StreamingTTSProcessor:
             yield from self._yield_ready_segments()
             return
 
-        self._buffer += chunk
+        self._received_chars += len(chunk)
 
         # Check if we should submit a new TTS task
-        self._try_submit_tts_task()
+        self._try_submit_tts_task(chunk)
 
         # Yield any segments that are ready
         yield from self._yield_ready_segments()
 
-    def _try_submit_tts_task(self):
+    def _try_submit_tts_task(self, chunk: str):
         """Submit all complete sentences currently available in the stream buffer."""
-        if not self._buffer:
-            return
-
-        # Preprocess only the unprocessed portion of the raw buffer to avoid
-        # offset drift caused by markdown constructs (bold, links, etc.)
-        # becoming complete as the buffer grows.
-        raw_remaining = self._buffer[self._raw_offset :]
-        if not raw_remaining:
-            return
-
-        processable_text = preprocess_for_tts(raw_remaining)
-        if not processable_text:
-            return
-
-        # Skip leading whitespace without producing a segment.
-        processable_text = processable_text.lstrip()
-
-        if len(processable_text) < 2:
+        completed_text = self._normalizer.feed(chunk)
+        if not completed_text:
             return
 
-        # Only consume text up to the last complete sentence ending in the
-        # currently processable stream window.
-        sentence_matches = list(SENTENCE_ENDINGS.finditer(processable_text))
-        if not sentence_matches:
-            return
-
-        last_match = sentence_matches[-1]
-        completed_text = processable_text[: last_match.end()]
-
-        # Advance the raw offset.  We need to find how far into the raw
-        # remaining text the last sentence ending corresponds.  Because
-        # preprocessing can change text length, we search for the sentence-
-        # ending character in the raw text scanning forward.
-        self._raw_offset += self._find_raw_consume_len(
-            raw_remaining, last_match.end(), processable_text
-        )
-
         self._submit_remaining_text_in_segments(
             completed_text,
             include_trailing_fragment=False,
         )
 
-    @staticmethod
-    def _find_raw_consume_len(
-        raw_text: str, processed_end: int, processed_text: str
-    ) -> int:
-        """Map a position in preprocessed text back to the raw buffer.
-
-        Uses binary search: find the smallest raw-text prefix whose
-        preprocessed form covers ``processed_text[:processed_end]``.
-        This is robust against arbitrary preprocessing transformations
-        (bold/italic removal, code-block stripping, etc.).
-
-        Args:
-            raw_text: The raw (un-preprocessed) remaining buffer text.
-            processed_end: End offset in *processed_text* up to which we
-                want to consume.
-            processed_text: The fully preprocessed (and lstripped) version
-                of *raw_text*.
-
-        Returns:
-            Number of characters to consume from *raw_text*.
-        """
-        target = processed_text[:processed_end]
-        # raw text is always >= preprocessed text in length (preprocessing
-        # only removes content), so processed_end is a valid lower bound.
-        lo, hi = processed_end, len(raw_text)
-        best = hi  # worst case: consume everything
-        while lo <= hi:
-            mid = (lo + hi) // 2
-            candidate = preprocess_for_tts(raw_text[:mid]).lstrip()
-            if len(candidate) >= len(target) and candidate[: len(target)] == target:
-                best = mid
-                hi = mid - 1
-            else:
-                lo = mid + 1
-        return best
-
     def _submit_tts_task(self, text: str):
-        """Submit a TTS synthesis task to the background thread pool."""
+        """Submit a TTS synthesis task to the shared TTS scheduler."""
         with self._lock:
             segment_index = self._segment_index
             self._segment_index += 1
@@ -302,14 +253,24 @@ class StreamingTTSProcessor:
             f"Submitting TTS task {segment_index}: {len(text)} chars, provider={self.tts_provider or '(unset)'}"
         )
 
-        future = _tts_executor.submit(
-            self._synthesize_in_thread,
-            segment,
-            self.voice_settings,
-            self.audio_settings,
-            self.tts_provider,
-            self.tts_model,
-        )
+        try:
+            future = tts_scheduler.submit(
+                self._synthesize_in_thread,
+                segment,
+                self.voice_settings,
+                self.audio_settings,
+                self.tts_provider,
+                self.tts_model,
+                provider=self.tts_provider,
+                priority=PRIORITY_STREAM,
+            )
+        except RuntimeError as e:
+            logger.warning(f"TTS segment {segment_index} was not scheduled: {e}")
+            segment.error = str(e)
+            segment.is_ready = True
+            with self._lock:
+                self._completed_segments[segment_index] = segment
+            return
         self._pending_futures.append(future)
 
     def _submit_remaining_text_in_segments(
@@ -368,7 +329,8 @@ class StreamingTTSProcessor:
         with self.app.app_context():
             try:
                 segment_start = time.monotonic()
-                result = synthesize_text(
+                result, source = synthesize_text_cached(
+                    self.app,
                     text=segment.text,
                     voice_settings=voice_settings,
                     audio_settings=audio_settings,
@@ -399,10 +361,18 @@ class StreamingTTSProcessor:
                     is_stream=True,
                     parent_usage_bid=self._usage_parent_bid,
                     segment_index=segment.index,
+                    source=source,
                 )
 
                 with self._lock:
-                    self._word_count_total += segment.word_count
+                    if source == SEGMENT_SYNTHESIZED:
+                        self._word_count_total += segment.word_count
+                    else:
+                        self._unbilled_length += len(segment.text or "")
+                        if source == SEGMENT_CACHED:
+                            self._cache_hit_count += 1
+                        else:
+                            self._shared_count += 1
 
                 logger.debug(
                     f"TTS segment {segment.index} synthesized: "
@@ -420,8 +390,11 @@ class StreamingTTSProcessor:
         return segment
 
     def _yield_ready_segments(self) -> Generator[RunMarkdownFlowDTO, None, None]:
-        """Yield segments that are ready in order."""
-        segments_yielded = 0
+        """Yield segments that are ready in order.
+
+        Nothing here waits: each segment carries ``start_offset_ms``, its play
+        offset within the track, and the player schedules playback from it.
+        """
         while True:
             with self._lock:
                 # Check if next segment is ready
@@ -442,8 +415,15 @@ class StreamingTTSProcessor:
                     )
 
             if segment.audio_data and not segment.error:
-                # Encode to base64
-                base64_audio = base64.b64encode(segment.audio_data).decode("utf-8")
+                # The contract only goes out with the first segment of the
+                # track; AUDIO_COMPLETE carries the final one.
+                av_contract = None
+                if not self._av_contract_sent:
+                    av_contract = self.av_contract
+                    self._av_contract_sent = av_contract is not None
+
+                start_offset_ms = self._next_start_offset_ms
+                self._next_start_offset_ms += int(segment.duration_ms or 0)
 
                 yield RunMarkdownFlowDTO(
                     outline_bid=self.outline_bid,
@@ -451,65 +431,115 @@ class StreamingTTSProcessor:
                     type=GeneratedType.AUDIO_SEGMENT,
                     content=AudioSegmentDTO(
                         segment_index=segment.index,
-                        audio_data=base64_audio,
                         duration_ms=segment.duration_ms,
+                        start_offset_ms=start_offset_ms,
                         is_final=False,
                         position=self.position,
-                        av_contract=self.av_contract,
+                        av_contract=av_contract,
+                        **segment_audio_fields(
+                            segment.audio_data, self.audio_settings.format
+                        ),
                     ),
                 )
 
-                # Add small delay between yields to prevent burst delivery
-                # This ensures segments are delivered at a steady pace
-                if segments_yielded > 0:
-                    time.sleep(0.1)  # 100ms delay between segment yields
-                segments_yielded += 1
+    def _close_input(self):
+        """Submit the text left in the buffer; no more chunks are accepted."""
+        self._input_closed = True
+        if self._received_chars:
+            remaining_text = self._normalizer.drain()
+            # Use segmented submission to maintain consistent pacing
+            self._submit_remaining_text_in_segments(remaining_text)
+        self._raw_text = self._normalizer.raw_text
+
+    def _skip_unfinished_segments(self):
+        """Give up on segments that never completed so later ones can go out."""
+        with self._lock:
+            for index in range(self._next_yield_index, self._segment_index):
+                if index not in self._completed_segments:
+                    logger.warning(f"TTS segment {index} did not complete, skipped")
+                    self._completed_segments[index] = TTSSegment(
+                        index=index, text="", error="not completed", is_ready=True
+                    )
 
-    def finalize(
-        self, *, commit: bool = True
+    def _wait_for_segments(
+        self, deadline: float
     ) -> Generator[RunMarkdownFlowDTO, None, None]:
+        """Emit pending segments as they complete, until ``deadline``."""
+        pending = [future for future in self._pending_futures if not future.done()]
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.error(
+                    f"TTS finalize deadline passed with {len(pending)} segments pending"
+                )
+                break
+            _done, not_done = wait_futures(
+                pending, timeout=remaining, return_when=FIRST_COMPLETED
+            )
+            pending = list(not_done)
+            yield from self._yield_ready_segments()
+        self._skip_unfinished_segments()
+        yield from self._yield_ready_segments()
+
+    def finalize(
+        self,
+        *,
+        commit: bool = True,
+        wait: bool = True,
+        deadline: Optional[float] = None,
+    ) -> Generator[RunMarkdownFlowDTO, None, bool]:
         """
         Finalize TTS processing after content streaming is complete.
-        """
-        raw_text = self._buffer
-        cleaned_text = ""
-        cleaned_text_length = 0
-        try:
-            cleaned_text = preprocess_for_tts(self._buffer or "")
-            cleaned_text_length = len(cleaned_text)
-        except Exception:
-            cleaned_text = ""
-            cleaned_text_length = 0
 
+        By default this waits, until ``deadline`` (a ``time.monotonic()``
+        value; TTS_STREAM_FINALIZE_TIMEOUT seconds from now when omitted),
+        for the pending segments, emitting each one as soon as it is ready,
+        and then emits AUDIO_COMPLETE. With ``wait=False`` it only
+        emits what is ready; the generator returns True while segments are
+        still being synthesized, and a later call completes the track.
+        """
         logger.debug(
             f"TTS finalize called: enabled={self._enabled}, "
-            f"buffer_len={len(self._buffer)}, "
+            f"received_chars={self._received_chars}, "
             f"segment_index={self._segment_index}, "
             f"pending_futures={len(self._pending_futures)}, "
             f"all_audio_data={len(self._all_audio_data)}"
         )
         if not self._enabled:
             logger.debug("TTS finalize: TTS not enabled, returning early")
-            return
-
-        # Submit any remaining buffer content in segments to avoid burst
-        if self._buffer:
-            raw_remaining = self._buffer[self._raw_offset :]
-            remaining_text = preprocess_for_tts(raw_remaining).strip()
-            # Use segmented submission to maintain consistent pacing
-            self._submit_remaining_text_in_segments(remaining_text)
-            self._raw_offset = len(self._buffer)
-            self._buffer = ""
+            return False
+        if self._completed:
+            return False
+
+        if not self._input_closed:
+            self._close_input()
+
+        if wait:
+            if deadline is None:
+                deadline = _finalize_deadline()
+            yield from self._wait_for_segments(deadline)
+        else:
+            yield from self._yield_ready_segments()
+            if any(not future.done() for future in self._pending_futures):
+                return True
+            self._skip_unfinished_segments()
+            yield from self._yield_ready_segments()
 
-        # Wait for all pending TTS tasks to complete
-        for future in self._pending_futures:
-            try:
-                future.result(timeout=60)  # Max 60s per segment
-            except Exception as e:
-                logger.error(f"TTS future failed: {e}")
+        self._completed = True
+        yield from self._complete_audio(commit=commit)
+        return False
 
-        # Yield any remaining segments
-        yield from self._yield_ready_segments()
+    def _complete_audio(
+        self, *, commit: bool
+    ) -> Generator[RunMarkdownFlowDTO, None, None]:
+        """Concatenate, upload and record the track, then emit AUDIO_COMPLETE."""
+        raw_text = self._raw_text
+        try:
+            cleaned_text = preprocess_for_tts(raw_text or "")
+            cleaned_text_length = len(cleaned_text)
+        except Exception:
+            cleaned_text = ""
+            cleaned_text_length = 0
 
         # Use stored audio data from all yielded segments
         with self._lock:
@@ -603,6 +633,9 @@ class StreamingTTSProcessor:
                 voice_settings=self.voice_settings,
                 audio_settings=self.audio_settings,
                 is_stream=True,
+                cache_hit_count=self._cache_hit_count,
+                shared_count=self._shared_count,
+                unbilled_length=self._unbilled_length,
             )
 
             # Yield completion
@@ -679,6 +712,8 @@ class AVStreamingTTSProcessor:
 
         self._position_cursor = 0
         self._current_processor: Optional[StreamingTTSProcessor] = None
+        # Tracks closed at a boundary whose audio is still being synthesized
+        self._draining: List[StreamingTTSProcessor] = []
         self._raw_buffer = ""
         self._raw_full_content = ""
         self._av_contract: Optional[Dict[str, Any]] = None
@@ -956,14 +991,47 @@ class AVStreamingTTSProcessor:
         for event in events:
             yield from self._bind_slide_for_audio_event(event)
 
+    def _retire_current(self) -> Generator[RunMarkdownFlowDTO, None, None]:
+        """Close the current track at a visual boundary without waiting.
+
+        Its remaining segments and AUDIO_COMPLETE are emitted by later calls,
+        so a slow provider does not hold back the text of the next track.
+        """
+        processor = self._current_processor
+        if processor is None:
+            return
+        if self._current_segment_has_speakable_text:
+            self._position_cursor += 1
+        self._current_processor = None
+        self._current_segment_has_speakable_text = False
+        self._draining.append(processor)
+        yield from self._poll_draining()
+
+    def _poll_draining(
+        self, *, wait: bool = False, deadline: Optional[float] = None
+    ) -> Generator[RunMarkdownFlowDTO, None, None]:
+        draining, self._draining = self._draining, []
+        for processor in draining:
+            pending = False
+
+            def _finalize(processor=processor):
+                nonlocal pending
+                pending = yield from processor.finalize(
+                    commit=False, wait=wait, deadline=deadline
+                )
+
+            yield from self._emit_with_slide_binding(_finalize())
+            if pending:
+                self._draining.append(processor)
+
     def _finalize_current(
-        self, *, commit: bool
+        self, *, commit: bool, deadline: Optional[float] = None
     ) -> Generator[RunMarkdownFlowDTO, None, None]:
         if self._current_processor is None:
             return
         did_complete = False
         for event in self._emit_with_slide_binding(
-            self._current_processor.finalize(commit=commit)
+            self._current_processor.finalize(commit=commit, deadline=deadline)
         ):
             if event.type == GeneratedType.AUDIO_COMPLETE:
                 did_complete = True
@@ -978,6 +1046,8 @@ class AVStreamingTTSProcessor:
         return _find_next_av_boundary(raw, include_partial_md_image=True)
 
     def process_chunk(self, chunk: str) -> Generator[RunMarkdownFlowDTO, None, None]:
+        if self._draining:
+            yield from self._poll_draining()
         if not chunk:
             if self._current_processor is not None:
                 yield from self._process_processor_chunk(self._current_processor, "")
@@ -1027,8 +1097,8 @@ class AVStreamingTTSProcessor:
                 processor = self._ensure_processor()
                 yield from self._process_processor_chunk(processor, speakable)
 
-            # Boundary encountered: finalize the current speakable segment.
-            yield from self._finalize_current(commit=False)
+            # Boundary encountered: close the current speakable segment.
+            yield from self._retire_current()
             if kind in _VISUAL_SLIDE_KINDS and complete and boundary_len > 0:
                 yield from self._finalize_pending_visual_slide(
                     visual_kind=kind,
@@ -1057,7 +1127,10 @@ class AVStreamingTTSProcessor:
             yield from self._process_processor_chunk(processor, self._raw_buffer)
             self._raw_buffer = ""
 
-        yield from self._finalize_current(commit=commit)
+        # One deadline for every track still synthesizing, not one each.
+        deadline = _finalize_deadline()
+        yield from self._poll_draining(wait=True, deadline=deadline)
+        yield from self._finalize_current(commit=commit, deadline=deadline)
 
         # After finalizing all content, re-sync slides from the complete AV contract
         # and emit finalized versions of any placeholder slides.
@@ -6,6 +6,7 @@ Provides utility functions to record TTS usage with consistent metadata construc
 
 from __future__ import annotations
 
+from dataclasses import replace
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -14,6 +15,11 @@ if TYPE_CHECKING:
     from flaskr.api.tts import VoiceSettings, AudioSettings
 
 from flaskr.service.metering import record_tts_usage
+from flaskr.service.tts.audio_cache import (
+    SEGMENT_CACHED,
+    SEGMENT_SHARED,
+    SEGMENT_SYNTHESIZED,
+)
 
 
 def build_tts_metadata(
@@ -55,6 +61,7 @@ def record_tts_segment_usage(
     is_stream: bool,
     parent_usage_bid: str,
     segment_index: int,
+    source: str = SEGMENT_SYNTHESIZED,
 ) -> None:
     """
     Record TTS usage for a single segment.
@@ -75,9 +82,18 @@ def record_tts_segment_usage(
         is_stream: Whether this is a streaming request
         parent_usage_bid: Parent usage record ID for aggregation
         segment_index: Index of this segment in the sequence
+        source: Where the audio came from (``SEGMENT_*`` in audio_cache);
+            only synthesized segments are billable, a shared synthesis is
+            billed to the caller that ran it
     """
     segment_length = len(segment_text or "")
     extra = build_tts_metadata(voice_settings, audio_settings)
+    if source != SEGMENT_SYNTHESIZED:
+        usage_context = replace(usage_context, billable=0)
+    if source == SEGMENT_CACHED:
+        extra["cache_hit"] = True
+    elif source == SEGMENT_SHARED:
+        extra["shared_synthesis"] = True
 
     record_tts_usage(
         app,
@@ -113,6 +129,9 @@ def record_tts_aggregated_usage(
     voice_settings: "VoiceSettings",
     audio_settings: "AudioSettings",
     is_stream: bool = True,
+    cache_hit_count: int = 0,
+    shared_count: int = 0,
+    unbilled_length: int = 0,
 ) -> None:
     """
     Record aggregated TTS usage for all segments.
@@ -128,14 +147,31 @@ def record_tts_aggregated_usage(
         model: TTS model name
         raw_text: Original input text (before preprocessing)
         cleaned_text: Cleaned text (after preprocessing)
-        total_word_count: Total word count across all segments
+        total_word_count: Word count of the synthesized segments
         duration_ms: Total audio duration in milliseconds
         segment_count: Number of segments synthesized
         voice_settings: TTS voice configuration
         audio_settings: TTS audio configuration
         is_stream: Whether this is a streaming request
+        cache_hit_count: Segments served from the TTS audio cache
+        shared_count: Segments that waited on another caller's synthesis
+        unbilled_length: Text length of the cached and shared segments; it is
+            left out of the recorded amounts, and the record is non-billable
+            when no segment was synthesized
     """
     extra = build_tts_metadata(voice_settings, audio_settings)
+    input_length = len(raw_text or "")
+    output_length = len(cleaned_text or "")
+    if cache_hit_count or shared_count:
+        extra["cache_hit_count"] = int(cache_hit_count)
+        extra["shared_count"] = int(shared_count)
+        extra["unbilled_length"] = int(unbilled_length)
+        if cache_hit_count + shared_count >= segment_count:
+            usage_context = replace(usage_context, billable=0)
+            input_length = output_length = 0
+        else:
+            input_length = max(0, input_length - unbilled_length)
+            output_length = max(0, output_length - unbilled_length)
 
     record_tts_usage(
         app,
@@ -144,9 +180,9 @@ def record_tts_aggregated_usage(
         provider=provider,
         model=model,
         is_stream=is_stream,
-        input=len(raw_text or ""),
-        output=len(cleaned_text or ""),
-        total=len(cleaned_text or ""),
+        input=input_length,
+        output=output_length,
+        total=output_length,
         word_count=total_word_count,
         duration_ms=int(duration_ms or 0),
         latency_ms=0,
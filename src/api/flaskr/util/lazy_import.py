@@ -0,0 +1,63 @@
+"""
+Deferred imports for heavy third-party packages.
+
+``LazyModule("litellm")`` stands in for ``import litellm`` at module level:
+the package is imported on first attribute access, so importing the module
+that holds the proxy (and therefore application startup) does not pay for
+it. Attribute writes are forwarded too, which keeps
+``monkeypatch.setattr(module.litellm, "completion", fake)`` working.
+"""
+
+from __future__ import annotations
+
+import importlib
+import importlib.util
+import threading
+from types import ModuleType
+from typing import Any
+
+
+class LazyModule:
+    """Proxy that imports ``name`` on first attribute access."""
+
+    def __init__(self, name: str):
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_module", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def _load(self) -> ModuleType:
+        module = self._module
+        if module is None:
+            with self._lock:
+                module = self._module
+                if module is None:
+                    module = importlib.import_module(self._name)
+                    object.__setattr__(self, "_module", module)
+        return module
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._module is not None
+
+    @property
+    def is_available(self) -> bool:
+        """Whether the package is installed, without importing it."""
+        if self._module is not None:
+            return True
+        try:
+            return importlib.util.find_spec(self._name) is not None
+        except (ImportError, ValueError):
+            return False
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr: str, value: Any) -> None:
+        setattr(self._load(), attr, value)
+
+    def __delattr__(self, attr: str) -> None:
+        delattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<LazyModule {self._name!r} ({state})>"
@@ -0,0 +1,122 @@
+"""create variable latest values table
+
+Revision ID: 3e1ee1ed9f23
+Revises: f0c1e2d3a4b5
+Create Date: 2026-10-18 12:00:00.000000
+
+Existing history is materialized lazily on the next write per user and scope,
+or up front with ``flask console backfill_profile_latest_values``.
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision = "3e1ee1ed9f23"
+down_revision = "f0c1e2d3a4b5"
+branch_labels = None
+depends_on = None
+
+TABLE_NAME = "var_variable_latest_values"
+
+
+def _table_exists(table_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    return table_name in inspector.get_table_names()
+
+
+def upgrade():
+    if _table_exists(TABLE_NAME):
+        return
+    op.create_table(
+        TABLE_NAME,
+        sa.Column(
+            "id",
+            mysql.BIGINT(),
+            autoincrement=True,
+            nullable=False,
+            comment="Unique ID",
+        ),
+        sa.Column(
+            "user_bid",
+            sa.String(length=32),
+            nullable=False,
+            server_default=sa.text("''"),
+            comment="User business identifier",
+        ),
+        sa.Column(
+            "shifu_bid",
+            sa.String(length=32),
+            nullable=False,
+            server_default=sa.text("''"),
+            comment="Shifu business identifier (empty=global/system scope)",
+        ),
+        sa.Column(
+            "variable_bid",
+            sa.String(length=32),
+            nullable=False,
+            server_default=sa.text("''"),
+            comment="Variable business identifier",
+        ),
+        sa.Column(
+            "key",
+            sa.String(length=255),
+            nullable=False,
+            server_default=sa.text("''"),
+            comment="Variable key",
+        ),
+        sa.Column(
+            "value",
+            sa.Text(),
+            nullable=False,
+            comment="Variable value",
+        ),
+        sa.Column(
+            "variable_value_bid",
+            sa.String(length=32),
+            nullable=False,
+            server_default=sa.text("''"),
+            comment="Business identifier of the source var_variable_values row",
+        ),
+        sa.Column(
+            "source_id",
+            mysql.BIGINT(),
+            nullable=False,
+            server_default=sa.text("0"),
+            comment="ID of the source var_variable_values row",
+        ),
+        sa.Column(
+            "created_at",
+            sa.DateTime(),
+            nullable=False,
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            comment="Creation timestamp",
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(),
+            nullable=False,
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            comment="Last update timestamp",
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "user_bid",
+            "shifu_bid",
+            "variable_bid",
+            "key",
+            name="uk_var_variable_latest_values_scope",
+        ),
+        comment=(
+            "Latest user variable value per user, scope, variable and key. "
+            "Materialized from var_variable_values for profile reads."
+        ),
+    )
+
+
+def downgrade():
+    if _table_exists(TABLE_NAME):
+        op.drop_table(TABLE_NAME)
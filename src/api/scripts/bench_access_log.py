@@ -0,0 +1,183 @@
+"""
+Benchmark request/response body logging.
+
+Sends the same POST (a ~100 KB mdflow-sized JSON body answered with a
+~200 KB outline-sized JSON response) through the Flask test client and
+reports requests per second, wall and process CPU time per request (CPU
+includes the background log writer) for
+- no body logging, as the baseline
+- the previous hooks: full request body repr and full response text, logged
+  synchronously
+- the current hooks with full bodies (ACCESS_LOG_BODY_MAX_BYTES=0)
+- the current hooks with capped bodies (2048 bytes), sampled at 10 % and in
+  json format
+
+Log records are written to a file in a temporary directory; the console
+handler is removed so terminal speed does not skew the numbers.
+
+Usage (from src/api):
+    python scripts/bench_access_log.py
+    python scripts/bench_access_log.py --requests 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+_API_ROOT = Path(__file__).resolve().parents[1]
+if str(_API_ROOT) not in sys.path:
+    sys.path.insert(0, str(_API_ROOT))
+os.environ.setdefault("SKIP_APP_AUTOCREATE", "1")
+os.environ.setdefault("SKIP_LOAD_DOTENV", "1")
+
+from flask import Flask, Response, request  # noqa: E402
+
+from flaskr.common import config as config_module  # noqa: E402
+from flaskr.common import log as log_module  # noqa: E402
+
+REQUEST_BODY = {
+    "mdflow": "\n".join(f"=== lesson {i} ===\n" + "text " * 40 for i in range(450)),
+    "password": "not-for-logs",
+}
+RESPONSE_BODY = {
+    "outline": [
+        {
+            "bid": f"{i:032x}",
+            "title": f"Chapter {i}",
+            "children": [{"n": j} for j in range(20)],
+        }
+        for i in range(400)
+    ]
+}
+JSON = "application/json"
+# Serialized once, so JSON encoding does not drown out the logging cost.
+REQUEST_BYTES = json.dumps(REQUEST_BODY).encode("utf-8")
+RESPONSE_BYTES = json.dumps(RESPONSE_BODY).encode("utf-8")
+
+
+def _legacy_hooks(app: Flask) -> None:
+    """The previous init_log request hooks, without the thread-local setup."""
+
+    @app.before_request
+    def setup_logging():
+        if request.method == "POST":
+            request_body = {}
+            if request.is_json:
+                request_body["JSON"] = request.get_json(silent=True)
+            else:
+                request_body["Raw"] = request.get_data(as_text=True)
+            app.logger.info(f"Request body: {request_body}")
+        else:
+            app.logger.info(f"Request method: {request.method}")
+
+    @app.after_request
+    def after_request(response):
+        response_data = response.get_data(as_text=True)
+        app.logger.info(f"Response: {response_data}")
+        return response
+
+
+def _create_app(log_dir: str, settings: dict | None) -> Flask:
+    app = Flask("bench_access_log")
+    app.config["LOGGING_PATH"] = os.path.join(log_dir, "ai-shifu.log")
+
+    @app.post("/api/shifu/<bid>/outline")
+    def outline(bid):
+        request.get_json()
+        return Response(RESPONSE_BYTES, mimetype="application/json")
+
+    if settings is None:
+        handler = logging.FileHandler(os.path.join(log_dir, "legacy.log"))
+        handler.setFormatter(log_module.RequestFormatter("%(asctime)s %(message)s"))
+        app.logger.handlers = [handler]
+        app.logger.setLevel(logging.INFO)
+        app.logger.propagate = False
+        _legacy_hooks(app)
+        return app
+
+    config_module.get_config = lambda key, default=None: settings.get(key, default)
+    log_module.init_log(app)
+    access_handler = app.logger.getChild("access").handlers[0]
+    file_handlers = [
+        h for h in app.logger.handlers if isinstance(h, logging.FileHandler)
+    ]
+    app.logger.handlers = file_handlers
+    access_handler.handlers = file_handlers
+    return app
+
+
+def _measure(app: Flask, count: int) -> tuple[float, float]:
+    """Return (wall ms, process CPU ms) per request, including log writes."""
+    client = app.test_client()
+    client.post("/api/shifu/bench/outline", data=REQUEST_BYTES, content_type=JSON)
+    access = app.logger.getChild("access").handlers
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    for _ in range(count):
+        client.post("/api/shifu/bench/outline", data=REQUEST_BYTES, content_type=JSON)
+    wall = time.perf_counter() - wall
+    if access:
+        access[0].flush(timeout=60)
+    cpu = time.process_time() - cpu
+    return wall / count * 1000, cpu / count * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    base = {
+        "ACCESS_LOG_FORMAT": "text",
+        "ACCESS_LOG_BODY_MAX_BYTES": 2048,
+        "ACCESS_LOG_BODY_SAMPLE_RATE": 1.0,
+        "ACCESS_LOG_BODY_POLICIES": [],
+        "ACCESS_LOG_REDACT_FIELDS": ["password", "token"],
+        "SERVER_SOFTWARE": "",
+    }
+    cases = {
+        "no body logging": {**base, "ACCESS_LOG_BODY_SAMPLE_RATE": 0.0},
+        "previous hooks": None,
+        "full bodies": {**base, "ACCESS_LOG_BODY_MAX_BYTES": 0},
+        "capped 2048 B": base,
+        "capped, sampled 10%": {**base, "ACCESS_LOG_BODY_SAMPLE_RATE": 0.1},
+        "json, capped": {**base, "ACCESS_LOG_FORMAT": "json"},
+    }
+    print(
+        f"request body {len(REQUEST_BYTES) // 1024} KB, "
+        f"response body {len(RESPONSE_BYTES) // 1024} KB, "
+        f"{args.requests} requests, best of {args.rounds}"
+    )
+    print(f"{'':<22} {'req/s':>8} {'wall ms':>8} {'cpu ms':>8} {'log MB':>8}")
+    best: dict[str, tuple[float, float, int]] = {}
+    # Rounds are interleaved so machine noise spreads over all cases.
+    for _ in range(args.rounds):
+        for name, settings in cases.items():
+            with tempfile.TemporaryDirectory() as log_dir:
+                app = _create_app(log_dir, settings)
+                wall_ms, cpu_ms = _measure(app, args.requests)
+                size = sum(
+                    os.path.getsize(os.path.join(log_dir, f))
+                    for f in os.listdir(log_dir)
+                )
+                for handler in app.logger.getChild("access").handlers:
+                    handler.close()
+            if name not in best or wall_ms < best[name][0]:
+                best[name] = (wall_ms, cpu_ms, size)
+    for name, (wall_ms, cpu_ms, size) in best.items():
+        print(
+            f"{name:<22} {1000 / wall_ms:>8.0f} {wall_ms:>8.2f} {cpu_ms:>8.2f} "
+            f"{size / 1024 / 1024:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
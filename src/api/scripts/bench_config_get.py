@@ -0,0 +1,103 @@
+"""
+Benchmark for service.config.get_config.
+
+Stores a plain and a secret config in an in-memory SQLite database, then
+measures the per-call cost of get_config for a present key, a secret key and
+a key missing from the database, with the process-local cache disabled
+(Redis + database only) and enabled.
+
+Redis is the in-process fallback cache here, so the "disabled" numbers are a
+lower bound: a real Redis round-trip adds network latency on every call.
+
+Usage (from src/api):
+    python scripts/bench_config_get.py
+    python scripts/bench_config_get.py --calls 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+_API_ROOT = Path(__file__).resolve().parents[1]
+if str(_API_ROOT) not in sys.path:
+    sys.path.insert(0, str(_API_ROOT))
+os.environ.setdefault("SKIP_APP_AUTOCREATE", "1")
+os.environ.setdefault("SKIP_LOAD_DOTENV", "1")
+
+from flask import Flask  # noqa: E402
+from flask_sqlalchemy import SQLAlchemy  # noqa: E402
+from sqlalchemy.dialects.mysql import BIGINT  # noqa: E402
+from sqlalchemy.ext.compiler import compiles  # noqa: E402
+
+from flaskr import dao  # noqa: E402
+from flaskr.framework.plugin.plugin_manager import enable_plugin_manager  # noqa: E402
+
+if dao.db is None:
+    dao.db = SQLAlchemy()
+
+from flaskr.service.config import funcs  # noqa: E402
+from flaskr.service.config.local_cache import ConfigLocalCache  # noqa: E402
+from flaskr.service.config.models import Config  # noqa: E402
+
+
+@compiles(BIGINT, "sqlite")
+def _compile_bigint_sqlite(_type, _compiler, **_kw):
+    return "INTEGER"
+
+
+KEYS = {
+    "present": "BENCH_CONFIG_PLAIN",
+    "secret": "BENCH_CONFIG_SECRET",
+    "absent": "BENCH_CONFIG_ABSENT",
+}
+
+
+def _create_app() -> Flask:
+    app = Flask("bench_config_get")
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI="sqlite://",
+        SECRET_KEY="bench-secret-key",
+        REDIS_KEY_PREFIX="bench:",
+    )
+    dao.db.init_app(app)
+    enable_plugin_manager(app)
+    with app.app_context():
+        Config.__table__.create(dao.db.engine)
+        funcs.add_config(app, KEYS["present"], "plain-value")
+        funcs.add_config(app, KEYS["secret"], "secret-value", is_secret=True)
+    return app
+
+
+def _per_call_us(key: str, calls: int) -> float:
+    funcs.get_config(key)  # warm Redis and the local cache
+    start = time.perf_counter()
+    for _ in range(calls):
+        funcs.get_config(key)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=5000)
+    args = parser.parse_args()
+
+    app = _create_app()
+    modes = {
+        "redis+db": ConfigLocalCache(ttl=0, negative_ttl=0),
+        "local cache": ConfigLocalCache(ttl=60, negative_ttl=10),
+    }
+    print(f"{'mode':<12} " + " ".join(f"{name:>12}" for name in KEYS))
+    with app.app_context():
+        for mode, cache in modes.items():
+            funcs.config_local_cache = cache
+            timings = [_per_call_us(key, args.calls) for key in KEYS.values()]
+            print(f"{mode:<12} " + " ".join(f"{t:>10.1f}us" for t in timings))
+        print(f"local cache stats: {cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
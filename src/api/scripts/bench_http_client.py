@@ -0,0 +1,159 @@
+"""
+Benchmark outbound provider calls against a local HTTPS stub.
+
+Starts a TLS server on 127.0.0.1 with a throwaway self-signed certificate
+that answers every POST with a small JSON body (like a TTS or moderation
+API), then reports per-call latency for
+- bare ``requests.post``, which opens a new TCP + TLS connection per call
+  (how the providers called out before)
+- ``HttpClient.post``, which reuses keep-alive connections from its pooled
+  per-host session
+
+Usage (from src/api):
+    python scripts/bench_http_client.py
+    python scripts/bench_http_client.py --calls 500 --threads 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import os
+import ssl
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+_API_ROOT = Path(__file__).resolve().parents[1]
+if str(_API_ROOT) not in sys.path:
+    sys.path.insert(0, str(_API_ROOT))
+os.environ.setdefault("SKIP_APP_AUTOCREATE", "1")
+os.environ.setdefault("SKIP_LOAD_DOTENV", "1")
+
+import requests  # noqa: E402
+from cryptography import x509  # noqa: E402
+from cryptography.hazmat.primitives import hashes, serialization  # noqa: E402
+from cryptography.hazmat.primitives.asymmetric import ec  # noqa: E402
+from cryptography.x509.oid import NameOID  # noqa: E402
+
+from flaskr.common.http_client import HttpClient  # noqa: E402
+
+PAYLOAD = {"text": "A sentence of lesson narration to synthesize.", "voice": "x"}
+RESPONSE = b'{"base_resp": {"status_code": 0}, "data": {"audio": "00"}}'
+
+
+def _write_certificate(directory: str) -> tuple[str, str]:
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=1))
+        .not_valid_after(now + datetime.timedelta(hours=1))
+        .add_extension(
+            x509.SubjectAlternativeName([x509.DNSName("localhost")]), critical=False
+        )
+        .sign(key, hashes.SHA256())
+    )
+    cert_path = os.path.join(directory, "cert.pem")
+    key_path = os.path.join(directory, "key.pem")
+    with open(cert_path, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(
+            key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            )
+        )
+    return cert_path, key_path
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes; with Nagle on, the body would
+    # wait for the client's delayed ACK and add ~40 ms to every call.
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(RESPONSE)))
+        self.end_headers()
+        self.wfile.write(RESPONSE)
+
+    def log_message(self, *args):
+        pass
+
+
+def _start_server(cert_path: str, key_path: str) -> ThreadingHTTPServer:
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.daemon_threads = True
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert_path, key_path)
+    httpd.socket = context.wrap_socket(httpd.socket, server_side=True)
+    threading.Thread(target=httpd.serve_forever, args=(0.05,), daemon=True).start()
+    return httpd
+
+
+def _measure(post, calls: int, threads: int) -> list[float]:
+    def one_call(_):
+        started = time.perf_counter()
+        response = post()
+        response.raise_for_status()
+        return (time.perf_counter() - started) * 1000
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return list(pool.map(one_call, range(calls)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cert_dir:
+        cert_path, key_path = _write_certificate(cert_dir)
+        httpd = _start_server(cert_path, key_path)
+        url = f"https://localhost:{httpd.server_address[1]}/v1/t2a"
+        client = HttpClient(pool_size=max(1, args.threads), max_retries=0)
+        cases = {
+            "requests.post": lambda: requests.post(
+                url, json=PAYLOAD, timeout=10, verify=cert_path
+            ),
+            "HttpClient.post": lambda: client.post(
+                url, json=PAYLOAD, timeout=10, verify=cert_path, endpoint="stub"
+            ),
+        }
+        print(f"{args.calls} HTTPS calls, {args.threads} thread(s)")
+        print(f"{'':<16} {'calls/s':>8} {'avg ms':>8} {'p50 ms':>8} {'p95 ms':>8}")
+        for name, post in cases.items():
+            post()  # warm-up: imports, first handshake
+            started = time.perf_counter()
+            latencies = _measure(post, args.calls, args.threads)
+            wall = time.perf_counter() - started
+            p95 = statistics.quantiles(latencies, n=20)[-1]
+            print(
+                f"{name:<16} {args.calls / wall:>8.0f} "
+                f"{statistics.fmean(latencies):>8.2f} "
+                f"{statistics.median(latencies):>8.2f} {p95:>8.2f}"
+            )
+        client.close()
+        httpd.shutdown()
+        httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
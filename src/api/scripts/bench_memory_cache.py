@@ -0,0 +1,177 @@
+"""
+Concurrency benchmark for the in-process cache used when Redis is absent.
+
+Runs the same mixed workload (get/set with TTL/incr, and a short-lived lock
+per request key, like ``run_script:{user}:{outline}``) from several threads
+against
+- legacy: one global RLock, lazy expiry only, one lock object per key forever
+- sharded: InMemoryCacheProvider
+
+and reports throughput plus how many entries and lock objects remain once
+every TTL has passed.
+
+Usage (from src/api):
+    python scripts/bench_memory_cache.py
+    python scripts/bench_memory_cache.py --threads 16 --ops 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+_API_ROOT = Path(__file__).resolve().parents[1]
+if str(_API_ROOT) not in sys.path:
+    sys.path.insert(0, str(_API_ROOT))
+os.environ.setdefault("SKIP_APP_AUTOCREATE", "1")
+os.environ.setdefault("SKIP_LOAD_DOTENV", "1")
+
+from flaskr.common.cache_provider import InMemoryCacheProvider  # noqa: E402
+
+
+class _LegacyEntry:
+    def __init__(self, value, expires_at):
+        self.value = value
+        self.expires_at = expires_at
+
+
+class _LegacyLock:
+    def __init__(self, lock):
+        self._lock = lock
+        self._held = False
+
+    def acquire(self, blocking=True, blocking_timeout=None):
+        acquired = self._lock.acquire(blocking=blocking)
+        self._held = bool(acquired)
+        return acquired
+
+    def release(self):
+        if self._held:
+            self._lock.release()
+            self._held = False
+
+
+class LegacyInMemoryCache:
+    """The previous provider, reduced to the operations exercised here."""
+
+    def __init__(self):
+        self._store = {}
+        self._locks = {}
+        self._mu = threading.RLock()
+
+    def _encode(self, value):
+        if isinstance(value, bytes):
+            return value
+        if isinstance(value, (int, float, bool)):
+            return str(value).encode("utf-8")
+        if value is None:
+            return b""
+        if isinstance(value, str):
+            return value.encode("utf-8")
+        return str(value).encode("utf-8")
+
+    def _purge_if_expired(self, key):
+        entry = self._store.get(key)
+        if entry is None or entry.expires_at is None:
+            return
+        if entry.expires_at <= time.time():
+            self._store.pop(key, None)
+
+    def get(self, key):
+        with self._mu:
+            self._purge_if_expired(key)
+            entry = self._store.get(key)
+            return entry.value if entry is not None else None
+
+    def set(self, key, value, ex=None, px=None, nx=False, xx=False):
+        with self._mu:
+            self._purge_if_expired(key)
+            if nx and key in self._store:
+                return False
+            if xx and key not in self._store:
+                return False
+            expires_at = time.time() + ex if ex is not None else None
+            self._store[key] = _LegacyEntry(self._encode(value), expires_at)
+            return True
+
+    def incr(self, key, amount=1):
+        with self._mu:
+            self._purge_if_expired(key)
+            entry = self._store.get(key)
+            value = (int(entry.value) if entry is not None else 0) + amount
+            expires_at = entry.expires_at if entry is not None else None
+            self._store[key] = _LegacyEntry(self._encode(value), expires_at)
+            return value
+
+    def lock(self, key, timeout=None, blocking_timeout=None):
+        with self._mu:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = threading.Lock()
+                self._locks[key] = lock
+        return _LegacyLock(lock)
+
+    def stats(self):
+        with self._mu:
+            for key in list(self._store):
+                self._purge_if_expired(key)
+            return {"entries": len(self._store), "locks": len(self._locks)}
+
+
+def _worker(cache, thread_index: int, ops: int, ttl: float) -> None:
+    for op in range(ops):
+        key = f"bench:{thread_index}:{op}"
+        cache.set(key, "x" * 64, ex=ttl)
+        cache.get(key)
+        cache.get(f"bench:{thread_index}:{op // 2}")
+        cache.incr("bench:counter")
+        lock = cache.lock(f"run_script:{thread_index}:{op}", timeout=ttl)
+        if lock.acquire(blocking=False):
+            lock.release()
+
+
+def _run(name: str, cache, threads: int, ops: int, ttl: float) -> None:
+    workers = [
+        threading.Thread(target=_worker, args=(cache, index, ops, ttl))
+        for index in range(threads)
+    ]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    time.sleep(ttl + 0.1)
+    if hasattr(cache, "sweep"):
+        cache.sweep()
+    stats = cache.stats()
+    total = threads * ops * 5
+    print(
+        f"{name:<8} {total / elapsed:>12,.0f} ops/s   "
+        f"entries after TTL: {stats['entries']:>7}   locks: {stats['locks']:>7}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=10000)
+    parser.add_argument("--ttl", type=float, default=1.0)
+    args = parser.parse_args()
+
+    _run("legacy", LegacyInMemoryCache(), args.threads, args.ops, args.ttl)
+    _run(
+        "sharded",
+        InMemoryCacheProvider(max_entries=100000, max_bytes=64 << 20, sweep_interval=0),
+        args.threads,
+        args.ops,
+        args.ttl,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Micro-benchmark for @extensible dispatch.
+
+Measures the per-call cost of
+- a plain function (baseline)
+- the previous @extensible wrapper, which logged every call at INFO level
+- the compiled @extensible dispatch with no extension and with one extension
+- service.config.get_config served from the process-local cache, wrapped by
+  the previous and by the compiled dispatch
+
+The app logger has an INFO-level NullHandler, so log records are built but
+not written; real handlers add formatting and I/O on top of the legacy
+numbers.
+
+Usage (from src/api):
+    python scripts/bench_plugin_dispatch.py
+    python scripts/bench_plugin_dispatch.py --calls 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import sys
+import time
+from functools import wraps
+from pathlib import Path
+
+_API_ROOT = Path(__file__).resolve().parents[1]
+if str(_API_ROOT) not in sys.path:
+    sys.path.insert(0, str(_API_ROOT))
+os.environ.setdefault("SKIP_APP_AUTOCREATE", "1")
+os.environ.setdefault("SKIP_LOAD_DOTENV", "1")
+
+from flask import Flask  # noqa: E402
+from flask_sqlalchemy import SQLAlchemy  # noqa: E402
+from sqlalchemy.dialects.mysql import BIGINT  # noqa: E402
+from sqlalchemy.ext.compiler import compiles  # noqa: E402
+
+from flaskr import dao  # noqa: E402
+from flaskr.framework.plugin import plugin_manager as plugin_manager_module  # noqa: E402
+
+if dao.db is None:
+    dao.db = SQLAlchemy()
+
+from flaskr.service.config import funcs  # noqa: E402
+from flaskr.service.config.local_cache import ConfigLocalCache  # noqa: E402
+from flaskr.service.config.models import Config  # noqa: E402
+
+
+@compiles(BIGINT, "sqlite")
+def _compile_bigint_sqlite(_type, _compiler, **_kw):
+    return "INTEGER"
+
+
+CONFIG_KEY = "BENCH_PLUGIN_DISPATCH"
+
+
+def legacy_extensible(func):
+    """The previous wrapper and execute_extensions, inlined."""
+    manager = plugin_manager_module.plugin_manager
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        result = func(*args, **kwargs)
+        func_name = func.__name__
+        manager.app.logger.info(f"execute_extensions: {func_name}")
+        if not manager.is_enabled:
+            return result
+        if func_name in manager.extension_functions:
+            for extension_func in manager.extension_functions[func_name]:
+                result = extension_func(result, *args, **kwargs)
+        return result
+
+    return wrapper
+
+
+def _plain(value):
+    return value
+
+
+def _extended(value):
+    return value
+
+
+def _per_call_ns(func, calls: int, *args) -> float:
+    func(*args)
+    start = time.perf_counter()
+    for _ in range(calls):
+        func(*args)
+    return (time.perf_counter() - start) / calls * 1e9
+
+
+def _create_app() -> Flask:
+    app = Flask("bench_plugin_dispatch")
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI="sqlite://",
+        SECRET_KEY="bench-secret-key",
+        REDIS_KEY_PREFIX="bench:",
+    )
+    app.logger.handlers[:] = [logging.NullHandler()]
+    app.logger.setLevel(logging.INFO)
+    app.logger.propagate = False
+    dao.db.init_app(app)
+    plugin_manager_module.enable_plugin_manager(app)
+    with app.app_context():
+        Config.__table__.create(dao.db.engine)
+        funcs.add_config(app, CONFIG_KEY, "value")
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=100000)
+    args = parser.parse_args()
+
+    app = _create_app()
+    plugin_manager_module.plugin_manager.register_extension(
+        "_extended", lambda result, value: result
+    )
+    extensible = plugin_manager_module.extensible
+    raw_get_config = funcs.get_config.__wrapped__
+    funcs.config_local_cache = ConfigLocalCache(ttl=60, negative_ttl=10)
+
+    cases = {
+        "plain function": _plain,
+        "legacy, no extension": legacy_extensible(_plain),
+        "compiled, no extension": extensible(_plain),
+        "legacy, 1 extension": legacy_extensible(_extended),
+        "compiled, 1 extension": extensible(_extended),
+    }
+    config_cases = {
+        "get_config, legacy": legacy_extensible(raw_get_config),
+        "get_config, compiled": extensible(raw_get_config),
+    }
+    with app.app_context():
+        for name, func in cases.items():
+            print(f"{name:<24} {_per_call_ns(func, args.calls, 1):>9.0f}ns")
+        for name, func in config_cases.items():
+            per_call = _per_call_ns(func, args.calls // 10, CONFIG_KEY)
+            print(f"{name:<24} {per_call:>9.0f}ns")
+
+
+if __name__ == "__main__":
+    main()
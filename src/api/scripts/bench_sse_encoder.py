@@ -0,0 +1,245 @@
+"""
+Micro-benchmark for the lesson SSE frame encoder.
+
+Replays a lesson stream and encodes every event with
+- legacy: "data: " + json.dumps(dto, default=fmt) + "\\n\\n" (the old run_script path)
+- encoder: sse_encoder.encode_sse_frame (orjson when installed)
+- encoder-stdlib: sse_encoder with orjson disabled
+
+and reports frames/sec plus allocations (tracemalloc) per frame.
+
+The stream is either a recording (one RunMarkdownFlowDTO JSON object per line,
+e.g. captured from the browser's EventSource) or a synthetic listen-mode lesson
+with token-level content deltas, slides and audio segments.
+
+Usage (from src/api):
+    python scripts/bench_sse_encoder.py
+    python scripts/bench_sse_encoder.py --record lesson_stream.jsonl --rounds 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import datetime
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+_API_ROOT = Path(__file__).resolve().parents[1]
+if str(_API_ROOT) not in sys.path:
+    sys.path.insert(0, str(_API_ROOT))
+os.environ.setdefault("SKIP_APP_AUTOCREATE", "1")
+os.environ.setdefault("SKIP_LOAD_DOTENV", "1")
+
+from flask import Flask  # noqa: E402
+from flask_sqlalchemy import SQLAlchemy  # noqa: E402
+
+from flaskr import dao  # noqa: E402
+from flaskr.framework.plugin.plugin_manager import enable_plugin_manager  # noqa: E402
+
+if dao.db is None:
+    dao.db = SQLAlchemy()
+enable_plugin_manager(Flask("bench_sse_encoder"))
+
+from flaskr.service.learn import sse_encoder  # noqa: E402
+from flaskr.service.learn.learn_dtos import (  # noqa: E402
+    AudioSegmentDTO,
+    GeneratedType,
+    NewSlideDTO,
+    OutlineItemUpdateDTO,
+    LearnStatus,
+    RunMarkdownFlowDTO,
+)
+
+
+def _legacy_fmt(o):
+    if isinstance(o, datetime.datetime):
+        return o.isoformat()
+    return o.__json__()
+
+
+def legacy_encode(payload) -> bytes:
+    frame = (
+        "data: "
+        + json.dumps(payload, default=_legacy_fmt, ensure_ascii=False)
+        + "\n\n".encode("utf-8").decode("utf-8")
+    )
+    # the WSGI server encodes str chunks before writing them to the socket
+    return frame.encode("utf-8")
+
+
+def _synthetic_stream(blocks: int, seed: int = 7) -> list[RunMarkdownFlowDTO]:
+    rng = random.Random(seed)
+    text = "在辅导过几十家企业之后，我总结出三种常见误解。" + (
+        "Large language models are tools, but they also change how we learn. "
+    )
+    audio = base64.b64encode(bytes(rng.getrandbits(8) for _ in range(24_000))).decode()
+    events: list[RunMarkdownFlowDTO] = [
+        RunMarkdownFlowDTO(
+            outline_bid="outline",
+            generated_block_bid="",
+            type=GeneratedType.OUTLINE_ITEM_UPDATE,
+            content=OutlineItemUpdateDTO(
+                outline_bid="outline",
+                title="Lesson",
+                status=LearnStatus.IN_PROGRESS,
+                has_children=False,
+            ),
+        )
+    ]
+    for block in range(blocks):
+        block_bid = f"block-{block}"
+        events.append(
+            RunMarkdownFlowDTO(
+                outline_bid="outline",
+                generated_block_bid=block_bid,
+                type=GeneratedType.NEW_SLIDE,
+                content=NewSlideDTO(
+                    slide_id=f"slide-{block}",
+                    generated_block_bid=block_bid,
+                    slide_index=block,
+                    visual_kind="text",
+                    segment_type="markdown",
+                    segment_content=text[:40],
+                ),
+            )
+        )
+        position = 0
+        while position < 600:
+            step = rng.randint(1, 3)
+            events.append(
+                RunMarkdownFlowDTO(
+                    outline_bid="outline",
+                    generated_block_bid=block_bid,
+                    type=GeneratedType.CONTENT,
+                    content=text[position % len(text) : position % len(text) + step],
+                )
+            )
+            position += step
+        for segment in range(4):
+            events.append(
+                RunMarkdownFlowDTO(
+                    outline_bid="outline",
+                    generated_block_bid=block_bid,
+                    type=GeneratedType.AUDIO_SEGMENT,
+                    content=AudioSegmentDTO(
+                        segment_index=segment,
+                        audio_data=audio,
+                        duration_ms=1500,
+                        av_contract={"visual_boundaries": [], "speakable_segments": []},
+                    ),
+                )
+            )
+        events.append(
+            RunMarkdownFlowDTO(
+                outline_bid="outline",
+                generated_block_bid=block_bid,
+                type=GeneratedType.BREAK,
+                content="",
+            )
+        )
+    events.append(
+        RunMarkdownFlowDTO(
+            outline_bid="outline",
+            generated_block_bid="",
+            type=GeneratedType.DONE,
+            content="",
+        )
+    )
+    return events
+
+
+def _load_record(path: str) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        lines = [line.strip() for line in f if line.strip()]
+    events = []
+    for line in lines:
+        if line.startswith("data:"):
+            line = line[len("data:") :].strip()
+        event = json.loads(line)
+        if event.get("type") != "heartbeat":
+            events.append(event)
+    return events
+
+
+def _measure(encode, events, rounds: int) -> dict:
+    started = time.perf_counter()
+    total_bytes = 0
+    for _ in range(rounds):
+        for event in events:
+            frame = encode(event)
+            total_bytes += len(frame)
+    elapsed = time.perf_counter() - started
+    frames = len(events) * rounds
+    return {
+        "frames_per_s": frames / elapsed if elapsed else 0.0,
+        "mb_per_s": total_bytes / elapsed / 1e6 if elapsed else 0.0,
+    }
+
+
+def _measure_allocations(encode, events) -> tuple[float, int]:
+    """Return (allocated KiB per frame, peak traced bytes) for one lesson."""
+    tracemalloc.start()
+    allocated = 0
+    peak = 0
+    for event in events:
+        tracemalloc.reset_peak()
+        start, _ = tracemalloc.get_traced_memory()
+        frame = encode(event)
+        _, frame_peak = tracemalloc.get_traced_memory()
+        allocated += frame_peak - start
+        peak = max(peak, frame_peak)
+        del frame
+    tracemalloc.stop()
+    return allocated / 1024 / max(len(events), 1), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--record", help="recorded stream (.jsonl / SSE lines)")
+    parser.add_argument("--blocks", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    events = (
+        _load_record(args.record) if args.record else _synthetic_stream(args.blocks)
+    )
+    print(f"events per lesson: {len(events)}")
+
+    orjson_module = sse_encoder.orjson
+
+    def encoder_stdlib(event):
+        sse_encoder.orjson = None
+        try:
+            return sse_encoder.encode_sse_frame(event)
+        finally:
+            sse_encoder.orjson = orjson_module
+
+    candidates = [
+        ("legacy", legacy_encode),
+        ("encoder-stdlib", encoder_stdlib),
+    ]
+    if orjson_module is not None:
+        candidates.append(("encoder", sse_encoder.encode_sse_frame))
+
+    baseline = None
+    for name, encode in candidates:
+        result = _measure(encode, events, args.rounds)
+        per_frame_kib, peak = _measure_allocations(encode, events)
+        baseline = baseline or result["frames_per_s"]
+        print(
+            f"{name:15} {result['frames_per_s']:12,.0f} frames/s "
+            f"{result['mb_per_s']:8.1f} MB/s "
+            f"x{result['frames_per_s'] / baseline:5.2f} "
+            f"alloc/frame {per_frame_kib:7.2f} KiB "
+            f"peak {peak / 1024:8.1f} KiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Load benchmark for lesson SSE streams (run_script) per stream engine.
+
+Every simulated learner drives runscript_v2.run_script against a fake
+run_script_inner that waits on "LLM I/O" between chunks. The script ramps the
+number of concurrent streams in one worker process and reports, per engine,
+wall time, OS threads and RSS, and the largest level where every stream
+finished within the latency budget.
+
+The gevent engine runs in a monkey patched child process (like
+gunicorn -k gevent), the thread engine in a plain one.
+
+Usage (from src/api):
+    python scripts/bench_sse_streams.py
+    python scripts/bench_sse_streams.py --levels 100,500,1000,2000 --chunks 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+_API_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _read_status(field: str) -> int:
+    try:
+        with open("/proc/self/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return -1
+
+
+def _child(engine: str, streams: int, chunks: int, chunk_delay: float) -> dict:
+    if engine == "gevent":
+        from gevent import monkey
+
+        # keep select.epoll: trio (optionally pulled in by httpcore) needs it at import
+        monkey.patch_all(select=False)
+
+    import threading
+
+    if str(_API_ROOT) not in sys.path:
+        sys.path.insert(0, str(_API_ROOT))
+    os.environ.setdefault("SKIP_APP_AUTOCREATE", "1")
+    os.environ.setdefault("SKIP_LOAD_DOTENV", "1")
+
+    from flask import Flask
+    from flask_sqlalchemy import SQLAlchemy
+
+    from flaskr import dao
+    from flaskr.framework.plugin.plugin_manager import enable_plugin_manager
+
+    if dao.db is None:
+        dao.db = SQLAlchemy()
+    app = Flask("bench_sse_streams")
+    app.config["REDIS_KEY_PREFIX"] = "bench"
+    enable_plugin_manager(app)
+
+    from flaskr.service.learn import runscript_v2
+    from flaskr.service.learn.learn_dtos import GeneratedType, RunMarkdownFlowDTO
+
+    def fake_run_script_inner(outline_bid: str, stop_event=None, **_kwargs):
+        for index in range(chunks):
+            if stop_event is not None and stop_event.is_set():
+                return
+            time.sleep(chunk_delay)
+            yield RunMarkdownFlowDTO(
+                outline_bid=outline_bid,
+                generated_block_bid="generated",
+                type=GeneratedType.CONTENT,
+                content=f"chunk-{index}",
+            )
+
+    runscript_v2.run_script_inner = fake_run_script_inner
+
+    peak_threads = 0
+    durations: list[float] = []
+    errors = 0
+    lock = threading.Lock()
+
+    def consume(index: int):
+        nonlocal peak_threads, errors
+        started = time.perf_counter()
+        try:
+            frames = 0
+            for _frame in runscript_v2.run_script(
+                app=app,
+                shifu_bid="shifu",
+                outline_bid=f"outline-{index}",
+                user_bid=f"user-{index}",
+                stream_engine=engine,
+            ):
+                frames += 1
+                if frames == chunks // 2:
+                    with lock:
+                        peak_threads = max(peak_threads, _read_status("Threads"))
+        except Exception:
+            with lock:
+                errors += 1
+            return
+        with lock:
+            durations.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    workers = []
+    try:
+        for index in range(streams):
+            worker = threading.Thread(target=consume, args=(index,), daemon=True)
+            worker.start()
+            workers.append(worker)
+    except RuntimeError:
+        errors += streams - len(workers)
+    for worker in workers:
+        worker.join()
+    wall = time.perf_counter() - started
+
+    durations.sort()
+    return {
+        "engine": engine,
+        "streams": streams,
+        "completed": len(durations),
+        "errors": errors,
+        "wall_s": round(wall, 3),
+        "p50_s": round(durations[len(durations) // 2], 3) if durations else None,
+        "p99_s": round(durations[int(len(durations) * 0.99) - 1], 3)
+        if durations
+        else None,
+        "peak_os_threads": peak_threads,
+        "max_rss_kb": _read_status("VmHWM"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--engines", default="thread,gevent")
+    parser.add_argument("--levels", default="50,200,500,1000")
+    parser.add_argument("--chunks", type=int, default=20)
+    parser.add_argument("--chunk-delay", type=float, default=0.05)
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=2.0,
+        help="a level passes when p99 stream time <= budget x ideal stream time",
+    )
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--engine", help=argparse.SUPPRESS)
+    parser.add_argument("--streams", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(
+            json.dumps(_child(args.engine, args.streams, args.chunks, args.chunk_delay))
+        )
+        return
+
+    ideal = args.chunks * args.chunk_delay
+    levels = [int(level) for level in args.levels.split(",") if level.strip()]
+    summary = {}
+    for engine in [e.strip() for e in args.engines.split(",") if e.strip()]:
+        capacity = 0
+        for streams in levels:
+            proc = subprocess.run(
+                [
+                    sys.executable,
+                    __file__,
+                    "--child",
+                    "--engine",
+                    engine,
+                    "--streams",
+                    str(streams),
+                    "--chunks",
+                    str(args.chunks),
+                    "--chunk-delay",
+                    str(args.chunk_delay),
+                ],
+                cwd=_API_ROOT,
+                capture_output=True,
+                text=True,
+            )
+            lines = [line for line in proc.stdout.splitlines() if line.startswith("{")]
+            if proc.returncode != 0 or not lines:
+                print(f"{engine:7} streams={streams:6} FAILED rc={proc.returncode}")
+                break
+            result = json.loads(lines[-1])
+            ok = (
+                result["errors"] == 0
+                and result["completed"] == streams
+                and result["p99_s"] is not None
+                and result["p99_s"] <= ideal * args.budget
+            )
+            print(
+                f"{engine:7} streams={streams:6} completed={result['completed']:6} "
+                f"errors={result['errors']:4} wall={result['wall_s']:7.2f}s "
+                f"p50={result['p50_s']}s p99={result['p99_s']}s "
+                f"threads={result['peak_os_threads']:6} "
+                f"rss={result['max_rss_kb'] // 1024}MB {'ok' if ok else 'over budget'}"
+            )
+            if not ok:
+                break
+            capacity = streams
+        summary[engine] = capacity
+    print()
+    for engine, capacity in summary.items():
+        print(f"{engine}: held {capacity} concurrent streams within budget")
+
+
+if __name__ == "__main__":
+    main()
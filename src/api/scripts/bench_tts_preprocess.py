@@ -0,0 +1,156 @@
+"""
+Benchmark for streaming TTS text preprocessing.
+
+Streams long lesson blocks in small chunks through
+- legacy: preprocess_for_tts over the whole unconsumed buffer on every chunk,
+  plus a binary search of preprocess_for_tts prefixes to map the cut back to
+  raw text (the old StreamingTTSProcessor._try_submit_tts_task)
+- incremental: IncrementalTTSNormalizer
+
+and reports wall time, full preprocessing passes and whether both produced the
+same sentences.
+
+Usage (from src/api):
+    python scripts/bench_tts_preprocess.py
+    python scripts/bench_tts_preprocess.py --chunk 2 --repeat 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+_API_ROOT = Path(__file__).resolve().parents[1]
+if str(_API_ROOT) not in sys.path:
+    sys.path.insert(0, str(_API_ROOT))
+os.environ.setdefault("SKIP_APP_AUTOCREATE", "1")
+os.environ.setdefault("SKIP_LOAD_DOTENV", "1")
+
+from flask_sqlalchemy import SQLAlchemy  # noqa: E402
+
+from flaskr import dao  # noqa: E402
+
+if dao.db is None:
+    dao.db = SQLAlchemy()
+
+import flaskr.service.tts as tts  # noqa: E402
+from flaskr.service.tts.incremental_preprocess import (  # noqa: E402
+    IncrementalTTSNormalizer,
+)
+from flaskr.service.tts.patterns import SENTENCE_ENDINGS  # noqa: E402
+
+
+class LegacyNormalizer:
+    def __init__(self):
+        self._buffer = ""
+        self._raw_offset = 0
+        self.scan_count = 0
+
+    def _preprocess(self, text: str) -> str:
+        self.scan_count += 1
+        return tts.preprocess_for_tts(text)
+
+    def feed(self, chunk: str) -> str:
+        self._buffer += chunk
+        raw_remaining = self._buffer[self._raw_offset :]
+        processable_text = self._preprocess(raw_remaining).lstrip()
+        if len(processable_text) < 2:
+            return ""
+        sentence_matches = list(SENTENCE_ENDINGS.finditer(processable_text))
+        if not sentence_matches:
+            return ""
+        end = sentence_matches[-1].end()
+        target = processable_text[:end]
+        lo, hi = end, len(raw_remaining)
+        best = hi
+        while lo <= hi:
+            mid = (lo + hi) // 2
+            candidate = self._preprocess(raw_remaining[:mid]).lstrip()
+            if candidate[: len(target)] == target:
+                best = mid
+                hi = mid - 1
+            else:
+                lo = mid + 1
+        self._raw_offset += best
+        return target
+
+    def drain(self) -> str:
+        return tts.preprocess_for_tts(self._buffer[self._raw_offset :]).strip()
+
+
+def _blocks(repeat: int) -> dict[str, str]:
+    prose = (
+        "Large language models are tools, but they also change how we learn. "
+        "在辅导过几十家企业之后，我总结出三种常见误解。**重点**在于[方法](https://example.com)。\n\n"
+    )
+    paragraph = "，".join(["这是一个没有句号的超长段落"] * 120 * repeat) + "。"
+    svg = (
+        "Look at the chart.\n\n<svg viewBox='0 0 800 600'>"
+        + "".join(
+            f"<rect x='{i}.5' y='{i}.25' width='10.5' height='20.5' style='fill:#abc;'/>"
+            f"<text x='{i}.5'>label {i}.</text>"
+            for i in range(80 * repeat)
+        )
+        + "</svg>\n\nAs the chart shows, growth is steady."
+    )
+    code = (
+        "Here is the code.\n\n```python\n"
+        + "".join(
+            f"value_{i} = compute({i}.5); print(value_{i})\n"
+            for i in range(150 * repeat)
+        )
+        + "```\n\nThat is all."
+    )
+    html = "".join(
+        f"<p>Step {i}: open the <b>settings</b> page &amp; check it.</p>\n"
+        for i in range(60 * repeat)
+    )
+    return {
+        "prose": prose * 20 * repeat,
+        "long-paragraph": paragraph,
+        "svg": svg,
+        "code-fence": code,
+        "html": html,
+    }
+
+
+def _run(normalizer, text: str, chunk: int) -> tuple[float, list[str]]:
+    started = time.perf_counter()
+    sentences = []
+    for index in range(0, len(text), chunk):
+        completed = normalizer.feed(text[index : index + chunk])
+        if completed:
+            sentences.append(completed)
+    tail = normalizer.drain()
+    if tail:
+        sentences.append(tail)
+    return time.perf_counter() - started, sentences
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chunk", type=int, default=3, help="chars per chunk")
+    parser.add_argument("--repeat", type=int, default=2, help="block size factor")
+    args = parser.parse_args()
+
+    for name, text in _blocks(args.repeat).items():
+        legacy = LegacyNormalizer()
+        legacy_s, legacy_out = _run(legacy, text, args.chunk)
+        incremental = IncrementalTTSNormalizer()
+        incremental_s, incremental_out = _run(incremental, text, args.chunk)
+        same = " ".join(legacy_out).split() == " ".join(incremental_out).split()
+        print(
+            f"{name:15} chars={len(text):7} "
+            f"legacy={legacy_s * 1000:9.1f}ms scans={legacy.scan_count:6} "
+            f"incremental={incremental_s * 1000:8.1f}ms "
+            f"scans={incremental.scan_count:5} "
+            f"x{legacy_s / max(incremental_s, 1e-9):7.1f} "
+            f"same_text={'yes' if same else 'no'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
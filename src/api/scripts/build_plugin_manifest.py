@@ -0,0 +1,83 @@
+"""
+Regenerate flaskr/framework/plugin/plugin_manifest.json.
+
+The manifest records the load steps ``load_plugins_from_dir`` would derive by
+walking the bundled plugin directories, so startup replays it instead of
+listing them. Run it after adding, renaming or removing a module under
+flaskr/service; tests/common/test_plugin_manifest.py fails while the
+committed manifest is out of date.
+
+Usage (from src/api):
+    python scripts/build_plugin_manifest.py
+    python scripts/build_plugin_manifest.py --check
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+_API_ROOT = Path(__file__).resolve().parents[1]
+if str(_API_ROOT) not in sys.path:
+    sys.path.insert(0, str(_API_ROOT))
+os.environ.setdefault("SKIP_APP_AUTOCREATE", "1")
+os.environ.setdefault("SKIP_LOAD_DOTENV", "1")
+
+from flaskr.framework.plugin.load_plugin import (  # noqa: E402
+    MANIFEST_PATH,
+    build_manifest,
+)
+
+# Directories whose contents ship with the application. flaskr/plugins holds
+# deployment-specific plugins and is always walked at startup.
+MANIFEST_DIRS = [os.path.join("flaskr", "service")]
+
+
+def render_manifest() -> str:
+    """Render the manifest as indented JSON with one line per step."""
+    manifest = build_manifest(MANIFEST_DIRS)
+    lines = ["{", f'  "version": {manifest["version"]},', '  "roots": {']
+    roots = list(manifest["roots"].items())
+    for root_index, (root, plugins) in enumerate(roots):
+        lines.append(f"    {json.dumps(root)}: [")
+        for plugin_index, plugin in enumerate(plugins):
+            lines.append("      {")
+            lines.append(f'        "name": {json.dumps(plugin["name"])},')
+            lines.append('        "steps": [')
+            steps = [json.dumps(step) for step in plugin["steps"]]
+            lines.append(",\n".join(f"          {step}" for step in steps))
+            lines.append("        ]")
+            lines.append("      }" + ("," if plugin_index < len(plugins) - 1 else ""))
+        lines.append("    ]" + ("," if root_index < len(roots) - 1 else ""))
+    lines.extend(["  }", "}"])
+    return "\n".join(line for line in lines if line) + "\n"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="exit non-zero if the committed manifest is out of date",
+    )
+    args = parser.parse_args()
+
+    os.chdir(_API_ROOT)
+    content = render_manifest()
+    if args.check:
+        with open(MANIFEST_PATH, encoding="utf-8") as fp:
+            if fp.read() != content:
+                print(f"{MANIFEST_PATH} is out of date")
+                return 1
+        return 0
+    with open(MANIFEST_PATH, "w", encoding="utf-8") as fp:
+        fp.write(content)
+    print(f"Wrote {MANIFEST_PATH}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+import json
+import logging
+
+import pytest
+from flask import Flask, Response, jsonify, request
+
+from flaskr.common import config as config_module
+from flaskr.common import log as log_module
+from flaskr.common.access_log import (
+    BodyLogPolicies,
+    BodyLogPolicy,
+    BodyRedactor,
+    parse_policy,
+)
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def _make_app(tmp_path, monkeypatch, **overrides):
+    settings = {
+        "ACCESS_LOG_FORMAT": "text",
+        "ACCESS_LOG_BODY_MAX_BYTES": 64,
+        "ACCESS_LOG_BODY_SAMPLE_RATE": 1.0,
+        "ACCESS_LOG_BODY_POLICIES": ["/quiet/*=off"],
+        "ACCESS_LOG_REDACT_FIELDS": ["password"],
+        "SERVER_SOFTWARE": "",
+    }
+    settings.update(overrides)
+    monkeypatch.setattr(
+        config_module, "get_config", lambda key, default=None: settings.get(key)
+    )
+    app = Flask("access-log-tests")
+    app.config["LOGGING_PATH"] = str(tmp_path / "logs" / "app.log")
+
+    @app.post("/echo/<name>")
+    def echo(name):
+        return jsonify({"name": name, "rows": request.get_json()["rows"]})
+
+    @app.post("/quiet/<name>")
+    def quiet(name):
+        return jsonify({"name": name})
+
+    @app.post("/stream/<name>")
+    def stream(name):
+        def events():
+            yield f"data: {name}\n\n"
+
+        return Response(events(), mimetype="text/event-stream")
+
+    log_module.init_log(app)
+    captured = ListHandler()
+    handler = app.logger.getChild("access").handlers[0]
+    handler.handlers.append(captured)
+    yield app, handler, captured
+    handler.close()
+
+
+@pytest.fixture
+def access_app(tmp_path, monkeypatch):
+    yield from _make_app(tmp_path, monkeypatch)
+
+
+@pytest.fixture
+def json_access_app(tmp_path, monkeypatch):
+    yield from _make_app(tmp_path, monkeypatch, ACCESS_LOG_FORMAT="json")
+
+
+def test_bodies_are_capped_and_redacted(access_app):
+    app, handler, captured = access_app
+    # The test client sorts keys, so "password" is within the logged prefix.
+    payload = {"rows": ["x" * 50] * 20, "password": "hunter2"}
+
+    response = app.test_client().post("/echo/a", json=payload)
+    handler.flush()
+
+    assert response.status_code == 200
+    request_line, response_line = captured.messages
+    assert request_line.startswith('Request body: {"password": "***"')
+    assert "hunter2" not in request_line
+    assert request_line.endswith(
+        f"...(truncated, {response.request.content_length} bytes)"
+    )
+    assert len(response_line) < 64 + 64
+
+
+def test_route_policy_skips_bodies(access_app):
+    app, handler, captured = access_app
+
+    response = app.test_client().post("/quiet/a", json={"password": "hunter2"})
+    handler.flush()
+
+    assert captured.messages == [
+        "Request body: <omitted>",
+        f"Response: <omitted, {response.content_length} bytes>",
+    ]
+
+
+def test_json_format_logs_one_line_per_request(json_access_app):
+    app, handler, captured = json_access_app
+
+    app.test_client().post("/echo/a", json={"rows": [1]})
+    handler.flush()
+
+    (line,) = captured.messages
+    entry = json.loads(line)
+    assert entry["route"] == "/echo/<name>"
+    assert entry["status"] == 200
+    assert json.loads(entry["request_body"]) == {"rows": [1]}
+    assert entry["duration_ms"] >= 0
+
+
+def test_json_format_logs_sse_stream_on_close(json_access_app):
+    app, handler, captured = json_access_app
+
+    response = app.test_client().post("/stream/a", json={"rows": [1]})
+    assert response.get_data() == b"data: a\n\n"
+    # Runs the close callback after the request context was popped.
+    response.close()
+    handler.flush()
+
+    (line,) = captured.messages
+    entry = json.loads(line)
+    assert entry["method"] == "POST"
+    assert entry["path"] == "/stream/a"
+    assert entry["route"] == "/stream/<name>"
+    assert entry["status"] == 200
+    assert entry["stream"] is True
+    assert json.loads(entry["request_body"]) == {"rows": [1]}
+    assert entry["duration_ms"] >= 0
+
+
+def test_policy_rules_match_routes_first_rule_wins():
+    default = BodyLogPolicy(max_bytes=100, sample_rate=1.0)
+    policies = BodyLogPolicies(
+        ["/api/shifu/*/mdflow=off", "/api/shifu/*=truncate:10", "/api/learn/*=full"],
+        default,
+    )
+
+    assert policies.for_request("/api/shifu/<bid>/mdflow", "").sample_rate == 0
+    assert policies.for_request("/api/shifu/<bid>", "").max_bytes == 10
+    assert policies.for_request("/api/learn/<bid>", "") == BodyLogPolicy(0, 1.0)
+    assert policies.for_request(None, "/missing") == default
+    assert parse_policy("sample:0.25", default) == BodyLogPolicy(100, 0.25)
+    with pytest.raises(ValueError):
+        BodyLogPolicies(["/api/*=sometimes"], default)
+
+
+def test_redactor_masks_truncated_and_form_values():
+    redactor = BodyRedactor(["token", "password"])
+
+    assert (
+        redactor.redact_text('{"token": "abc", "n": 1}') == '{"token": "***", "n": 1}'
+    )
+    assert redactor.redact_text('{"Password": "hunt') == '{"Password": "***"'
+    assert redactor.redact_text("a=1&token=xyz", form_encoded=True) == "a=1&token=***"
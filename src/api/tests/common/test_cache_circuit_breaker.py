@@ -0,0 +1,161 @@
+import time
+
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from flaskr.common import cache_provider
+from flaskr.common.cache_provider import (
+    CacheUnavailableError,
+    CircuitBreaker,
+    FallbackCacheProvider,
+    InMemoryCacheProvider,
+    cache_health,
+)
+from tests.common.fixtures.fake_redis import FakeRedis
+
+CONNECT_TIMEOUT = 0.05
+
+
+class _FlakyRedis:
+    """FakeRedis that simulates an outage by timing out every call."""
+
+    def __init__(self):
+        self._redis = FakeRedis()
+        self.down = False
+        self.calls = 0
+
+    def _guard(self, target):
+        def call(*args, **kwargs):
+            self.calls += 1
+            if self.down:
+                time.sleep(CONNECT_TIMEOUT)
+                raise RedisConnectionError("Timeout connecting to server")
+            return target(*args, **kwargs)
+
+        return call
+
+    def __getattr__(self, name):
+        return self._guard(getattr(self._redis, name))
+
+    def lock(self, key, timeout=None, blocking_timeout=None):
+        # Like redis-py, creating a lock does not touch the network.
+        lock = self._redis.lock(key, timeout=timeout, blocking_timeout=blocking_timeout)
+        lock.acquire = self._guard(lock.acquire)
+        return lock
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def _provider(clock=None):
+    primary = _FlakyRedis()
+    breaker = CircuitBreaker(
+        failure_threshold=3, cooldown=5.0, clock=clock or time.monotonic
+    )
+    return primary, FallbackCacheProvider(primary, InMemoryCacheProvider(), breaker)
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def test_open_circuit_skips_redis_during_outage():
+    primary, cache = _provider()
+    cache.set("k", "v")
+    primary.down = True
+
+    slow = [_timed(cache.get, "k") for _ in range(3)]
+    calls_when_opened = primary.calls
+    fast = [_timed(cache.get, "k") for _ in range(50)]
+
+    assert min(slow) >= CONNECT_TIMEOUT
+    assert max(fast) < CONNECT_TIMEOUT / 5
+    assert primary.calls == calls_when_opened
+    health = cache.health()
+    assert health["state"] == CircuitBreaker.OPEN
+    assert health["short_circuited"] == 50
+    assert health["fallback_calls"] == 53
+    assert "Timeout connecting" in health["last_error"]
+
+
+def test_public_cache_health_omits_last_error(monkeypatch):
+    primary, cache = _provider()
+    primary.down = True
+    cache.get("k")
+    monkeypatch.setattr(cache_provider, "cache", cache)
+
+    health = cache_health()
+
+    assert health["failures"] == 1
+    assert health["fallback_calls"] == 1
+    assert "last_error" not in health
+
+
+def test_half_open_probe_restores_or_reopens_circuit():
+    clock = _Clock()
+    primary, cache = _provider(clock)
+    primary.down = True
+    for _ in range(3):
+        cache.incr("counter")
+    assert cache.breaker.state == CircuitBreaker.OPEN
+
+    clock.now += 5
+    cache.get("k")  # probe fails
+    assert cache.breaker.state == CircuitBreaker.OPEN
+    assert cache.breaker.opened == 2
+
+    primary.down = False
+    clock.now += 4
+    cache.get("k")
+    assert primary.calls == 4  # still cooling down
+    clock.now += 1
+    cache.set("k", "restored")
+    assert cache.breaker.state == CircuitBreaker.CLOSED
+    assert cache.get("k") == b"restored"
+
+
+def test_only_one_half_open_probe_at_a_time():
+    clock = _Clock()
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=5.0, clock=clock)
+    breaker.record_failure(RuntimeError("down"))
+    clock.now += 5
+
+    assert breaker.allow() is True
+    assert breaker.allow() is False
+    breaker.record_success()
+    assert breaker.allow() is True
+
+
+def test_lock_falls_back_when_redis_fails_on_acquire():
+    primary, cache = _provider()
+    primary.down = True
+
+    lock = cache.lock("run_script", timeout=1, blocking_timeout=1)
+    assert lock.acquire(blocking=False) is True
+    other = cache.lock("run_script", timeout=1, blocking_timeout=1)
+    assert other.acquire(blocking=False) is False
+    lock.release()
+    assert cache.breaker.failures == 2
+    assert cache.lock("run_script").acquire(blocking=False) is True
+
+
+def test_unconfigured_redis_does_not_trip_circuit():
+    class _Unconfigured:
+        def get(self, key):
+            raise CacheUnavailableError("Redis is not configured")
+
+    cache = FallbackCacheProvider(
+        _Unconfigured(), InMemoryCacheProvider(), CircuitBreaker(1, 5.0)
+    )
+    for _ in range(20):
+        assert cache.get("k") is None
+
+    assert cache.breaker.state == CircuitBreaker.CLOSED
+    assert cache.breaker.failures == 0
+    assert cache.health()["fallback_calls"] == 20
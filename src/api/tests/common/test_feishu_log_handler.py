@@ -0,0 +1,134 @@
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from flaskr.common.log import FeishuLogHandler
+
+
+class StubWebhook:
+    """Local stand-in for a Feishu bot webhook."""
+
+    def __init__(self):
+        self.payloads = []
+        self.delay = 0.0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                time.sleep(stub.delay)
+                stub.payloads.append(json.loads(body))
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.end_headers()
+                self.wfile.write(b'{"code": 0, "msg": "success"}')
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(
+            target=self._httpd.serve_forever, args=(0.05,), daemon=True
+        ).start()
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}/hook"
+
+    @property
+    def texts(self):
+        return [payload["content"]["text"] for payload in self.payloads]
+
+    def close(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture
+def webhook():
+    stub = StubWebhook()
+    yield stub
+    stub.close()
+
+
+def _logger(handler):
+    logger = logging.getLogger(f"feishu-test-{id(handler)}")
+    logger.handlers = [handler]
+    logger.propagate = False
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    return logger
+
+
+def test_alerts_are_batched_off_the_logging_thread(webhook):
+    webhook.delay = 0.5
+    handler = FeishuLogHandler(webhook.url, batch_interval=0.05)
+    logger = _logger(handler)
+
+    started = time.perf_counter()
+    for index in range(5):
+        logger.error("provider down %s", index)
+    assert time.perf_counter() - started < 0.2
+    handler.flush()
+
+    assert len(webhook.payloads) == 1
+    assert "provider down 0" in webhook.texts[0]
+    assert "provider down 4" in webhook.texts[0]
+    assert handler.stats()["sent"] == 5
+    handler.close()
+
+
+def test_identical_alerts_are_deduplicated(webhook):
+    handler = FeishuLogHandler(webhook.url, batch_interval=0.05, dedupe_window=60)
+    logger = _logger(handler)
+
+    for _ in range(10):
+        logger.error("run_script failed")
+    handler.flush()
+    logger.error("run_script failed")
+    handler.flush()
+
+    assert len(webhook.payloads) == 1
+    assert "(repeated 9 more times)" in webhook.texts[0]
+    assert handler.stats()["deduplicated"] == 10
+    handler.close()
+
+
+def test_posts_are_rate_limited(webhook):
+    handler = FeishuLogHandler(
+        webhook.url, batch_interval=0.05, max_posts_per_minute=1, max_batch=1
+    )
+    logger = _logger(handler)
+
+    logger.error("first")
+    logger.error("second")
+    handler.flush(timeout=0.5)
+
+    assert webhook.texts == ["师傅出错啦！\nfirst\n"]
+    assert handler.stats()["posts"] == 1
+    handler.close()
+
+
+def test_slow_endpoint_hits_read_timeout(webhook):
+    webhook.delay = 1.0
+    handler = FeishuLogHandler(webhook.url, batch_interval=0.01, timeout=(1.0, 0.1))
+    logger = _logger(handler)
+
+    logger.error("boom")
+    handler.flush()
+
+    assert handler.stats()["failed"] == 1
+    assert handler.stats()["sent"] == 0
+    handler.close()
+
+
+def test_full_queue_drops_new_alerts(webhook):
+    handler = FeishuLogHandler(webhook.url, queue_size=2, batch_interval=0.2)
+    handler._ensure_sender = lambda: None  # keep the queue from draining
+    logger = _logger(handler)
+
+    for index in range(5):
+        logger.error("alert %s", index)
+
+    assert handler.stats()["dropped"] == 3
+    assert handler.stats()["queued"] == 2
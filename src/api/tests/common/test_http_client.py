@@ -0,0 +1,181 @@
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from flaskr.common.http_client import HttpClient, LatencyHistogram
+
+
+class StubServer:
+    """Keep-alive HTTP/1.1 server answering with queued status codes."""
+
+    def __init__(self):
+        self.statuses = []
+        self.retry_after = None
+        self.delay = 0
+        self.requests = 0
+        self.connections = set()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _respond(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    self.rfile.read(length)
+                server.requests += 1
+                server.connections.add(self.client_address)
+                status = server.statuses.pop(0) if server.statuses else 200
+                body = b'{"ok": true}'
+                time.sleep(server.delay)
+                self.send_response(status)
+                if status != 200 and server.retry_after is not None:
+                    self.send_header("Retry-After", server.retry_after)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = _respond
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, args=(0.05,), daemon=True
+        )
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture
+def stub_server():
+    with StubServer() as server:
+        yield server
+
+
+@pytest.fixture
+def client():
+    delays = []
+    client = HttpClient(
+        pool_size=4,
+        connect_timeout=1,
+        read_timeout=5,
+        max_retries=2,
+        backoff=0.1,
+        sleep=delays.append,
+    )
+    client.delays = delays
+    yield client
+    client.close()
+
+
+def test_calls_to_one_host_reuse_a_keep_alive_connection(client, stub_server):
+    for _ in range(5):
+        response = client.post(stub_server.url + "/tts", json={"text": "hi"})
+        assert response.json() == {"ok": True}
+
+    assert stub_server.requests == 5
+    assert len(stub_server.connections) == 1
+    stats = client.stats()
+    assert stats["sessions"] == 1
+    endpoint = stats["endpoints"][stub_server.url.split("//")[1]]
+    assert (endpoint["count"], endpoint["errors"], endpoint["retries"]) == (5, 0, 0)
+    assert sum(endpoint["buckets"].values()) == 5
+
+
+def test_idempotent_calls_retry_with_jittered_backoff(client, stub_server):
+    stub_server.statuses = [503, 502]
+    response = client.get(stub_server.url + "/token", endpoint="token")
+
+    assert response.status_code == 200
+    assert stub_server.requests == 3
+    assert len(client.delays) == 2
+    assert 0 <= client.delays[0] <= 0.1 and 0 <= client.delays[1] <= 0.2
+    stats = client.stats()["endpoints"]["token"]
+    assert (stats["count"], stats["errors"], stats["retries"]) == (3, 2, 2)
+
+    # A POST is only retried when the caller marks it idempotent.
+    stub_server.statuses = [503]
+    assert client.post(stub_server.url + "/chat").status_code == 503
+    stub_server.statuses = [429]
+    response = client.post(stub_server.url + "/tts", idempotent=True)
+    assert response.status_code == 200
+    assert stub_server.requests == 6
+
+
+def test_connection_errors_are_raised_after_the_last_retry(client):
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    with pytest.raises(requests.ConnectionError):
+        client.get(f"http://127.0.0.1:{port}/", endpoint="down")
+    assert client.stats()["endpoints"]["down"]["errors"] == 3
+
+    # A refused connection never sent the request, so even a POST is retried.
+    with pytest.raises(requests.ConnectionError):
+        client.post(f"http://127.0.0.1:{port}/", endpoint="down-post")
+    assert client.stats()["endpoints"]["down-post"]["errors"] == 3
+
+
+def test_retry_after_header_sets_the_backoff(client, stub_server):
+    stub_server.statuses = [503]
+    stub_server.retry_after = "3"
+
+    response = client.get(stub_server.url + "/token")
+
+    assert response.status_code == 200
+    assert client.delays == [3.0]
+
+
+def test_calls_are_not_resent_after_a_read_timeout(client, stub_server):
+    stub_server.delay = 0.3
+    url = stub_server.url + "/tts"
+
+    # A synthesis that timed out may still run (and bill) upstream.
+    with pytest.raises(requests.ReadTimeout):
+        client.post(url, timeout=0.1, idempotent=True, retry_after_send=False)
+    assert stub_server.requests == 1
+
+    with pytest.raises(requests.ReadTimeout):
+        client.post(url, timeout=0.1, idempotent=True)
+    assert stub_server.requests == 4
+
+    # Retryable statuses are still retried.
+    stub_server.delay = 0
+    stub_server.statuses = [503]
+    response = client.post(url, idempotent=True, retry_after_send=False)
+    assert response.status_code == 200
+    assert stub_server.requests == 6
+
+
+def test_latency_histogram_percentiles():
+    histogram = LatencyHistogram(buckets=(10, 100, 1000))
+    for elapsed_ms in [5] * 90 + [50] * 9 + [5000]:
+        histogram.observe(elapsed_ms)
+
+    snapshot = histogram.snapshot()
+    assert (snapshot["p50_ms"], snapshot["p95_ms"], snapshot["p99_ms"]) == (
+        10,
+        100,
+        100,
+    )
+    assert snapshot["max_ms"] == 5000
+    assert snapshot["buckets"] == {"10": 90, "100": 9, "1000": 0, "+inf": 1}
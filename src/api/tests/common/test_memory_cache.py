@@ -0,0 +1,125 @@
+import threading
+import time
+
+from flaskr.common.cache_provider import InMemoryCacheProvider
+
+
+class _ClockedCache(InMemoryCacheProvider):
+    def __init__(self, **kwargs):
+        kwargs.setdefault("sweep_interval", 0)
+        super().__init__(**kwargs)
+        self.now = 1000.0
+
+    def _now(self) -> float:
+        return self.now
+
+
+def _cache(**kwargs):
+    kwargs.setdefault("max_entries", 1000)
+    kwargs.setdefault("max_bytes", 1 << 20)
+    return _ClockedCache(**kwargs)
+
+
+def test_evicts_least_recently_used_entries():
+    cache = _cache(shards=1, max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == b"1"
+
+    cache.set("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_byte_budget_bounds_the_cache():
+    cache = _cache(shards=1, max_bytes=100)
+    for index in range(10):
+        cache.set(f"k{index}", "x" * 30)
+
+    stats = cache.stats()
+    assert stats["bytes"] <= 100
+    assert stats["entries"] == 3
+    assert cache.get("k9") == b"x" * 30
+
+
+def test_sweep_removes_expired_entries_and_lapsed_locks():
+    cache = _cache()
+    cache.set("short", "v", ex=10)
+    cache.set("forever", "v")
+    lock = cache.lock("run_script:u1:o1", timeout=5)
+    assert lock.acquire(blocking=False)
+
+    cache.now += 11
+    assert cache.sweep() == 1
+
+    stats = cache.stats()
+    assert (stats["entries"], stats["locks"]) == (1, 0)
+    assert cache.get("forever") == b"v"
+
+
+def test_released_locks_are_reclaimed():
+    cache = _cache()
+    for index in range(100):
+        lock = cache.lock(f"run_script:{index}", timeout=30)
+        assert lock.acquire(blocking=False)
+        lock.release()
+
+    assert cache.stats()["locks"] == 0
+
+
+def test_lapsed_lock_can_be_taken_over():
+    cache = _cache()
+    first = cache.lock("job", timeout=5)
+    second = cache.lock("job", timeout=5)
+    assert first.acquire(blocking=False)
+    assert not second.acquire(blocking=False)
+
+    cache.now += 6
+    assert second.acquire(blocking=False)
+    # the original holder's late release must not free the new owner's lock
+    first.release()
+    assert not cache.lock("job").acquire(blocking=False)
+    second.release()
+    assert cache.lock("job").acquire(blocking=False)
+
+
+def test_blocking_acquire_waits_for_release():
+    cache = InMemoryCacheProvider(sweep_interval=0)
+    holder = cache.lock("job")
+    assert holder.acquire()
+    acquired_at = []
+
+    def waiter():
+        lock = cache.lock("job", blocking_timeout=2)
+        if lock.acquire():
+            acquired_at.append(time.monotonic())
+            lock.release()
+
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    time.sleep(0.05)
+    released_at = time.monotonic()
+    holder.release()
+    thread.join(2)
+
+    assert acquired_at and acquired_at[0] >= released_at
+    assert cache.lock("job").acquire(blocking_timeout=0.01) is True
+    assert cache.lock("job").acquire(blocking_timeout=0.01) is False
+
+
+def test_concurrent_increments_are_not_lost():
+    cache = InMemoryCacheProvider(sweep_interval=0)
+
+    def worker():
+        for _ in range(500):
+            cache.incr("counter")
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert cache.get("counter") == b"4000"
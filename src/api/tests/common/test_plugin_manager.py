@@ -0,0 +1,103 @@
+import functools
+import logging
+import sys
+
+import pytest
+from flask import Flask
+
+from flaskr.framework.plugin import plugin_manager as plugin_manager_module
+from flaskr.framework.plugin.hot_reload import PluginHotReloader
+from flaskr.framework.plugin.plugin_manager import (
+    PluginManager,
+    extensible,
+    extensible_generic,
+    extension,
+    extensible_generic_register,
+)
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    app = Flask("plugin-manager-tests")
+    manager = PluginManager(app)
+    monkeypatch.setattr(plugin_manager_module, "plugin_manager", manager)
+    return manager
+
+
+@extensible
+def _greet(name):
+    return f"hello {name}"
+
+
+@extensible_generic
+def _stream(count):
+    yield from range(count)
+
+
+def test_unextended_call_is_direct_and_silent(manager, caplog):
+    with caplog.at_level(logging.DEBUG):
+        assert _greet("ada") == "hello ada"
+        assert list(_stream(2)) == [0, 1]
+
+    assert manager.extension_dispatch == {}
+    assert caplog.records == []
+
+
+def test_registration_compiles_unwrapped_dispatch(manager):
+    def shout(result, name):
+        return result.upper()
+
+    @functools.wraps(shout)
+    def wrapped(*args, **kwargs):  # pragma: no cover - must be unwrapped
+        raise AssertionError("wrapper should not be called")
+
+    extension("_greet")(wrapped)
+    extensible_generic_register("_stream")(lambda count: iter(["done"]))
+
+    assert manager.extension_dispatch["_greet"] == (shout,)
+    assert _greet("ada") == "HELLO ADA"
+    assert list(_stream(1)) == [0, "done"]
+
+
+def test_disable_and_clear_recompile_dispatch(manager):
+    extension("_greet")(lambda result, name: result + "!")
+    assert _greet("ada") == "hello ada!"
+
+    manager.is_enabled = False
+    assert _greet("ada") == "hello ada"
+    manager.is_enabled = True
+    assert _greet("ada") == "hello ada!"
+
+    manager.clear_extension("_greet")
+    assert _greet("ada") == "hello ada"
+
+
+def test_debug_logging_is_opt_in(manager, caplog):
+    manager.debug = True
+    with caplog.at_level(logging.DEBUG, logger=manager.app.logger.name):
+        _greet("ada")
+
+    assert any("execute_extensions: _greet" in r.message for r in caplog.records)
+
+
+def test_hot_reload_recompiles_dispatch(manager, tmp_path, monkeypatch):
+    module_path = tmp_path / "reloadable_greet_plugin.py"
+    module_path.write_text(
+        "from flaskr.framework import extension\n\n\n"
+        '@extension("_greet")\n'
+        "def polite(result, name):\n"
+        '    return result + ", welcome"\n'
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delitem(sys.modules, "reloadable_greet_plugin", raising=False)
+    reloader = PluginHotReloader(manager.app)
+
+    reloader.reload_plugin("reloadable_greet_plugin.py")
+    assert _greet("ada") == "hello ada, welcome"
+
+    module_path.write_text(module_path.read_text().replace("welcome", "back"))
+    reloader.reload_plugin("reloadable_greet_plugin.py")
+
+    assert _greet("ada") == "hello ada, back"
+    assert [f.__name__ for f in manager.extension_dispatch["_greet"]] == ["polite"]
@@ -0,0 +1,60 @@
+import json
+import os
+import sys
+from pathlib import Path
+
+from flask import Flask
+
+from flaskr.framework.plugin import load_plugin
+from flaskr.framework.plugin.load_plugin import build_manifest, load_plugins_from_dir
+
+API_ROOT = Path(__file__).resolve().parents[2]
+
+
+def test_committed_manifest_matches_directory_walk(monkeypatch):
+    monkeypatch.chdir(API_ROOT)
+    with open(load_plugin.MANIFEST_PATH, encoding="utf-8") as fp:
+        committed = json.load(fp)
+
+    fresh = build_manifest([os.path.join("flaskr", "service")])
+
+    assert committed == fresh, (
+        "plugin manifest is stale; run python scripts/build_plugin_manifest.py"
+    )
+
+
+def test_manifest_replays_imports_and_inject_calls(tmp_path, monkeypatch):
+    root = tmp_path / "manifest_plugins"
+    package = root / "greeting"
+    package.mkdir(parents=True)
+    (root / "__init__.py").write_text("")
+    (package / "__init__.py").write_text("")
+    (package / "routes.py").write_text(
+        "from flaskr.framework.plugin.inject import inject\n\n"
+        "CALLS = []\n\n\n"
+        "@inject\n"
+        "def register_routes(app=None):\n"
+        "    CALLS.append(app.name)\n"
+    )
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    for name in list(sys.modules):
+        if name.startswith("manifest_plugins"):
+            monkeypatch.delitem(sys.modules, name)
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text(json.dumps(build_manifest(["manifest_plugins"])))
+    monkeypatch.setattr(load_plugin, "MANIFEST_PATH", str(manifest_path))
+    # Added after the manifest was built: only a directory walk would see it.
+    (package / "unlisted.py").write_text("LOADED = True\n")
+    app = Flask("manifest-tests")
+
+    load_plugins_from_dir(app, "manifest_plugins")
+
+    routes = sys.modules["manifest_plugins.greeting.routes"]
+    assert routes.CALLS == ["manifest-tests"]
+    assert "manifest_plugins.greeting.unlisted" not in sys.modules
+
+    app.config["PLUGIN_MANIFEST_ENABLED"] = False
+    load_plugins_from_dir(app, "manifest_plugins")
+
+    assert sys.modules["manifest_plugins.greeting.unlisted"].LOADED
@@ -43,7 +43,10 @@ class _TestPluginManager:
     def __init__(self):
         self.extension_functions = {}
         self.extensible_generic_functions = {}
+        self.extension_dispatch = {}
+        self.generic_dispatch = {}
         self.is_enabled = False
+        self.debug = False
 
     def register_extension(self, target_func_name, func):
         self.extension_functions.setdefault(target_func_name, []).append(func)
@@ -103,6 +106,8 @@ def app():
     os.environ["OPENAI_API_KEY"] = "test-key"
     os.environ["DIFY_API_KEY"] = "test-key"
     os.environ["DIFY_URL"] = "https://example.com"
+    metering_spill_dir = tempfile.mkdtemp(prefix="ai-shifu-metering-")
+    os.environ["METERING_SPILL_DIR"] = metering_spill_dir
 
     from app import create_app
     from flask_migrate import upgrade
@@ -118,12 +123,16 @@ def app():
 
     yield app
 
+    from flaskr.service.metering import flush_usage_records
+
+    flush_usage_records(app)
     with app.app_context():
         dao.db.session.remove()
         if os.getenv("DROP_TEST_DB_ON_EXIT"):
             dao.db.drop_all()
     if _test_db_dir is not None:
         shutil.rmtree(_test_db_dir, ignore_errors=True)
+    shutil.rmtree(metering_spill_dir, ignore_errors=True)
     os.environ.clear()
     os.environ.update(original_env)
 
@@ -171,6 +180,35 @@ def mock_redis_client(monkeypatch, request):
     return fake_redis
 
 
+@pytest.fixture(autouse=True)
+def reset_shifu_struct_cache():
+    # Tests seed and delete struct rows directly, so SQLite may reuse row ids.
+    struct_cache = sys.modules.get("flaskr.service.shifu.shifu_struct_cache")
+    if struct_cache is not None:
+        struct_cache.shifu_struct_cache.clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def reset_config_local_cache():
+    # Config tests mock Redis and the database per test, so values cached
+    # in-process by an earlier test must not leak into the next one.
+    local_cache = sys.modules.get("flaskr.service.config.local_cache")
+    if local_cache is not None:
+        local_cache.config_local_cache.clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def reset_profile_definition_cache():
+    # Definition versions live in the per-test FakeRedis, so cached entries
+    # must not outlive the test that loaded them.
+    definition_cache = sys.modules.get("flaskr.service.profile.definition_cache")
+    if definition_cache is not None:
+        definition_cache.profile_definition_cache.clear()
+    yield
+
+
 def _should_skip_llm_mock(request) -> bool:
     return request.node.get_closest_marker("no_mock_llm") is not None
 
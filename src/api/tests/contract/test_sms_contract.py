@@ -17,7 +17,7 @@ def test_send_sms_code_ali_builds_request(monkeypatch):
             captured["runtime"] = runtime
             return SimpleNamespace(ok=True)
 
-    monkeypatch.setattr(sms_aliyun, "Dysmsapi20170525Client", FakeClient)
+    monkeypatch.setattr(sms_aliyun.dysmsapi_client, "Client", FakeClient)
 
     app = Flask("contract-sms")
     app.config.update(
@@ -46,7 +46,7 @@ def test_send_sms_code_ali_returns_none_without_keys(monkeypatch):
     def fake_client(_config):
         raise AssertionError("client should not be created")
 
-    monkeypatch.setattr(sms_aliyun, "Dysmsapi20170525Client", fake_client)
+    monkeypatch.setattr(sms_aliyun.dysmsapi_client, "Client", fake_client)
 
     app = Flask("contract-sms-missing")
     app.config.update(
@@ -82,8 +82,8 @@ def test_send_sms_code_ali_handles_client_error(monkeypatch):
     def fake_assert(message):
         captured["assert_message"] = message
 
-    monkeypatch.setattr(sms_aliyun, "Dysmsapi20170525Client", FakeClient)
-    monkeypatch.setattr(sms_aliyun.UtilClient, "assert_as_string", fake_assert)
+    monkeypatch.setattr(sms_aliyun.dysmsapi_client, "Client", FakeClient)
+    monkeypatch.setattr(sms_aliyun.util_client.Client, "assert_as_string", fake_assert)
 
     app = Flask("contract-sms-error")
     app.config.update(
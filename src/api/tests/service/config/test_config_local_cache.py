@@ -0,0 +1,130 @@
+"""
+Tests for the process-local config cache in front of Redis.
+"""
+
+import pytest
+
+from flaskr.dao import db
+from flaskr.service.config import funcs
+from flaskr.service.config.funcs import add_config, get_config
+from flaskr.service.config.local_cache import ABSENT, ConfigLocalCache
+from flaskr.service.config.models import Config
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return _Clock()
+
+
+@pytest.fixture
+def local_cache(monkeypatch, clock):
+    cache = ConfigLocalCache(
+        ttl=60, negative_ttl=10, version_check_interval=1.0, clock=clock
+    )
+    monkeypatch.setattr(funcs, "config_local_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def config_app(app):
+    with app.app_context():
+        app.config["SECRET_KEY"] = "test-secret-key-12345"
+        Config.query.filter(Config.key.like("l1_%")).delete()
+        db.session.commit()
+        yield app
+        Config.query.filter(Config.key.like("l1_%")).delete()
+        db.session.commit()
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = ConfigLocalCache(ttl=60, negative_ttl=10, clock=clock)
+    cache.put("present", "value")
+    cache.put("missing", ABSENT)
+
+    assert cache.get("present") == (True, "value")
+    assert cache.get("missing") == (True, ABSENT)
+
+    clock.now += 11
+    assert cache.get("missing") == (False, None)
+    assert cache.get("present") == (True, "value")
+    clock.now += 50
+    assert cache.get("present") == (False, None)
+    assert cache.stats() == {
+        "size": 0,
+        "hits": 2,
+        "negative_hits": 1,
+        "misses": 2,
+        "invalidations": 0,
+    }
+
+
+def test_present_and_secret_values_are_served_from_memory(
+    config_app, local_cache, monkeypatch
+):
+    add_config(config_app, "l1_plain", "plain-value")
+    add_config(config_app, "l1_secret", "secret-value", is_secret=True)
+    decrypted = []
+    original_decrypt = funcs._decrypt_config
+    monkeypatch.setattr(
+        funcs,
+        "_decrypt_config",
+        lambda app, value: decrypted.append(value) or original_decrypt(app, value),
+    )
+
+    for _ in range(3):
+        assert get_config("l1_plain") == "plain-value"
+        assert get_config("l1_secret") == "secret-value"
+
+    assert len(decrypted) == 1
+    stats = local_cache.stats()
+    assert (stats["misses"], stats["hits"]) == (2, 4)
+
+
+def test_missing_key_is_negatively_cached(config_app, local_cache, monkeypatch):
+    queries = []
+    original_query = Config.query
+
+    class _CountingQuery:
+        def filter(self, *args):
+            queries.append(args)
+            return original_query.filter(*args)
+
+    monkeypatch.setattr(Config, "query", _CountingQuery())
+
+    for _ in range(3):
+        assert get_config("l1_missing") is None
+    assert len(queries) == 1
+    assert local_cache.stats()["negative_hits"] == 2
+
+
+def test_add_config_invalidates_local_entries(config_app, local_cache):
+    assert get_config("l1_added") is None
+
+    add_config(config_app, "l1_added", "new-value")
+
+    assert get_config("l1_added") == "new-value"
+    assert local_cache.stats()["invalidations"] == 1
+
+
+def test_version_bump_from_another_process_drops_entries(
+    config_app, local_cache, clock
+):
+    add_config(config_app, "l1_remote", "old-value")
+    assert get_config("l1_remote") == "old-value"
+
+    # Another worker updates the value and bumps the shared version.
+    cache_key = funcs._get_config_cache_key(config_app, "l1_remote")
+    funcs.redis.set(cache_key, funcs.ConfigCache(value="new-value").model_dump_json())
+    funcs.redis.incr(funcs._get_config_version_key(config_app))
+
+    assert get_config("l1_remote") == "old-value"
+    clock.now += 1.5
+    assert get_config("l1_remote") == "new-value"
@@ -40,6 +40,7 @@ from flaskr.service.learn.learn_funcs import get_learn_record
 from flaskr.service.learn.context_v2 import RunScriptContextV2, RunScriptInfo, RunType
 from flaskr.service.learn.models import LearnGeneratedBlock, LearnProgressRecord
 from flaskr.service.learn.llmsetting import LLMSettings
+from flaskr.service.profile.definition_cache import ProfileDefinitionSnapshot
 from flaskr.service.shifu.consts import (
     BLOCK_TYPE_MDCONTENT_VALUE,
     BLOCK_TYPE_MDERRORMESSAGE_VALUE,
@@ -290,8 +291,8 @@ class LearnRecordLoadTests(unittest.TestCase):
                 "flaskr.service.learn.context_v2.get_user_profiles", return_value={}
             ),
             unittest.mock.patch(
-                "flaskr.service.learn.context_v2.get_profile_item_definition_list",
-                return_value=[],
+                "flaskr.service.learn.context_v2.get_profile_definition_snapshot",
+                return_value=ProfileDefinitionSnapshot("", ()),
             ),
         ):
             list(ctx.run_inner(self.app))
@@ -417,8 +418,8 @@ class LearnRecordLoadTests(unittest.TestCase):
                 "flaskr.service.learn.context_v2.get_user_profiles", return_value={}
             ),
             unittest.mock.patch(
-                "flaskr.service.learn.context_v2.get_profile_item_definition_list",
-                return_value=[],
+                "flaskr.service.learn.context_v2.get_profile_definition_snapshot",
+                return_value=ProfileDefinitionSnapshot("", ()),
             ),
         ):
             events = list(ctx.run_inner(self.app))
@@ -544,8 +545,8 @@ class LearnRecordLoadTests(unittest.TestCase):
                 "flaskr.service.learn.context_v2.get_user_profiles", return_value={}
             ),
             unittest.mock.patch(
-                "flaskr.service.learn.context_v2.get_profile_item_definition_list",
-                return_value=[],
+                "flaskr.service.learn.context_v2.get_profile_definition_snapshot",
+                return_value=ProfileDefinitionSnapshot("", ()),
             ),
         ):
             events = list(ctx.run_inner(self.app))
@@ -664,8 +665,8 @@ class LearnRecordLoadTests(unittest.TestCase):
                 "flaskr.service.learn.context_v2.get_user_profiles", return_value={}
             ),
             unittest.mock.patch(
-                "flaskr.service.learn.context_v2.get_profile_item_definition_list",
-                return_value=[],
+                "flaskr.service.learn.context_v2.get_profile_definition_snapshot",
+                return_value=ProfileDefinitionSnapshot("", ()),
             ),
         ):
             events = list(ctx.run_inner(self.app))
@@ -21,10 +21,12 @@ class FakeLock:
         self.release_calls += 1
 
 
-def _parse_sse_events(chunks: list[str]) -> list[dict]:
+def _parse_sse_events(chunks: list[bytes]) -> list[dict]:
     events: list[dict] = []
     prefix = "data: "
     for chunk in chunks:
+        if isinstance(chunk, bytes):
+            chunk = chunk.decode("utf-8")
         if not isinstance(chunk, str) or not chunk.startswith(prefix):
             continue
         payload = chunk[len(prefix) :].strip()
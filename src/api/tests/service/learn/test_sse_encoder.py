@@ -0,0 +1,50 @@
+import datetime
+import json
+
+import pytest
+
+from flaskr.service.learn import sse_encoder
+from flaskr.service.learn.learn_dtos import GeneratedType, RunMarkdownFlowDTO
+
+
+def _body(frame: bytes):
+    assert frame.startswith(b"data: ")
+    assert frame.endswith(b"\n\n")
+    return json.loads(frame[len(b"data: ") : -2])
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def encoder_backend(request, monkeypatch):
+    if request.param == "stdlib":
+        monkeypatch.setattr(sse_encoder, "orjson", None)
+    elif sse_encoder.orjson is None:
+        pytest.skip("orjson not installed")
+    return request.param
+
+
+def test_encode_sse_frame_matches_legacy_payload(encoder_backend):
+    dto = RunMarkdownFlowDTO(
+        outline_bid="outline-1",
+        generated_block_bid="generated-1",
+        type=GeneratedType.CONTENT,
+        content='你好 "world"\n',
+    )
+
+    frame = sse_encoder.encode_sse_frame(dto)
+
+    assert isinstance(frame, bytes)
+    assert _body(frame) == json.loads(json.dumps(dto.__json__()))
+    # non-ASCII text stays raw UTF-8 instead of \u escapes
+    assert "你好".encode("utf-8") in frame
+
+
+def test_encode_sse_frame_handles_datetimes_and_big_ints(encoder_backend):
+    stamp = datetime.datetime(2025, 8, 7, 12, 30)
+
+    frame = sse_encoder.encode_sse_frame({"at": stamp, "big": 1 << 70})
+
+    assert _body(frame) == {"at": stamp.isoformat(), "big": 1 << 70}
+
+
+def test_heartbeat_frame():
+    assert _body(sse_encoder.HEARTBEAT_FRAME) == {"type": "heartbeat"}
@@ -0,0 +1,156 @@
+import json
+import time
+from types import SimpleNamespace
+
+from flaskr.service.learn import runscript_v2
+from flaskr.service.learn.learn_dtos import (
+    GeneratedType,
+    NewSlideDTO,
+    RunMarkdownFlowDTO,
+)
+from flaskr.service.learn.stream_coalescer import ContentCoalescer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def _content(text, block="generated-1"):
+    return RunMarkdownFlowDTO(
+        outline_bid="outline-1",
+        generated_block_bid=block,
+        type=GeneratedType.CONTENT,
+        content=text,
+    )
+
+
+def _event(type_, block="generated-1"):
+    return RunMarkdownFlowDTO(
+        outline_bid="outline-1",
+        generated_block_bid=block,
+        type=type_,
+        content="",
+    )
+
+
+def test_coalescer_merges_deltas_until_window_elapses():
+    clock = FakeClock()
+    coalescer = ContentCoalescer(window_seconds=0.04, max_bytes=0, clock=clock)
+
+    assert coalescer.add(_content("he")) == []
+    clock.now += 0.01
+    assert coalescer.add(_content("llo")) == []
+    assert coalescer.flush_due() == []
+    assert 0 < coalescer.timeout(0.5) <= 0.03 + 1e-9
+
+    clock.now += 0.03
+    ready = coalescer.flush_due()
+    assert [e.content for e in ready] == ["hello"]
+    assert not coalescer.has_pending
+    assert coalescer.timeout(0.5) == 0.5
+
+
+def test_coalescer_flushes_on_byte_threshold_and_block_change():
+    coalescer = ContentCoalescer(window_seconds=1, max_bytes=6, clock=FakeClock())
+
+    assert coalescer.add(_content("你")) == []
+    # 3 + 3 bytes reaches the threshold
+    assert [e.content for e in coalescer.add(_content("好"))] == ["你好"]
+
+    assert coalescer.add(_content("a")) == []
+    ready = coalescer.add(_content("b", block="generated-2"))
+    assert [(e.generated_block_bid, e.content) for e in ready] == [("generated-1", "a")]
+    assert [e.content for e in coalescer.flush()] == ["b"]
+
+
+def test_coalescer_never_reorders_or_delays_other_events():
+    coalescer = ContentCoalescer(window_seconds=1, max_bytes=0, clock=FakeClock())
+    slide = RunMarkdownFlowDTO(
+        outline_bid="outline-1",
+        generated_block_bid="generated-1",
+        type=GeneratedType.NEW_SLIDE,
+        content=NewSlideDTO(
+            slide_id="slide-1",
+            generated_block_bid="generated-1",
+            slide_index=0,
+            visual_kind="text",
+            segment_type="markdown",
+            segment_content="",
+        ),
+    )
+
+    emitted = []
+    for event in [
+        _content("a"),
+        _content("b"),
+        slide,
+        _content("c"),
+        _event(GeneratedType.BREAK),
+    ]:
+        emitted.extend(coalescer.add(event))
+
+    assert [
+        (e.type, e.content if e.type == GeneratedType.CONTENT else None)
+        for e in emitted
+    ] == [
+        (GeneratedType.CONTENT, "ab"),
+        (GeneratedType.NEW_SLIDE, None),
+        (GeneratedType.CONTENT, "c"),
+        (GeneratedType.BREAK, None),
+    ]
+    assert not coalescer.has_pending
+
+
+def test_coalescer_disabled_passes_events_through():
+    coalescer = ContentCoalescer(window_seconds=0, max_bytes=1024)
+    first = _content("a")
+
+    assert coalescer.add(first) == [first]
+    assert not coalescer.has_pending
+
+
+def test_run_script_coalesces_content_frames(app, monkeypatch):
+    lock = SimpleNamespace(acquire=lambda blocking=True: True, release=lambda: None)
+    monkeypatch.setattr(
+        runscript_v2,
+        "cache_provider",
+        SimpleNamespace(lock=lambda *_args, **_kwargs: lock),
+    )
+
+    def fake_run_script_inner(**_kwargs):
+        for text in ("a", "b", "c"):
+            yield _content(text)
+        time.sleep(0.1)
+        yield _content("d")
+        yield _event(GeneratedType.BREAK)
+
+    monkeypatch.setattr(runscript_v2, "run_script_inner", fake_run_script_inner)
+
+    with app.app_context():
+        app.config["REDIS_KEY_PREFIX"] = "test"
+        frames = list(
+            runscript_v2.run_script(
+                app=app,
+                shifu_bid="shifu-1",
+                outline_bid="outline-1",
+                user_bid="user-1",
+                stream_engine="thread",
+            )
+        )
+
+    events = [
+        json.loads(frame[len(b"data: ") :])
+        for frame in frames
+        if frame.startswith(b"data: ")
+    ]
+    events = [e for e in events if e["type"] != "heartbeat"]
+    assert [(e["type"], e["content"]) for e in events] == [
+        ("content", "abc"),
+        ("content", "d"),
+        ("break", ""),
+        ("done", ""),
+    ]
@@ -0,0 +1,148 @@
+import json
+from types import SimpleNamespace
+
+import gevent
+import pytest
+
+from flaskr.service.learn import runscript_v2, stream_runner
+from flaskr.service.learn.learn_dtos import GeneratedType, RunMarkdownFlowDTO
+from flaskr.service.learn.stream_runner import (
+    GeventStreamRunner,
+    ThreadStreamRunner,
+    get_stream_runner,
+    resolve_stream_engine,
+)
+
+
+@pytest.fixture
+def gevent_worker(monkeypatch):
+    """Resolve as if running in a monkey patched gevent worker."""
+    monkeypatch.setattr(stream_runner, "_is_gevent_patched", lambda: True)
+
+
+class FakeLock:
+    def __init__(self):
+        self.release_calls = 0
+
+    def acquire(self, blocking=True):
+        return True
+
+    def release(self):
+        self.release_calls += 1
+
+
+def _parse_sse_events(chunks: list[bytes]) -> list[dict]:
+    prefix = b"data: "
+    return [
+        json.loads(chunk[len(prefix) :].strip())
+        for chunk in chunks
+        if chunk.startswith(prefix)
+    ]
+
+
+def _run(app, monkeypatch, fake_inner, stream_engine):
+    lock = FakeLock()
+    monkeypatch.setattr(
+        runscript_v2,
+        "cache_provider",
+        SimpleNamespace(lock=lambda *_args, **_kwargs: lock),
+    )
+    monkeypatch.setattr(runscript_v2, "run_script_inner", fake_inner)
+    chunks = list(
+        runscript_v2.run_script(
+            app=app,
+            shifu_bid="shifu-1",
+            outline_bid="outline-1",
+            user_bid="user-1",
+            input={"input": ["x"]},
+            input_type="normal",
+            stream_engine=stream_engine,
+        )
+    )
+    assert lock.release_calls == 1
+    return _parse_sse_events(chunks)
+
+
+def test_resolve_stream_engine_defaults_to_threads_without_monkey_patching():
+    assert resolve_stream_engine("auto") == "thread"
+    assert resolve_stream_engine("thread") == "thread"
+    assert resolve_stream_engine("unknown") == "thread"
+    assert isinstance(get_stream_runner("thread"), ThreadStreamRunner)
+
+
+def test_gevent_engine_falls_back_to_threads_without_monkey_patching(caplog):
+    with caplog.at_level("WARNING", logger=stream_runner.__name__):
+        assert resolve_stream_engine("gevent") == "thread"
+        assert isinstance(get_stream_runner("gevent"), ThreadStreamRunner)
+    assert "not monkey patched" in caplog.text
+
+
+def test_resolve_stream_engine_uses_gevent_in_patched_workers(gevent_worker):
+    assert resolve_stream_engine("auto") == "gevent"
+    assert resolve_stream_engine("gevent") == "gevent"
+    assert isinstance(get_stream_runner("gevent"), GeventStreamRunner)
+
+
+@pytest.mark.parametrize("stream_engine", ["thread", "gevent"])
+def test_run_script_streams_with_each_engine(
+    app, monkeypatch, gevent_worker, stream_engine
+):
+    with app.app_context():
+        app.config["REDIS_KEY_PREFIX"] = "test"
+
+        def fake_run_script_inner(**_kwargs):
+            for text in ("hello", "world"):
+                yield RunMarkdownFlowDTO(
+                    outline_bid="outline-1",
+                    generated_block_bid="generated-1",
+                    type=GeneratedType.CONTENT,
+                    content=text,
+                )
+
+        events = _run(app, monkeypatch, fake_run_script_inner, stream_engine)
+
+    # consecutive deltas may be coalesced into one frame
+    assert "".join(e["content"] for e in events if e["type"] == "content") == (
+        "helloworld"
+    )
+    assert events[-1]["type"] == "done"
+
+
+def test_gevent_engine_emits_heartbeats_while_producer_waits(
+    app, monkeypatch, gevent_worker
+):
+    with app.app_context():
+        app.config["REDIS_KEY_PREFIX"] = "test"
+        app.config["SSE_HEARTBEAT_INTERVAL"] = 0.01
+
+        def fake_run_script_inner(**_kwargs):
+            gevent.sleep(0.1)
+            yield RunMarkdownFlowDTO(
+                outline_bid="outline-1",
+                generated_block_bid="generated-1",
+                type=GeneratedType.CONTENT,
+                content="late",
+            )
+
+        try:
+            events = _run(app, monkeypatch, fake_run_script_inner, "gevent")
+        finally:
+            app.config.pop("SSE_HEARTBEAT_INTERVAL", None)
+
+    types = [event["type"] for event in events]
+    assert "heartbeat" in types
+    assert types.index("heartbeat") < types.index("content")
+    assert types[-1] == "done"
+
+
+def test_gevent_engine_reports_producer_errors(app, monkeypatch, gevent_worker):
+    with app.app_context():
+        app.config["REDIS_KEY_PREFIX"] = "test"
+
+        def fake_run_script_inner(**_kwargs):
+            raise RuntimeError("boom")
+            yield  # pragma: no cover
+
+        events = _run(app, monkeypatch, fake_run_script_inner, "gevent")
+
+    assert [event["type"] for event in events] == ["content", "break", "done"]
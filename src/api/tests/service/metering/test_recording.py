@@ -1,6 +1,11 @@
 import pytest
 
-from flaskr.service.metering import UsageContext, record_llm_usage, record_tts_usage
+from flaskr.service.metering import (
+    UsageContext,
+    flush_usage_records,
+    record_llm_usage,
+    record_tts_usage,
+)
 from flaskr.service.metering.consts import (
     BILL_USAGE_SCENE_PREVIEW,
     BILL_USAGE_SCENE_PROD,
@@ -32,6 +37,7 @@ def test_record_llm_usage_persists(app):
             latency_ms=123,
         )
         assert usage_bid
+        assert flush_usage_records(app)
         record = BillUsageRecord.query.filter_by(usage_bid=usage_bid).first()
         assert record is not None
         assert record.usage_type == BILL_USAGE_TYPE_LLM
@@ -85,6 +91,7 @@ def test_record_tts_usage_preview_billable_off(app):
             segment_count=1,
         )
         assert parent_record_bid == parent_usage_bid
+        assert flush_usage_records(app)
 
         parent_record = BillUsageRecord.query.filter_by(
             usage_bid=parent_usage_bid
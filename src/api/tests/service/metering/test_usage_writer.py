@@ -0,0 +1,159 @@
+import threading
+import time
+
+import pytest
+
+from flaskr.dao import db
+from flaskr.service.metering.models import BillUsageRecord
+from flaskr.service.metering.writer import (
+    UsageRecordWriter,
+    _SpillFile,
+    _encode_values,
+    record_to_values,
+)
+from flaskr.util.uuid import generate_id
+
+
+def _values(app, **kwargs):
+    return record_to_values(
+        BillUsageRecord(usage_bid=generate_id(app), provider="minimax", **kwargs)
+    )
+
+
+def _stored(app, rows):
+    bids = [row["usage_bid"] for row in rows]
+    with app.app_context():
+        return BillUsageRecord.query.filter(BillUsageRecord.usage_bid.in_(bids)).count()
+
+
+def _spill_files(path):
+    return sorted(p.name for p in path.iterdir())
+
+
+@pytest.fixture
+def writer_factory(app, tmp_path):
+    writers = []
+
+    def _create(start=False, **kwargs):
+        kwargs.setdefault("batch_size", 100)
+        kwargs.setdefault("flush_interval", 60)
+        writer = UsageRecordWriter(app, spill_dir=str(tmp_path), **kwargs)
+        if start:
+            writer.start()
+        else:
+            tmp_path.mkdir(exist_ok=True)
+        writers.append(writer)
+        return writer
+
+    yield _create
+    for writer in writers:
+        writer.shutdown(timeout=5)
+
+
+def test_background_thread_flushes_full_batches(app, tmp_path, writer_factory):
+    writer = writer_factory(start=True, batch_size=3)
+    rows = [_values(app, input=index) for index in range(3)]
+
+    for row in rows:
+        writer.submit(row)
+
+    deadline = time.monotonic() + 5
+    while writer.written < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert _stored(app, rows) == 3
+    assert writer.stats()["flushes"] == 1
+    assert _spill_files(tmp_path) == []
+
+
+def test_records_are_spilled_until_flushed(app, tmp_path, writer_factory):
+    writer = writer_factory()
+    rows = [_values(app) for _ in range(2)]
+    for row in rows:
+        writer.submit(row)
+
+    assert _stored(app, rows) == 0
+    [spill] = _spill_files(tmp_path)
+    assert spill.endswith(".wal")
+    assert len((tmp_path / spill).read_text().splitlines()) == 2
+
+    assert writer.flush()
+    assert _stored(app, rows) == 2
+    assert _spill_files(tmp_path) == []
+
+
+def test_failed_batch_stays_on_disk_and_is_retried(
+    app, tmp_path, writer_factory, monkeypatch
+):
+    writer = writer_factory()
+    rows = [_values(app) for _ in range(2)]
+    for row in rows:
+        writer.submit(row)
+    original_insert = writer._insert
+
+    def broken_insert(*_args, **_kwargs):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(writer, "_insert", broken_insert)
+    assert writer.flush() is False
+    assert [name.endswith(".flushing") for name in _spill_files(tmp_path)] == [True]
+
+    monkeypatch.setattr(writer, "_insert", original_insert)
+    assert writer.flush()
+    assert _stored(app, rows) == 2
+    assert writer.stats()["failures"] == 1
+    assert _spill_files(tmp_path) == []
+
+
+def test_inline_flush_when_buffer_is_full(app, writer_factory):
+    writer = writer_factory(batch_size=2, max_pending=2)
+    rows = [_values(app) for _ in range(2)]
+
+    for row in rows:
+        writer.submit(row)
+
+    assert _stored(app, rows) == 2
+    assert writer.stats()["pending"] == 0
+
+
+def test_orphaned_spill_files_are_replayed_once(app, tmp_path, writer_factory):
+    tmp_path.mkdir(exist_ok=True)
+    rows = [_values(app, output=index) for index in range(3)]
+    with app.app_context():
+        db.session.add(BillUsageRecord(**rows[0]))
+        db.session.commit()
+    orphan = tmp_path / "usage-99999-dead-0.flushing"
+    orphan.write_text("".join(_encode_values(row) + "\n" for row in rows) + '{"torn')
+    live = _SpillFile.create(tmp_path / "usage-1-live-0.wal")
+    live.append(_values(app))
+
+    writer = writer_factory()
+    assert writer.replay_orphans() == 2
+
+    assert _stored(app, rows) == 3
+    assert _spill_files(tmp_path) == ["usage-1-live-0.wal"]
+    live.remove()
+
+
+def test_orphans_are_replayed_on_the_writer_thread(
+    app, tmp_path, writer_factory, monkeypatch
+):
+    tmp_path.mkdir(exist_ok=True)
+    row = _values(app)
+    orphan = tmp_path / "usage-99999-dead-0.flushing"
+    orphan.write_text(_encode_values(row) + "\n")
+    original_replay = UsageRecordWriter.replay_orphans
+    threads = []
+
+    def replay_orphans(writer):
+        threads.append(threading.current_thread().name)
+        return original_replay(writer)
+
+    monkeypatch.setattr(UsageRecordWriter, "replay_orphans", replay_orphans)
+    writer = writer_factory(start=True)
+    deadline = time.monotonic() + 5
+    while not writer.replayed and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert threads == ["metering_writer"]
+    assert _stored(app, [row]) == 1
+    assert _spill_files(tmp_path) == []
@@ -0,0 +1,118 @@
+import uuid
+
+from flaskr.dao import db
+from flaskr.service.profile.constants import PROFILE_LABEL_KEYS
+from flaskr.service.profile.definition_cache import (
+    DefinitionRow,
+    ProfileDefinitionCache,
+    get_profile_definition_snapshot,
+    profile_definition_cache,
+)
+from flaskr.service.profile.funcs import get_profile_labels
+from flaskr.service.profile.models import Variable
+from flaskr.service.profile.profile_manage import (
+    add_profile_item_quick,
+    delete_profile_item,
+    get_profile_item_definition_list,
+    save_profile_item,
+    update_profile_item_hidden_state,
+)
+
+
+def _keys(app, shifu_bid):
+    return [
+        item.profile_key for item in get_profile_item_definition_list(app, shifu_bid)
+    ]
+
+
+def test_definition_list_is_served_from_cache(app):
+    shifu_bid = uuid.uuid4().hex
+    with app.app_context():
+        add_profile_item_quick(app, parent_id=shifu_bid, key="hobby", user_id="u")
+        assert "hobby" in _keys(app, shifu_bid)
+        misses = profile_definition_cache.misses
+
+        # A row written behind the cache's back stays invisible until a
+        # writer publishes a new version.
+        db.session.add(
+            Variable(
+                variable_bid=uuid.uuid4().hex,
+                shifu_bid=shifu_bid,
+                key="sneaky",
+                is_hidden=0,
+                deleted=0,
+            )
+        )
+        db.session.commit()
+
+        assert "sneaky" not in _keys(app, shifu_bid)
+        assert profile_definition_cache.misses == misses
+
+
+def test_writers_invalidate_cached_definitions(app):
+    shifu_bid = uuid.uuid4().hex
+    with app.app_context():
+        created = save_profile_item(
+            app,
+            profile_id=None,
+            parent_id=shifu_bid,
+            user_id="u",
+            key="goal",
+            type=0,
+        )
+        snapshot = get_profile_definition_snapshot(app, shifu_bid)
+        assert snapshot.key_id_map["goal"] == created.profile_id
+
+        save_profile_item(
+            app,
+            profile_id=created.profile_id,
+            parent_id=shifu_bid,
+            user_id="u",
+            key="target",
+            type=0,
+        )
+        assert "target" in _keys(app, shifu_bid)
+        assert "goal" not in _keys(app, shifu_bid)
+
+        update_profile_item_hidden_state(
+            app, parent_id=shifu_bid, profile_keys=["target"], hidden=True, user_id="u"
+        )
+        hidden = {
+            item.profile_key: item.is_hidden
+            for item in get_profile_item_definition_list(app, shifu_bid)
+        }
+        assert hidden["target"] is True
+
+        delete_profile_item(app, user_id="u", profile_id=created.profile_id)
+        assert "target" not in _keys(app, shifu_bid)
+
+
+def test_other_process_reloads_after_version_bump():
+    now = [0.0]
+    cache = ProfileDefinitionCache(
+        max_entries=8, version_check_interval=1.0, clock=lambda: now[0]
+    )
+    versions = ["1"]
+    loads = []
+
+    def load():
+        loads.append(versions[0])
+        return (DefinitionRow("sex", "v-" + versions[0], "", 0),)
+
+    def read_versions():
+        return versions[0], "0"
+
+    assert cache.get("s1", read_versions, load).key_id_map == {"sex": "v-1"}
+    versions[0] = "2"
+    # Within the check interval the entry is trusted without a version read.
+    assert cache.get("s1", read_versions, load).key_id_map == {"sex": "v-1"}
+    now[0] = 1.5
+    snapshot = cache.get("s1", read_versions, load)
+
+    assert snapshot.key_id_map == {"sex": "v-2"}
+    assert snapshot.label_keys == frozenset({"sex"})
+    assert loads == ["1", "2"]
+
+
+def test_profile_label_keys_match_profile_labels():
+    assert PROFILE_LABEL_KEYS == frozenset(get_profile_labels())
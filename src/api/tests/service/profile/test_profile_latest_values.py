@@ -0,0 +1,152 @@
+import uuid
+
+import pytest
+
+from flaskr.command.backfill_profile_latest_values import (
+    backfill_profile_latest_values,
+)
+from flaskr.dao import db
+from flaskr.service.profile.dtos import ProfileToSave
+from flaskr.service.profile import latest_values
+from flaskr.service.profile.funcs import get_user_profiles, save_user_profiles
+from flaskr.service.profile.models import VariableLatestValue, VariableValue
+from flaskr.service.profile.profile_manage import add_profile_item_quick
+
+
+@pytest.fixture
+def course(app):
+    shifu_bid = uuid.uuid4().hex
+    user_bid = uuid.uuid4().hex
+    with app.app_context():
+        add_profile_item_quick(app, parent_id=shifu_bid, key="hobby", user_id="u")
+        add_profile_item_quick(app, parent_id=shifu_bid, key="goal", user_id="u")
+    yield shifu_bid, user_bid
+    with app.app_context():
+        for model in (VariableValue, VariableLatestValue):
+            model.query.filter(model.user_bid == user_bid).delete()
+        db.session.commit()
+
+
+def _latest_rows(user_bid):
+    return VariableLatestValue.query.filter(
+        VariableLatestValue.user_bid == user_bid
+    ).all()
+
+
+def test_saves_keep_one_latest_row_per_variable(app, course):
+    shifu_bid, user_bid = course
+    with app.app_context():
+        for value in ("chess", "go", "tennis"):
+            save_user_profiles(
+                app, user_bid, shifu_bid, [ProfileToSave("hobby", value, "")]
+            )
+            db.session.commit()
+        save_user_profiles(
+            app, user_bid, shifu_bid, [ProfileToSave("goal", "learn", "")]
+        )
+        db.session.commit()
+
+        profiles = get_user_profiles(app, user_bid, shifu_bid)
+
+        assert profiles["hobby"] == "tennis"
+        assert profiles["goal"] == "learn"
+        assert sorted(row.value for row in _latest_rows(user_bid)) == [
+            "learn",
+            "tennis",
+        ]
+
+
+def test_history_is_used_until_scope_is_materialized(app, course):
+    shifu_bid, user_bid = course
+    with app.app_context():
+        db.session.add(
+            VariableValue(
+                variable_value_bid=uuid.uuid4().hex,
+                user_bid=user_bid,
+                shifu_bid=shifu_bid,
+                variable_bid="",
+                key="goal",
+                value="legacy-goal",
+                deleted=0,
+            )
+        )
+        db.session.commit()
+
+        assert get_user_profiles(app, user_bid, shifu_bid)["goal"] == "legacy-goal"
+
+        # The first write into the scope pulls older history in with it.
+        save_user_profiles(
+            app, user_bid, shifu_bid, [ProfileToSave("hobby", "chess", "")]
+        )
+        db.session.commit()
+
+        assert {row.key for row in _latest_rows(user_bid)} == {"goal", "hobby"}
+        profiles = get_user_profiles(app, user_bid, shifu_bid)
+        assert (profiles["goal"], profiles["hobby"]) == ("legacy-goal", "chess")
+
+
+def test_backfill_rebuilds_latest_values(app, course):
+    shifu_bid, user_bid = course
+    with app.app_context():
+        for value in ("old", "new"):
+            db.session.add(
+                VariableValue(
+                    variable_value_bid=uuid.uuid4().hex,
+                    user_bid=user_bid,
+                    shifu_bid=shifu_bid,
+                    variable_bid="",
+                    key="hobby",
+                    value=value,
+                    deleted=0,
+                )
+            )
+            db.session.commit()
+
+    users, rows = backfill_profile_latest_values(app, user_bid=user_bid)
+
+    assert (users, rows) == (1, 1)
+    with app.app_context():
+        assert [row.value for row in _latest_rows(user_bid)] == ["new"]
+
+
+def test_first_write_survives_a_concurrent_rebuild(app, course, monkeypatch):
+    shifu_bid, user_bid = course
+    history_rows = latest_values._history_rows
+    rebuild = latest_values.rebuild_latest_values
+    rebuilding = []
+
+    def rebuild_tracked(user, scopes):
+        rebuilding.append(True)
+        try:
+            return rebuild(user, scopes)
+        finally:
+            rebuilding.clear()
+
+    def history_with_conflict(user, scopes):
+        rows = history_rows(user, scopes)
+        # Another writer materializes the scope between our delete and insert.
+        if rebuilding:
+            for row in rows:
+                db.session.execute(
+                    VariableLatestValue.__table__.insert().values(
+                        user_bid=user,
+                        shifu_bid=row.shifu_bid,
+                        variable_bid=row.variable_bid,
+                        key=row.key,
+                        value=row.value,
+                        variable_value_bid=row.variable_value_bid,
+                        source_id=row.id,
+                    )
+                )
+        return rows
+
+    monkeypatch.setattr(latest_values, "rebuild_latest_values", rebuild_tracked)
+    monkeypatch.setattr(latest_values, "_history_rows", history_with_conflict)
+    with app.app_context():
+        save_user_profiles(
+            app, user_bid, shifu_bid, [ProfileToSave("hobby", "chess", "")]
+        )
+        db.session.commit()
+
+        assert [row.value for row in _latest_rows(user_bid)] == ["chess"]
+        assert get_user_profiles(app, user_bid, shifu_bid)["hobby"] == "chess"
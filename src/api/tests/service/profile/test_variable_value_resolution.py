@@ -1,21 +1,21 @@
-from flaskr.service.profile.funcs import _get_latest_variable_value
+from flaskr.service.profile.latest_values import LatestValueIndex
 
 
 class _DummyValue:
-    def __init__(self, *, key: str, shifu_bid: str, variable_bid: str):
+    def __init__(self, *, id: int, key: str, shifu_bid: str, variable_bid: str):
+        self.id = id
         self.key = key
         self.shifu_bid = shifu_bid
         self.variable_bid = variable_bid
 
 
-def test_get_latest_variable_value_prefers_variable_bid_match_over_key_match():
+def test_latest_value_prefers_variable_bid_match_over_key_match():
     values = [
-        _DummyValue(key="k1", shifu_bid="s1", variable_bid="v-other"),
-        _DummyValue(key="k-other", shifu_bid="s1", variable_bid="v1"),
+        _DummyValue(id=2, key="k1", shifu_bid="s1", variable_bid="v-other"),
+        _DummyValue(id=1, key="k-other", shifu_bid="s1", variable_bid="v1"),
     ]
 
-    hit = _get_latest_variable_value(
-        values,
+    hit = LatestValueIndex(values).lookup(
         variable_key="k1",
         shifu_bid="s1",
         variable_bid="v1",
@@ -23,35 +23,46 @@ def test_get_latest_variable_value_prefers_variable_bid_match_over_key_match():
     assert hit is values[1]
 
 
-def test_get_latest_variable_value_prefers_shifu_scoped_key_over_global_key():
+def test_latest_value_prefers_shifu_scoped_key_over_global_key():
     values = [
-        _DummyValue(key="k1", shifu_bid="", variable_bid="v1"),
-        _DummyValue(key="k1", shifu_bid="s1", variable_bid="v1"),
+        _DummyValue(id=2, key="k1", shifu_bid="", variable_bid="v1"),
+        _DummyValue(id=1, key="k1", shifu_bid="s1", variable_bid="v1"),
     ]
 
-    hit = _get_latest_variable_value(values, variable_key="k1", shifu_bid="s1")
+    hit = LatestValueIndex(values).lookup(variable_key="k1", shifu_bid="s1")
     assert hit is values[1]
 
 
-def test_get_latest_variable_value_falls_back_to_global_key_when_shifu_missing():
+def test_latest_value_falls_back_to_global_key_when_shifu_missing():
     values = [
-        _DummyValue(key="k1", shifu_bid="", variable_bid="v1"),
+        _DummyValue(id=1, key="k1", shifu_bid="", variable_bid="v1"),
     ]
 
-    hit = _get_latest_variable_value(values, variable_key="k1", shifu_bid="s1")
+    hit = LatestValueIndex(values).lookup(variable_key="k1", shifu_bid="s1")
     assert hit is values[0]
 
 
-def test_get_latest_variable_value_global_variable_bid_beats_global_key():
+def test_latest_value_global_variable_bid_beats_global_key():
     values = [
-        _DummyValue(key="k1", shifu_bid="", variable_bid="v-other"),
-        _DummyValue(key="k-other", shifu_bid="", variable_bid="v1"),
+        _DummyValue(id=2, key="k1", shifu_bid="", variable_bid="v-other"),
+        _DummyValue(id=1, key="k-other", shifu_bid="", variable_bid="v1"),
     ]
 
-    hit = _get_latest_variable_value(
-        values,
+    hit = LatestValueIndex(values).lookup(
         variable_key="k1",
         shifu_bid="s1",
         variable_bid="v1",
     )
     assert hit is values[1]
+
+
+def test_latest_value_newest_row_wins_regardless_of_input_order():
+    values = [
+        _DummyValue(id=1, key="k1", shifu_bid="s1", variable_bid="v1"),
+        _DummyValue(id=3, key="k1", shifu_bid="s1", variable_bid="v1"),
+        _DummyValue(id=2, key="k1", shifu_bid="s1", variable_bid="v1"),
+    ]
+
+    index = LatestValueIndex(values)
+    assert index.lookup("k1", "s1", "v1") is values[1]
+    assert index.lookup("k1", "s1") is values[1]
@@ -0,0 +1,111 @@
+import pytest
+from pydantic import ValidationError
+
+from flaskr.dao import db
+from flaskr.service.shifu.models import LogPublishedStruct
+from flaskr.service.shifu.shifu_history_manager import HistoryItem
+from flaskr.service.shifu.shifu_struct_cache import (
+    ShifuStructCache,
+    invalidate_shifu_struct_cache,
+    shifu_struct_cache,
+)
+from flaskr.service.shifu.shifu_struct_manager import get_shifu_struct
+
+
+def _add_published_struct(app, shifu_bid: str, outline_bids: list[str]) -> int:
+    with app.app_context():
+        struct = HistoryItem(
+            bid=shifu_bid,
+            id=1,
+            type="shifu",
+            children=[
+                HistoryItem(bid=bid, id=index + 10, type="outline", children=[])
+                for index, bid in enumerate(outline_bids)
+            ],
+        ).to_json()
+        log = LogPublishedStruct(
+            struct_bid=f"{shifu_bid}-{len(outline_bids)}",
+            shifu_bid=shifu_bid,
+            struct=struct,
+        )
+        db.session.add(log)
+        db.session.commit()
+        return log.id
+
+
+def _cleanup(app, shifu_bid: str):
+    with app.app_context():
+        LogPublishedStruct.query.filter_by(shifu_bid=shifu_bid).delete()
+        db.session.commit()
+
+
+def test_get_shifu_struct_reuses_parsed_tree(app):
+    shifu_bid = "struct-cache-reuse"
+    _add_published_struct(app, shifu_bid, ["o1"])
+    try:
+        first = get_shifu_struct(app, shifu_bid)
+        second = get_shifu_struct(app, shifu_bid)
+        assert first is second
+        assert [child.bid for child in first.children] == ["o1"]
+        assert isinstance(first, HistoryItem)
+    finally:
+        _cleanup(app, shifu_bid)
+
+
+def test_get_shifu_struct_returns_immutable_tree(app):
+    shifu_bid = "struct-cache-frozen"
+    _add_published_struct(app, shifu_bid, ["o1"])
+    try:
+        struct = get_shifu_struct(app, shifu_bid)
+        with pytest.raises(ValidationError):
+            struct.id = 99
+        with pytest.raises(AttributeError):
+            struct.children.append(struct)
+        copied = struct.model_copy(deep=True)
+        assert copied.to_json() == struct.to_json()
+    finally:
+        _cleanup(app, shifu_bid)
+
+
+def test_get_shifu_struct_picks_up_new_version(app):
+    shifu_bid = "struct-cache-version"
+    _add_published_struct(app, shifu_bid, ["o1"])
+    try:
+        first = get_shifu_struct(app, shifu_bid)
+        _add_published_struct(app, shifu_bid, ["o1", "o2"])
+        second = get_shifu_struct(app, shifu_bid)
+        assert second is not first
+        assert [child.bid for child in second.children] == ["o1", "o2"]
+        # The superseded version is dropped from the cache.
+        assert len(shifu_struct_cache) == 1
+    finally:
+        _cleanup(app, shifu_bid)
+
+
+def test_invalidate_shifu_struct_cache_drops_entries(app):
+    shifu_bid = "struct-cache-invalidate"
+    _add_published_struct(app, shifu_bid, ["o1"])
+    try:
+        first = get_shifu_struct(app, shifu_bid)
+        assert invalidate_shifu_struct_cache(shifu_bid, is_preview=True) == 0
+        assert invalidate_shifu_struct_cache(shifu_bid, is_preview=False) == 1
+        assert get_shifu_struct(app, shifu_bid) is not first
+    finally:
+        _cleanup(app, shifu_bid)
+
+
+def test_struct_cache_evicts_least_recently_used():
+    cache = ShifuStructCache(max_entries=2)
+    cache.put("a", False, 1, "a1")
+    cache.put("b", False, 1, "b1")
+    assert cache.get("a", False, 1) == "a1"
+    cache.put("c", False, 1, "c1")
+    assert cache.get("b", False, 1) is None
+    assert cache.get("a", False, 1) == "a1"
+    assert cache.get("c", False, 1) == "c1"
+
+
+def test_struct_cache_disabled_when_size_is_zero():
+    cache = ShifuStructCache(max_entries=0)
+    cache.put("a", False, 1, "a1")
+    assert cache.get("a", False, 1) is None
@@ -0,0 +1,124 @@
+from flaskr.dao import db
+from flaskr.service.shifu.models import LogDraftStruct
+from flaskr.service.shifu.shifu_history_manager import (
+    FrozenHistoryItem,
+    HistoryItem,
+    delete_outline_history,
+    get_shifu_history,
+    save_new_outline_history,
+)
+from flaskr.service.shifu.struct_index import StructIndex, get_struct_index
+from flaskr.service.shifu.struct_utils import find_node_with_parents
+
+
+def _outline(bid: str, id: int, children=None) -> HistoryItem:
+    return HistoryItem(bid=bid, id=id, type="outline", children=children or [])
+
+
+def _block(bid: str, id: int) -> HistoryItem:
+    return HistoryItem(bid=bid, id=id, type="block", children=[])
+
+
+def _build_struct() -> HistoryItem:
+    return HistoryItem(
+        bid="shifu",
+        id=1,
+        type="shifu",
+        children=[
+            _outline(
+                "chapter-1",
+                10,
+                [
+                    _outline("lesson-1", 11, [_block("b1", 100)]),
+                    _outline("lesson-2", 12),
+                ],
+            ),
+            _outline("chapter-2", 20, [_outline("lesson-3", 21)]),
+        ],
+    )
+
+
+def test_struct_index_lookups():
+    struct = _build_struct()
+    index = StructIndex(struct)
+
+    assert index.get("lesson-2").id == 12
+    assert index.parent("lesson-2").bid == "chapter-1"
+    assert index.parent("shifu") is None
+    assert index.sibling_index("lesson-2") == 1
+    assert [item.bid for item in index.path("b1")] == [
+        "shifu",
+        "chapter-1",
+        "lesson-1",
+        "b1",
+    ]
+    assert index.path("missing") is None
+    # outlines are listed in pre-order, the learning order
+    assert index.outline_bids == [
+        "chapter-1",
+        "lesson-1",
+        "lesson-2",
+        "chapter-2",
+        "lesson-3",
+    ]
+
+
+def test_struct_index_keeps_first_duplicate_in_pre_order():
+    struct = _build_struct()
+    struct.children[0].children[0].children.append(_outline("chapter-2", 99))
+
+    # A breadth-first walk would find the top-level chapter-2 (id 20) first.
+    assert StructIndex(struct).get("chapter-2").id == 99
+
+
+def test_find_node_with_parents_uses_index():
+    struct = _build_struct()
+    path = find_node_with_parents(struct, "lesson-3")
+    assert [item.bid for item in path] == ["shifu", "chapter-2", "lesson-3"]
+    assert find_node_with_parents(struct, "missing") is None
+
+
+def test_get_struct_index_is_cached_for_frozen_structs():
+    frozen = FrozenHistoryItem.from_json(_build_struct().to_json())
+    assert get_struct_index(frozen) is get_struct_index(frozen)
+
+    mutable = _build_struct()
+    assert get_struct_index(mutable) is not get_struct_index(mutable)
+
+
+def test_history_mutators_use_index(app):
+    shifu_bid = "struct-index-history"
+    with app.app_context():
+        LogDraftStruct.query.filter_by(shifu_bid=shifu_bid).delete()
+        struct = _build_struct()
+        struct.bid = shifu_bid
+        db.session.add(
+            LogDraftStruct(
+                struct_bid="struct-index-history",
+                shifu_bid=shifu_bid,
+                struct=struct.to_json(),
+            )
+        )
+        db.session.commit()
+
+    try:
+        with app.app_context():
+            save_new_outline_history(
+                app, "user", shifu_bid, "lesson-4", 22, "chapter-2"
+            )
+            db.session.commit()
+            delete_outline_history(app, "user", shifu_bid, "lesson-1")
+            db.session.commit()
+
+            history = get_shifu_history(app, shifu_bid)
+            index = StructIndex(history)
+            assert "lesson-1" not in index
+            assert "b1" not in index
+            assert [child.bid for child in index.get("chapter-2").children] == [
+                "lesson-3",
+                "lesson-4",
+            ]
+    finally:
+        with app.app_context():
+            LogDraftStruct.query.filter_by(shifu_bid=shifu_bid).delete()
+            db.session.commit()
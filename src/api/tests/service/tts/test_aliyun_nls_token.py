@@ -6,6 +6,7 @@ import requests
 
 from flaskr.api.tts.aliyun_nls_token import get_aliyun_nls_token
 from flaskr.api.tts.aliyun_provider import AliyunTTSProvider
+from flaskr.common.http_client import http_client
 
 
 def test_get_aliyun_nls_token_uses_override_when_configured(monkeypatch):
@@ -13,10 +14,10 @@ def test_get_aliyun_nls_token_uses_override_when_configured(monkeypatch):
 
     def fake_get(*args, **kwargs):
         raise AssertionError(
-            "requests.get should not be called when override token exists"
+            "http_client.get should not be called when override token exists"
         )
 
-    monkeypatch.setattr(requests, "get", fake_get)
+    monkeypatch.setattr(http_client, "get", fake_get)
 
     assert get_aliyun_nls_token() == "override-token"
 
@@ -45,14 +46,14 @@ def test_get_aliyun_nls_token_fetches_and_caches(monkeypatch):
         def json(self):
             return {"Token": {"Id": "tok-1", "ExpireTime": int(time.time()) + 3600}}
 
-    def fake_get(url, headers=None, timeout=None):
+    def fake_get(url, headers=None, timeout=None, **_kwargs):
         captured["calls"] += 1
         captured["url"] = url
         captured["headers"] = headers
         captured["timeout"] = timeout
         return DummyResponse()
 
-    monkeypatch.setattr(requests, "get", fake_get)
+    monkeypatch.setattr(http_client, "get", fake_get)
 
     token1 = get_aliyun_nls_token()
     token2 = get_aliyun_nls_token()
@@ -98,7 +99,7 @@ def test_get_aliyun_nls_token_refresh_falls_back_to_cached_token(monkeypatch):
         captured["calls"] += 1
         raise requests.RequestException("network down")
 
-    monkeypatch.setattr(requests, "get", fake_get)
+    monkeypatch.setattr(http_client, "get", fake_get)
 
     assert get_aliyun_nls_token() == "cached-token"
     assert captured["calls"] == 1
@@ -130,14 +131,14 @@ def test_aliyun_provider_synthesize_uses_dynamic_token(monkeypatch):
         headers = {"Content-Type": "audio/mpeg"}
         content = b"audio-bytes"
 
-    def fake_post(url, json=None, headers=None, timeout=None):
+    def fake_post(url, json=None, headers=None, timeout=None, **_kwargs):
         captured["url"] = url
         captured["json"] = json
         captured["headers"] = headers
         captured["timeout"] = timeout
         return DummyResponse()
 
-    monkeypatch.setattr(requests, "post", fake_post)
+    monkeypatch.setattr(http_client, "post", fake_post)
 
     provider = AliyunTTSProvider()
     result = provider.synthesize("Hello")
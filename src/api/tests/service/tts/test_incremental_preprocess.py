@@ -0,0 +1,90 @@
+import pytest
+
+from flaskr.service.tts import preprocess_for_tts, preprocess_for_tts_with_offsets
+from flaskr.service.tts.incremental_preprocess import IncrementalTTSNormalizer
+from flaskr.service.tts.patterns import SENTENCE_ENDINGS
+
+SAMPLES = [
+    "**Hi.** there.",
+    "# Title\n\n- item one.\n- [link](http://x.y). Done!",
+    "Before &lt;p&gt;Hello&lt;/p&gt; After. a &amp;lt;b&amp;gt; c.",
+    "Before.\n\n<svg width='1'><text>x.</text></svg>\n\nAfter.",
+    "code `a.b` and ```py\nx=1.\n``` end.",
+    "![img](u.png) caption.\n\n\n\nNext\t\t para.   ok.",
+    "x < 3. y <p>z</p>. _it_ and ***bi*** z.",
+    "data:image/png;base64,AAA= tail. 你好。世界！ <b>粗体</b>；完",
+]
+
+
+@pytest.mark.parametrize("sample", SAMPLES)
+def test_offsets_match_preprocess_for_every_stream_prefix(sample):
+    for size in range(len(sample) + 1):
+        raw = sample[:size]
+        cleaned, ends = preprocess_for_tts_with_offsets(raw)
+
+        assert cleaned == preprocess_for_tts(raw)
+        assert len(ends) == len(cleaned)
+        assert ends == sorted(ends)
+        # cutting the raw text at a mapped sentence end keeps that sentence
+        for match in SENTENCE_ENDINGS.finditer(cleaned):
+            cut = ends[match.end() - 1]
+            assert preprocess_for_tts(raw[:cut]).startswith(cleaned[: match.end()])
+
+
+class _ScanEveryChunk(IncrementalTTSNormalizer):
+    """Reference without rescan gating."""
+
+    def _should_scan(self, chunk):
+        return True
+
+
+def _stream(text, chunk_size, normalizer_class=IncrementalTTSNormalizer):
+    normalizer = normalizer_class()
+    sentences = []
+    for index in range(0, len(text), chunk_size):
+        completed = normalizer.feed(text[index : index + chunk_size])
+        if completed:
+            sentences.append(completed)
+    tail = normalizer.drain()
+    if tail:
+        sentences.append(tail)
+    return normalizer, sentences
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 17])
+def test_rescan_gating_does_not_change_sentences(chunk_size):
+    text = "\n\n".join(SAMPLES) + "\n\n<svg><text>a.</text>" + "``` x. ```" + " end."
+
+    _normalizer, sentences = _stream(text, chunk_size)
+    _reference, expected = _stream(text, chunk_size, _ScanEveryChunk)
+
+    assert sentences == expected
+
+
+def test_long_paragraph_without_endings_is_scanned_once():
+    text = "，".join(["没有句号的长段落"] * 300) + "。"
+
+    normalizer, sentences = _stream(text, 2)
+
+    assert normalizer.scan_count == 1
+    assert sentences == [preprocess_for_tts(text)]
+
+
+def test_open_svg_block_waits_for_its_closing_tag():
+    svg = "".join(f"<rect x='{i}.5' style='fill:#abc;'/>" for i in range(200))
+    text = f"Look.\n\n<svg viewBox='0 0 8 6'>{svg}</svg>\n\nAs shown."
+
+    normalizer, sentences = _stream(text, 3)
+
+    assert sentences == ["Look.", "As shown."]
+    assert normalizer.scan_count < 10
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5])
+def test_raw_text_keeps_everything_fed(chunk_size):
+    text = "\n\n".join(SAMPLES)
+
+    normalizer, _sentences = _stream(text, chunk_size)
+
+    assert normalizer.pending_raw == ""
+    assert normalizer.raw_text == text
@@ -0,0 +1,123 @@
+import struct
+
+import pytest
+
+from flaskr.service.tts import audio_utils
+from flaskr.service.tts.mp3_frames import (
+    _crc16,
+    build_info_frame,
+    concat_mp3_frames,
+    parse_frame_header,
+    parse_mp3,
+)
+
+# MPEG-2 Layer III, 64 kbps, 24 kHz, mono: 192 byte frames of 576 samples
+_HEADER_24K = bytes((0xFF, 0xF3, 0x84, 0xC4))
+# MPEG-2 Layer III, 64 kbps, 16 kHz, mono: 288 byte frames
+_HEADER_16K = bytes((0xFF, 0xF3, 0x88, 0xC4))
+
+
+def _frames(header: bytes, count: int, seed: int) -> list[bytes]:
+    length = parse_frame_header(header).frame_length
+    return [
+        header + bytes((seed + index) % 251 for _ in range(length - 4))
+        for index in range(count)
+    ]
+
+
+def _id3v2(payload: bytes = b"\x00" * 20) -> bytes:
+    size = len(payload)
+    syncsafe = bytes(
+        ((size >> 21) & 0x7F, (size >> 14) & 0x7F, (size >> 7) & 0x7F, size & 0x7F)
+    )
+    return b"ID3\x04\x00\x00" + syncsafe + payload
+
+
+def _segment(header: bytes, count: int, seed: int, delay=576, padding=300) -> bytes:
+    frames = _frames(header, count, seed)
+    info = build_info_frame(
+        parse_frame_header(header),
+        [memoryview(frame) for frame in frames],
+        encoder_delay=delay,
+        encoder_padding=padding,
+    )
+    id3v1 = b"TAG" + b"\x00" * 125
+    return _id3v2() + info + b"".join(frames) + id3v1
+
+
+def test_parse_mp3_strips_tags_and_info_frame():
+    stream = parse_mp3(_segment(_HEADER_24K, 10, seed=1))
+
+    assert stream.frame_count == 10
+    assert stream.header.sample_rate == 24000
+    assert stream.header.channels == 1
+    assert (stream.encoder_delay, stream.encoder_padding) == (576, 300)
+    assert stream.duration_ms == (10 * 576 - 576 - 300) * 1000 // 24000
+
+
+def test_parse_mp3_resyncs_after_junk():
+    frames = _frames(_HEADER_24K, 4, seed=2)
+    data = frames[0] + frames[1] + b"\xff\x00junk" + frames[2] + frames[3]
+
+    assert parse_mp3(data).frame_count == 4
+
+
+def test_concat_mp3_frames_joins_without_decoding():
+    segments = [
+        _segment(_HEADER_24K, count, seed) for seed, count in enumerate((3, 5, 2))
+    ]
+    expected = b"".join(
+        b"".join(_frames(_HEADER_24K, count, seed))
+        for seed, count in enumerate((3, 5, 2))
+    )
+
+    joined = concat_mp3_frames(segments)
+
+    info_length = parse_frame_header(joined).frame_length
+    info = joined[:info_length]
+    assert joined[info_length:] == expected
+    # Xing/Info header: tag, flags, frames, bytes
+    xing_offset = 4 + 9
+    tag, flags, frames, total = struct.unpack_from(">4sIII", info, xing_offset)
+    assert tag == b"Info"
+    assert flags == 0x0F
+    assert frames == 10
+    assert total == len(joined)
+    # LAME tag CRCs
+    lame_offset = xing_offset + 120
+    assert info[lame_offset : lame_offset + 9] == b"LAME3.100"
+    music_crc, tag_crc = struct.unpack_from(">HH", info, lame_offset + 32)
+    assert music_crc == _crc16([expected])
+    assert tag_crc == _crc16([info[: lame_offset + 34]])
+
+    stream = parse_mp3(joined)
+    assert stream.frame_count == 10
+    # delay of the first segment, padding of the last one
+    assert (stream.encoder_delay, stream.encoder_padding) == (576, 300)
+
+
+def test_concat_mp3_frames_rejects_mixed_sample_rates():
+    segments = [_segment(_HEADER_24K, 3, 1), _segment(_HEADER_16K, 3, 2)]
+
+    assert concat_mp3_frames(segments) is None
+
+
+def test_concat_audio_best_effort_falls_back_when_formats_differ(monkeypatch):
+    segments = [_segment(_HEADER_24K, 3, 1), _segment(_HEADER_16K, 3, 2)]
+    monkeypatch.setattr(audio_utils, "PYDUB_AVAILABLE", False)
+
+    with pytest.raises(ImportError):
+        audio_utils.concat_audio_mp3(segments)
+    assert audio_utils.concat_audio_best_effort(segments) == b"".join(segments)
+
+
+def test_audio_utils_use_frames_without_pydub(monkeypatch):
+    segments = [_segment(_HEADER_24K, 4, 1), _segment(_HEADER_24K, 6, 2)]
+    monkeypatch.setattr(audio_utils, "PYDUB_AVAILABLE", False)
+
+    joined = audio_utils.concat_audio_best_effort(segments)
+
+    assert joined == concat_mp3_frames(segments)
+    assert audio_utils.get_audio_duration_ms(joined) == (
+        (10 * 576 - 576 - 300) * 1000 // 24000
+    )
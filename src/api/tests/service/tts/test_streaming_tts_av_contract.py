@@ -41,8 +41,8 @@ def test_av_streaming_tts_processor_emits_av_contract_in_events(app, monkeypatch
                 ),
             )
 
-        def finalize(self, commit=True):
-            _ = commit
+        def finalize(self, commit=True, wait=True, deadline=None):
+            _ = commit, wait, deadline
             yield RunMarkdownFlowDTO(
                 outline_bid=self.outline_bid,
                 generated_block_bid=self.generated_block_bid,
@@ -105,8 +105,8 @@ def test_av_streaming_tts_processor_skips_chunked_markdown_image(app, monkeypatc
             return
             yield
 
-        def finalize(self, commit=True):
-            _ = commit
+        def finalize(self, commit=True, wait=True, deadline=None):
+            _ = commit, wait, deadline
             return
             yield
 
@@ -179,8 +179,8 @@ def test_av_streaming_tts_processor_emits_new_slide_before_audio(app, monkeypatc
                 ),
             )
 
-        def finalize(self, commit=True):
-            _ = commit
+        def finalize(self, commit=True, wait=True, deadline=None):
+            _ = commit, wait, deadline
             yield RunMarkdownFlowDTO(
                 outline_bid=self.outline_bid,
                 generated_block_bid=self.generated_block_bid,
@@ -262,8 +262,8 @@ def test_av_streaming_tts_processor_advances_position_when_segment_has_no_audio(
             return
             yield
 
-        def finalize(self, commit=True):
-            _ = commit
+        def finalize(self, commit=True, wait=True, deadline=None):
+            _ = commit, wait, deadline
             # Simulate provider behavior: very short text produces no audio completion.
             if len((self._buffer or "").strip()) < 2:
                 return
@@ -328,8 +328,8 @@ def test_av_streaming_tts_processor_emits_run_start_slide_once(app, monkeypatch)
             return
             yield
 
-        def finalize(self, commit=True):
-            _ = commit
+        def finalize(self, commit=True, wait=True, deadline=None):
+            _ = commit, wait, deadline
             return
             yield
 
@@ -376,8 +376,8 @@ def test_av_streaming_tts_processor_emits_visual_slide_on_boundary_without_audio
             return
             yield
 
-        def finalize(self, commit=True):
-            _ = commit
+        def finalize(self, commit=True, wait=True, deadline=None):
+            _ = commit, wait, deadline
             return
             yield
 
@@ -426,8 +426,8 @@ def test_av_streaming_tts_processor_emits_head_then_full_slide_for_incomplete_bo
             return
             yield
 
-        def finalize(self, commit=True):
-            _ = commit
+        def finalize(self, commit=True, wait=True, deadline=None):
+            _ = commit, wait, deadline
             return
             yield
 
@@ -482,8 +482,8 @@ def test_av_streaming_tts_processor_detects_truncated_sandbox_start(app, monkeyp
             return
             yield
 
-        def finalize(self, commit=True):
-            _ = commit
+        def finalize(self, commit=True, wait=True, deadline=None):
+            _ = commit, wait, deadline
             return
             yield
 
@@ -559,8 +559,8 @@ def test_av_streaming_tts_processor_never_emits_full_segment_content_in_new_slid
                 ),
             )
 
-        def finalize(self, commit=True):
-            _ = commit
+        def finalize(self, commit=True, wait=True, deadline=None):
+            _ = commit, wait, deadline
             return
             yield
 
@@ -38,10 +38,10 @@ def create_test_processor(mock_app, **kwargs):
 class TestFinalizeSegmentation:
     """Tests for finalize segmentation improvements."""
 
-    @patch("flaskr.service.tts.streaming_tts._tts_executor")
+    @patch("flaskr.service.tts.streaming_tts.tts_scheduler")
     @patch("flaskr.service.tts.streaming_tts.is_tts_configured")
     def test_process_chunk_submits_only_after_sentence_boundary(
-        self, mock_is_configured, mock_executor, mock_app
+        self, mock_is_configured, mock_scheduler, mock_app
     ):
         """Test stream-time submission waits for a full sentence ending."""
         mock_is_configured.return_value = True
@@ -58,7 +58,7 @@ class TestFinalizeSegmentation:
             future.result.return_value = None
             return future
 
-        mock_executor.submit.side_effect = mock_submit
+        mock_scheduler.submit.side_effect = mock_submit
 
         list(processor.process_chunk("Hello without ending"))
         assert submitted_texts == []
@@ -69,10 +69,10 @@ class TestFinalizeSegmentation:
         list(processor.process_chunk("!"))
         assert submitted_texts == ["Hello without ending still no ending!"]
 
-    @patch("flaskr.service.tts.streaming_tts._tts_executor")
+    @patch("flaskr.service.tts.streaming_tts.tts_scheduler")
     @patch("flaskr.service.tts.streaming_tts.is_tts_configured")
     def test_submit_remaining_text_in_segments_splits_at_sentence_boundaries(
-        self, mock_is_configured, mock_executor, mock_app
+        self, mock_is_configured, mock_scheduler, mock_app
     ):
         """Test that remaining text is split at sentence boundaries."""
         mock_is_configured.return_value = True
@@ -100,7 +100,7 @@ class TestFinalizeSegmentation:
             future.result.return_value = None
             return future
 
-        mock_executor.submit.side_effect = mock_submit
+        mock_scheduler.submit.side_effect = mock_submit
 
         # Call the method
         processor._submit_remaining_text_in_segments(remaining_text)
@@ -111,10 +111,10 @@ class TestFinalizeSegmentation:
         for i, text in enumerate(submitted_texts[:-1]):
             assert text.rstrip().endswith((".", "!", "?", "。", "！", "？"))
 
-    @patch("flaskr.service.tts.streaming_tts._tts_executor")
+    @patch("flaskr.service.tts.streaming_tts.tts_scheduler")
     @patch("flaskr.service.tts.streaming_tts.is_tts_configured")
     def test_submit_remaining_text_does_not_split_by_char_count_without_sentence(
-        self, mock_is_configured, mock_executor, mock_app
+        self, mock_is_configured, mock_scheduler, mock_app
     ):
         """Test that text without sentence boundaries is submitted as one segment."""
         mock_is_configured.return_value = True
@@ -139,16 +139,16 @@ class TestFinalizeSegmentation:
             future.result.return_value = None
             return future
 
-        mock_executor.submit.side_effect = mock_submit
+        mock_scheduler.submit.side_effect = mock_submit
 
         processor._submit_remaining_text_in_segments(remaining_text)
 
         assert submitted_texts == [remaining_text]
 
-    @patch("flaskr.service.tts.streaming_tts._tts_executor")
+    @patch("flaskr.service.tts.streaming_tts.tts_scheduler")
     @patch("flaskr.service.tts.streaming_tts.is_tts_configured")
     def test_submit_remaining_text_handles_short_text(
-        self, mock_is_configured, mock_executor, mock_app
+        self, mock_is_configured, mock_scheduler, mock_app
     ):
         """Test handling of very short remaining text."""
         mock_is_configured.return_value = True
@@ -170,7 +170,7 @@ class TestFinalizeSegmentation:
             future.result.return_value = None
             return future
 
-        mock_executor.submit.side_effect = mock_submit
+        mock_scheduler.submit.side_effect = mock_submit
 
         processor._submit_remaining_text_in_segments(remaining_text)
 
@@ -178,10 +178,10 @@ class TestFinalizeSegmentation:
         assert len(submitted_texts) == 1
         assert submitted_texts[0] == "Hi"
 
-    @patch("flaskr.service.tts.streaming_tts._tts_executor")
+    @patch("flaskr.service.tts.streaming_tts.tts_scheduler")
     @patch("flaskr.service.tts.streaming_tts.is_tts_configured")
     def test_submit_remaining_text_handles_empty_string(
-        self, mock_is_configured, mock_executor, mock_app
+        self, mock_is_configured, mock_scheduler, mock_app
     ):
         """Test handling of empty remaining text."""
         mock_is_configured.return_value = True
@@ -192,12 +192,12 @@ class TestFinalizeSegmentation:
         processor._submit_remaining_text_in_segments("")
 
         # Should not submit anything
-        assert mock_executor.submit.call_count == 0
+        assert mock_scheduler.submit.call_count == 0
 
-    @patch("flaskr.service.tts.streaming_tts._tts_executor")
+    @patch("flaskr.service.tts.streaming_tts.tts_scheduler")
     @patch("flaskr.service.tts.streaming_tts.is_tts_configured")
     def test_submit_remaining_text_handles_whitespace_only(
-        self, mock_is_configured, mock_executor, mock_app
+        self, mock_is_configured, mock_scheduler, mock_app
     ):
         """Test handling of whitespace-only remaining text."""
         mock_is_configured.return_value = True
@@ -208,12 +208,12 @@ class TestFinalizeSegmentation:
         processor._submit_remaining_text_in_segments("   \n\t  ")
 
         # Should not submit anything
-        assert mock_executor.submit.call_count == 0
+        assert mock_scheduler.submit.call_count == 0
 
-    @patch("flaskr.service.tts.streaming_tts._tts_executor")
+    @patch("flaskr.service.tts.streaming_tts.tts_scheduler")
     @patch("flaskr.service.tts.streaming_tts.is_tts_configured")
     def test_submit_remaining_text_logs_segment_info(
-        self, mock_is_configured, mock_executor, mock_app, caplog
+        self, mock_is_configured, mock_scheduler, mock_app, caplog
     ):
         """Test that segment submission is properly logged."""
         mock_is_configured.return_value = True
@@ -227,7 +227,7 @@ class TestFinalizeSegmentation:
             future.result.return_value = None
             return future
 
-        mock_executor.submit.side_effect = mock_submit
+        mock_scheduler.submit.side_effect = mock_submit
 
         with caplog.at_level("DEBUG"):
             processor._submit_remaining_text_in_segments(remaining_text)
@@ -240,10 +240,10 @@ class TestFinalizeSegmentation:
 class TestOffsetDriftRegression:
     """Regression tests for offset drift when markdown becomes complete across chunks."""
 
-    @patch("flaskr.service.tts.streaming_tts._tts_executor")
+    @patch("flaskr.service.tts.streaming_tts.tts_scheduler")
     @patch("flaskr.service.tts.streaming_tts.is_tts_configured")
     def test_bold_spanning_chunks_no_text_loss(
-        self, mock_is_configured, mock_executor, mock_app
+        self, mock_is_configured, mock_scheduler, mock_app
     ):
         """Bold markers completing across chunks must not cause text loss.
 
@@ -265,7 +265,7 @@ class TestOffsetDriftRegression:
             future.result.return_value = None
             return future
 
-        mock_executor.submit.side_effect = mock_submit
+        mock_scheduler.submit.side_effect = mock_submit
 
         # Chunk 1: bold starts but doesn't close, first sentence submitted
         list(processor.process_chunk("First. **Second"))
@@ -286,10 +286,10 @@ class TestOffsetDriftRegression:
             f"Text 'Third' was lost. Submitted: {submitted_texts}"
         )
 
-    @patch("flaskr.service.tts.streaming_tts._tts_executor")
+    @patch("flaskr.service.tts.streaming_tts.tts_scheduler")
     @patch("flaskr.service.tts.streaming_tts.is_tts_configured")
     def test_link_spanning_chunks_no_text_loss(
-        self, mock_is_configured, mock_executor, mock_app
+        self, mock_is_configured, mock_scheduler, mock_app
     ):
         """Links completing across chunks must not lose surrounding text."""
         mock_is_configured.return_value = True
@@ -306,7 +306,7 @@ class TestOffsetDriftRegression:
             future.result.return_value = None
             return future
 
-        mock_executor.submit.side_effect = mock_submit
+        mock_scheduler.submit.side_effect = mock_submit
 
         # Chunk 1: sentence + start of a link
         list(processor.process_chunk("Hello. See [docs](https://exam"))
@@ -323,13 +323,13 @@ class TestOffsetDriftRegression:
 class TestFinalizeDelayManagement:
     """Tests for finalize delay management improvements."""
 
-    @patch("flaskr.service.tts.streaming_tts._tts_executor")
+    @patch("flaskr.service.tts.streaming_tts.tts_scheduler")
     @patch("flaskr.service.tts.streaming_tts.is_tts_configured")
     @patch("flaskr.service.tts.streaming_tts.time.sleep")
-    def test_yield_ready_segments_adds_delay_between_segments(
-        self, mock_sleep, mock_is_configured, mock_executor, mock_app
+    def test_yield_ready_segments_sets_play_offsets_without_sleeping(
+        self, mock_sleep, mock_is_configured, mock_scheduler, mock_app
     ):
-        """Test that _yield_ready_segments adds delay between segment yields."""
+        """Test that segments carry play offsets instead of being paced by sleeps."""
         mock_is_configured.return_value = True
 
         processor = create_test_processor(mock_app)
@@ -346,9 +346,12 @@ class TestFinalizeDelayManagement:
             processor._completed_segments[i] = segment
 
         # Yield ready segments
-        list(processor._yield_ready_segments())
-
-        # Verify sleep was called between segments (not before first segment)
-        # For 4 segments, should have 3 delays (between 0-1, 1-2, 2-3)
-        assert mock_sleep.call_count == num_segments - 1
-        mock_sleep.assert_called_with(0.1)  # 100ms delay
+        events = list(processor._yield_ready_segments())
+
+        mock_sleep.assert_not_called()
+        assert [event.content.start_offset_ms for event in events] == [
+            0,
+            1000,
+            2000,
+            3000,
+        ]
@@ -0,0 +1,153 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from flaskr.api.tts.base import TTSResult
+from flaskr.service.tts.audio_cache import SEGMENT_SYNTHESIZED
+from flaskr.service.tts.scheduler import tts_scheduler
+from flaskr.service.learn.learn_dtos import GeneratedType
+
+SYNTHESIS_SECONDS = 0.4
+
+CHUNKS = [
+    "First sentence of the lesson. ",
+    "Second sentence follows here. ",
+    "Third one before the diagram.\n",
+    "<svg><text>diagram</text></svg>\n",
+    "Narration after the diagram. ",
+    "And a closing sentence here.",
+]
+
+
+def _require_app(app):
+    if app is None:
+        pytest.skip("App fixture disabled")
+
+
+@pytest.fixture
+def slow_tts(monkeypatch):
+    """Fake synthesis; set ``slow_tts.seconds`` to change how long it takes.
+
+    Teardown waits for syntheses a finalize gave up on, so they finish while
+    the usage recorders are still patched.
+    """
+    settings = SimpleNamespace(seconds=SYNTHESIS_SECONDS)
+
+    def _synthesize(app, *, text, **_kwargs):
+        time.sleep(settings.seconds)
+        return TTSResult(b"ID3" + text.encode(), 500, 24000, "mp3"), SEGMENT_SYNTHESIZED
+
+    monkeypatch.setattr(
+        "flaskr.service.tts.streaming_tts.synthesize_text_cached", _synthesize
+    )
+    monkeypatch.setattr(
+        "flaskr.service.tts.tts_usage_recorder.record_tts_segment_usage",
+        lambda **_kwargs: None,
+    )
+    monkeypatch.setattr(
+        "flaskr.service.tts.tts_usage_recorder.record_tts_aggregated_usage",
+        lambda **_kwargs: None,
+    )
+    monkeypatch.setattr(
+        "flaskr.service.tts.streaming_tts.concat_audio_best_effort", b"".join
+    )
+    monkeypatch.setattr(
+        "flaskr.service.tts.streaming_tts.get_audio_duration_ms", lambda _a: 1000
+    )
+    monkeypatch.setattr(
+        "flaskr.service.tts.tts_handler.upload_audio_to_oss",
+        lambda _app, _audio, audio_bid: (f"https://oss/{audio_bid}.mp3", "bucket"),
+    )
+    monkeypatch.setattr(
+        "flaskr.service.tts.streaming_tts.save_audio_record",
+        lambda *_args, **_kwargs: None,
+    )
+    yield settings
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        stats = tts_scheduler.stats()
+        if not stats["queued"] and not stats["running"]:
+            break
+        time.sleep(0.02)
+
+
+def _stream_lesson(app, monkeypatch, tts_enabled, chunks=CHUNKS):
+    """Feed the chunks like the run stream does; return (last text at, events)."""
+    from flaskr.service.tts.streaming_tts import AVStreamingTTSProcessor
+
+    monkeypatch.setattr(
+        "flaskr.service.tts.streaming_tts.is_tts_configured",
+        lambda _provider: tts_enabled,
+    )
+    processor = AVStreamingTTSProcessor(
+        app=app,
+        generated_block_bid="gen-pacing",
+        outline_bid="outline-pacing",
+        progress_record_bid="progress-pacing",
+        user_bid="user-pacing",
+        shifu_bid="shifu-pacing",
+        tts_provider="minimax",
+    )
+    events = []
+    start = time.monotonic()
+    for chunk in chunks:
+        # The text of a chunk is sent once its TTS events were collected.
+        events.extend(processor.process_chunk(chunk))
+    last_text_at = time.monotonic() - start
+    events.extend(processor.finalize(commit=False))
+    return last_text_at, events
+
+
+def test_tts_does_not_delay_lesson_text(app, monkeypatch, slow_tts):
+    _require_app(app)
+
+    without_tts, events = _stream_lesson(app, monkeypatch, tts_enabled=False)
+    assert not [e for e in events if e.type == GeneratedType.AUDIO_SEGMENT]
+
+    with_tts, events = _stream_lesson(app, monkeypatch, tts_enabled=True)
+
+    # Every sentence takes SYNTHESIS_SECONDS, and a track is closed at the
+    # <svg> boundary, yet the last text byte is not held back by synthesis.
+    assert with_tts - without_tts < SYNTHESIS_SECONDS / 2
+
+    segments = [e.content for e in events if e.type == GeneratedType.AUDIO_SEGMENT]
+    offsets = {}
+    for segment in segments:
+        offsets.setdefault(segment.position, []).append(segment.start_offset_ms)
+    assert offsets == {0: [0, 500, 1000], 1: [0, 500]}
+
+    completes = [e.content for e in events if e.type == GeneratedType.AUDIO_COMPLETE]
+    assert [c.position for c in completes] == [0, 1]
+
+
+def test_finalize_waits_once_for_all_draining_tracks(app, monkeypatch, slow_tts):
+    _require_app(app)
+    import flaskr.service.tts.streaming_tts as streaming_tts
+
+    finalize_timeout = 0.3
+    get_config = streaming_tts.get_config
+    monkeypatch.setattr(
+        streaming_tts,
+        "get_config",
+        lambda key, *args: (
+            finalize_timeout
+            if key == "TTS_STREAM_FINALIZE_TIMEOUT"
+            else get_config(key, *args)
+        ),
+    )
+    slow_tts.seconds = 1.5
+    # Two tracks are still synthesizing when finalize starts, plus the last.
+    chunks = [
+        "First track sentence here. ",
+        "<svg><text>one</text></svg>\n",
+        "Second track sentence here. ",
+        "<svg><text>two</text></svg>\n",
+        "Closing track sentence here.",
+    ]
+
+    started = time.monotonic()
+    _stream_lesson(app, monkeypatch, tts_enabled=True, chunks=chunks)
+
+    # One shared deadline, not one per track (3 x finalize_timeout).
+    assert time.monotonic() - started < 2 * finalize_timeout
@@ -0,0 +1,255 @@
+import threading
+import time
+
+import flaskr.common.config as common_config
+import pytest
+from flask import Flask
+
+from flaskr.api.tts.base import AudioSettings, TTSResult, VoiceSettings
+from flaskr.service.metering import UsageContext
+from flaskr.service.tts import audio_cache, pipeline, tts_usage_recorder
+from flaskr.service.tts.audio_cache import (
+    SEGMENT_CACHED,
+    SEGMENT_SHARED,
+    SEGMENT_SYNTHESIZED,
+    DiskLRUCache,
+    TTSAudioCache,
+    build_tts_cache_key,
+    decode_cache_entry,
+    encode_cache_entry,
+)
+
+
+def _key(text="Hello world.", **voice):
+    return build_tts_cache_key(
+        text=text,
+        provider="minimax",
+        model="speech-01",
+        voice_settings=VoiceSettings(**voice),
+        audio_settings=AudioSettings(),
+    )
+
+
+class _FakeSynthesizer:
+    def __init__(self, delay: float = 0.0):
+        self.calls = []
+        self.delay = delay
+        self._lock = threading.Lock()
+
+    def __call__(self, *, text, **_kwargs):
+        with self._lock:
+            self.calls.append(text)
+        if self.delay:
+            time.sleep(self.delay)
+        return TTSResult(
+            audio_data=f"audio:{text}".encode(),
+            duration_ms=1200,
+            sample_rate=24000,
+            format="mp3",
+            word_count=len(text),
+        )
+
+
+@pytest.fixture
+def storage_app(monkeypatch, tmp_path):
+    monkeypatch.setenv("STORAGE_PROVIDER", "local")
+    monkeypatch.setenv("LOCAL_STORAGE_ROOT", str(tmp_path / "storage"))
+    for key in ("STORAGE_PROVIDER", "LOCAL_STORAGE_ROOT"):
+        common_config.__ENHANCED_CONFIG__._cache.pop(key, None)  # noqa: SLF001
+    return Flask(__name__)
+
+
+def _synthesize(cache, app, text="Hello world."):
+    return cache.synthesize(
+        app,
+        text=text,
+        voice_settings=VoiceSettings(voice_id="v1"),
+        audio_settings=AudioSettings(),
+        model="speech-01",
+        provider_name="minimax",
+    )
+
+
+def test_cache_key_ignores_whitespace_but_not_settings():
+    assert _key("Hello   world.\n") == _key(" Hello world.")
+    assert _key(voice_id="a") != _key(voice_id="b")
+    assert _key(speed=1.0) != _key(speed=1.2)
+    assert _key("Hello world.") != _key("Hello world!")
+
+
+def test_cache_entry_round_trip():
+    result = TTSResult(
+        audio_data=b"\xff\xf3\x84\xc4\n\x00",
+        duration_ms=321,
+        sample_rate=24000,
+        format="mp3",
+        word_count=7,
+    )
+
+    assert decode_cache_entry(encode_cache_entry(result)) == result
+    assert decode_cache_entry(b"not a cache entry") is None
+
+
+def test_disk_lru_evicts_least_recently_used(tmp_path):
+    disk = DiskLRUCache(str(tmp_path), max_bytes=250)
+    disk.put("aa01", b"a" * 100)
+    disk.put("bb02", b"b" * 100)
+    assert disk.get("aa01") == b"a" * 100
+
+    disk.put("cc03", b"c" * 100)
+
+    assert disk.get("bb02") is None
+    assert disk.get("aa01") is not None
+    assert disk.total_bytes == 200
+    # a fresh process rebuilds the index from the directory
+    assert DiskLRUCache(str(tmp_path), max_bytes=250).total_bytes == 200
+
+
+def test_second_request_skips_provider(monkeypatch, tmp_path, storage_app):
+    fake = _FakeSynthesizer()
+    monkeypatch.setattr(audio_cache, "synthesize_text", fake)
+    cache = TTSAudioCache(
+        disk=DiskLRUCache(str(tmp_path / "disk"), 1 << 20), storage_enabled=False
+    )
+
+    first, first_source = _synthesize(cache, storage_app)
+    second, second_source = _synthesize(cache, storage_app)
+
+    assert (first_source, second_source) == (SEGMENT_SYNTHESIZED, SEGMENT_CACHED)
+    assert second == first
+    assert fake.calls == ["Hello world."]
+
+
+def test_storage_tier_is_shared_between_instances(monkeypatch, tmp_path, storage_app):
+    fake = _FakeSynthesizer()
+    monkeypatch.setattr(audio_cache, "synthesize_text", fake)
+    writer = TTSAudioCache(
+        disk=DiskLRUCache(str(tmp_path / "disk-a"), 1 << 20), storage_enabled=True
+    )
+    _synthesize(writer, storage_app)
+
+    reader_disk = DiskLRUCache(str(tmp_path / "disk-b"), 1 << 20)
+    reader = TTSAudioCache(disk=reader_disk, storage_enabled=True)
+    result, source = _synthesize(reader, storage_app)
+
+    assert source == SEGMENT_CACHED
+    assert result.audio_data == b"audio:Hello world."
+    assert reader.storage_hits == 1
+    assert reader_disk.total_bytes > 0
+    assert fake.calls == ["Hello world."]
+
+
+def test_concurrent_misses_share_one_provider_call(monkeypatch, storage_app):
+    fake = _FakeSynthesizer(delay=0.05)
+    monkeypatch.setattr(audio_cache, "synthesize_text", fake)
+    cache = TTSAudioCache(disk=None, storage_enabled=False)
+    results = []
+
+    def worker():
+        results.append(_synthesize(cache, storage_app))
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert fake.calls == ["Hello world."]
+    # Waiters are not cache hits; only the caller that synthesized bills it.
+    assert sorted(source for _result, source in results) == [
+        SEGMENT_SHARED,
+        SEGMENT_SHARED,
+        SEGMENT_SHARED,
+        SEGMENT_SYNTHESIZED,
+    ]
+    assert (cache.hits, cache.misses) == (0, 1)
+
+
+def test_cache_hit_usage_is_not_billable(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(
+        tts_usage_recorder,
+        "record_tts_usage",
+        lambda app, context, **kwargs: recorded.append((context, kwargs)),
+    )
+
+    for source in (SEGMENT_SYNTHESIZED, SEGMENT_CACHED, SEGMENT_SHARED):
+        tts_usage_recorder.record_tts_segment_usage(
+            app=None,
+            usage_context=UsageContext(user_bid="u1"),
+            provider="minimax",
+            model="",
+            segment_text="Hello world.",
+            word_count=12,
+            duration_ms=1200,
+            latency_ms=3,
+            voice_settings=VoiceSettings(),
+            audio_settings=AudioSettings(),
+            is_stream=True,
+            parent_usage_bid="parent",
+            segment_index=0,
+            source=source,
+        )
+
+    (billed_context, billed), (cached_context, cached), (shared_context, shared) = (
+        recorded
+    )
+    assert billed_context.billable is None
+    assert "cache_hit" not in billed["extra"]
+    assert cached_context.billable == 0
+    assert cached["extra"]["cache_hit"] is True
+    assert shared_context.billable == 0
+    assert shared["extra"]["shared_synthesis"] is True
+
+
+def test_partial_cache_hit_bills_only_synthesized_segments(monkeypatch):
+    app = Flask(__name__)
+    text = "First sentence here. Second sentence here. Third sentence here."
+    sources = {"Second sentence here.": SEGMENT_CACHED}
+    recorded = []
+
+    def fake_synthesize(_app, *, text, **_kwargs):
+        result = TTSResult(f"audio:{text}".encode(), 1200, 24000, "mp3", len(text))
+        return result, sources.get(text, SEGMENT_SYNTHESIZED)
+
+    monkeypatch.setattr(pipeline, "is_tts_configured", lambda _provider: True)
+    monkeypatch.setattr(
+        pipeline,
+        "split_text_for_tts",
+        lambda text, **_kwargs: [s + "." for s in text.rstrip(".").split(". ")],
+    )
+    monkeypatch.setattr(pipeline, "synthesize_text_cached", fake_synthesize)
+    monkeypatch.setattr(pipeline, "concat_audio_best_effort", b"".join)
+    monkeypatch.setattr(pipeline, "get_audio_duration_ms", lambda *_a, **_k: 3600)
+    monkeypatch.setattr(
+        pipeline, "upload_audio_to_oss", lambda *_args: ("https://oss/a.mp3", "b")
+    )
+    monkeypatch.setattr(
+        pipeline,
+        "record_tts_usage",
+        lambda _app, context, **kwargs: recorded.append((context, kwargs)),
+    )
+
+    pipeline.synthesize_long_text_to_oss(
+        app,
+        text=text,
+        provider_name="minimax",
+        max_workers=1,
+        voice_settings=VoiceSettings(voice_id="v1"),
+        audio_settings=AudioSettings(),
+        usage_context=UsageContext(user_bid="u1"),
+        parent_usage_bid="parent",
+    )
+
+    *segments, (summary_context, summary) = recorded
+    assert [context.billable for context, _kwargs in segments] == [None, 0, None]
+    assert summary["record_level"] == 0
+    assert summary_context.billable is None
+    cached_length = len("Second sentence here.")
+    assert summary["total"] == len(text) - cached_length
+    assert summary["input"] == len(text) - cached_length
+    assert summary["word_count"] == sum(
+        kwargs["word_count"] for context, kwargs in segments if context.billable is None
+    )
+    assert summary["extra"]["cache_hit_count"] == 1
+    assert summary["extra"]["unbilled_length"] == cached_length
@@ -0,0 +1,202 @@
+import threading
+import time
+
+import pytest
+
+from flaskr.service.tts.scheduler import (
+    PRIORITY_BATCH,
+    PRIORITY_STREAM,
+    ProviderLimit,
+    TTSQueueFullError,
+    TTSScheduler,
+    parse_provider_limits,
+)
+
+
+def _scheduler(**kwargs):
+    defaults = {
+        "max_workers": 4,
+        "max_queue_size": 100,
+        "reserved_stream_workers": 0,
+        "default_concurrency": 4,
+        "provider_limits": {},
+    }
+    defaults.update(kwargs)
+    return TTSScheduler(**defaults)
+
+
+@pytest.fixture
+def scheduler_factory():
+    created = []
+
+    def _create(**kwargs):
+        scheduler = _scheduler(**kwargs)
+        created.append(scheduler)
+        return scheduler
+
+    yield _create
+    for scheduler in created:
+        scheduler.shutdown(wait=True, cancel_pending=True, timeout=5)
+
+
+def test_parse_provider_limits():
+    limits = parse_provider_limits(" Minimax=4:10, baidu=2 ,bad, x=y")
+
+    assert limits == {
+        "minimax": ProviderLimit(max_concurrency=4, rate_per_second=10.0),
+        "baidu": ProviderLimit(max_concurrency=2, rate_per_second=0.0),
+    }
+
+
+def test_provider_concurrency_limit(scheduler_factory):
+    scheduler = scheduler_factory(
+        provider_limits={"minimax": ProviderLimit(max_concurrency=2)}
+    )
+    lock = threading.Lock()
+    active = {"now": 0, "peak": 0}
+
+    def task():
+        with lock:
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+        time.sleep(0.02)
+        with lock:
+            active["now"] -= 1
+
+    futures = [scheduler.submit(task, provider="minimax") for _ in range(8)]
+    for future in futures:
+        future.result(timeout=5)
+
+    assert active["peak"] == 2
+    stats = scheduler.stats()
+    assert stats["providers"]["minimax"]["completed"] == 8
+    assert stats["wait_count"] == 8
+    assert stats["queued"] == 0
+
+
+def test_streaming_runs_before_queued_batch(scheduler_factory):
+    scheduler = scheduler_factory(max_workers=1)
+    gate = threading.Event()
+    running = threading.Event()
+    order = []
+
+    def block():
+        running.set()
+        gate.wait(5)
+
+    blocker = scheduler.submit(block, provider="minimax")
+    assert running.wait(5)
+    batch = [
+        scheduler.submit(order.append, f"batch-{i}", provider="minimax")
+        for i in range(3)
+    ]
+    stream = scheduler.submit(
+        order.append, "stream", provider="minimax", priority=PRIORITY_STREAM
+    )
+    assert scheduler.stats()["queued"] == 4
+    gate.set()
+    for future in [blocker, stream, *batch]:
+        future.result(timeout=5)
+
+    assert order == ["stream", "batch-0", "batch-1", "batch-2"]
+
+
+def test_reserved_workers_stay_free_for_streaming(scheduler_factory):
+    scheduler = scheduler_factory(max_workers=2, reserved_stream_workers=1)
+    gate = threading.Event()
+
+    batch = [
+        scheduler.submit(gate.wait, 5, provider="baidu", priority=PRIORITY_BATCH)
+        for _ in range(2)
+    ]
+    stream = scheduler.submit(lambda: "ok", provider="baidu", priority=PRIORITY_STREAM)
+
+    assert stream.result(timeout=5) == "ok"
+    assert scheduler.stats()["providers"]["baidu"]["in_flight"] == 1
+    gate.set()
+    for future in batch:
+        future.result(timeout=5)
+
+
+def test_rate_limit_spaces_requests(scheduler_factory):
+    scheduler = scheduler_factory(
+        provider_limits={
+            "volcengine": ProviderLimit(max_concurrency=4, rate_per_second=20)
+        }
+    )
+    started = []
+
+    futures = [
+        scheduler.submit(
+            lambda: started.append(time.monotonic()), provider="volcengine"
+        )
+        for _ in range(5)
+    ]
+    for future in futures:
+        future.result(timeout=5)
+
+    # one token of burst, then one request every 50ms
+    assert started[-1] - started[0] >= 0.15
+
+
+def test_exceptions_propagate_and_are_counted(scheduler_factory):
+    scheduler = scheduler_factory()
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError, match="boom"):
+        scheduler.submit(fail, provider="aliyun").result(timeout=5)
+    assert scheduler.stats()["providers"]["aliyun"]["failed"] == 1
+
+
+def test_queue_full_rejects(scheduler_factory):
+    scheduler = scheduler_factory(max_workers=1, max_queue_size=1)
+    gate = threading.Event()
+    running = threading.Event()
+
+    def block():
+        running.set()
+        gate.wait(5)
+
+    scheduler.submit(block)
+    assert running.wait(5)
+    scheduler.submit(lambda: None)
+    with pytest.raises(TTSQueueFullError):
+        scheduler.submit(lambda: None)
+    assert scheduler.stats()["rejected"] == 1
+    gate.set()
+
+
+def test_shutdown_drains_queue_then_rejects():
+    scheduler = _scheduler(max_workers=1)
+    results = []
+    futures = [scheduler.submit(results.append, i) for i in range(5)]
+
+    scheduler.shutdown(wait=True, timeout=5)
+
+    assert all(future.done() for future in futures)
+    assert results == [0, 1, 2, 3, 4]
+    with pytest.raises(RuntimeError):
+        scheduler.submit(lambda: None)
+
+
+def test_shutdown_can_cancel_pending():
+    scheduler = _scheduler(max_workers=1)
+    gate = threading.Event()
+    running = threading.Event()
+
+    def block():
+        running.set()
+        gate.wait(5)
+
+    first = scheduler.submit(block)
+    assert running.wait(5)
+    pending = scheduler.submit(lambda: None)
+
+    scheduler.shutdown(wait=False, cancel_pending=True)
+    gate.set()
+    first.result(timeout=5)
+
+    assert pending.cancelled()
+    assert scheduler.stats()["queued"] == 0
@@ -0,0 +1,88 @@
+import base64
+
+import pytest
+
+from flaskr.service.tts import segment_store
+from flaskr.service.tts.streaming_tts import StreamingTTSProcessor, TTSSegment
+
+
+def _require_app(app):
+    if app is None:
+        pytest.skip("App fixture disabled")
+
+
+def _use_delivery(monkeypatch, mode):
+    get_config = segment_store.get_config
+
+    def _get_config(key, default=None):
+        if key == "TTS_SEGMENT_DELIVERY":
+            return mode
+        return get_config(key, default)
+
+    monkeypatch.setattr(segment_store, "get_config", _get_config)
+
+
+def _ready_processor(app, monkeypatch, audios):
+    monkeypatch.setattr(
+        "flaskr.service.tts.streaming_tts.is_tts_configured", lambda _p: True
+    )
+    processor = StreamingTTSProcessor(
+        app=app,
+        generated_block_bid="block-1",
+        outline_bid="outline-1",
+        progress_record_bid="progress-1",
+        user_bid="user-1",
+        shifu_bid="shifu-1",
+        av_contract={"speakable_segments": [{"position": 0}]},
+    )
+    for index, audio in enumerate(audios):
+        processor._completed_segments[index] = TTSSegment(
+            index=index, text="text", audio_data=audio, duration_ms=100
+        )
+    return processor
+
+
+def test_url_delivery_serves_segments_by_reference(app, monkeypatch):
+    _require_app(app)
+    _use_delivery(monkeypatch, "url")
+    audios = [b"ID3-first-segment-audio", b"ID3-second-segment-audio"]
+    processor = _ready_processor(app, monkeypatch, audios)
+
+    payloads = [event.content.__json__() for event in processor._yield_ready_segments()]
+
+    assert [p["segment_index"] for p in payloads] == [0, 1]
+    assert all("audio_data" not in p for p in payloads)
+    # The contract goes out once, with the first segment of the track.
+    assert payloads[0]["av_contract"] == {"speakable_segments": [{"position": 0}]}
+    assert "av_contract" not in payloads[1]
+
+    client = app.test_client()
+    for payload, audio in zip(payloads, audios):
+        url = payload["audio_url"]
+        assert url.startswith(segment_store.SEGMENT_URL_PATH)
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.mimetype == "audio/mpeg"
+        assert response.data == audio
+
+    ranged = client.get(payloads[0]["audio_url"], headers={"Range": "bytes=4-8"})
+    assert ranged.status_code == 206
+    assert ranged.data == audios[0][4:9]
+    assert ranged.headers["Content-Range"] == f"bytes 4-8/{len(audios[0])}"
+
+    assert client.get(segment_store.SEGMENT_URL_PATH + "0" * 32).status_code == 404
+    assert (
+        client.get(segment_store.SEGMENT_URL_PATH + "not-a-segment").status_code == 404
+    )
+
+
+def test_inline_delivery_embeds_base64_audio(app, monkeypatch):
+    _require_app(app)
+    _use_delivery(monkeypatch, "inline")
+    processor = _ready_processor(app, monkeypatch, [b"audio-bytes"])
+
+    (event,) = list(processor._yield_ready_segments())
+    payload = event.content.__json__()
+
+    assert base64.b64decode(payload["audio_data"]) == b"audio-bytes"
+    assert "audio_url" not in payload
@@ -0,0 +1,145 @@
+import threading
+import time
+
+import pytest
+
+import flaskr.api.tts.baidu_provider as baidu_provider
+from flaskr.api.tts.token_cache import (
+    CachedToken,
+    SharedTokenCache,
+    decode_token,
+    store_token,
+)
+from flaskr.common.cache_provider import cache
+from flaskr.common.http_client import http_client
+
+KEY = "test:token-cache:provider"
+
+
+def _wait_idle(token_cache, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while token_cache.stats()["refreshing"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert token_cache.stats()["refreshing"] == 0
+
+
+def test_baidu_token_is_shared_between_workers(monkeypatch):
+    monkeypatch.setenv("REDIS_KEY_PREFIX", "test:baidu-token:")
+    calls = []
+
+    class DummyResponse:
+        def raise_for_status(self):
+            return None
+
+        def json(self):
+            return {"access_token": "baidu-token", "expires_in": 2592000}
+
+    def fake_post(url, params=None, **_kwargs):
+        calls.append(params)
+        return DummyResponse()
+
+    monkeypatch.setattr(http_client, "post", fake_post)
+
+    assert baidu_provider._get_access_token("api", "secret") == "baidu-token"
+    # Another worker process has its own SharedTokenCache but the same cache.
+    monkeypatch.setattr(baidu_provider, "access_token_cache", SharedTokenCache("baidu"))
+    assert baidu_provider._get_access_token("api", "secret") == "baidu-token"
+    assert len(calls) == 1
+    assert calls[0]["client_id"] == "api"
+
+    # Rotated credentials never read the previous token.
+    assert baidu_provider._get_access_token("api", "rotated") == "baidu-token"
+    assert len(calls) == 2
+
+
+def test_expiring_token_is_refreshed_once_in_the_background():
+    token_cache = SharedTokenCache("test", refresh_ahead=300)
+    store_token(KEY, CachedToken("old", int(time.time()) + 200))
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(2)
+        return CachedToken("new", int(time.time()) + 3600)
+
+    # Callers are not held up by the refresh, and only one refresh runs.
+    started = time.monotonic()
+    tokens = [token_cache.get(KEY, fetch, refresh_leeway=60) for _ in range(5)]
+    assert time.monotonic() - started < 0.5
+    assert tokens == ["old"] * 5
+
+    release.set()
+    _wait_idle(token_cache)
+    assert len(calls) == 1
+    assert token_cache.get(KEY, fetch, refresh_leeway=60) == "new"
+    stats = token_cache.stats()
+    assert (stats["hits"], stats["fetches"], stats["background_refreshes"]) == (
+        6,
+        1,
+        1,
+    )
+
+
+def test_background_refresh_skips_while_another_process_refreshes():
+    token_cache = SharedTokenCache("test", refresh_ahead=300)
+    store_token(KEY, CachedToken("old", int(time.time()) + 200))
+    other_process = cache.lock(KEY + ":lock", timeout=15)
+    assert other_process.acquire(blocking=False)
+    try:
+        assert token_cache.get(KEY, pytest.fail, refresh_leeway=60) == "old"
+        _wait_idle(token_cache)
+    finally:
+        other_process.release()
+    assert token_cache.stats()["skipped"] == 1
+
+
+def test_refresh_failures_are_counted():
+    token_cache = SharedTokenCache("test", refresh_ahead=300)
+
+    def fetch():
+        raise ValueError("token endpoint down")
+
+    with pytest.raises(ValueError):
+        token_cache.get(KEY, fetch)
+
+    # A token inside the leeway is still served while refreshing fails.
+    store_token(KEY, CachedToken("old", int(time.time()) + 30))
+    assert token_cache.get(KEY, fetch, refresh_leeway=60) == "old"
+
+    stats = token_cache.stats()
+    assert (stats["failures"], stats["fallbacks"], stats["fetches"]) == (2, 1, 0)
+    assert stats["last_error"] == "token endpoint down"
+    assert decode_token(cache.get(KEY)).token == "old"
+
+
+def test_lock_timeout_rereads_the_cache(monkeypatch):
+    token_cache = SharedTokenCache("test", refresh_ahead=300)
+    cache.delete(KEY)
+    lock = cache.lock
+
+    class SlowHolderLock:
+        """Times out while another process stores its token and keeps the lock."""
+
+        def __init__(self, key, **kwargs):
+            self._lock = lock(key, **kwargs)
+
+        def acquire(self, **_kwargs):
+            if decode_token(cache.get(KEY)) is None:
+                store_token(KEY, CachedToken("shared", int(time.time()) + 3600))
+            return False
+
+        def release(self):
+            self._lock.release()
+
+    monkeypatch.setattr(cache, "lock", SlowHolderLock)
+
+    # The token stored while we waited is picked up instead of fetching one.
+    assert token_cache.get(KEY, pytest.fail, refresh_leeway=60) == "shared"
+
+    # While the holder is still fetching, a token inside the leeway is used.
+    store_token(KEY, CachedToken("expiring", int(time.time()) + 30))
+    assert token_cache.get(KEY, pytest.fail, refresh_leeway=60) == "expiring"
+
+    stats = token_cache.stats()
+    assert (stats["hits"], stats["fetches"]) == (2, 0)
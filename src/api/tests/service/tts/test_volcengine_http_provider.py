@@ -1,12 +1,11 @@
 import base64
 
-import requests
-
 from flaskr.api.tts.base import AudioSettings, VoiceSettings
 from flaskr.api.tts.volcengine_http_provider import (
     VOLCENGINE_HTTP_TTS_URL,
     VolcengineHttpTTSProvider,
 )
+from flaskr.common.http_client import http_client
 from flaskr.service.tts.pipeline import split_text_for_tts
 from flaskr.service.tts.validation import validate_tts_settings_strict
 
@@ -39,14 +38,14 @@ def test_volcengine_http_synthesize_success(monkeypatch):
                 "addition": {"duration": "1234"},
             }
 
-    def fake_post(url, json=None, headers=None, timeout=None):
+    def fake_post(url, json=None, headers=None, timeout=None, **_kwargs):
         captured["url"] = url
         captured["json"] = json
         captured["headers"] = headers
         captured["timeout"] = timeout
         return DummyResponse()
 
-    monkeypatch.setattr(requests, "post", fake_post)
+    monkeypatch.setattr(http_client, "post", fake_post)
 
     provider = VolcengineHttpTTSProvider()
     voice_settings = VoiceSettings(
@@ -104,14 +103,14 @@ def test_volcengine_http_legacy_resource_id_overrides_default_cluster(monkeypatc
                 "addition": {"duration": "0"},
             }
 
-    def fake_post(url, json=None, headers=None, timeout=None):
+    def fake_post(url, json=None, headers=None, timeout=None, **_kwargs):
         captured["url"] = url
         captured["json"] = json
         captured["headers"] = headers
         captured["timeout"] = timeout
         return DummyResponse()
 
-    monkeypatch.setattr(requests, "post", fake_post)
+    monkeypatch.setattr(http_client, "post", fake_post)
 
     provider = VolcengineHttpTTSProvider()
     provider.synthesize("Hello world", model=None)
@@ -0,0 +1,274 @@
+import base64
+import hashlib
+import json
+import socketserver
+import struct
+import threading
+import time
+
+import pytest
+
+import flaskr.api.tts.volcengine_provider as volcengine_provider
+from flaskr.api.tts.base import AudioSettings, VoiceSettings
+from flaskr.api.tts.volcengine_protocol import Event, MessageType
+from flaskr.api.tts.volcengine_ws_pool import VolcengineConnectionPool
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+def _server_frame(message_type, event, ident, payload):
+    if isinstance(payload, dict):
+        serialization, payload = 1, json.dumps(payload).encode()
+    else:
+        serialization = 0
+    ident = ident.encode()
+    return (
+        bytes([0x11, (message_type << 4) | 0b0100, serialization << 4, 0])
+        + struct.pack(">i", event)
+        + struct.pack(">I", len(ident))
+        + ident
+        + struct.pack(">I", len(payload))
+        + payload
+    )
+
+
+class _FakeVolcengineHandler(socketserver.BaseRequestHandler):
+    """Speaks just enough WebSocket and Volcengine framing for the pool."""
+
+    def _read(self, size):
+        data = b""
+        while len(data) < size:
+            chunk = self.request.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("client went away")
+            data += chunk
+        return data
+
+    def _read_message(self):
+        first, second = self._read(2)
+        length = second & 0x7F
+        if length == 126:
+            (length,) = struct.unpack(">H", self._read(2))
+        elif length == 127:
+            (length,) = struct.unpack(">Q", self._read(8))
+        mask = self._read(4)
+        data = bytes(b ^ mask[i % 4] for i, b in enumerate(self._read(length)))
+        return first & 0x0F, data
+
+    def _send_ws(self, data, opcode=0x2):
+        if len(data) < 126:
+            header = bytes([0x80 | opcode, len(data)])
+        else:
+            header = bytes([0x80 | opcode, 126]) + struct.pack(">H", len(data))
+        self.request.sendall(header + data)
+
+    def handle(self):
+        server = self.server
+        request = b""
+        while b"\r\n\r\n" not in request:
+            request += self.request.recv(4096)
+        headers = {}
+        for line in request.decode().split("\r\n")[1:]:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        accept = base64.b64encode(
+            hashlib.sha1((headers["sec-websocket-key"] + WS_GUID).encode()).digest()
+        ).decode()
+        self.request.sendall(
+            (
+                "HTTP/1.1 101 Switching Protocols\r\n"
+                "Upgrade: websocket\r\nConnection: Upgrade\r\n"
+                f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+            ).encode()
+        )
+        with server.lock:
+            server.connections.append(headers)
+            connection_number = len(server.connections)
+
+        text = ""
+        try:
+            while True:
+                opcode, data = self._read_message()
+                if opcode == 0x8:
+                    self._send_ws(b"", opcode=0x8)
+                    return
+                (event,) = struct.unpack(">i", data[4:8])
+                session_id = ""
+                if event >= Event.START_SESSION:
+                    (size,) = struct.unpack(">I", data[8:12])
+                    session_id = data[12 : 12 + size].decode()
+                    (payload_size,) = struct.unpack(">I", data[12 + size : 16 + size])
+                    payload = json.loads(data[16 + size : 16 + size + payload_size])
+                if event == Event.START_CONNECTION:
+                    self._send_ws(
+                        _server_frame(
+                            MessageType.FULL_SERVER_RESPONSE,
+                            Event.CONNECTION_STARTED,
+                            f"conn-{connection_number}",
+                            {},
+                        )
+                    )
+                elif event == Event.FINISH_CONNECTION:
+                    with server.lock:
+                        server.finished_connections += 1
+                    return
+                elif event == Event.START_SESSION:
+                    if server.drop_next_session:
+                        server.drop_next_session = False
+                        return
+                    self._send_ws(
+                        _server_frame(
+                            MessageType.FULL_SERVER_RESPONSE,
+                            Event.SESSION_STARTED,
+                            session_id,
+                            {},
+                        )
+                    )
+                elif event == Event.TASK_REQUEST:
+                    text = payload["req_params"]["text"]
+                elif event == Event.FINISH_SESSION:
+                    self._send_ws(
+                        _server_frame(
+                            MessageType.FULL_SERVER_RESPONSE,
+                            Event.TTS_SENTENCE_END,
+                            session_id,
+                            {"res_params": {"duration_ms": 300}},
+                        )
+                    )
+                    self._send_ws(
+                        _server_frame(
+                            MessageType.AUDIO_ONLY_RESPONSE,
+                            Event.TTS_RESPONSE,
+                            session_id,
+                            b"audio:" + text.encode(),
+                        )
+                    )
+                    self._send_ws(
+                        _server_frame(
+                            MessageType.FULL_SERVER_RESPONSE,
+                            Event.SESSION_FINISHED,
+                            session_id,
+                            {},
+                        )
+                    )
+                    with server.lock:
+                        server.sessions += 1
+                    if server.close_after_session:
+                        self._send_ws(b"", opcode=0x8)
+                        return
+        except ConnectionError:
+            return
+
+
+@pytest.fixture
+def fake_server():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _FakeVolcengineHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.connections = []
+    server.finished_connections = 0
+    server.sessions = 0
+    server.close_after_session = False
+    server.drop_next_session = False
+    server.url = f"ws://127.0.0.1:{server.server_address[1]}/tts"
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _synthesize(pool, server, text, resource_id="seed-tts-1.0"):
+    return pool.synthesize(
+        url=server.url,
+        app_key="app",
+        access_key="secret",
+        resource_id=resource_id,
+        text=text,
+        session_params={"speaker": "zh_female_shuangkuaisisi_moon_bigtts"},
+    )
+
+
+def test_provider_runs_sessions_over_one_warm_connection(monkeypatch, fake_server):
+    pool = VolcengineConnectionPool(max_idle_per_key=2, idle_timeout=60, max_age=0)
+    monkeypatch.setattr(volcengine_provider, "volcengine_ws_pool", pool)
+    monkeypatch.setattr(volcengine_provider, "VOLCENGINE_TTS_WS_URL", fake_server.url)
+    monkeypatch.setenv("VOLCENGINE_TTS_APP_KEY", "app")
+    monkeypatch.setenv("VOLCENGINE_TTS_ACCESS_KEY", "secret")
+    provider = volcengine_provider.VolcengineTTSProvider()
+
+    texts = ["First sentence.", "Second sentence.", "Third sentence."]
+    results = [
+        provider.synthesize(
+            text,
+            voice_settings=VoiceSettings(voice_id="zh_male_abin_moon_bigtts"),
+            audio_settings=AudioSettings(format="mp3"),
+        )
+        for text in texts
+    ]
+
+    assert [r.audio_data for r in results] == [b"audio:" + t.encode() for t in texts]
+    assert all(r.duration_ms == 300 for r in results)
+    assert len(fake_server.connections) == 1
+    assert fake_server.connections[0]["x-api-resource-id"] == "seed-tts-1.0"
+    assert fake_server.sessions == 3
+    stats = pool.stats()
+    assert (stats["opened"], stats["reused"], stats["sessions"]) == (1, 2, 3)
+    assert (stats["idle"], stats["in_use"]) == (1, 0)
+
+    # Another resource id needs its own authenticated connection.
+    _synthesize(pool, fake_server, "Other voice.", resource_id="seed-tts-2.0")
+    assert len(fake_server.connections) == 2
+    assert pool.stats()["idle"] == 2
+
+    pool.close_all()
+    deadline = time.monotonic() + 2
+    while fake_server.finished_connections < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert fake_server.finished_connections == 2
+
+
+def test_connections_closed_by_the_server_are_replaced(fake_server):
+    pool = VolcengineConnectionPool(max_idle_per_key=2, idle_timeout=60, max_age=0)
+
+    # The health check sees the close frame of an idle connection.
+    fake_server.close_after_session = True
+    _synthesize(pool, fake_server, "one")
+    time.sleep(0.1)
+    fake_server.close_after_session = False
+    assert _synthesize(pool, fake_server, "two").audio_chunks == [b"audio:two"]
+    assert pool.stats()["discarded_unhealthy"] == 1
+
+    # A connection that dies while starting a session is retried on a new one.
+    fake_server.drop_next_session = True
+    assert _synthesize(pool, fake_server, "three").audio_chunks == [b"audio:three"]
+    stats = pool.stats()
+    assert (stats["opened"], stats["retries"], stats["failures"]) == (3, 1, 0)
+    assert len(fake_server.connections) == 3
+    pool.close_all()
+
+
+def test_idle_connections_are_evicted(fake_server):
+    now = [1000.0]
+    pool = VolcengineConnectionPool(
+        max_idle_per_key=2, idle_timeout=30, max_age=0, clock=lambda: now[0]
+    )
+    _synthesize(pool, fake_server, "hello")
+    now[0] += 10
+    assert pool.evict_idle() == 0
+
+    now[0] += 25
+    assert pool.evict_idle() == 1
+    stats = pool.stats()
+    assert (stats["idle"], stats["evicted_idle"]) == (0, 1)
+
+    _synthesize(pool, fake_server, "again")
+    assert len(fake_server.connections) == 2
+
+
+def test_pool_size_zero_disables_reuse(fake_server):
+    pool = VolcengineConnectionPool(max_idle_per_key=0, idle_timeout=30, max_age=0)
+    _synthesize(pool, fake_server, "a")
+    _synthesize(pool, fake_server, "b")
+    assert len(fake_server.connections) == 2
+    assert pool.stats()["idle"] == 0
@@ -0,0 +1,162 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import flaskr.api.llm as llm
+from flaskr.api.llm.model_catalog import ModelCatalog, provider_fingerprint
+
+
+class FakeModelsServer:
+    """OpenAI-compatible ``GET /v1/models`` endpoint on localhost."""
+
+    def __init__(self):
+        self.models = ["gpt-4o"]
+        self.delay = 0.0
+        self.status = 200
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests += 1
+                time.sleep(server.delay)
+                body = json.dumps({"data": [{"id": m} for m in server.models]})
+                self.send_response(server.status)
+                self.send_header("Content-Type", "application/json")
+                self.end_headers()
+                self.wfile.write(body.encode("utf-8"))
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, args=(0.05,), daemon=True
+        )
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}/v1"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture
+def models_server():
+    with FakeModelsServer() as server:
+        yield server
+
+
+def _register(catalog, key, server):
+    catalog.register(
+        key,
+        provider_fingerprint(key, "test-key", server.base_url),
+        lambda: llm._fetch_provider_models("test-key", server.base_url),
+    )
+
+
+def test_providers_are_fetched_concurrently_and_persisted(tmp_path, models_server):
+    models_server.delay = 0.3
+    path = str(tmp_path / "models.json")
+    catalog = ModelCatalog(path=path)
+    for key in ("openai", "qwen", "deepseek"):
+        _register(catalog, key, models_server)
+
+    started = time.perf_counter()
+    assert catalog.refresh() == {"openai": True, "qwen": True, "deepseek": True}
+    assert time.perf_counter() - started < 0.8
+
+    # A new worker serves the snapshot without touching the network.
+    requests_before = models_server.requests
+    restarted = ModelCatalog(path=path)
+    restarted.load()
+    _register(restarted, "openai", models_server)
+    assert restarted.models("openai") == ["gpt-4o"]
+    assert restarted.missing() == []
+    assert models_server.requests == requests_before
+
+
+def test_stale_entries_are_served_while_refreshing(tmp_path, models_server):
+    now = [1000.0]
+    updates = []
+    catalog = ModelCatalog(
+        path=str(tmp_path / "models.json"),
+        refresh_interval=60,
+        on_update=lambda key, models: updates.append((key, models)),
+        clock=lambda: now[0],
+    )
+    _register(catalog, "openai", models_server)
+    catalog.refresh()
+    updates.clear()
+    assert catalog.maybe_refresh() is None
+
+    now[0] += 61
+    models_server.models = ["gpt-4o", "gpt-5"]
+    models_server.delay = 0.2
+    thread = catalog.maybe_refresh()
+    assert thread is not None
+    assert catalog.models("openai") == ["gpt-4o"]
+    thread.join(timeout=5)
+
+    assert catalog.models("openai") == ["gpt-4o", "gpt-5"]
+    assert updates == [("openai", ["gpt-4o", "gpt-5"])]
+
+
+def test_failed_fetch_keeps_previous_models(tmp_path, models_server):
+    catalog = ModelCatalog(path=str(tmp_path / "models.json"))
+    _register(catalog, "openai", models_server)
+    catalog.refresh()
+    models_server.status = 500
+
+    assert catalog.refresh() == {"openai": False}
+    assert catalog.models("openai") == ["gpt-4o"]
+
+
+def test_changed_credentials_ignore_snapshot(tmp_path, models_server):
+    path = str(tmp_path / "models.json")
+    catalog = ModelCatalog(path=path)
+    _register(catalog, "openai", models_server)
+    catalog.refresh()
+
+    restarted = ModelCatalog(path=path)
+    restarted.load()
+    restarted.register("openai", "other-fingerprint", lambda: ["gpt-other"])
+
+    assert restarted.models("openai") is None
+    assert restarted.missing() == ["openai"]
+
+
+@pytest.mark.no_mock_llm
+def test_current_models_come_from_catalog(tmp_path, models_server, monkeypatch, app):
+    config = {
+        "OPENAI_API_KEY": "test-key",
+        "OPENAI_BASE_URL": models_server.base_url,
+        "LLM_MODEL_CATALOG_PATH": str(tmp_path / "models.json"),
+        "LLM_MODEL_CATALOG_REFRESH_SECONDS": 3600,
+        "LLM_MODEL_CATALOG_FETCH_TIMEOUT": 5,
+    }
+    monkeypatch.setattr(llm, "get_config", lambda key, default=None: config.get(key))
+    monkeypatch.setattr(
+        llm, "LITELLM_PROVIDER_CONFIGS", llm.LITELLM_PROVIDER_CONFIGS[:1]
+    )
+    monkeypatch.setattr(llm, "PROVIDER_STATES", {})
+    monkeypatch.setattr(llm, "MODEL_ALIAS_MAP", {})
+    monkeypatch.setattr(llm, "model_catalog", None)
+    monkeypatch.setattr(llm, "_resolve_allowed_model_config", lambda: ([], []))
+    models_server.models = ["gpt-4o", "whisper-1"]
+
+    with app.app_context():
+        models = llm.get_current_models(app)
+
+    assert [option["model"] for option in models] == ["gpt-4o"]
+    assert llm.get_litellm_params_and_model("gpt-4o")[1] == "gpt-4o"
+    assert models_server.requests == 1
@@ -0,0 +1,97 @@
+"""Startup-time benchmark: ``create_app`` in a fresh interpreter."""
+
+import json
+import os
+import subprocess
+import sys
+import textwrap
+import time
+from pathlib import Path
+
+from flaskr.common.startup_profile import StartupProfiler
+
+API_ROOT = Path(__file__).resolve().parents[1]
+
+# Generous enough for slow CI machines; a regression that pulls an SDK back
+# into the import path is caught by the module assertions below instead.
+STARTUP_BUDGET_SECONDS = 30.0
+
+DEFERRED_MODULES = (
+    "litellm",
+    "oss2",
+    "pydub",
+    "alibabacloud_dysmsapi20170525",
+    "flaskr.api.tts.volcengine_provider",
+)
+
+_SCRIPT = textwrap.dedent(
+    """
+    import json, sys, time
+    start = time.perf_counter()
+    import app
+    flask_app = app.create_app()
+    print(json.dumps({
+        "seconds": time.perf_counter() - start,
+        "modules": sorted(sys.modules),
+        "rules": len(list(flask_app.url_map.iter_rules())),
+    }))
+    """
+)
+
+
+def test_create_app_defers_heavy_imports(tmp_path):
+    db_uri = f"sqlite:///{tmp_path / 'startup.db'}"
+    env = dict(
+        os.environ,
+        SKIP_APP_AUTOCREATE="1",
+        SKIP_LOAD_DOTENV="1",
+        SQLALCHEMY_DATABASE_URI=db_uri,
+        SAAS_DB_URI=db_uri,
+        ADMIN_DB_URI=db_uri,
+        SECRET_KEY="startup-test-secret-key-0123456789",
+        UNIVERSAL_VERIFICATION_CODE="9999",
+        DEFAULT_LLM_MODEL="gpt-test",
+        OPENAI_API_KEY="test-key",
+        STARTUP_PROFILE="true",
+    )
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", _SCRIPT],
+        cwd=API_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=300,
+    )
+    wall = time.perf_counter() - started
+    assert result.returncode == 0, result.stderr[-4000:]
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+
+    print(f"create_app: {report['seconds']:.2f}s ({wall:.2f}s with interpreter)")
+    loaded = set(report["modules"])
+    assert [name for name in DEFERRED_MODULES if name in loaded] == []
+    assert report["rules"] > 50
+    assert report["seconds"] < STARTUP_BUDGET_SECONDS
+
+
+def test_profiler_attributes_self_and_cumulative_time(tmp_path, monkeypatch):
+    (tmp_path / "profiled_outer.py").write_text("import profiled_inner\n")
+    (tmp_path / "profiled_inner.py").write_text("VALUE = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    for name in ("profiled_outer", "profiled_inner"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    profiler = StartupProfiler(enabled=True, top=5)
+
+    profiler.install()
+    try:
+        with profiler.phase("imports"):
+            import profiled_outer  # noqa: F401
+    finally:
+        profiler.uninstall()
+
+    outer_self, outer_total = profiler.modules["profiled_outer"]
+    inner_self, inner_total = profiler.modules["profiled_inner"]
+    assert inner_self == inner_total
+    assert outer_total >= outer_self + inner_total - 1e-6
+    assert [name for name, _ in profiler.phases] == ["imports"]
+    assert "profiled_outer" in profiler.report()
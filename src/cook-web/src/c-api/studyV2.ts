@@ -122,8 +122,10 @@ export interface RunningResult {
 // Audio types for TTS
 export interface AudioSegmentData {
   segment_index: number;
-  audio_data: string; // Base64 encoded
+  audio_data?: string; // Base64 encoded (inline delivery)
+  audio_url?: string; // Short-lived segment URL (url delivery)
   duration_ms: number;
+  start_offset_ms?: number; // Play offset within the track
   is_final: boolean;
   position?: number;
   slide_id?: string;
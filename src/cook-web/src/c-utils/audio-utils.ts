@@ -2,8 +2,10 @@ import type { AudioCompleteData, AudioSegmentData } from '@/c-api/studyV2';
 
 export interface AudioSegment {
   segmentIndex: number;
-  audioData: string; // Base64 encoded
+  audioData: string; // Base64 encoded, empty when the segment has audioUrl
+  audioUrl?: string;
   durationMs: number;
+  startOffsetMs?: number;
   isFinal: boolean;
   position?: number;
   slideId?: string;
@@ -104,8 +106,12 @@ export interface AudioSegmentPayload {
   segmentIndex?: number;
   audio_data?: string;
   audioData?: string;
+  audio_url?: string;
+  audioUrl?: string;
   duration_ms?: number;
   durationMs?: number;
+  start_offset_ms?: number;
+  startOffsetMs?: number;
   is_final?: boolean;
   isFinal?: boolean;
   position?: number;
@@ -119,16 +125,19 @@ export const normalizeAudioSegmentPayload = (
   payload: AudioSegmentPayload,
 ): AudioSegment | null => {
   const segmentIndex = payload.segment_index ?? payload.segmentIndex;
-  const audioData = payload.audio_data ?? payload.audioData;
+  const audioData = payload.audio_data ?? payload.audioData ?? '';
+  const audioUrl = payload.audio_url ?? payload.audioUrl;
 
-  if (segmentIndex === undefined || !audioData) {
+  if (segmentIndex === undefined || (!audioData && !audioUrl)) {
     return null;
   }
 
   return {
     segmentIndex,
     audioData,
+    audioUrl,
     durationMs: payload.duration_ms ?? payload.durationMs ?? 0,
+    startOffsetMs: payload.start_offset_ms ?? payload.startOffsetMs,
     isFinal: payload.is_final ?? payload.isFinal ?? false,
     position: payload.position,
     slideId: payload.slide_id ?? payload.slideId,
@@ -138,8 +147,10 @@ export const normalizeAudioSegmentPayload = (
 
 const toAudioSegment = (segment: AudioSegmentData): AudioSegment => ({
   segmentIndex: segment.segment_index,
-  audioData: segment.audio_data,
+  audioData: segment.audio_data ?? '',
+  audioUrl: segment.audio_url,
   durationMs: segment.duration_ms,
+  startOffsetMs: segment.start_offset_ms,
   isFinal: segment.is_final,
   position: normalizeAudioPosition(segment.position),
   slideId: segment.slide_id,
@@ -15,7 +15,7 @@ import useExclusiveAudio from '@/hooks/useExclusiveAudio';
 import type { AudioSegment } from '@/c-utils/audio-utils';
 import {
   createAudioContext,
-  decodeAudioBufferFromBase64,
+  decodeAudioSegmentBuffer,
   playAudioBuffer,
   resumeAudioContext,
 } from '@/lib/audio-playback';
@@ -456,9 +456,9 @@ function AudioPlayerBase(
         const segment = segments[index];
         currentSegmentIndexRef.current = index;
 
-        const audioBuffer = await decodeAudioBufferFromBase64(
+        const audioBuffer = await decodeAudioSegmentBuffer(
           audioContext,
-          segment.audioData,
+          segment,
         );
         if (!isSessionActive(sessionId)) {
           isPlayingSegmentRef.current = false;
@@ -17,6 +17,7 @@ import {
   sortAudioSegments,
 } from '@/c-utils/audio-playlist';
 import useExclusiveAudio from '@/hooks/useExclusiveAudio';
+import { resolveAudioSegmentUrl } from '@/lib/audio-playback';
 import type { AudioPlayerHandle } from './AudioPlayer';
 
 export interface AudioPlayerListProps {
@@ -193,6 +194,9 @@ const AudioPlayerListBase = (
   );
 
   const getSegmentSrc = useCallback((segment: AudioSegment) => {
+    if (segment?.audioUrl && !segment.audioData) {
+      return resolveAudioSegmentUrl(segment.audioUrl);
+    }
     if (!segment?.audioData) {
       return '';
     }
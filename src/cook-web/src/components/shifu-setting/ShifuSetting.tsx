@@ -91,7 +91,7 @@ import api from '@/api';
 import useExclusiveAudio from '@/hooks/useExclusiveAudio';
 import {
   createAudioContext,
-  decodeAudioBufferFromBase64,
+  decodeAudioSegmentBuffer,
   playAudioBuffer,
   resumeAudioContext,
 } from '@/lib/audio-playback';
@@ -791,9 +791,9 @@ export default function ShifuSettingDialog({
         }
 
         const segment = segments[index];
-        const audioBuffer = await decodeAudioBufferFromBase64(
+        const audioBuffer = await decodeAudioSegmentBuffer(
           audioContext,
-          segment.audioData,
+          segment,
         );
         if (ttsPreviewSessionRef.current !== sessionId) {
           return;
@@ -1,3 +1,5 @@
+import { getResolvedBaseURL } from '@/c-utils/envUtils';
+
 export const createAudioContext = (): AudioContext => {
   if (typeof window === 'undefined') {
     throw new Error('AudioContext requires a browser environment.');
@@ -43,6 +45,30 @@ export const decodeAudioBufferFromBase64 = async (
   return audioContext.decodeAudioData(arrayBuffer);
 };
 
+// Segments streamed with TTS_SEGMENT_DELIVERY=url carry a relative API path
+// instead of base64 audio.
+export const resolveAudioSegmentUrl = (audioUrl: string): string =>
+  /^(https?:|blob:|data:)/.test(audioUrl)
+    ? audioUrl
+    : `${getResolvedBaseURL()}${audioUrl}`;
+
+export const decodeAudioSegmentBuffer = async (
+  audioContext: AudioContext,
+  segment: { audioData?: string; audioUrl?: string },
+): Promise<AudioBuffer> => {
+  if (segment.audioData) {
+    return decodeAudioBufferFromBase64(audioContext, segment.audioData);
+  }
+  if (!segment.audioUrl) {
+    throw new Error('Audio segment has no audio data.');
+  }
+  const response = await fetch(resolveAudioSegmentUrl(segment.audioUrl));
+  if (!response.ok) {
+    throw new Error(`Failed to fetch audio segment: ${response.status}`);
+  }
+  return audioContext.decodeAudioData(await response.arrayBuffer());
+};
+
 export const playAudioBuffer = (
   audioContext: AudioContext,
   audioBuffer: AudioBuffer,